@@ -0,0 +1,185 @@
+"""
+Startup benchmark for the CLI.
+
+Times quick CLI commands end to end against a synthetic store, subtracting
+the cost of starting a bare interpreter, and measures the import time of
+src.cli with ``python -X importtime``. The same measurements are taken of
+the CLI at a baseline git revision (by default the first commit), exported
+to a temporary directory, and the run exits with status 1 unless every
+budgeted measurement is at least --min-reduction below the baseline's, so it
+guards against imports creeping back into the CLI's start-up path.
+"view" and "complete" are reported against the baseline but not budgeted:
+they load the whole store, so they scale with the store rather than startup.
+
+Usage:
+    python benchmarks/cli_startup_bench.py [--tasks 1000] [--runs 20]
+        [--baseline-ref REV] [--min-reduction 0.1] [--output startup.json]
+"""
+
+import argparse
+import io
+import json
+import os
+import random
+import re
+import statistics
+import subprocess
+import sys
+import tarfile
+import tempfile
+import time
+
+from task_service_bench import PROJECT_ROOT, generate_tasks, make_vocabulary
+
+# Fraction by which each budgeted measurement must undercut the baseline's
+DEFAULT_MIN_REDUCTION = 0.1
+# Commands whose time is startup alone, checked like the import time
+BUDGETED_COMMANDS = ("help",)
+IMPORT_TIME_PATTERN = re.compile(r"import time:\s*\d+\s*\|\s*(\d+)\s*\|\s*src\.cli$")
+# Fields every version of the JSON store reads
+LEGACY_FIELDS = ("id", "title", "description", "priority", "completed", "created_at")
+
+
+def median_ms(command, runs, cwd=PROJECT_ROOT):
+    """Run a command repeatedly and return its median wall time in milliseconds."""
+    latencies = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(command, cwd=cwd, stdout=subprocess.DEVNULL, check=True)
+        latencies.append(time.perf_counter() - start)
+    return statistics.median(latencies) * 1000
+
+
+def import_time_ms(runs, cwd=PROJECT_ROOT):
+    """Median cumulative import time of src.cli in milliseconds, as reported by -X importtime."""
+    # Compile first, so no run pays for it (PYTHONDONTWRITEBYTECODE may be set)
+    subprocess.run([sys.executable, "-m", "compileall", "-q", "src"], cwd=cwd, stdout=subprocess.DEVNULL, check=True)
+    samples = []
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", "import src.cli"],
+            cwd=cwd,
+            stderr=subprocess.PIPE,
+            check=True
+        ).stderr.decode()
+        for line in output.splitlines():
+            match = IMPORT_TIME_PATTERN.search(line)
+            if match:
+                samples.append(int(match.group(1)) / 1000)
+    return statistics.median(samples)
+
+
+def write_legacy_store(path, tasks):
+    """Write tasks as the bare JSON list that every version of the CLI reads."""
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump([{field: task.to_dict()[field] for field in LEGACY_FIELDS} for task in tasks], f)
+
+
+def export_revision(revision, directory):
+    """Extract the tree of a git revision into a directory."""
+    archive = subprocess.run(
+        ["git", "archive", "--format=tar", revision], cwd=PROJECT_ROOT, stdout=subprocess.PIPE, check=True
+    ).stdout
+    with tarfile.open(fileobj=io.BytesIO(archive)) as tar:
+        tar.extractall(directory)
+
+
+def first_revision():
+    """The first commit of the repository."""
+    output = subprocess.run(
+        ["git", "rev-list", "--max-parents=0", "HEAD"], cwd=PROJECT_ROOT, stdout=subprocess.PIPE, check=True
+    ).stdout.decode()
+    return output.split()[-1]
+
+
+def measure(root, cli, task_id, runs, interpreter_ms):
+    """
+    Measure one tree of the CLI.
+
+    Args:
+        root: Project root of the tree
+        cli: Command line running the CLI on the synthetic store
+        task_id: ID of a task in the store
+        runs: Runs per measurement
+        interpreter_ms: Start-up time of a bare interpreter
+
+    Returns:
+        Dict with the import time and each command's time over interpreter start
+    """
+    commands = {
+        "help": cli + ["--help"],
+        "view": cli + ["view", str(task_id)],
+        "complete": cli + ["complete", str(task_id)],
+    }
+    return {
+        "import_ms": import_time_ms(runs, root),
+        "commands": {
+            name: median_ms(command, runs, root) - interpreter_ms for name, command in commands.items()
+        },
+    }
+
+
+def main():
+    """Measure CLI startup and check it against the baseline revision."""
+    parser = argparse.ArgumentParser(description="CLI startup benchmark")
+    parser.add_argument("--tasks", type=int, default=1000, help="Tasks in the synthetic store")
+    parser.add_argument("--runs", type=int, default=20, help="Runs per command")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed")
+    parser.add_argument("--baseline-ref", help="Git revision to compare against (defaults to the first commit)")
+    parser.add_argument(
+        "--min-reduction", type=float, default=DEFAULT_MIN_REDUCTION,
+        help="Fraction by which import and budgeted command times must undercut the baseline's"
+    )
+    parser.add_argument("--output", help="Results file to write")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    tasks = list(generate_tasks(args.tasks, make_vocabulary(rng), args.seed))
+    task_id = rng.randint(1, args.tasks)
+    revision = args.baseline_ref or first_revision()
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "tasks.json")
+        write_legacy_store(path, tasks)
+        baseline_root = os.path.join(directory, "baseline")
+        export_revision(revision, baseline_root)
+        # Older CLIs have no --storage-file and always use config/tasks.json
+        os.makedirs(os.path.join(baseline_root, "config"), exist_ok=True)
+        write_legacy_store(os.path.join(baseline_root, "config", "tasks.json"), tasks)
+
+        interpreter_ms = median_ms([sys.executable, "-c", "pass"], args.runs)
+        results = {
+            "interpreter_ms": interpreter_ms,
+            "baseline_ref": revision,
+            "current": measure(
+                PROJECT_ROOT, [sys.executable, "-m", "src.cli", "--storage-file", path], task_id, args.runs,
+                interpreter_ms
+            ),
+            "baseline": measure(baseline_root, [sys.executable, "-m", "src.cli"], task_id, args.runs, interpreter_ms),
+        }
+
+    current, baseline = results["current"], results["baseline"]
+    limit = 1 - args.min_reduction
+    print(f"Interpreter start:  {results['interpreter_ms']:8.1f} ms")
+    print(f"{'':<20}{'current':>10}{'baseline':>10}  (ms; baseline {revision[:12]})")
+    print(f"{'Import src.cli:':<20}{current['import_ms']:10.1f}{baseline['import_ms']:10.1f}")
+    for name, overhead in current["commands"].items():
+        budget = "  budgeted" if name in BUDGETED_COMMANDS else ""
+        print(f"{name + ':':<20}{overhead:10.1f}{baseline['commands'][name]:10.1f}{budget}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+    over_budget = [
+        name for name in BUDGETED_COMMANDS if current["commands"][name] > baseline["commands"][name] * limit
+    ]
+    if current["import_ms"] > baseline["import_ms"] * limit:
+        over_budget.append("import")
+    if over_budget:
+        print(f"\nNot {args.min_reduction:.0%} faster than the baseline: {', '.join(over_budget)}")
+        sys.exit(1)
+    print(f"\nAt least {args.min_reduction:.0%} faster than the baseline")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+Benchmark of parallel substring scans against worker count.
+
+Writes a synthetic store, then times the same substring searches serially
+and on worker pools of increasing size, reporting the speedup of each over
+the serial scan. Every parallel result is checked against the serial one;
+any difference fails the run (exit status 1).
+
+The first parallel search of each pool starts the workers and writes the
+scan snapshot, so it is timed separately as "first ms".
+
+Usage:
+    python benchmarks/parallel_scan_bench.py [--size 1000000]
+        [--workers 1,2,4,8] [--storage-mode json] [--runs 5]
+        [--output scan.json]
+"""
+
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+from task_service_bench import STORE_FILES, generate_tasks, make_vocabulary, write_store
+
+from src.services.task_service import PARALLEL_SCAN_THRESHOLD, TaskService
+
+DEFAULT_SIZE = 1000000
+QUERIES = 10
+
+
+def default_workers():
+    """Worker counts doubling from 1 up to the number of CPUs."""
+    counts = [1]
+    while counts[-1] * 2 <= (os.cpu_count() or 1):
+        counts.append(counts[-1] * 2)
+    if counts[-1] != (os.cpu_count() or 1):
+        counts.append(os.cpu_count() or 1)
+    return ",".join(str(count) for count in counts)
+
+
+def time_searches(service, queries, runs):
+    """Run every query runs times; return the median ms per query and the results."""
+    latencies = []
+    results = {}
+    for _ in range(runs):
+        for query in queries:
+            start = time.perf_counter()
+            results[query] = [task.id for task in service.search_tasks(query, mode="substring")]
+            latencies.append(time.perf_counter() - start)
+    return statistics.median(latencies) * 1000, results
+
+
+def main():
+    """Run the parallel scan benchmark."""
+    parser = argparse.ArgumentParser(description="Parallel scan benchmark")
+    parser.add_argument("--size", type=int, default=DEFAULT_SIZE, help="Number of tasks")
+    parser.add_argument("--workers", default=default_workers(), help="Comma-separated worker counts")
+    parser.add_argument("--storage-mode", choices=("json", "columnar"), default="json", help="Store to scan")
+    parser.add_argument("--runs", type=int, default=5, help="Runs per query")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed")
+    parser.add_argument("--output", help="Results file to write")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    vocabulary = make_vocabulary(rng)
+    tasks = list(generate_tasks(args.size, vocabulary, args.seed))
+    # Each vocabulary word appears in a few percent of the tasks
+    queries = rng.sample(vocabulary, QUERIES)
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, STORE_FILES.get(args.storage_mode, "tasks.json"))
+        write_store(path, args.storage_mode, tasks, args.size + 1)
+
+        serial = TaskService(path, args.storage_mode, parallel_scan=False)
+        serial_ms, expected = time_searches(serial, queries, args.runs)
+        # What a service left to decide by store size would do on this machine
+        serial.parallel_scan = None
+        auto = serial._scans_in_parallel()
+        serial.close()
+
+        results = {
+            "size": args.size,
+            "cpus": os.cpu_count(),
+            "storage_mode": args.storage_mode,
+            "threshold": PARALLEL_SCAN_THRESHOLD,
+            "auto_parallel": auto,
+            "serial_ms": serial_ms,
+            "parallel": {},
+        }
+        consistent = True
+        for workers in (int(count) for count in args.workers.split(",")):
+            service = TaskService(path, args.storage_mode, parallel_scan=True, scan_workers=workers)
+            start = time.perf_counter()
+            service.search_tasks(queries[0], mode="substring")
+            first_ms = (time.perf_counter() - start) * 1000
+            median, found = time_searches(service, queries, args.runs)
+            service.close()
+            consistent = consistent and found == expected
+            results["parallel"][str(workers)] = {
+                "first_ms": first_ms,
+                "median_ms": median,
+                "speedup": serial_ms / median,
+            }
+
+    print(f"{args.size} tasks, {args.storage_mode} store, {os.cpu_count()} CPUs")
+    print(f"Automatic choice: {'parallel' if auto else 'serial'} (threshold {PARALLEL_SCAN_THRESHOLD} tasks)")
+    print(f"{'Workers':<10}{'First ms':>10}{'Median ms':>12}{'Speedup':>10}")
+    print(f"{'serial':<10}{'':>10}{serial_ms:>12.2f}{1:>10.2f}")
+    for workers, entry in results["parallel"].items():
+        print(f"{workers:<10}{entry['first_ms']:>10.2f}{entry['median_ms']:>12.2f}{entry['speedup']:>10.2f}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if not consistent:
+        print("\nParallel results differ from the serial scan")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
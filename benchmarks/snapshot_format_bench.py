@@ -0,0 +1,133 @@
+"""
+Benchmark of the JSON and columnar snapshot formats.
+
+Writes the same synthetic tasks in both formats and compares file size,
+save time, full load time and single-task lookup time. Each size also
+converts tasks.json to a columnar snapshot and back, and fails (exit status
+1) unless both conversions are lossless.
+
+Usage:
+    python benchmarks/snapshot_format_bench.py [--sizes 1000,100000]
+        [--runs 5] [--lookups 200] [--output formats.json]
+"""
+
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+from task_service_bench import DEFAULT_SIZES, generate_tasks, make_vocabulary
+
+from src.storage.factory import convert_store, create_store
+
+FORMATS = {"json": "tasks.json", "columnar": "tasks.tcol"}
+
+
+def median_ms(func, runs):
+    """Call func repeatedly and return its median wall time in milliseconds."""
+    latencies = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        func()
+        latencies.append(time.perf_counter() - start)
+    return statistics.median(latencies) * 1000
+
+
+def snapshot_of(path):
+    """Load a store as comparable data: (task dicts, next id)."""
+    store = create_store(path)
+    try:
+        tasks, next_id = store.load()
+    finally:
+        store.close()
+    return [task.to_dict() for task in tasks], next_id
+
+
+def bench_format(path, tasks, next_id, runs, lookup_ids):
+    """Time saving, loading and point lookups for one store file."""
+    store = create_store(path)
+    store.begin_write()
+    try:
+        save_ms = median_ms(lambda: store.save(tasks, next_id), runs)
+    finally:
+        store.end_write()
+    load_ms = median_ms(store.load, runs)
+
+    start = time.perf_counter()
+    for task_id in lookup_ids:
+        store.find(task_id)
+    find_ms = (time.perf_counter() - start) * 1000 / len(lookup_ids)
+    store.close()
+    return {"size_bytes": os.path.getsize(path), "save_ms": save_ms, "load_ms": load_ms, "find_ms": find_ms}
+
+
+def bench_size(count, runs, lookups, seed):
+    """Benchmark both formats for one store size and check conversion round-trips."""
+    rng = random.Random(seed)
+    tasks = list(generate_tasks(count, make_vocabulary(rng), seed))
+    lookup_ids = [rng.randint(1, count) for _ in range(lookups)]
+
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        paths = {name: os.path.join(directory, filename) for name, filename in FORMATS.items()}
+        for name, path in paths.items():
+            results[name] = bench_format(path, tasks, count + 1, runs, lookup_ids)
+
+        # tasks.json -> columnar -> tasks.json must reproduce the original exactly
+        original = snapshot_of(paths["json"])
+        converted = os.path.join(directory, "converted.tcol")
+        restored = os.path.join(directory, "restored.json")
+        convert_store(paths["json"], converted)
+        convert_store(converted, restored)
+        results["lossless"] = snapshot_of(converted) == original and snapshot_of(restored) == original
+    return results
+
+
+def print_results(count, results):
+    """Print one size's results as a table."""
+    print(f"\n{count} tasks (lossless round-trip: {'yes' if results['lossless'] else 'NO'})")
+    print(f"{'Format':<10}{'Size KiB':>12}{'Save ms':>10}{'Load ms':>10}{'Find ms':>10}")
+    for name in FORMATS:
+        entry = results[name]
+        print(
+            f"{name:<10}{entry['size_bytes'] / 1024:>12.1f}{entry['save_ms']:>10.2f}"
+            f"{entry['load_ms']:>10.2f}{entry['find_ms']:>10.3f}"
+        )
+    json_entry, columnar = results["json"], results["columnar"]
+    print(
+        f"{'ratio':<10}{columnar['size_bytes'] / json_entry['size_bytes']:>12.2f}"
+        f"{columnar['save_ms'] / json_entry['save_ms']:>10.2f}{columnar['load_ms'] / json_entry['load_ms']:>10.2f}"
+        f"{columnar['find_ms'] / json_entry['find_ms']:>10.3f}"
+    )
+
+
+def main():
+    """Run the format benchmark."""
+    parser = argparse.ArgumentParser(description="Snapshot format benchmark")
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help="Comma-separated store sizes")
+    parser.add_argument("--runs", type=int, default=5, help="Runs per save and load")
+    parser.add_argument("--lookups", type=int, default=200, help="Single-task lookups per format")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed")
+    parser.add_argument("--output", help="Results file to write")
+    args = parser.parse_args()
+
+    results = {}
+    for count in (int(size) for size in args.sizes.split(",")):
+        results[str(count)] = bench_size(count, args.runs, args.lookups, args.seed)
+        print_results(count, results[str(count)])
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if not all(entry["lossless"] for entry in results.values()):
+        print("\nConversion was not lossless")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
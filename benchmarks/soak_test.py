@@ -0,0 +1,511 @@
+"""
+Load generator and soak test for concurrent use of a task store.
+
+Runs a mix of add/complete/delete/search/list traffic from many concurrent
+workers against one synthetic store for a fixed time, then checks the store
+for lost updates. Workers come in three kinds:
+
+- shared: threads calling one SharedTaskService, as the web app's sessions do
+- process: processes each with their own TaskService on the same file, as
+  separate scripts do
+- cli: threads running CLI commands, optionally through a daemon (--daemon)
+
+The report has throughput, latency percentiles and error counts per
+operation, plus a timeline of throughput and store size. Results are
+written as JSON. Passing an earlier results file as a baseline compares
+against it, and the run exits with status 1 on a regression or on any
+lost update.
+
+A lost update is an acknowledged change missing at the end: an added task
+that is gone though nobody deleted it, a completed task that is active
+again, a deleted task that is back, or one id handed to two adds.
+
+Usage:
+    python benchmarks/soak_test.py [--kind shared] [--workers 8]
+        [--duration 30] [--size 10000] [--storage-mode json]
+        [--mix add=30,complete=20,delete=10,search=25,list=15]
+        [--output soak.json] [--baseline baseline.json]
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import queue
+import random
+import re
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+from task_service_bench import PROJECT_ROOT, STORE_FILES, generate_tasks, make_vocabulary, write_store
+
+from src.daemon_client import socket_path_for
+from src.services.shared_task_service import SharedTaskService
+from src.services.task_service import TaskService
+from src.storage.factory import STORAGE_MODES
+from src.utils.exceptions import StaleTaskException, TaskNotFoundException
+
+OPERATIONS = ("add", "complete", "delete", "search", "list")
+WORKER_KINDS = ("shared", "process", "cli")
+DEFAULT_MIX = "add=30,complete=20,delete=10,search=25,list=15"
+DEFAULT_THRESHOLD = 0.25
+# Commit interval of the shared service, as in the web app
+SHARED_COMMIT_INTERVAL = 0.5
+# Positions in the live counters shared with the workers
+OPS, ADDS, DELETES = range(3)
+# Seconds to wait for a daemon to start listening
+DAEMON_START_TIMEOUT = 30
+# Percentiles reported per operation
+LATENCY_KEYS = ("p50_ms", "p95_ms", "p99_ms", "p999_ms", "max_ms")
+ADDED_ID = re.compile(r"with ID (\d+)")
+
+
+def parse_mix(text):
+    """Parse "op=weight,..." into a dict of operation weights."""
+    mix = {}
+    for part in text.split(","):
+        op, _, weight = part.partition("=")
+        if op.strip() not in OPERATIONS:
+            raise ValueError(f"Unknown operation '{op.strip()}'. Expected one of: {', '.join(OPERATIONS)}")
+        mix[op.strip()] = float(weight or 1)
+    if not any(mix.values()):
+        raise ValueError("The mix needs at least one operation with a positive weight")
+    return mix
+
+
+def service_op(service, op, rng, vocabulary, target):
+    """Run one operation through a task service; return the id it changed, if any."""
+    if op == "add":
+        title = " ".join(rng.sample(vocabulary, 3))
+        return service.add_task(title, "soak test", rng.choice(("low", "medium", "high"))).id
+    if op == "complete":
+        return service.complete_task(target).id
+    if op == "delete":
+        return service.delete_task(target).id
+    if op == "search":
+        service.search_tasks(rng.choice(vocabulary), limit=20)
+    else:
+        service.page(completed=False, page_size=50)
+    return None
+
+
+def cli_op(command, op, rng, vocabulary, target):
+    """Run one operation as a CLI command; return the id it changed, if any."""
+    if op == "add":
+        args = ["add", " ".join(rng.sample(vocabulary, 3)), "-d", "soak test"]
+    elif op in ("complete", "delete"):
+        args = [op, str(target)]
+    elif op == "search":
+        args = ["search", rng.choice(vocabulary), "-n", "20"]
+    else:
+        args = ["list"]
+    output = subprocess.run(command + args, cwd=PROJECT_ROOT, stdout=subprocess.PIPE, check=True).stdout.decode()
+    if output.startswith("Error:") and "not found" in output:
+        raise TaskNotFoundException(output.strip())
+    if output.startswith(("Error:", "An unexpected error occurred")):
+        raise RuntimeError(output.strip())
+    if op == "add":
+        return int(ADDED_ID.search(output).group(1))
+    return target if op in ("complete", "delete") else None
+
+
+def run_worker(do_op, mix, seed, size, vocabulary, deadline, counters):
+    """
+    Issue operations until the deadline.
+
+    Args:
+        do_op: service_op or cli_op with its first argument bound
+        mix: Operation weights
+        seed: Random seed of this worker
+        size: Number of tasks the store started with; their ids are 1..size
+        vocabulary: Words for titles and searches
+        deadline: time.time() at which to stop
+        counters: Shared array of live OPS, ADDS and DELETES counts
+
+    Returns:
+        Dict with per-operation "latencies", "not_found", "conflicts" and
+        "errors" counts, and the ids "added", "completed" and "deleted"
+    """
+    rng = random.Random(seed)
+    ops, weights = list(mix), list(mix.values())
+    # Ids this worker may complete or delete; other workers' adds are unknown to it
+    known = list(range(1, size + 1))
+    result = {
+        "latencies": {op: [] for op in ops},
+        "not_found": {op: 0 for op in ops},
+        "conflicts": {op: 0 for op in ops},
+        "errors": {},
+        "added": [],
+        "completed": [],
+        "deleted": [],
+    }
+    while time.time() < deadline:
+        op = rng.choices(ops, weights)[0]
+        target = None
+        if op in ("complete", "delete"):
+            if not known:
+                continue
+            position = rng.randrange(len(known))
+            target = known[position]
+            if op == "delete":
+                # Swap-remove: whether or not the delete succeeds, the id is gone
+                known[position] = known[-1]
+                known.pop()
+        start = time.perf_counter()
+        try:
+            task_id = do_op(op, rng, vocabulary, target)
+        except TaskNotFoundException:
+            result["not_found"][op] += 1
+            continue
+        except StaleTaskException:
+            result["conflicts"][op] += 1
+            continue
+        except Exception as e:
+            name = f"{op}: {type(e).__name__}"
+            result["errors"][name] = result["errors"].get(name, 0) + 1
+            continue
+        result["latencies"][op].append(time.perf_counter() - start)
+        with counters.get_lock():
+            counters[OPS] += 1
+            if op == "add":
+                counters[ADDS] += 1
+            elif op == "delete":
+                counters[DELETES] += 1
+        if op == "add":
+            result["added"].append(task_id)
+            known.append(task_id)
+        elif op == "complete":
+            result["completed"].append(task_id)
+        elif op == "delete":
+            result["deleted"].append(task_id)
+    return result
+
+
+def process_worker(path, storage_mode, mix, seed, size, vocabulary, deadline, counters, results):
+    """Worker process with a TaskService of its own."""
+    service = TaskService(path, storage_mode)
+    try:
+        result = run_worker(
+            lambda *args: service_op(service, *args), mix, seed, size, vocabulary, deadline, counters
+        )
+    finally:
+        service.close()
+    results.put(result)
+
+
+def store_bytes(path):
+    """Size of the store's files: the store itself, its journal, WAL and archive segments."""
+    directory, name = os.path.split(path)
+    total = 0
+    for entry in os.listdir(directory):
+        full = os.path.join(directory, entry)
+        if entry.startswith(name) and not entry.endswith((".lock", ".sock")):
+            if os.path.isdir(full):
+                total += sum(os.path.getsize(os.path.join(full, child)) for child in os.listdir(full))
+            else:
+                total += os.path.getsize(full)
+    return total
+
+
+def start_daemon(command, path):
+    """Start a daemon for the store and wait until it listens."""
+    daemon = subprocess.Popen(command + ["daemon"], cwd=PROJECT_ROOT, stdout=subprocess.DEVNULL)
+    deadline = time.time() + DAEMON_START_TIMEOUT
+    while not os.path.exists(socket_path_for(path)):
+        if daemon.poll() is not None or time.time() > deadline:
+            daemon.kill()
+            raise RuntimeError("The daemon did not start")
+        time.sleep(0.05)
+    return daemon
+
+
+def find_lost_updates(path, storage_mode, results):
+    """
+    Check the acknowledged changes against the store as it ended up.
+
+    Returns:
+        Dict of lost update kind to count
+    """
+    service = TaskService(path, storage_mode)
+    tasks = {task.id: task for task in service.get_all_tasks()}
+    service.close()
+    added = [task_id for result in results for task_id in result["added"]]
+    deleted = {task_id for result in results for task_id in result["deleted"]}
+    completed = {task_id for result in results for task_id in result["completed"]}
+    return {
+        "duplicate_ids": len(added) - len(set(added)),
+        "lost_adds": sum(1 for task_id in set(added) - deleted if task_id not in tasks),
+        "lost_completes": sum(
+            1 for task_id in completed - deleted if task_id in tasks and not tasks[task_id].completed
+        ),
+        "resurrected": sum(1 for task_id in deleted if task_id in tasks),
+    }
+
+
+def percentile(ordered, fraction):
+    """Value at a fraction of a sorted list, in ms."""
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))] * 1000
+
+
+def summarize(latencies, not_found, conflicts, duration):
+    """Reduce one operation's latencies (seconds) to throughput and tail latencies."""
+    ordered = sorted(latencies)
+    summary = {"calls": len(ordered), "ops_per_s": len(ordered) / duration, "not_found": not_found}
+    summary["conflicts"] = conflicts
+    if ordered:
+        summary.update({
+            "p50_ms": percentile(ordered, 0.5),
+            "p95_ms": percentile(ordered, 0.95),
+            "p99_ms": percentile(ordered, 0.99),
+            "p999_ms": percentile(ordered, 0.999),
+            "max_ms": ordered[-1] * 1000,
+        })
+    return summary
+
+
+def git_commit():
+    """Short hash of the checked-out commit, or None outside a git checkout."""
+    try:
+        output = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=PROJECT_ROOT, stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL, check=True
+        ).stdout
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return output.decode().strip() + ("+" if subprocess.run(
+        ["git", "diff", "--quiet", "HEAD"], cwd=PROJECT_ROOT, stderr=subprocess.DEVNULL
+    ).returncode else "")
+
+
+def soak(args, mix):
+    """Run the soak test and build the results document."""
+    rng = random.Random(args.seed)
+    vocabulary = make_vocabulary(rng)
+    counters = multiprocessing.Array("q", 3)
+    results = []
+    timeline = []
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, STORE_FILES.get(args.storage_mode, "tasks.json"))
+        write_store(path, args.storage_mode, generate_tasks(args.size, vocabulary, args.seed), args.size + 1)
+
+        command = [sys.executable, "-m", "src.cli", "--storage-file", path, "--storage-mode", args.storage_mode]
+        daemon = start_daemon(command, path) if args.daemon else None
+        shared = None
+        if args.kind == "shared":
+            shared = SharedTaskService(TaskService(path, args.storage_mode, commit_interval=SHARED_COMMIT_INTERVAL))
+
+        start = time.time()
+        deadline = start + args.duration
+        seeds = [args.seed * 1000 + index for index in range(args.workers)]
+        collected = queue.Queue() if args.kind != "process" else multiprocessing.Queue()
+        workers = []
+        for seed in seeds:
+            if args.kind == "process":
+                worker = multiprocessing.Process(
+                    target=process_worker,
+                    args=(path, args.storage_mode, mix, seed, args.size, vocabulary, deadline, counters, collected)
+                )
+            else:
+                if shared is not None:
+                    do_op = lambda *op_args, service=shared: service_op(service, *op_args)
+                else:
+                    do_op = lambda *op_args: cli_op(command, *op_args)
+                worker = threading.Thread(
+                    target=lambda do_op=do_op, seed=seed: collected.put(
+                        run_worker(do_op, mix, seed, args.size, vocabulary, deadline, counters)
+                    )
+                )
+            worker.start()
+            workers.append(worker)
+
+        previous_ops, previous_time = 0, start
+        while time.time() < deadline:
+            time.sleep(max(0.0, min(args.interval, deadline - time.time())))
+            now = time.time()
+            with counters.get_lock():
+                ops, adds, deletes = counters[OPS], counters[ADDS], counters[DELETES]
+            timeline.append({
+                "elapsed_s": round(now - start, 2),
+                "ops": ops,
+                "ops_per_s": (ops - previous_ops) / (now - previous_time),
+                "tasks": args.size + adds - deletes,
+                "store_bytes": store_bytes(path),
+            })
+            previous_ops, previous_time = ops, now
+
+        # Results are collected before joining: a process cannot exit while its result is unread
+        results = [collected.get() for _ in workers]
+        for worker in workers:
+            worker.join()
+        elapsed = time.time() - start
+        if shared is not None:
+            shared.close()
+        if daemon is not None:
+            daemon.terminate()
+            daemon.wait()
+        lost = find_lost_updates(path, args.storage_mode, results)
+        final_bytes = store_bytes(path)
+
+    operations = {}
+    for op in mix:
+        operations[op] = summarize(
+            [latency for result in results for latency in result["latencies"][op]],
+            sum(result["not_found"][op] for result in results),
+            sum(result["conflicts"][op] for result in results),
+            elapsed
+        )
+    errors = {}
+    for result in results:
+        for name, count in result["errors"].items():
+            errors[name] = errors.get(name, 0) + count
+    total_ops = sum(summary["calls"] for summary in operations.values())
+    return {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "kind": args.kind,
+            "daemon": args.daemon,
+            "workers": args.workers,
+            "duration_s": args.duration,
+            "size": args.size,
+            "storage_mode": args.storage_mode,
+            "mix": mix,
+            "seed": args.seed,
+        },
+        "totals": {
+            "ops": total_ops,
+            "ops_per_s": total_ops / elapsed,
+            "errors": sum(errors.values()),
+            "lost_updates": sum(lost.values()),
+            "final_store_bytes": final_bytes,
+        },
+        "operations": operations,
+        "errors": errors,
+        "lost_updates": lost,
+        "timeline": timeline,
+    }
+
+
+def compare(results, baseline, threshold):
+    """
+    Compare results with a baseline run.
+
+    Args:
+        results: Current results document
+        baseline: Baseline results document
+        threshold: Relative change tolerated before flagging, e.g. 0.25
+
+    Returns:
+        List of human-readable regression descriptions
+    """
+    regressions = []
+    setup = ("kind", "workers", "daemon", "storage_mode")
+    if any(results["meta"][key] != baseline["meta"][key] for key in setup):
+        regressions.append("The baseline ran different workers or storage; results are not comparable")
+        return regressions
+    base_ops = baseline["totals"]["ops_per_s"]
+    if base_ops and results["totals"]["ops_per_s"] < base_ops * (1 - threshold):
+        regressions.append(
+            f"throughput: {base_ops:,.1f} -> {results['totals']['ops_per_s']:,.1f} ops/s "
+            f"({100 * (results['totals']['ops_per_s'] / base_ops - 1):.0f}%)"
+        )
+    for op, summary in results["operations"].items():
+        base = baseline["operations"].get(op, {})
+        for metric in ("p50_ms", "p99_ms"):
+            value, base_value = summary.get(metric), base.get(metric)
+            if value and base_value and value > base_value * (1 + threshold):
+                regressions.append(
+                    f"{op} {metric}: {base_value:.3f} -> {value:.3f} (+{100 * (value / base_value - 1):.0f}%)"
+                )
+    if results["totals"]["errors"] > baseline["totals"]["errors"]:
+        regressions.append(f"errors: {baseline['totals']['errors']} -> {results['totals']['errors']}")
+    return regressions
+
+
+def print_results(results):
+    """Print the per-operation table, the timeline and any errors and lost updates."""
+    meta, totals = results["meta"], results["totals"]
+    print(
+        f"\n{meta['workers']} {meta['kind']} workers{' via daemon' if meta['daemon'] else ''}, "
+        f"{meta['size']} {meta['storage_mode']} tasks, {meta['duration_s']:g} s: "
+        f"{totals['ops']:,} ops, {totals['ops_per_s']:,.1f} ops/s"
+    )
+    print(f"{'operation':<10}{'calls':>8}{'ops/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}"
+          f"{'p99.9 ms':>10}{'max ms':>10}{'missing':>9}{'stale':>7}")
+    for op, summary in results["operations"].items():
+        latencies = "".join(f"{summary.get(key, 0):>10.2f}" for key in LATENCY_KEYS)
+        print(
+            f"{op:<10}{summary['calls']:>8}{summary['ops_per_s']:>10.1f}{latencies}"
+            f"{summary['not_found']:>9}{summary['conflicts']:>7}"
+        )
+    print(f"\n{'elapsed s':>10}{'ops':>10}{'ops/s':>10}{'tasks':>10}{'store bytes':>14}")
+    for sample in results["timeline"]:
+        print(
+            f"{sample['elapsed_s']:>10.1f}{sample['ops']:>10}{sample['ops_per_s']:>10.1f}"
+            f"{sample['tasks']:>10}{sample['store_bytes']:>14,}"
+        )
+    for name, count in results["errors"].items():
+        print(f"Error {name}: {count}")
+    lost = ", ".join(f"{kind} {count}" for kind, count in results["lost_updates"].items())
+    print(f"\nLost updates: {totals['lost_updates']} ({lost})")
+
+
+def main():
+    """Run the soak test, save the results and compare them with a baseline."""
+    parser = argparse.ArgumentParser(description="Concurrent load and soak test")
+    parser.add_argument("--kind", choices=WORKER_KINDS, default="shared", help="How workers reach the store")
+    parser.add_argument("--workers", type=int, default=8, help="Concurrent workers")
+    parser.add_argument("--duration", type=float, default=30, help="Seconds to run")
+    parser.add_argument("--interval", type=float, default=5, help="Seconds between timeline samples")
+    parser.add_argument("--size", type=int, default=10000, help="Tasks in the store at the start")
+    parser.add_argument("--storage-mode", default="json", choices=STORAGE_MODES, help="Storage backend")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="Operation weights, e.g. add=30,search=70")
+    parser.add_argument("--daemon", action="store_true", help="With --kind cli, serve the store from a daemon")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed")
+    parser.add_argument("--output", default="soak_results.json", help="Results file to write")
+    parser.add_argument("--baseline", help="Earlier results file to compare against")
+    parser.add_argument(
+        "--threshold", type=float, default=DEFAULT_THRESHOLD,
+        help="Relative throughput drop or latency rise flagged as a regression"
+    )
+    args = parser.parse_args()
+    try:
+        mix = parse_mix(args.mix)
+    except ValueError as e:
+        parser.error(str(e))
+    if args.daemon and args.kind != "cli":
+        parser.error("--daemon only applies to --kind cli")
+    if args.workers < 1 or args.duration <= 0 or args.interval <= 0:
+        parser.error("--workers, --duration and --interval must be positive")
+
+    results = soak(args, mix)
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2)
+    print_results(results)
+    print(f"\nResults written to {args.output}")
+
+    failed = results["totals"]["lost_updates"] > 0
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) against {args.baseline}:")
+            for regression in regressions:
+                print("  " + regression)
+            failed = True
+        else:
+            print(f"\nNo regressions against {args.baseline}")
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Memory benchmark for the Task model.
+
+Compares bytes per task of the current slotted Task against the previous
+dict-based layout (priority and created_at stored as strings).
+
+Usage:
+    python benchmarks/task_memory.py [--count N]
+"""
+
+import argparse
+import gc
+import os
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.models.task import Task
+
+
+class LegacyTask:
+    """Replica of the Task layout before __slots__, for comparison."""
+
+    def __init__(self, task_id, title, description="", priority="medium", completed=False, created_at=None):
+        self.id = task_id
+        self.title = title
+        self.description = description
+        self.priority = priority
+        self.completed = completed
+        self.created_at = created_at or datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+
+def generate_rows(count):
+    """Yield task field tuples resembling real data, as loaded from JSON."""
+    priorities = ("low", "medium", "high")
+    base = int(time.time()) - count
+    for i in range(count):
+        # Strings are rebuilt per row, like json.load does, so nothing is shared by accident
+        yield (
+            i + 1,
+            f"Task number {i}",
+            f"Description for task {i}",
+            "".join(priorities[i % 3]),
+            i % 4 == 0,
+            datetime.fromtimestamp(base + i).strftime("%Y-%m-%d %H:%M:%S"),
+        )
+
+
+def measure(factory, count):
+    """Return bytes allocated per task while building count tasks."""
+    gc.collect()
+    tracemalloc.start()
+    tasks = [factory(*row) for row in generate_rows(count)]
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del tasks
+    return current / count
+
+
+def main():
+    """Run the benchmark and print bytes per task."""
+    parser = argparse.ArgumentParser(description="Task model memory benchmark")
+    parser.add_argument("--count", type=int, default=100000, help="Number of tasks to build")
+    args = parser.parse_args()
+
+    legacy = measure(LegacyTask, args.count)
+    current = measure(Task, args.count)
+    print(f"Tasks built:          {args.count}")
+    print(f"Legacy bytes/task:    {legacy:,.0f}")
+    print(f"Slotted bytes/task:   {current:,.0f}")
+    print(f"Reduction:            {100 * (1 - current / legacy):.1f}%")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,319 @@
+"""
+Benchmark harness for TaskService at realistic scale.
+
+Generates synthetic stores of the requested sizes and times the core
+TaskService operations and CLI commands against them, reporting throughput,
+p50/p99 latency and peak RSS. Each store size runs in its own process so
+peak RSS is measured per size.
+
+Results are written as JSON. Passing an earlier results file as a baseline
+compares against it and exits with status 1 if anything regressed.
+
+Usage:
+    python benchmarks/task_service_bench.py [--sizes 1000,100000,1000000]
+        [--storage-mode json] [--output results.json]
+        [--baseline baseline.json] [--threshold 0.25]
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, PROJECT_ROOT)
+
+from src.models.task import Task
+from src.services.task_service import TaskService
+from src.storage.columnar_store import ColumnarTaskStore
+from src.storage.factory import STORAGE_MODES
+from src.storage.sqlite_store import SqliteTaskStore
+
+STORE_FILES = {"sqlite": "tasks.db", "columnar": "tasks.tcol"}
+
+DEFAULT_SIZES = "1000,100000"
+DEFAULT_THRESHOLD = 0.25
+SYLLABLES = ("ka", "lo", "mi", "ne", "ru", "sa", "ti", "vo", "ze", "da", "pe", "gu")
+PRIORITIES = ("low", "medium", "high")
+
+# Metrics where a larger value is worse, compared against the baseline
+COMPARED_METRICS = ("p50_ms", "p99_ms")
+
+
+def make_vocabulary(rng, size=500):
+    """Build a list of distinct pseudo-words for titles, descriptions and queries."""
+    words = set()
+    while len(words) < size:
+        words.add("".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))))
+    return sorted(words)
+
+
+def generate_tasks(count, vocabulary, seed):
+    """Yield count synthetic tasks with ids 1..count."""
+    rng = random.Random(seed)
+    base = int(time.time()) - count
+    for task_id in range(1, count + 1):
+        yield Task(
+            task_id,
+            " ".join(rng.sample(vocabulary, 3)),
+            " ".join(rng.sample(vocabulary, 8)),
+            rng.choice(PRIORITIES),
+            rng.random() < 0.3,
+            base + task_id
+        )
+
+
+def write_store(path, storage_mode, tasks, next_id):
+    """Write tasks to a new store, streaming so huge stores never sit in memory."""
+    if storage_mode == "sqlite":
+        store = SqliteTaskStore(path)
+        store.insert_many(tasks)
+        store.close()
+        return
+    if storage_mode == "columnar":
+        # Columns are built in memory, so this store is materialized in full
+        ColumnarTaskStore(path).save(tasks, next_id)
+        return
+    with open(path, "w", encoding="utf-8") as f:
+        f.write('{"next_id": %d, "tasks": [' % next_id)
+        for index, task in enumerate(tasks):
+            f.write((",\n" if index else "\n") + json.dumps(task.to_dict()))
+        f.write("\n]}")
+
+
+def summarize(latencies):
+    """Reduce per-call latencies (seconds) to throughput and percentiles."""
+    ordered = sorted(latencies)
+    total = sum(ordered)
+    return {
+        "calls": len(ordered),
+        "throughput": len(ordered) / total if total else None,
+        "p50_ms": ordered[len(ordered) // 2] * 1000,
+        "p99_ms": ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))] * 1000,
+        "mean_ms": total / len(ordered) * 1000,
+    }
+
+
+def timed(calls):
+    """Run zero-argument callables in order, returning each one's latency."""
+    latencies = []
+    for call in calls:
+        start = time.perf_counter()
+        call()
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MiB, or None if unknown."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Reported in bytes on macOS and in KiB elsewhere
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def run_cli(path, storage_mode, *command):
+    """Run one CLI command against the store."""
+    subprocess.run(
+        [sys.executable, "-m", "src.cli", "--storage-file", path, "--storage-mode", storage_mode] + list(command),
+        cwd=PROJECT_ROOT,
+        stdout=subprocess.DEVNULL,
+        check=True
+    )
+
+
+def bench_size(count, storage_mode, ops, heavy_ops, cli_runs, seed):
+    """
+    Benchmark one store size.
+
+    Args:
+        count: Number of tasks in the store
+        storage_mode: Storage backend to benchmark
+        ops: Calls per cheap operation (lookups, searches)
+        heavy_ops: Calls per operation that touches every task
+        cli_runs: Runs per CLI command
+        seed: Random seed
+
+    Returns:
+        Dict of operation name to summary, plus peak RSS
+    """
+    rng = random.Random(seed)
+    vocabulary = make_vocabulary(rng)
+    results = {}
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, STORE_FILES.get(storage_mode, "tasks.json"))
+        start = time.perf_counter()
+        write_store(path, storage_mode, generate_tasks(count, vocabulary, seed), count + 1)
+        results["generate_s"] = time.perf_counter() - start
+
+        results["cli_view"] = summarize(timed(
+            lambda: run_cli(path, storage_mode, "view", str(rng.randint(1, count))) for _ in range(cli_runs)
+        ))
+        results["cli_search"] = summarize(timed(
+            lambda: run_cli(path, storage_mode, "search", rng.choice(vocabulary), "-n", "10") for _ in range(cli_runs)
+        ))
+
+        services = []
+        results["load_tasks"] = summarize(timed(
+            lambda: services.append(TaskService(path, storage_mode)) for _ in range(heavy_ops)
+        ))
+        service = services.pop()
+        for extra in services:
+            extra.close()
+
+        if storage_mode != "sqlite":
+            def save():
+                service._store.begin_write()
+                try:
+                    service._save_tasks()
+                finally:
+                    service._store.end_write()
+            results["save_tasks"] = summarize(timed(save for _ in range(heavy_ops)))
+
+        results["get_task_by_id"] = summarize(timed(
+            (lambda task_id=rng.randint(1, count): service.get_task_by_id(task_id)) for _ in range(ops)
+        ))
+        results["search_tasks"] = summarize(timed(
+            (lambda word=rng.choice(vocabulary): service.search_tasks(word)) for _ in range(ops)
+        ))
+        results["get_all_tasks_active"] = summarize(timed(
+            (lambda: service.get_all_tasks(show_completed=False)) for _ in range(heavy_ops)
+        ))
+        results["add_task"] = summarize(timed(
+            (lambda: service.add_task(" ".join(rng.sample(vocabulary, 3)), "benchmark task")) for _ in range(heavy_ops)
+        ))
+        doomed = rng.sample(range(1, count + 1), min(heavy_ops, count))
+        results["delete_task"] = summarize(timed(
+            (lambda task_id=task_id: service.delete_task(task_id)) for task_id in doomed
+        ))
+        service.close()
+
+    results["peak_rss_mb"] = peak_rss_mb()
+    return results
+
+
+def compare(results, baseline, threshold):
+    """
+    Compare results with a baseline.
+
+    Args:
+        results: Current results document
+        baseline: Baseline results document
+        threshold: Relative slowdown tolerated before flagging, e.g. 0.25
+
+    Returns:
+        List of human-readable regression descriptions
+    """
+    regressions = []
+    for size, operations in results["results"].items():
+        base_operations = baseline.get("results", {}).get(size, {})
+        for name, summary in operations.items():
+            base = base_operations.get(name)
+            if isinstance(summary, dict) and isinstance(base, dict):
+                pairs = [(metric, summary[metric], base[metric]) for metric in COMPARED_METRICS]
+            elif name == "peak_rss_mb" and summary and base:
+                pairs = [("MiB", summary, base)]
+            else:
+                continue
+            for metric, value, base_value in pairs:
+                if base_value and value > base_value * (1 + threshold):
+                    regressions.append(
+                        f"{size} tasks, {name} {metric}: {base_value:.3f} -> {value:.3f} "
+                        f"(+{100 * (value / base_value - 1):.0f}%)"
+                    )
+    return regressions
+
+
+def print_results(results):
+    """Print a table per store size."""
+    for size, operations in results["results"].items():
+        print(f"\n{size} tasks ({results['meta']['storage_mode']}), peak RSS {operations['peak_rss_mb'] or 0:.0f} MiB")
+        print(f"{'operation':<22}{'calls':>7}{'ops/s':>12}{'p50 ms':>11}{'p99 ms':>11}")
+        for name, summary in operations.items():
+            if isinstance(summary, dict):
+                print(
+                    f"{name:<22}{summary['calls']:>7}{summary['throughput'] or 0:>12,.0f}"
+                    f"{summary['p50_ms']:>11.3f}{summary['p99_ms']:>11.3f}"
+                )
+
+
+def main():
+    """Run the benchmark, save the results and compare them with a baseline."""
+    parser = argparse.ArgumentParser(description="TaskService benchmark")
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help="Comma-separated store sizes")
+    parser.add_argument("--storage-mode", default="json", choices=STORAGE_MODES, help="Storage backend")
+    parser.add_argument("--ops", type=int, default=200, help="Calls per lookup/search operation")
+    parser.add_argument("--heavy-ops", type=int, default=5, help="Calls per operation touching every task")
+    parser.add_argument("--cli-runs", type=int, default=5, help="Runs per CLI command")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed")
+    parser.add_argument("--output", default="benchmark_results.json", help="Results file to write")
+    parser.add_argument("--baseline", help="Earlier results file to compare against")
+    parser.add_argument(
+        "--threshold", type=float, default=DEFAULT_THRESHOLD,
+        help="Relative slowdown flagged as a regression"
+    )
+    parser.add_argument("--worker", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker is not None:
+        # Child process for one size: report on stdout for the parent
+        print(json.dumps(bench_size(
+            args.worker, args.storage_mode, args.ops, args.heavy_ops, args.cli_runs, args.seed
+        )))
+        return
+
+    results = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "storage_mode": args.storage_mode,
+            "ops": args.ops,
+            "heavy_ops": args.heavy_ops,
+            "cli_runs": args.cli_runs,
+        },
+        "results": {},
+    }
+    for size in (int(size) for size in args.sizes.split(",")):
+        print(f"Benchmarking {size} tasks...", file=sys.stderr)
+        output = subprocess.run(
+            [
+                sys.executable, os.path.abspath(__file__), "--worker", str(size),
+                "--storage-mode", args.storage_mode, "--ops", str(args.ops),
+                "--heavy-ops", str(args.heavy_ops), "--cli-runs", str(args.cli_runs), "--seed", str(args.seed),
+            ],
+            stdout=subprocess.PIPE,
+            check=True
+        ).stdout
+        results["results"][str(size)] = json.loads(output)
+
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2)
+    print_results(results)
+    print(f"\nResults written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) against {args.baseline}:")
+            for regression in regressions:
+                print("  " + regression)
+            sys.exit(1)
+        print(f"\nNo regressions against {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
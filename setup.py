@@ -2,7 +2,7 @@
 Setup script for the task manager application.
 """
 
-from setuptools import setup, find_packages
+from setuptools import setup, find_namespace_packages
 
 with open("README.md", "r", encoding="utf-8") as fh:
     long_description = fh.read()
@@ -19,7 +19,8 @@ setup(
     long_description=long_description,
     long_description_content_type="text/markdown",
     url="https://github.com/yourusername/task-manager",
-    packages=find_packages(),
+    # The packages have no __init__.py, which find_packages() would skip
+    packages=find_namespace_packages(include=["src", "src.*"]),
     classifiers=[
         "Programming Language :: Python :: 3",
         "License :: OSI Approved :: MIT License",
@@ -2,16 +2,169 @@
 Streamlit web application for the task manager.
 """
 
+import argparse
 import os
 import sys
+import time
+from datetime import datetime, timedelta
 import streamlit as st
 
 # Add the project root directory to the Python path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
+from src.services.archive_policy import ArchivePolicy
 from src.services.task_service import TaskService
+from src.services.sharded_task_service import ShardedTaskService
+from src.services.shared_task_service import SharedTaskService
+from src.storage.shard_map import DEFAULT_SHARD_MAP, load_shard_map
 from src.utils.exceptions import TaskNotFoundException
 
+PAGE_SIZES = [25, 50, 100]
+# Bursts of clicks from all sessions are written to storage together
+COMMIT_INTERVAL = 0.5
+ALL_TENANTS = "All tenants"
+# Seconds between checks for changes made by other sessions and processes
+WATCH_INTERVAL = 2.0
+DUE_COUNTS = [10, 25, 50]
+
+# st.rerun replaced st.experimental_rerun in Streamlit 1.27, which later
+# releases removed
+rerun = st.rerun if hasattr(st, "rerun") else st.experimental_rerun
+
+
+def parse_args():
+    """
+    Parse the app's options, passed after "--": streamlit run src/app.py -- --tenant NAME
+
+    Returns:
+        The parsed options
+    """
+    parser = argparse.ArgumentParser(description="Task Manager web app")
+    store_group = parser.add_mutually_exclusive_group()
+    store_group.add_argument("--store", help="Task storage file (defaults to config/tasks.json)")
+    store_group.add_argument("--tenant", help="Tenant selected when the app opens")
+    store_group.add_argument("--all-tenants", help="Open with every tenant selected", action="store_true")
+    parser.add_argument("--archive-days", help="Archive tasks completed more than this many days ago", type=float)
+    parser.add_argument(
+        "--archive-keep",
+        help="Archive the longest-completed tasks while a store holds more than this many",
+        type=int
+    )
+    return parser.parse_args()
+
+
+def archive_policy_of(args):
+    """The archive policy given by the options, or None for no automatic archival."""
+    if args.archive_days is None and args.archive_keep is None:
+        return None
+    return ArchivePolicy(args.archive_days, args.archive_keep)
+
+
+@st.cache_resource
+def get_task_service(storage_file: str, shard: int = None, archive_policy: ArchivePolicy = None) -> SharedTaskService:
+    """
+    Get the task service for a storage file, shared by all sessions and reruns.
+
+    Args:
+        storage_file: Path to the task storage file
+        shard: Shard number when the file is a tenant's store
+        archive_policy: Completed tasks to move to the archive on writes
+
+    Returns:
+        The shared task service
+    """
+    return SharedTaskService(
+        TaskService(storage_file, commit_interval=COMMIT_INTERVAL, shard=shard, archive_policy=archive_policy)
+    )
+
+
+@st.cache_resource
+def get_sharded_task_service(shard_map: str, archive_policy: ArchivePolicy = None) -> SharedTaskService:
+    """
+    Get the task service spanning every tenant, shared by all sessions and reruns.
+
+    Args:
+        shard_map: Path of the shard map file
+        archive_policy: Completed tasks to move to each tenant's archive on writes
+
+    Returns:
+        The shared task service
+    """
+    return SharedTaskService(
+        ShardedTaskService(shard_map, commit_interval=COMMIT_INTERVAL, archive_policy=archive_policy)
+    )
+
+
+def select_task_service(args, config_dir: str) -> SharedTaskService:
+    """
+    Pick the store to work on from the options and the tenant chosen in the sidebar.
+
+    Args:
+        args: Result of parse_args
+        config_dir: Directory holding the default store and the shard map
+
+    Returns:
+        The shared task service of the selected store
+    """
+    policy = archive_policy_of(args)
+    if args.store:
+        return get_task_service(args.store, archive_policy=policy)
+    shard_map = os.path.join(config_dir, DEFAULT_SHARD_MAP)
+    shards = load_shard_map(shard_map)
+    if not shards:
+        return get_task_service(os.path.join(config_dir, "tasks.json"), archive_policy=policy)
+
+    options = [ALL_TENANTS] + [shard.name for shard in shards]
+    if args.all_tenants:
+        default = ALL_TENANTS
+    elif args.tenant is None:
+        default = shards[0].name
+    elif args.tenant in options[1:]:
+        default = args.tenant
+    else:
+        st.error(f"Unknown tenant '{args.tenant}'")
+        st.stop()
+    tenant = st.sidebar.selectbox("Tenant", options, index=options.index(default))
+    if tenant == ALL_TENANTS:
+        return get_sharded_task_service(shard_map, policy)
+    shard = shards[options.index(tenant) - 1]
+    return get_task_service(shard.path, shard.number, policy)
+
+
+def notify_reminders(task_service):
+    """
+    Show each reminder that came due since this session last checked.
+
+    The due index is asked for the reminders in that window only, so
+    checking on every rerun costs nothing while none are due.
+    """
+    now = int(time.time())
+    checked = st.session_state.get("reminders_checked", now)
+    for task in task_service.reminders_between(checked, now):
+        due = f", due {task.due_at}" if task.due_at is not None else ""
+        # st.toast needs Streamlit 1.27+
+        (st.toast if hasattr(st, "toast") else st.info)(f"⏰ Reminder: {task.title}{due}")
+    st.session_state.reminders_checked = now
+
+
+def watch_for_changes(task_service):
+    """
+    Rerun the app once the tasks have changed since the page was drawn.
+
+    Nothing is redrawn or reloaded while nothing changes: each check only
+    stats the store files and reads the change log. Reminders that come due
+    meanwhile are shown.
+    """
+    notify_reminders(task_service)
+    if task_service.watch(st.session_state.revision, timeout=0):
+        rerun()
+
+
+# Fragments (Streamlit 1.37+) rerun on their own timer; older versions only
+# pick up changes on the next interaction
+if hasattr(st, "fragment"):
+    watch_for_changes = st.fragment(run_every=WATCH_INTERVAL)(watch_for_changes)
+
 
 def main():
     """Main function for the Streamlit application."""
@@ -27,50 +180,104 @@ def main():
     # Initialize the task service
     config_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), "config")
     os.makedirs(config_dir, exist_ok=True)
-    storage_file = os.path.join(config_dir, "tasks.json")
-    task_service = TaskService(storage_file)
+    task_service = select_task_service(parse_args(), config_dir)
+    # Pick up changes made outside the app, e.g. from the CLI
+    task_service.refresh()
+    # The page is drawn from the tasks as of this revision
+    st.session_state.revision = task_service.revision
+    notify_reminders(task_service)
     
     # Sidebar for navigation
     st.sidebar.title("Navigation")
-    page = st.sidebar.radio("Go to", ["View Tasks", "Add Task", "Search Tasks"])
+    page = st.sidebar.radio("Go to", ["View Tasks", "Due Soon", "Add Task", "Search Tasks"])
     
     if page == "View Tasks":
         display_tasks_page(task_service)
+    elif page == "Due Soon":
+        due_tasks_page(task_service)
     elif page == "Add Task":
         add_task_page(task_service)
     elif page == "Search Tasks":
         search_tasks_page(task_service)
 
+    if hasattr(st, "fragment"):
+        watch_for_changes(task_service)
+
 
 def display_tasks_page(task_service):
     """Display the tasks page."""
     st.header("Your Tasks")
     
     # Filter options
-    col1, col2 = st.columns(2)
+    col1, col2, col3, col4 = st.columns(4)
     with col1:
         show_completed = st.checkbox("Show completed tasks", value=False)
+        # The archive is only read when asked for
+        include_archived = show_completed and st.checkbox("Include archived tasks", value=False)
     with col2:
         filter_priority = st.selectbox(
             "Filter by priority",
             ["All", "Low", "Medium", "High"]
         )
+    with col3:
+        view_mode = st.radio("View", ["List", "Table"], horizontal=True)
+    with col4:
+        page_size = st.selectbox("Tasks per page", PAGE_SIZES, index=1)
     
-    # Get tasks
-    tasks = task_service.get_all_tasks(show_completed=True)
+    # Only the current page is fetched, so rendering cost follows the page size
+    filters = {
+        "completed": None if show_completed else False,
+        "priority": None if filter_priority == "All" else filter_priority.lower(),
+    }
+    cursor = current_cursor("tasks_page", (filters, page_size))
+    page = task_service.page(page_size=page_size, cursor=cursor, **filters)
     
-    # Apply filters
-    if not show_completed:
-        tasks = [task for task in tasks if not task.completed]
+    if not page.tasks and cursor is not None:
+        # Everything from this page on was deleted; start over
+        st.session_state["tasks_page"]["cursors"] = [None]
+        rerun()
     
-    if filter_priority != "All":
-        tasks = [task for task in tasks if task.priority.lower() == filter_priority.lower()]
-    
-    if not tasks:
+    if include_archived:
+        render_archived_tasks(task_service, filters["priority"])
+
+    if not page.tasks:
         st.info("No tasks found matching your criteria.")
         return
     
-    # Display tasks
+    if view_mode == "Table":
+        render_task_table(task_service, page.tasks)
+    else:
+        render_task_list(task_service, page.tasks)
+    
+    first = page_number("tasks_page") * page_size + 1
+    pagination_controls(
+        "tasks_page",
+        page.next_cursor,
+        f"Tasks {first}-{first + len(page.tasks) - 1} of {page.total}"
+    )
+
+
+def render_archived_tasks(task_service, priority):
+    """Render archived tasks, newest first, each with a button to restore it."""
+    archived = [
+        task for task in reversed(task_service.archived_tasks())
+        if priority is None or task.priority == priority
+    ]
+    with st.expander(f"Archived tasks ({len(archived)})"):
+        for task in archived[:PAGE_SIZES[-1]]:
+            col1, col2 = st.columns([4, 1])
+            with col1:
+                st.markdown(f"~~**{task.title}**~~ (completed {task.completed_at or 'at an unknown time'})")
+            with col2:
+                if st.button("Restore", key=f"restore_{task.id}"):
+                    task_service.restore_task(task.id)
+                    rerun()
+        if len(archived) > PAGE_SIZES[-1]:
+            st.caption(f"Showing the {PAGE_SIZES[-1]} most recently archived; search the archive to find others.")
+
+
+def render_task_list(task_service, tasks):
+    """Render tasks one container per task."""
     for task in tasks:
         with st.container():
             col1, col2, col3 = st.columns([3, 1, 1])
@@ -84,6 +291,10 @@ def display_tasks_page(task_service):
                 with st.expander("Details"):
                     st.write(f"**Description:** {task.description}")
                     st.write(f"**Created at:** {task.created_at}")
+                    if task.due_at is not None:
+                        st.write(f"**Due at:** {task.due_at}{' (overdue)' if task.is_overdue() else ''}")
+                    if task.remind_at is not None:
+                        st.write(f"**Remind at:** {task.remind_at}")
             
             with col2:
                 priority_color = {
@@ -100,11 +311,154 @@ def display_tasks_page(task_service):
             with col3:
                 if not task.completed and st.button("✓", key=f"complete_{task.id}"):
                     task_service.complete_task(task.id)
-                    st.experimental_rerun()
+                    rerun()
             
             st.divider()
 
 
+def render_task_table(task_service, tasks):
+    """Render tasks as a single table, with actions applied to a selected row."""
+    st.dataframe(
+        [
+            {
+                "ID": task.id,
+                "Title": task.title,
+                "Priority": task.priority.capitalize(),
+                "Status": "Completed" if task.completed else "Active",
+                "Created at": task.created_at,
+                "Due at": task.due_at or "",
+            }
+            for task in tasks
+        ],
+        use_container_width=True
+    )
+    
+    tasks_by_id = {task.id: task for task in tasks}
+    col1, col2, col3 = st.columns([3, 1, 1])
+    with col1:
+        task_id = st.selectbox(
+            "Task",
+            list(tasks_by_id),
+            format_func=lambda task_id: f"#{task_id} {tasks_by_id[task_id].title}"
+        )
+    with col2:
+        if st.button("Mark as Complete", disabled=tasks_by_id[task_id].completed):
+            task_service.complete_task(task_id)
+            rerun()
+    with col3:
+        if st.button("Delete"):
+            task_service.delete_task(task_id)
+            rerun()
+
+
+def current_cursor(state_key, filters):
+    """
+    Get the cursor of the page being shown, starting over when the filters change.
+
+    Args:
+        state_key: Session state key of the paginated view
+        filters: Value identifying the current filters
+
+    Returns:
+        The cursor, or None for the first page
+    """
+    state = st.session_state.get(state_key)
+    if state is None or state["filters"] != filters:
+        state = st.session_state[state_key] = {"filters": filters, "cursors": [None]}
+    return state["cursors"][-1]
+
+
+def page_number(state_key):
+    """Get the zero-based number of the page being shown."""
+    return len(st.session_state[state_key]["cursors"]) - 1
+
+
+def pagination_controls(state_key, next_cursor, caption):
+    """
+    Render previous/next buttons for a paginated view.
+
+    Args:
+        state_key: Session state key of the paginated view
+        next_cursor: Cursor of the following page, or None on the last page
+        caption: Text shown between the buttons
+    """
+    cursors = st.session_state[state_key]["cursors"]
+    col1, col2, col3 = st.columns([1, 3, 1])
+    with col1:
+        if len(cursors) > 1 and st.button("← Previous", key=f"{state_key}_previous"):
+            cursors.pop()
+            rerun()
+    with col2:
+        st.caption(caption)
+    with col3:
+        if next_cursor is not None and st.button("Next →", key=f"{state_key}_next"):
+            cursors.append(next_cursor)
+            rerun()
+
+
+def due_tasks_page(task_service):
+    """Display overdue tasks and the tasks due next."""
+    st.header("Due Soon")
+    count = st.selectbox("Upcoming tasks to show", DUE_COUNTS)
+
+    # Both lists come from the due index; no task is scanned
+    overdue = task_service.overdue()
+    upcoming = task_service.next_due(len(overdue) + count)[len(overdue):]
+    if not overdue and not upcoming:
+        st.info("No active task has a due date. Set one when adding a task.")
+        return
+
+    if overdue:
+        st.subheader(f"Overdue ({len(overdue)})")
+        render_due_tasks(task_service, overdue, overdue=True)
+    if upcoming:
+        st.subheader("Upcoming")
+        render_due_tasks(task_service, upcoming, overdue=False)
+
+
+def render_due_tasks(task_service, tasks, overdue):
+    """Render tasks with their due dates, each with buttons to complete it or clear the due date."""
+    for task in tasks:
+        col1, col2, col3 = st.columns([4, 1, 1])
+        with col1:
+            color = "red" if overdue else "inherit"
+            reminder = f" · reminder {task.remind_at}" if task.remind_at is not None else ""
+            st.markdown(
+                f"**{task.title}** ({task.priority}) — "
+                f"<span style='color:{color};'>due {task.due_at}</span>{reminder}",
+                unsafe_allow_html=True
+            )
+        with col2:
+            if st.button("✓", key=f"due_complete_{task.id}"):
+                task_service.complete_task(task.id)
+                rerun()
+        with col3:
+            if st.button("Clear", key=f"due_clear_{task.id}"):
+                task_service.update_task(task.id, due_at=None, remind_at=None)
+                rerun()
+
+
+def optional_datetime(label, key, default):
+    """
+    Render inputs for an optional date and time.
+
+    Args:
+        label: What the time is, e.g. "due date"
+        key: Widget key prefix
+        default: Datetime the inputs start at
+
+    Returns:
+        The chosen datetime, or None if the checkbox is left unticked
+    """
+    enabled = st.checkbox(f"Set a {label}", key=f"{key}_enabled")
+    col1, col2 = st.columns(2)
+    with col1:
+        day = st.date_input(label.capitalize(), value=default.date(), key=f"{key}_date")
+    with col2:
+        moment = st.time_input("Time", value=default.time(), key=f"{key}_time")
+    return datetime.combine(day, moment) if enabled else None
+
+
 def add_task_page(task_service):
     """Display the add task page."""
     st.header("Add New Task")
@@ -117,6 +471,9 @@ def add_task_page(task_service):
             options=["Low", "Medium", "High"],
             value="Medium"
         )
+        tomorrow = (datetime.now() + timedelta(days=1)).replace(minute=0, second=0, microsecond=0)
+        due_at = optional_datetime("due date", "add_due", tomorrow)
+        remind_at = optional_datetime("reminder", "add_remind", tomorrow - timedelta(hours=1))
         
         submitted = st.form_submit_button("Add Task")
         
@@ -127,7 +484,9 @@ def add_task_page(task_service):
                 task = task_service.add_task(
                     title=title,
                     description=description,
-                    priority=priority.lower()
+                    priority=priority.lower(),
+                    due_at=due_at,
+                    remind_at=remind_at
                 )
                 st.success(f"Task '{title}' added successfully with ID {task.id}")
 
@@ -137,14 +496,23 @@ def search_tasks_page(task_service):
     st.header("Search Tasks")
     
     keyword = st.text_input("Search for tasks", placeholder="Enter keyword...")
+    search_archive = st.checkbox("Search archived tasks instead", value=False)
     
     if keyword:
-        results = task_service.search_tasks(keyword)
+        page_size = PAGE_SIZES[0]
+        offset = current_cursor("search_page", (keyword, search_archive)) or 0
+        # One extra result tells whether another page follows
+        if search_archive:
+            results = task_service.search_archive(keyword, limit=offset + page_size + 1)[offset:]
+        else:
+            results = task_service.search_tasks(keyword, limit=page_size + 1, offset=offset)
+        next_offset = offset + page_size if len(results) > page_size else None
+        results = results[:page_size]
         
         if not results:
             st.info(f"No tasks found matching '{keyword}'")
         else:
-            st.write(f"Found {len(results)} tasks matching '{keyword}':")
+            st.write(f"Tasks matching '{keyword}':")
             
             for task in results:
                 with st.container():
@@ -162,9 +530,15 @@ def search_tasks_page(task_service):
                     with col2:
                         if st.button("View", key=f"view_{task.id}"):
                             st.session_state.task_to_view = task.id
-                            st.experimental_rerun()
+                            rerun()
                     
                     st.divider()
+            
+            pagination_controls(
+                "search_page",
+                next_offset,
+                f"Results {offset + 1}-{offset + len(results)}"
+            )
     
     # View task details if selected
     if hasattr(st.session_state, 'task_to_view'):
@@ -177,18 +551,20 @@ def search_tasks_page(task_service):
             st.write(f"**Priority:** {task.priority}")
             st.write(f"**Status:** {'Completed' if task.completed else 'Active'}")
             st.write(f"**Created at:** {task.created_at}")
+            if task.due_at is not None:
+                st.write(f"**Due at:** {task.due_at}{' (overdue)' if task.is_overdue() else ''}")
             
             col1, col2 = st.columns(2)
             
             with col1:
                 if not task.completed and st.button("Mark as Complete"):
                     task_service.complete_task(task.id)
-                    st.experimental_rerun()
+                    rerun()
             
             with col2:
                 if st.button("Close"):
                     del st.session_state.task_to_view
-                    st.experimental_rerun()
+                    rerun()
                 
         except TaskNotFoundException:
             st.error("Task not found")
@@ -5,70 +5,601 @@ Command-line interface for the task manager application.
 
 import argparse
 import os
+import re
 import sys
+import time
 
-# Add the project root directory to the Python path
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+if not __package__:
+    # Run as a script (python src/cli.py): add the project root to the Python
+    # path. The console entry point and python -m src.cli skip this.
+    sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from src.services.task_service import TaskService
-from src.utils.exceptions import TaskNotFoundException
+# Only what every command needs is imported up front; the service stack and
+# command-specific modules are imported once the command is known, so quick
+# commands like "view" start fast. benchmarks/cli_startup_bench.py guards this.
+from src.utils.exceptions import TaskManagerException, TaskNotFoundException
 
+# Copies of constants of modules imported only once the command is known
+# (src.storage.factory, src.utils.task_io, src.daemon, src.services.change_feed
+# and src.storage.shard_map); tests/test_cli.py checks they stay in step
+STORAGE_MODES = ("json", "journal", "sqlite", "columnar")
+FORMATS = ("csv", "jsonl")
+DEFAULT_FLUSH_INTERVAL = 1.0
+DEFAULT_WATCH_INTERVAL = 0.5
+DEFAULT_SHARD_MAP = "shards.json"
 
-def main():
-    """Main function to handle command-line arguments."""
-    parser = argparse.ArgumentParser(description="Task Manager - A CLI task management app")
-    subparsers = parser.add_subparsers(dest="command", help="Command to execute")
-
-    # Add task command
-    add_parser = subparsers.add_parser("add", help="Add a new task")
-    add_parser.add_argument("title", help="Task title")
-    add_parser.add_argument("-d", "--description", help="Task description", default="")
-    add_parser.add_argument(
-        "-p", "--priority", 
-        help="Task priority", 
-        choices=["low", "medium", "high"], 
+# "+90m", "+2h", "+1.5d", "+1w": a time relative to now
+RELATIVE_TIME = re.compile(r"^\+(\d+(?:\.\d+)?)([mhdw])$")
+TIME_UNITS = {"m": 60, "h": 3600, "d": 86400, "w": 7 * 86400}
+# Absolute times accepted by parse_when
+WHEN_FORMATS = ("%Y-%m-%d %H:%M:%S", "%Y-%m-%d %H:%M", "%Y-%m-%d")
+
+
+def format_optional(value, unit: str = "") -> str:
+    """Format a stats value that may be unavailable."""
+    return "n/a" if value is None else f"{value:,}{unit}"
+
+
+def print_stats(stats):
+    """Print the result of TaskService.stats() as tables."""
+    print("\n" + "=" * 60)
+    print(f"{'Tasks:':<16}{format_optional(stats['tasks'])}")
+    print(f"{'Search terms:':<16}{format_optional(stats['search_terms'])}")
+    print(f"{'Storage size:':<16}{format_optional(stats['storage_bytes'], ' bytes')}")
+    print(f"{'Bytes read:':<16}{format_optional(stats['bytes_read'])}")
+    print(f"{'Bytes written:':<16}{format_optional(stats['bytes_written'])}")
+    print(f"{'Archive size:':<16}{format_optional(stats['archive_bytes'], ' bytes')}")
+    cache = stats["query_cache"]
+    print(
+        f"{'Query cache:':<16}{cache['entries']:,} results, {cache['bytes']:,} bytes; {cache['hits']:,} hits, "
+        f"{cache['misses']:,} misses, {cache['evictions']:,} evictions, {cache['invalidations']:,} invalidations"
+    )
+    metrics = stats["metrics"]
+    if metrics is None:
+        print("=" * 60)
+        print("Start the daemon with --metrics to collect operation timings.\n")
+        return
+
+    # p50/p99 are histogram bucket bounds: the latency is at most this value
+    print("=" * 60)
+    print(f"{'Operation':<26}{'Calls':>8}{'Mean ms':>10}{'p50 ms':>8}{'p99 ms':>8}")
+    print("=" * 60)
+    for entry in metrics["histograms"]:
+        labels = entry["labels"]
+        name = labels.get("method") or "store." + labels.get("op", "")
+        mean = entry["sum"] / entry["count"] * 1000
+        print(f"{name:<26}{entry['count']:>8}{mean:>10.3f}{entry['p50'] * 1000:>8g}{entry['p99'] * 1000:>8g}")
+    for entry in metrics["counters"]:
+        labels = ",".join(f"{key}={value}" for key, value in entry["labels"].items())
+        print(f"{entry['name']} {labels}".rstrip() + f": {entry['value']:g}")
+    print("=" * 60 + "\n")
+
+
+def add_archive_arguments(parser, days: str = "--days", keep: str = "--keep") -> None:
+    """Add the options of an archive policy to a parser."""
+    parser.add_argument(
+        days,
+        help="Archive tasks completed more than this many days ago",
+        type=float,
+        dest="archive_days"
+    )
+    parser.add_argument(
+        keep,
+        help="Archive the longest-completed tasks while more than this many tasks are kept",
+        type=int,
+        dest="archive_keep"
+    )
+
+
+def parse_when(text: str) -> int:
+    """
+    Parse a due date or reminder time given on the command line.
+
+    Args:
+        text: "YYYY-MM-DD[ HH:MM[:SS]]" in local time, or a time relative to
+            now such as "+30m", "+2h", "+3d" or "+1w"
+
+    Returns:
+        Epoch seconds
+
+    Raises:
+        argparse.ArgumentTypeError: If the text is neither
+    """
+    # Imported here: only commands given a time need it
+    from datetime import datetime
+
+    text = text.strip()
+    match = RELATIVE_TIME.match(text)
+    if match:
+        return int(time.time() + float(match.group(1)) * TIME_UNITS[match.group(2)])
+    for time_format in WHEN_FORMATS:
+        try:
+            return int(datetime.strptime(text, time_format).timestamp())
+        except ValueError:
+            pass
+    raise argparse.ArgumentTypeError(
+        f"invalid time '{text}': use YYYY-MM-DD[ HH:MM[:SS]] or +N followed by m, h, d or w"
+    )
+
+
+def print_due_tasks(title: str, tasks) -> None:
+    """Print tasks with their due dates as a table."""
+    print(f"\n{title}:")
+    print("=" * 60)
+    print(f"{'ID':^5}|{'Title':^20}|{'Priority':^10}|{'Due At':^20}")
+    print("=" * 60)
+    for task in tasks:
+        print(f"{task.id:^5}|{task.title[:18]:^20}|{task.priority:^10}|{task.due_at:^20}")
+    print("=" * 60)
+
+
+def watch_reminders(task_service, interval: float) -> None:
+    """Print reminders as they come due until interrupted."""
+    def remind(task):
+        due = f", due {task.due_at}" if task.due_at is not None else ""
+        print(f"[{task.remind_at}] Reminder: task {task.id}: {task.title}{due}", flush=True)
+
+    print("Waiting for reminders. Press Ctrl+C to stop.")
+    # A daemon client can only poll; in process, a scheduler sleeps until the next reminder
+    scheduler = None
+    if hasattr(task_service, "schedule_reminders"):
+        scheduler = task_service.schedule_reminders(remind, poll_interval=interval)
+    checked = int(time.time())
+    try:
+        while True:
+            time.sleep(interval)
+            if scheduler is None:
+                now = int(time.time())
+                for task in task_service.reminders_between(checked, now):
+                    remind(task)
+                checked = now
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if scheduler is not None:
+            scheduler.stop()
+
+
+def watch_tasks(task_service, interval: float) -> None:
+    """Print every change to the tasks until interrupted."""
+    # Starts with a reset listing every task, which is not printed
+    changes = task_service.changes_since(0)
+    revision = changes[-1].revision
+    print(f"Watching {len(changes) - 1} tasks for changes. Press Ctrl+C to stop.")
+    # A daemon client can only poll; in process, watch() returns as soon as something changes
+    polling = not hasattr(task_service, "watch")
+    try:
+        while True:
+            if polling:
+                time.sleep(interval)
+                changes = task_service.changes_since(revision)
+            else:
+                changes = task_service.watch(revision, poll_interval=interval)
+            for change in changes:
+                if change.op == "reset":
+                    print(f"[{change.revision}] reset: every task follows")
+                else:
+                    print(f"[{change.revision}] {change.op}: {change.task}")
+                revision = change.revision
+    except KeyboardInterrupt:
+        pass
+
+
+class LazyParser(argparse.ArgumentParser):
+    """
+    Subcommand parser whose arguments are added when it is first used.
+
+    Only the subcommand being run (or whose help is shown) is configured,
+    so each invocation pays for one subcommand's arguments, not all of them.
+    """
+
+    def __init__(self, *args, configure=None, add_help: bool = True, **kwargs):
+        """
+        Create the parser.
+
+        Args:
+            configure: Called with the parser to add its arguments, or None
+            add_help: Whether to add a -h/--help option, also on first use
+            *args, **kwargs: Passed to ArgumentParser
+        """
+        super().__init__(*args, add_help=False, **kwargs)
+        self._configure = configure
+        self._lazy_help = add_help
+
+    def _ensure_configured(self) -> None:
+        """Add the arguments, once."""
+        if self._lazy_help:
+            self._lazy_help = False
+            self.add_argument(
+                "-h", "--help", action="help", default=argparse.SUPPRESS, help="show this help message and exit"
+            )
+        configure, self._configure = self._configure, None
+        if configure is not None:
+            configure(self)
+
+    def parse_known_args(self, args=None, namespace=None):
+        self._ensure_configured()
+        return super().parse_known_args(args, namespace)
+
+    def format_usage(self):
+        self._ensure_configured()
+        return super().format_usage()
+
+    def format_help(self):
+        self._ensure_configured()
+        return super().format_help()
+
+
+def configure_add(parser) -> None:
+    """Add the arguments of the add command."""
+    parser.add_argument("title", help="Task title")
+    parser.add_argument("-d", "--description", help="Task description", default="")
+    parser.add_argument(
+        "-p", "--priority",
+        help="Task priority",
+        choices=["low", "medium", "high"],
         default="medium"
     )
+    parser.add_argument("--due", help="Due date, e.g. '2026-11-01 17:00' or '+3d'", type=parse_when)
+    parser.add_argument("--remind", help="When to remind about the task, in the same forms", type=parse_when)
+
+
+def configure_list(parser) -> None:
+    """Add the arguments of the list command."""
+    parser.add_argument(
+        "-a", "--all",
+        help="Show completed tasks as well",
+        action="store_true"
+    )
+    parser.add_argument(
+        "-p", "--priority",
+        help="Only show tasks with this priority",
+        choices=["low", "medium", "high"]
+    )
+    parser.add_argument(
+        "--archived",
+        help="Show archived tasks as well (implies --all)",
+        action="store_true"
+    )
+
+
+def configure_task_id(action: str):
+    """Make a configure function for commands that take just a task ID."""
+    def configure(parser) -> None:
+        """Add the task ID argument."""
+        parser.add_argument("id", type=int, help=f"Task ID to {action}")
+    return configure
+
+
+def configure_search(parser) -> None:
+    """Add the arguments of the search command."""
+    parser.add_argument("keyword", help="Keyword to search for")
+    parser.add_argument("-n", "--limit", type=int, help="Maximum number of results")
+    parser.add_argument(
+        "--substring",
+        help="Match the keyword as a plain substring instead of by words",
+        action="store_true"
+    )
+    parser.add_argument(
+        "--archived",
+        help="Search the archive of completed tasks instead, by substring",
+        action="store_true"
+    )
+
+
+def configure_due(parser) -> None:
+    """Add the arguments of the due command."""
+    parser.add_argument("id", type=int, nargs="?", help="Task ID to set the due date or reminder of")
+    parser.add_argument("--at", help="Due date, e.g. '2026-11-01 17:00' or '+3d'", type=parse_when)
+    parser.add_argument("--remind", help="When to remind about the task, in the same forms", type=parse_when)
+    parser.add_argument("--clear", help="Remove the due date and reminder", action="store_true")
+    parser.add_argument("-n", "--limit", type=int, default=10, help="Upcoming tasks to show (default 10)")
+    parser.add_argument("--overdue", help="Only show overdue tasks", action="store_true")
+    parser.add_argument("--watch", help="Print reminders as they come due", action="store_true")
+    parser.add_argument(
+        "--interval",
+        help="With --watch, seconds between checks for changes made by other processes",
+        type=float,
+        default=DEFAULT_WATCH_INTERVAL
+    )
+
+
+def configure_file(direction: str):
+    """Make a configure function for the import and export commands."""
+    def configure(parser) -> None:
+        """Add the file and format arguments."""
+        parser.add_argument("file", help=f"File to {direction}")
+        parser.add_argument("-f", "--format", help="File format (defaults to the file extension)", choices=FORMATS)
+    return configure
+
+
+def configure_daemon(parser) -> None:
+    """Add the arguments of the daemon command."""
+    parser.add_argument(
+        "--flush-interval",
+        help="Seconds between writes of pending changes to storage (0 writes every change)",
+        type=float,
+        default=DEFAULT_FLUSH_INTERVAL
+    )
+    parser.add_argument(
+        "--metrics",
+        help="Record operation timings and I/O totals, shown by the stats command",
+        action="store_true"
+    )
+    parser.add_argument(
+        "--metrics-port",
+        help="Also serve the metrics in Prometheus format at http://127.0.0.1:PORT/metrics",
+        type=int
+    )
+    add_archive_arguments(parser, "--archive-days", "--archive-keep")
+
 
-    # List tasks command
-    list_parser = subparsers.add_parser("list", help="List all tasks")
-    list_parser.add_argument(
-        "-a", "--all", 
-        help="Show completed tasks as well", 
+def configure_stats(parser) -> None:
+    """Add the arguments of the stats command."""
+    parser.add_argument(
+        "--prometheus",
+        help="Print the metrics in Prometheus text format",
         action="store_true"
     )
 
-    # Complete task command
-    complete_parser = subparsers.add_parser("complete", help="Mark a task as complete")
-    complete_parser.add_argument("id", type=int, help="Task ID to mark as complete")
 
-    # Delete task command
-    delete_parser = subparsers.add_parser("delete", help="Delete a task")
-    delete_parser.add_argument("id", type=int, help="Task ID to delete")
+def configure_watch(parser) -> None:
+    """Add the arguments of the watch command."""
+    parser.add_argument(
+        "--interval",
+        help="Seconds between checks for changes made by other processes",
+        type=float,
+        default=DEFAULT_WATCH_INTERVAL
+    )
+
+
+def configure_convert(parser) -> None:
+    """Add the arguments of the convert command."""
+    parser.add_argument("target", help="File to create")
+    parser.add_argument(
+        "--target-mode",
+        help="Storage format of the new file (defaults to its extension: .tcol is columnar, anything else json)",
+        choices=("json", "columnar")
+    )
+
+
+def configure_tenants(parser) -> None:
+    """Add the arguments of the tenants command."""
+    tenants_subparsers = parser.add_subparsers(dest="tenants_command")
+    tenant_add_parser = tenants_subparsers.add_parser(
+        "add",
+        help="Add a tenant with a store of its own (columnar with --storage-mode columnar)"
+    )
+    tenant_add_parser.add_argument("name", help="Tenant name")
+
 
-    # Search tasks command
-    search_parser = subparsers.add_parser("search", help="Search for tasks")
-    search_parser.add_argument("keyword", help="Keyword to search for")
+# (name, help, configure function) of every command, in the order --help lists them
+COMMANDS = (
+    ("add", "Add a new task", configure_add),
+    ("list", "List all tasks", configure_list),
+    ("complete", "Mark a task as complete", configure_task_id("mark as complete")),
+    ("delete", "Delete a task", configure_task_id("delete")),
+    ("search", "Search for tasks", configure_search),
+    ("view", "View task details", configure_task_id("view")),
+    (
+        "due",
+        "List overdue and upcoming tasks, or set a task's due date with 'due ID --at WHEN'",
+        configure_due
+    ),
+    ("archive", "Move completed tasks to the archive", add_archive_arguments),
+    ("restore", "Move an archived task back to the task list", configure_task_id("restore")),
+    ("import", "Add tasks from a CSV or JSONL file", configure_file("import ('-' for stdin)")),
+    ("export", "Write all tasks to a CSV or JSONL file", configure_file("write ('-' for stdout)")),
+    ("daemon", "Serve the task store to other CLI calls from memory", configure_daemon),
+    (
+        "stats",
+        "Show store sizes and operation timings (collected by a running daemon started with --metrics)",
+        configure_stats
+    ),
+    ("watch", "Print changes to the tasks as they happen", configure_watch),
+    ("migrate", "Copy tasks from tasks.json into the SQLite database tasks.db", None),
+    (
+        "convert",
+        "Copy the task store into a new file in another snapshot format (e.g. tasks.json to tasks.tcol)",
+        configure_convert
+    ),
+    ("tenants", "List tenants, or add one with 'tenants add NAME'", configure_tenants),
+)
 
-    # View task command
-    view_parser = subparsers.add_parser("view", help="View task details")
-    view_parser.add_argument("id", type=int, help="Task ID to view")
 
+def build_parser() -> argparse.ArgumentParser:
+    """Create the command-line parser."""
+    parser = argparse.ArgumentParser(description="Task Manager - A CLI task management app")
+    parser.add_argument(
+        "--storage-mode",
+        help="Storage backend (auto-detected by default)",
+        choices=STORAGE_MODES
+    )
+    store_group = parser.add_mutually_exclusive_group()
+    store_group.add_argument(
+        "--storage-file", "--store",
+        help=(
+            "Task storage file (defaults to config/tasks.json, or config/tasks.db with --storage-mode sqlite "
+            "and config/tasks.tcol with --storage-mode columnar)"
+        )
+    )
+    store_group.add_argument("--tenant", help="Work on this tenant's store (see the tenants command)")
+    store_group.add_argument(
+        "--all-tenants",
+        help="Work on every tenant's store at once; new tasks are spread over them",
+        action="store_true"
+    )
+    subparsers = parser.add_subparsers(dest="command", help="Command to execute", parser_class=LazyParser)
+    for name, help_text, configure in COMMANDS:
+        subparsers.add_parser(name, help=help_text, configure=configure)
+    return parser
+
+
+def main():
+    """Main function to handle command-line arguments."""
+    parser = build_parser()
     args = parser.parse_args()
     
     # Initialize the task service
     config_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), "config")
     os.makedirs(config_dir, exist_ok=True)
     storage_file = os.path.join(config_dir, "tasks.json")
-    task_service = TaskService(storage_file)
+    db_file = os.path.join(config_dir, "tasks.db")
+    if args.storage_file:
+        storage_file = args.storage_file
+        db_file = os.path.splitext(storage_file)[0] + ".db"
+    elif args.storage_mode == "columnar":
+        storage_file = os.path.join(config_dir, "tasks.tcol")
+    shard_map = os.path.join(config_dir, DEFAULT_SHARD_MAP)
+
+    if args.command is None:
+        parser.print_help()
+        return
+
+    if args.command == "tenants":
+        if args.tenants_command == "add":
+            from src.storage.shard_map import add_shard
+
+            if args.storage_mode == "sqlite":
+                print("Error: tenant stores cannot use sqlite storage.")
+                return
+            try:
+                shard = add_shard(shard_map, args.name, ".tcol" if args.storage_mode == "columnar" else ".json")
+            except ValueError as e:
+                print(f"Error: {e}")
+                return
+            print(f"Tenant '{shard.name}' added; its tasks are stored in {shard.path}.")
+            return
+        from src.storage.shard_map import load_shard_map
+
+        shards = load_shard_map(shard_map)
+        if not shards:
+            print("No tenants found. Add one with 'tenants add NAME'.")
+            return
+        print("\n" + "=" * 60)
+        print(f"{'Shard':^7}|{'Tenant':^20}| Store")
+        print("=" * 60)
+        for shard in shards:
+            print(f"{shard.number:^7}|{shard.name[:18]:^20}| {os.path.relpath(shard.path)}")
+        print("=" * 60 + "\n")
+        return
+
+    if (args.tenant is not None or args.all_tenants) and args.command == "migrate":
+        print("Error: tenant stores cannot be migrated to SQLite.")
+        return
+    if args.all_tenants and args.command in ("convert", "daemon"):
+        print(f"Error: {args.command} works on one store; pick a tenant with --tenant.")
+        return
+
+    shard = None
+    if args.tenant is not None:
+        from src.storage.shard_map import find_shard, load_shard_map
+
+        try:
+            tenant = find_shard(load_shard_map(shard_map), args.tenant)
+        except ValueError as e:
+            print(f"Error: {e}")
+            return
+        storage_file, shard = tenant.path, tenant.number
+
+    if args.command == "migrate":
+        from src.storage.sqlite_store import migrate_json_to_sqlite
+
+        if os.path.exists(db_file):
+            print(f"Error: {db_file} already exists.")
+            return
+        count = migrate_json_to_sqlite(storage_file, db_file)
+        print(f"Migrated {count} tasks to {db_file}.")
+        return
+
+    if args.command == "convert":
+        from src.storage.factory import convert_store
+
+        if os.path.exists(args.target):
+            print(f"Error: {args.target} already exists.")
+            return
+        try:
+            count = convert_store(storage_file, args.target, args.storage_mode, args.target_mode)
+        except ValueError as e:
+            print(f"Error: {e}")
+            return
+        print(f"Converted {count} tasks to {args.target}.")
+        return
+
+    if args.storage_mode == "sqlite" and not args.storage_file:
+        storage_file = db_file
+
+    if args.command == "daemon":
+        from src.daemon import TaskDaemon
+        from src.services.archive_policy import ArchivePolicy
+        from src.utils.metrics import Metrics
+
+        metrics = Metrics() if args.metrics or args.metrics_port is not None else None
+        archive_policy = None
+        if args.archive_days is not None or args.archive_keep is not None:
+            archive_policy = ArchivePolicy(args.archive_days, args.archive_keep)
+        try:
+            daemon = TaskDaemon(
+                storage_file,
+                args.storage_mode,
+                flush_interval=args.flush_interval,
+                metrics=metrics,
+                metrics_port=args.metrics_port,
+                shard=shard,
+                archive_policy=archive_policy
+            )
+        except (ValueError, TaskManagerException) as e:
+            print(f"Error: {e}")
+            return
+        print(f"Serving tasks on {daemon.socket_path}. Press Ctrl+C to stop.")
+        daemon.serve_forever()
+        return
+
+    # A running daemon already has the store loaded; otherwise work in-process.
+    # Lazy loading lets point lookups like "view" skip parsing the whole store.
+    task_service = None
+    if not args.all_tenants:
+        from src.daemon_client import connect, socket_path_for
+
+        task_service = connect(socket_path_for(storage_file))
+    if task_service is None and args.all_tenants:
+        from src.services.sharded_task_service import ShardedTaskService
+
+        try:
+            # stats reports what the shards hold, so it loads them like the single-store stats
+            task_service = ShardedTaskService(shard_map, args.storage_mode, lazy_load=args.command != "stats")
+        except ValueError as e:
+            print(f"Error: {e}")
+            return
+    elif task_service is None:
+        from src.services.task_service import TaskService
+
+        if args.command == "stats":
+            from src.utils.metrics import Metrics
+
+            # Without a daemon there is no history; measure loading the store instead
+            task_service = TaskService(storage_file, args.storage_mode, metrics=Metrics(), shard=shard)
+        else:
+            task_service = TaskService(storage_file, args.storage_mode, lazy_load=True, shard=shard)
 
     try:
         if args.command == "add":
-            task = task_service.add_task(args.title, args.description, args.priority)
+            task = task_service.add_task(
+                args.title, args.description, args.priority, due_at=args.due, remind_at=args.remind
+            )
             print(f"Task '{task.title}' added successfully with ID {task.id}.")
             
         elif args.command == "list":
-            tasks = task_service.get_all_tasks(show_completed=args.all)
+            if args.archived:
+                tasks = [
+                    task for task in task_service.get_all_tasks(include_archived=True)
+                    if args.priority is None or task.priority == args.priority
+                ]
+            else:
+                tasks = task_service.query(
+                    completed=None if args.all else False,
+                    priority=args.priority
+                )
             if not tasks:
                 print("No tasks found.")
                 return
@@ -92,7 +623,14 @@ def main():
             print(f"Task '{task.title}' deleted successfully.")
             
         elif args.command == "search":
-            results = task_service.search_tasks(args.keyword)
+            if args.archived:
+                results = task_service.search_archive(args.keyword, limit=args.limit)
+            else:
+                results = task_service.search_tasks(
+                    args.keyword,
+                    limit=args.limit,
+                    mode="substring" if args.substring else "index"
+                )
             
             if not results:
                 print(f"No tasks found matching '{args.keyword}'.")
@@ -109,6 +647,23 @@ def main():
             
             print("=" * 60 + "\n")
             
+        elif args.command == "import":
+            from src.utils.task_io import detect_format, open_text, read_task_entries
+
+            file_format = detect_format(args.file, args.format)
+            with open_text(args.file, "r") as f:
+                tasks = task_service.add_tasks(read_task_entries(f, file_format))
+            print(f"Imported {len(tasks)} tasks.")
+
+        elif args.command == "export":
+            from src.utils.task_io import detect_format, open_text, write_tasks
+
+            file_format = detect_format(args.file, args.format)
+            with open_text(args.file, "w") as f:
+                count = write_tasks(f, task_service.get_all_tasks(), file_format)
+            if args.file != "-":
+                print(f"Exported {count} tasks to {args.file}.")
+
         elif args.command == "view":
             task = task_service.get_task_by_id(args.id)
             print("\n" + "=" * 60)
@@ -118,7 +673,76 @@ def main():
             print(f"Priority: {task.priority}")
             print(f"Status: {'Completed' if task.completed else 'Active'}")
             print(f"Created at: {task.created_at}")
+            if task.completed_at is not None:
+                print(f"Completed at: {task.completed_at}")
+            if task.due_at is not None:
+                print(f"Due at: {task.due_at}{' (overdue)' if task.is_overdue() else ''}")
+            if task.remind_at is not None:
+                print(f"Remind at: {task.remind_at}")
             print("=" * 60 + "\n")
+
+        elif args.command == "due":
+            changes = {"due_at": None, "remind_at": None} if args.clear else {}
+            if args.at is not None:
+                changes["due_at"] = args.at
+            if args.remind is not None:
+                changes["remind_at"] = args.remind
+            if args.id is not None:
+                if not changes:
+                    print("Error: give --at, --remind or --clear.")
+                    return
+                task = task_service.update_task(args.id, **changes)
+                if task.due_at is None and task.remind_at is None:
+                    print(f"Task {task.id} has no due date or reminder.")
+                else:
+                    print(
+                        f"Task {task.id} is due at {task.due_at or 'no set time'}; "
+                        f"reminder at {task.remind_at or 'none'}."
+                    )
+                return
+            if changes:
+                print("Error: give the ID of the task to change.")
+                return
+            if args.watch:
+                watch_reminders(task_service, args.interval)
+                return
+            overdue = task_service.overdue()
+            upcoming = [] if args.overdue else task_service.next_due(len(overdue) + args.limit)[len(overdue):]
+            if not overdue and not upcoming:
+                print("No overdue tasks." if args.overdue else "No tasks with a due date.")
+                return
+            if overdue:
+                print_due_tasks(f"Overdue ({len(overdue)})", overdue)
+            if upcoming:
+                print_due_tasks("Upcoming", upcoming)
+            print()
+
+        elif args.command == "archive":
+            if args.archive_days is None and args.archive_keep is None:
+                print("Error: give --days, --keep or both.")
+                return
+            # A plain tuple so it can also be sent to a daemon
+            count = task_service.archive_completed((args.archive_days, args.archive_keep))
+            print(f"Archived {count} completed tasks.")
+
+        elif args.command == "restore":
+            task = task_service.restore_task(args.id)
+            print(f"Task {task.id} restored from the archive.")
+
+        elif args.command == "stats":
+            stats = task_service.stats()
+            if args.prometheus:
+                if stats["metrics"] is None:
+                    print("Error: the daemon was started without --metrics.")
+                    return
+                from src.utils.metrics import format_prometheus
+
+                print(format_prometheus(stats["metrics"]), end="")
+                return
+            print_stats(stats)
+
+        elif args.command == "watch":
+            watch_tasks(task_service, args.interval)
             
         else:
             parser.print_help()
@@ -127,6 +751,8 @@ def main():
         print(f"Error: {e}")
     except Exception as e:
         print(f"An unexpected error occurred: {e}")
+    finally:
+        task_service.close()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,223 @@
+"""
+Long-lived task daemon serving a TaskService over a Unix domain socket.
+
+Keeping the store loaded in one process spares each CLI invocation from
+re-reading and re-parsing it. Requests and responses are newline-delimited
+JSON objects:
+
+    {"method": "get_task_by_id", "args": [1], "kwargs": {}}
+    {"ok": true, "result": {"__task__": {...}}}
+    {"ok": false, "error": "TaskNotFoundException", "message": "..."}
+
+Clients keeping a copy of the tasks poll "changes_since" for updates;
+blocking watch() calls are not served, as they would hold up other clients.
+"""
+
+import os
+import json
+import signal
+import threading
+import socketserver
+from typing import Any, Dict, Optional
+
+from src.daemon_client import connect, socket_path_for
+from src.models.task import Task
+from src.services.archive_policy import ArchivePolicy
+from src.services.shared_task_service import READ_METHODS, WRITE_METHODS
+from src.utils import exceptions
+from src.utils.metrics import Metrics, serve_metrics
+from src.utils.rwlock import ReadWriteLock
+
+DEFAULT_FLUSH_INTERVAL = 1.0
+
+
+class _UnixServer(socketserver.ThreadingUnixStreamServer):
+    # Client handlers must not keep the daemon alive on shutdown
+    daemon_threads = True
+
+
+def encode_result(value: Any) -> Any:
+    """Convert Task results into JSON-serializable values."""
+    from src.services.change_feed import Change
+    from src.services.task_service import TaskPage
+
+    if isinstance(value, Change):
+        return {"__change__": [value.revision, value.op, value.task_id, encode_result(value.task)]}
+    if isinstance(value, Task):
+        return {"__task__": value.to_dict()}
+    if isinstance(value, TaskPage):
+        return {"__page__": [encode_result(value.tasks), value.next_cursor, value.total]}
+    if isinstance(value, list):
+        return [encode_result(item) for item in value]
+    return value
+
+
+class TaskDaemon:
+    """Holds a loaded TaskService and serves it to local clients."""
+
+    def __init__(
+        self,
+        storage_file: str,
+        storage_mode: Optional[str] = None,
+        socket_path: Optional[str] = None,
+        flush_interval: float = DEFAULT_FLUSH_INTERVAL,
+        metrics: Optional[Metrics] = None,
+        metrics_port: Optional[int] = None,
+        shard: Optional[int] = None,
+        archive_policy: Optional[ArchivePolicy] = None
+    ):
+        """
+        Load the store and prepare the server.
+
+        Args:
+            storage_file: Path to the task storage file
+            storage_mode: Storage backend, see TaskService
+            socket_path: Socket to listen on (defaults to socket_path_for)
+            flush_interval: Seconds between flushes of pending changes;
+                0 persists every change immediately
+            metrics: Registry to instrument the service with; reported by
+                the "stats" method
+            metrics_port: Local port to serve the metrics on in Prometheus
+                format; requires metrics
+            shard: Shard number of the store when it belongs to a shard
+                map, see TaskService
+            archive_policy: Completed tasks to move to the archive as
+                changes come in, see TaskService
+
+        Raises:
+            ValueError: If metrics_port is given without metrics, or the
+                archive policy is invalid
+            TaskManagerException: If another daemon is serving the socket
+        """
+        if metrics_port is not None and metrics is None:
+            raise ValueError("metrics_port requires metrics")
+        # Imported here so CLI calls that only look for a running daemon
+        # skip loading the service stack
+        from src.services.task_service import TaskService
+
+        self.socket_path = socket_path or socket_path_for(storage_file)
+        # Checked before the (possibly slow) load, and again before binding
+        self._check_socket()
+        self.flush_interval = flush_interval
+        self.metrics_port = metrics_port
+        self.service = TaskService(
+            storage_file,
+            storage_mode,
+            autosave=flush_interval <= 0,
+            metrics=metrics,
+            shard=shard,
+            archive_policy=archive_policy
+        )
+        self._lock = ReadWriteLock()
+        self._stopped = threading.Event()
+        self._server: Optional[_UnixServer] = None
+
+    def dispatch(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Run one request against the service.
+
+        Args:
+            request: Decoded request object
+
+        Returns:
+            Response object
+        """
+        method = request.get("method")
+        args = request.get("args", [])
+        kwargs = request.get("kwargs", {})
+        try:
+            if method in READ_METHODS:
+                lock = self._lock.read
+            elif method in WRITE_METHODS:
+                lock = self._lock.write
+            else:
+                raise ValueError(f"Unknown method '{method}'")
+            with lock():
+                # Encoded under the lock so no writer can change a task mid-way
+                return {"ok": True, "result": encode_result(getattr(self.service, method)(*args, **kwargs))}
+        except Exception as e:
+            return {"ok": False, "error": type(e).__name__, "message": str(e)}
+
+    def flush(self) -> None:
+        """Persist pending changes."""
+        # Flushing only reads the tasks, so it blocks writers but not readers
+        with self._lock.read():
+            self.service.flush()
+
+    def _check_socket(self) -> None:
+        """
+        Make sure no other daemon serves the socket, removing a stale one.
+
+        Raises:
+            TaskManagerException: If a daemon answers on the socket
+        """
+        client = connect(self.socket_path)
+        if client is not None:
+            client.close()
+            # Two daemons would each write their own copy of the store
+            raise exceptions.TaskManagerException(f"A task daemon is already serving {self.socket_path}")
+        if os.path.exists(self.socket_path):
+            # Left behind by a daemon that did not shut down cleanly
+            os.remove(self.socket_path)
+
+    def serve_forever(self) -> None:
+        """
+        Listen for clients until shutdown() is called or a signal arrives.
+
+        Raises:
+            TaskManagerException: If another daemon is serving the socket
+        """
+        self._check_socket()
+
+        daemon = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                for line in self.rfile:
+                    try:
+                        response = daemon.dispatch(json.loads(line))
+                    except json.JSONDecodeError as e:
+                        response = {"ok": False, "error": "ValueError", "message": str(e)}
+                    self.wfile.write(json.dumps(response).encode("utf-8") + b"\n")
+                    self.wfile.flush()
+
+        self._server = _UnixServer(self.socket_path, Handler)
+        # Clients can read and change every task, so only the owner may connect
+        os.chmod(self.socket_path, 0o600)
+
+        metrics_server = None
+        if self.metrics_port is not None:
+            metrics_server = serve_metrics(self.service.metrics, self.metrics_port)
+
+        flusher = None
+        if self.flush_interval > 0:
+            flusher = threading.Thread(target=self._flush_loop, name="task-daemon-flusher", daemon=True)
+            flusher.start()
+
+        if threading.current_thread() is threading.main_thread():
+            for signum in (signal.SIGINT, signal.SIGTERM):
+                signal.signal(signum, lambda *_: threading.Thread(target=self.shutdown).start())
+
+        try:
+            self._server.serve_forever()
+        finally:
+            self._stopped.set()
+            if flusher is not None:
+                flusher.join()
+            self._server.server_close()
+            if metrics_server is not None:
+                metrics_server.shutdown()
+                metrics_server.server_close()
+            if os.path.exists(self.socket_path):
+                os.remove(self.socket_path)
+            with self._lock.write():
+                self.service.close()
+
+    def shutdown(self) -> None:
+        """Stop serving; pending changes are flushed on the way out."""
+        if self._server is not None:
+            self._server.shutdown()
+
+    def _flush_loop(self) -> None:
+        while not self._stopped.wait(self.flush_interval):
+            self.flush()
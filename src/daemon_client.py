@@ -0,0 +1,137 @@
+"""
+Client side of the task daemon protocol, see src.daemon.
+
+Kept apart from the daemon so the CLI can talk to a running daemon without
+importing the server machinery.
+"""
+
+import os
+import json
+from typing import Any, Dict, Optional, TYPE_CHECKING
+
+from src.utils import exceptions
+
+if TYPE_CHECKING:
+    import socket
+
+# Seconds a client waits to connect; replies may take longer (e.g. big imports)
+DEFAULT_CONNECT_TIMEOUT = 5.0
+
+# Exceptions that are re-raised on the client side under their own type
+REMOTE_ERRORS = {
+    "TaskManagerException": exceptions.TaskManagerException,
+    "TaskNotFoundException": exceptions.TaskNotFoundException,
+    "InvalidTaskDataException": exceptions.InvalidTaskDataException,
+    "StaleTaskException": exceptions.StaleTaskException,
+    "ValueError": ValueError,
+}
+
+
+def socket_path_for(storage_file: str) -> str:
+    """
+    Get the daemon socket path for a storage file.
+
+    Args:
+        storage_file: Path to the task storage file
+
+    Returns:
+        Path of the Unix domain socket
+    """
+    return storage_file + ".sock"
+
+
+def decode_result(value: Any) -> Any:
+    """Inverse of src.daemon.encode_result."""
+    if isinstance(value, dict) and "__task__" in value:
+        from src.models.task import Task
+
+        return Task.from_dict(value["__task__"])
+    if isinstance(value, dict) and "__page__" in value:
+        from src.services.task_service import TaskPage
+
+        tasks, next_cursor, total = value["__page__"]
+        return TaskPage(decode_result(tasks), next_cursor, total)
+    if isinstance(value, dict) and "__change__" in value:
+        from src.services.change_feed import Change
+
+        revision, op, task_id, task = value["__change__"]
+        return Change(revision, op, task_id, decode_result(task))
+    if isinstance(value, list):
+        return [decode_result(item) for item in value]
+    return value
+
+
+class DaemonClient:
+    """Client exposing the TaskService methods served by a TaskDaemon."""
+
+    def __init__(self, sock: 'socket.socket'):
+        """
+        Wrap a connected socket.
+
+        Args:
+            sock: Socket connected to a TaskDaemon
+        """
+        self._sock = sock
+        self._file = sock.makefile("rwb")
+
+    def __getattr__(self, name: str) -> Any:
+        # Imported here: the method lists come with the service stack
+        from src.services.shared_task_service import READ_METHODS, WRITE_METHODS
+
+        if name in READ_METHODS or name in WRITE_METHODS:
+            return lambda *args, **kwargs: self._call(name, args, kwargs)
+        raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
+
+    def _call(self, method: str, args: tuple, kwargs: Dict[str, Any]) -> Any:
+        """Send a request and return its decoded result, re-raising remote errors."""
+        request = {"method": method, "args": list(args), "kwargs": kwargs}
+        # default=list sends generators (e.g. streamed imports) as arrays
+        self._file.write(json.dumps(request, default=list).encode("utf-8") + b"\n")
+        self._file.flush()
+        line = self._file.readline()
+        if not line:
+            raise exceptions.TaskManagerException("Task daemon closed the connection")
+        response = json.loads(line)
+        if response["ok"]:
+            return decode_result(response["result"])
+        raise REMOTE_ERRORS.get(response["error"], exceptions.TaskManagerException)(response["message"])
+
+    def close(self) -> None:
+        """Close the connection."""
+        self._file.close()
+        self._sock.close()
+
+
+def connect(
+    socket_path: str,
+    timeout: float = DEFAULT_CONNECT_TIMEOUT,
+    request_timeout: Optional[float] = None
+) -> Optional[DaemonClient]:
+    """
+    Connect to a running daemon.
+
+    Args:
+        socket_path: Path of the daemon socket
+        timeout: Seconds to wait for the connection
+        request_timeout: Seconds to wait for each reply, or None to wait
+            as long as the daemon takes
+
+    Returns:
+        A DaemonClient, or None if no daemon is listening
+    """
+    if not os.path.exists(socket_path):
+        return None
+    # Imported here: without a daemon socket, which is the common case, it is not needed
+    import socket
+
+    if not hasattr(socket, "AF_UNIX"):
+        return None
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(timeout)
+    try:
+        sock.connect(socket_path)
+    except OSError:
+        sock.close()
+        return None
+    sock.settimeout(request_timeout)
+    return DaemonClient(sock)
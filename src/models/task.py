@@ -2,13 +2,88 @@
 Task model representing a task entity in the task manager application.
 """
 
+import sys
+import time
 from datetime import datetime
-from typing import Dict, Any, Optional
+from functools import lru_cache
+from typing import Dict, Any, Mapping, Optional, Union
+
+from src.utils.exceptions import InvalidTaskDataException
+
+PRIORITY_LEVELS = ("low", "medium", "high")
+PRIORITY_CODES = {name: code for code, name in enumerate(PRIORITY_LEVELS)}
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+if sys.version_info >= (3, 7):
+    # fromisoformat parses TIMESTAMP_FORMAT strings far faster than strptime
+    _parse_datetime = datetime.fromisoformat
+else:
+    def _parse_datetime(text: str) -> datetime:
+        """Parse a TIMESTAMP_FORMAT string; Python 3.6 has no datetime.fromisoformat."""
+        return datetime.strptime(text, TIMESTAMP_FORMAT)
+
+
+def parse_timestamp(value: Union[str, int, float, datetime]) -> int:
+    """
+    Convert a timestamp to epoch seconds.
+
+    Args:
+        value: Epoch seconds, a datetime, or a local-time string in
+            TIMESTAMP_FORMAT
+
+    Returns:
+        Epoch seconds
+    """
+    if isinstance(value, str):
+        value = _parse_datetime(value)
+    if isinstance(value, datetime):
+        return int(value.timestamp())
+    return int(value)
+
+
+# Tasks created in bulk share timestamps, and serializing a store formats all of them
+@lru_cache(maxsize=4096)
+def format_timestamp(timestamp: int) -> str:
+    """
+    Format epoch seconds as a local-time string in TIMESTAMP_FORMAT.
+
+    Args:
+        timestamp: Epoch seconds
+
+    Returns:
+        The formatted timestamp
+    """
+    return datetime.fromtimestamp(timestamp).strftime(TIMESTAMP_FORMAT)
+
+
+def stored_priority(priority: str) -> Union[int, str]:
+    """
+    Get the value Task.from_stored takes for a priority read from a store.
+
+    Stored data is not validated again: a priority outside PRIORITY_LEVELS,
+    which older versions accepted, is kept as text rather than failing the
+    whole load. Only new input is checked, by Task() and the priority setter.
+
+    Args:
+        priority: Priority as stored
+
+    Returns:
+        Its index in PRIORITY_LEVELS, or the text itself if it is not one
+    """
+    code = PRIORITY_CODES.get(priority.lower()) if isinstance(priority, str) else None
+    return priority if code is None else code
 
 
 class Task:
     """Task model class representing a single task."""
 
+    # Slots drop the per-instance __dict__; priority is stored as a small int
+    # code and the timestamps as epoch seconds, both shared/cached by CPython.
+    __slots__ = (
+        "id", "title", "description", "_priority", "completed", "created_ts", "version", "completed_ts", "due_ts",
+        "remind_ts"
+    )
+
     def __init__(
         self,
         task_id: int,
@@ -16,7 +91,11 @@ class Task:
         description: str = "",
         priority: str = "medium",
         completed: bool = False,
-        created_at: Optional[str] = None
+        created_at: Union[str, int, None] = None,
+        version: int = 1,
+        completed_at: Union[str, int, None] = None,
+        due_at: Union[str, int, None] = None,
+        remind_at: Union[str, int, None] = None
     ):
         """
         Initialize a new Task instance.
@@ -27,14 +106,136 @@ class Task:
             description: Detailed description of the task
             priority: Priority level (low, medium, high)
             completed: Whether the task is completed
-            created_at: Timestamp when the task was created
+            created_at: Timestamp when the task was created, as epoch seconds
+                or a "YYYY-MM-DD HH:MM:SS" string
+            version: Number of the task's revision, bumped on every update
+            completed_at: When the task was completed, in the same forms as
+                created_at; None if it is not completed or the time is
+                unknown
+            due_at: When the task is due, in the same forms as created_at;
+                None if it has no due date
+            remind_at: When to remind about the task, in the same forms as
+                created_at; None for no reminder
+
+        Raises:
+            InvalidTaskDataException: If the priority is not a known level
         """
         self.id = task_id
         self.title = title
         self.description = description
         self.priority = priority
         self.completed = completed
-        self.created_at = created_at or datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        self.created_at = int(time.time()) if created_at is None else created_at
+        self.version = version
+        self.completed_at = completed_at
+        self.due_at = due_at
+        self.remind_at = remind_at
+
+    @property
+    def priority(self) -> str:
+        """Priority level (low, medium, high)."""
+        try:
+            return PRIORITY_LEVELS[self._priority]
+        except TypeError:
+            # A priority outside PRIORITY_LEVELS, kept as stored (see stored_priority)
+            return self._priority
+
+    @priority.setter
+    def priority(self, value: str) -> None:
+        code = PRIORITY_CODES.get(value.lower())
+        if code is None:
+            raise InvalidTaskDataException(
+                f"Invalid priority '{value}'. Expected one of: {', '.join(PRIORITY_LEVELS)}"
+            )
+        self._priority = code
+
+    @property
+    def created_at(self) -> str:
+        """Creation time formatted for display."""
+        return format_timestamp(self.created_ts)
+
+    @created_at.setter
+    def created_at(self, value: Union[str, int, datetime]) -> None:
+        self.created_ts = parse_timestamp(value)
+
+    @property
+    def completed_at(self) -> Optional[str]:
+        """Completion time formatted for display, or None if not known."""
+        return None if self.completed_ts is None else format_timestamp(self.completed_ts)
+
+    @completed_at.setter
+    def completed_at(self, value: Union[str, int, datetime, None]) -> None:
+        self.completed_ts = None if value is None else parse_timestamp(value)
+
+    @property
+    def due_at(self) -> Optional[str]:
+        """Due date formatted for display, or None if there is none."""
+        return None if self.due_ts is None else format_timestamp(self.due_ts)
+
+    @due_at.setter
+    def due_at(self, value: Union[str, int, datetime, None]) -> None:
+        self.due_ts = None if value is None else parse_timestamp(value)
+
+    @property
+    def remind_at(self) -> Optional[str]:
+        """Reminder time formatted for display, or None if there is none."""
+        return None if self.remind_ts is None else format_timestamp(self.remind_ts)
+
+    @remind_at.setter
+    def remind_at(self, value: Union[str, int, datetime, None]) -> None:
+        self.remind_ts = None if value is None else parse_timestamp(value)
+
+    def is_overdue(self, now: Optional[float] = None) -> bool:
+        """
+        Check whether the task is active and past its due date.
+
+        Args:
+            now: Current time as epoch seconds (defaults to the clock)
+
+        Returns:
+            True if the task is overdue
+        """
+        if self.completed or self.due_ts is None:
+            return False
+        return self.due_ts < (time.time() if now is None else now)
+
+    def set_completed(self, completed: bool) -> None:
+        """
+        Mark the task completed (as of now) or active again.
+
+        Args:
+            completed: Whether the task is completed
+        """
+        if completed and not self.completed:
+            self.completed_ts = int(time.time())
+        elif not completed:
+            self.completed_ts = None
+        self.completed = completed
+
+    def apply_changes(self, changes: Mapping[str, Any]) -> None:
+        """
+        Update fields as given to TaskService.update_task, all or none.
+
+        The changes are applied to a copy first, so an invalid value leaves
+        the task exactly as it was.
+
+        Args:
+            changes: New values for title, description, priority, completed,
+                due_at or remind_at (None clears the last two); other keys
+                are ignored
+
+        Raises:
+            InvalidTaskDataException: If the priority is not a known level
+            ValueError: If a time cannot be parsed
+        """
+        updated = self.copy()
+        for field in ("title", "description", "priority", "due_at", "remind_at"):
+            if field in changes:
+                setattr(updated, field, changes[field])
+        if "completed" in changes:
+            updated.set_completed(changes["completed"])
+        for name in self.__slots__:
+            setattr(self, name, getattr(updated, name))
 
     def to_dict(self) -> Dict[str, Any]:
         """
@@ -49,13 +250,19 @@ class Task:
             "description": self.description,
             "priority": self.priority,
             "completed": self.completed,
-            "created_at": self.created_at
+            "created_at": self.created_at,
+            "version": self.version,
+            "completed_at": self.completed_at,
+            "due_at": self.due_at,
+            "remind_at": self.remind_at
         }
 
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'Task':
         """
-        Create a Task instance from a dictionary.
+        Create a Task instance from a dictionary, as stored.
+
+        The priority is not validated, see stored_priority.
 
         Args:
             data: Dictionary containing task data
@@ -63,13 +270,84 @@ class Task:
         Returns:
             A new Task instance
         """
-        return cls(
+        task = cls(
             task_id=data["id"],
             title=data["title"],
             description=data.get("description", ""),
-            priority=data.get("priority", "medium"),
             completed=data.get("completed", False),
-            created_at=data.get("created_at")
+            created_at=data.get("created_at"),
+            version=data.get("version", 1),
+            completed_at=data.get("completed_at"),
+            due_at=data.get("due_at"),
+            remind_at=data.get("remind_at")
+        )
+        task._priority = stored_priority(data.get("priority", "medium"))
+        return task
+
+    @classmethod
+    def from_stored(
+        cls,
+        task_id: int,
+        title: str,
+        description: str,
+        priority_code: int,
+        completed: bool,
+        created_ts: int,
+        version: int,
+        completed_ts: Optional[int] = None,
+        due_ts: Optional[int] = None,
+        remind_ts: Optional[int] = None
+    ) -> 'Task':
+        """
+        Create a Task from already-validated stored fields, skipping parsing.
+
+        Args:
+            task_id: Unique identifier for the task
+            title: Title of the task
+            description: Detailed description of the task
+            priority_code: Index of the priority in PRIORITY_LEVELS, or
+                the text of a priority outside them (see stored_priority)
+            completed: Whether the task is completed
+            created_ts: Creation time as epoch seconds
+            version: Number of the task's revision
+            completed_ts: Completion time as epoch seconds, or None
+            due_ts: Due date as epoch seconds, or None
+            remind_ts: Reminder time as epoch seconds, or None
+
+        Returns:
+            A new Task instance
+        """
+        task = cls.__new__(cls)
+        task.id = task_id
+        task.title = title
+        task.description = description
+        task._priority = priority_code
+        task.completed = completed
+        task.created_ts = created_ts
+        task.version = version
+        task.completed_ts = completed_ts
+        task.due_ts = due_ts
+        task.remind_ts = remind_ts
+        return task
+
+    def copy(self) -> 'Task':
+        """
+        Copy the task, so later changes to either object do not affect the other.
+
+        Returns:
+            A new Task instance with the same fields
+        """
+        return Task.from_stored(
+            self.id,
+            self.title,
+            self.description,
+            self._priority,
+            self.completed,
+            self.created_ts,
+            self.version,
+            self.completed_ts,
+            self.due_ts,
+            self.remind_ts
         )
 
     def __str__(self) -> str:
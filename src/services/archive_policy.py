@@ -0,0 +1,70 @@
+"""
+Archival policy: which completed tasks leave the store for its archive.
+"""
+
+import time
+from typing import Iterable, List, NamedTuple, Optional
+
+from src.models.task import Task
+
+SECONDS_PER_DAY = 86400
+
+
+class ArchivePolicy(NamedTuple):
+    """When completed tasks are moved to the archive; unset limits do not apply."""
+
+    # Archive tasks completed more than this many days ago
+    completed_days: Optional[float] = None
+    # Archive the longest-completed tasks while the store holds more than
+    # this many; active tasks are never archived, so it may stay above
+    max_hot_tasks: Optional[int] = None
+
+    def validate(self) -> 'ArchivePolicy':
+        """
+        Check the limits.
+
+        Returns:
+            This policy
+
+        Raises:
+            ValueError: If a limit is negative
+        """
+        if self.completed_days is not None and self.completed_days < 0:
+            raise ValueError("completed_days must not be negative")
+        if self.max_hot_tasks is not None and self.max_hot_tasks < 0:
+            raise ValueError("max_hot_tasks must not be negative")
+        return self
+
+
+def completion_time(task: Task) -> int:
+    """Completion time of a completed task, falling back to its creation time when unknown."""
+    return task.created_ts if task.completed_ts is None else task.completed_ts
+
+
+def select_archivable(
+    completed: Iterable[Task],
+    stored: int,
+    policy: ArchivePolicy,
+    now: Optional[float] = None
+) -> List[Task]:
+    """
+    Pick the tasks a policy moves to the archive.
+
+    Args:
+        completed: Every completed task in the store
+        stored: Number of tasks in the store, completed or not
+        policy: Limits to apply
+        now: Current time as epoch seconds (defaults to the clock)
+
+    Returns:
+        The tasks to archive, longest-completed first
+    """
+    completed = sorted(completed, key=completion_time)
+    count = 0
+    if policy.completed_days is not None:
+        cutoff = (time.time() if now is None else now) - policy.completed_days * SECONDS_PER_DAY
+        while count < len(completed) and completion_time(completed[count]) < cutoff:
+            count += 1
+    if policy.max_hot_tasks is not None:
+        count = max(count, min(len(completed), stored - policy.max_hot_tasks))
+    return completed[:count]
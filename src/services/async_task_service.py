@@ -0,0 +1,135 @@
+"""
+Asyncio front end for TaskService.
+"""
+
+import asyncio
+import functools
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, List, Optional
+
+from src.services.change_feed import DEFAULT_WATCH_INTERVAL, Change
+from src.services.task_service import TaskService
+from src.services.shared_task_service import READ_METHODS, WRITE_METHODS
+
+# Mutations made within this many seconds of the first unwritten one share one write
+DEFAULT_FLUSH_DELAY = 0.05
+
+
+class AsyncTaskService:
+    """
+    Coroutine versions of the TaskService read and write methods.
+
+    Every call runs on a single background thread, so the event loop never
+    waits on file I/O and calls are applied in the order they were made.
+    Mutations only change the in-memory store; a background writer persists
+    them flush_delay seconds after the first unwritten one, turning a burst
+    of changes into a single write. Await flush() for durability; if a
+    background write fails, the next mutation raises its error.
+    """
+
+    def __init__(
+        self,
+        storage_file: str = "tasks.json",
+        storage_mode: Optional[str] = None,
+        flush_delay: float = DEFAULT_FLUSH_DELAY
+    ):
+        """
+        Initialize the service. The store is loaded by the first call.
+
+        Args:
+            storage_file: Path to the task storage file
+            storage_mode: Storage backend, see TaskService
+            flush_delay: Seconds the background writer waits for further
+                mutations before persisting; bounds how long a change stays
+                unwritten
+        """
+        self.service = TaskService(storage_file, storage_mode, lazy_load=True, autosave=False)
+        self.flush_delay = flush_delay
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="async-task-service")
+        self._writer: Optional[asyncio.Task] = None
+        self._write_error: Optional[Exception] = None
+
+    def __getattr__(self, name: str) -> Any:
+        if name in READ_METHODS:
+            return functools.partial(self._run, getattr(self.service, name))
+        if name in WRITE_METHODS:
+            return functools.partial(self._mutate, getattr(self.service, name))
+        raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
+
+    async def __aenter__(self) -> 'AsyncTaskService':
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    async def flush(self) -> None:
+        """Persist every mutation made so far; returns once they are written."""
+        # The executor runs calls in order, so this follows every prior mutation
+        await self._run(self.service.flush)
+        # Unwritten changes stay pending after a failed write, so this retried it
+        self._write_error = None
+
+    async def watch(
+        self,
+        revision: int,
+        timeout: Optional[float] = None,
+        poll_interval: float = DEFAULT_WATCH_INTERVAL
+    ) -> List[Change]:
+        """
+        Wait until there are changes after a revision, and return them.
+
+        See TaskService.watch. The wait happens on the event loop between
+        checks, so the background thread stays free for other calls;
+        changes made through this service are also found by those checks.
+
+        Args:
+            revision: Revision the caller's copy is at
+            timeout: Most seconds to wait, or None to wait for a change
+            poll_interval: Seconds between checks
+
+        Returns:
+            The changes, as from changes_since(); empty on timeout
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            await self._run(self.service.reload_if_changed)
+            changes = await self._run(self.service.changes_since, revision)
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if changes or (remaining is not None and remaining <= 0):
+                return changes
+            await asyncio.sleep(poll_interval if remaining is None else min(poll_interval, remaining))
+
+    async def close(self) -> None:
+        """Flush pending changes and release storage resources."""
+        if self._writer is not None:
+            self._writer.cancel()
+            self._writer = None
+        await self._run(self.service.close)
+        self._executor.shutdown()
+
+    async def _run(self, method: Callable, *args, **kwargs) -> Any:
+        """Run a service method on the background thread."""
+        # get_running_loop is Python 3.7+; inside a coroutine both return the running loop
+        loop = getattr(asyncio, "get_running_loop", asyncio.get_event_loop)()
+        return await loop.run_in_executor(self._executor, functools.partial(method, *args, **kwargs))
+
+    async def _mutate(self, method: Callable, *args, **kwargs) -> Any:
+        """Run a service mutation and make sure a write is scheduled."""
+        if self._write_error is not None:
+            error, self._write_error = self._write_error, None
+            raise error
+        result = await self._run(method, *args, **kwargs)
+        if self._writer is None:
+            self._writer = asyncio.ensure_future(self._flush_later())
+        return result
+
+    async def _flush_later(self) -> None:
+        await asyncio.sleep(self.flush_delay)
+        # Not cancelled past this point: the flush is queued on the executor
+        self._writer = None
+        try:
+            await self.flush()
+        except Exception as error:
+            # Nobody awaits this task, so hand the error to the next mutation
+            self._write_error = error
@@ -0,0 +1,182 @@
+"""
+Change feed: numbered records of the changes made to a task store.
+
+Every change a service makes, or picks up from another process when it
+reloads, gets the next revision number. A client holding a copy of the
+tasks at some revision can bring it up to date by applying the changes
+after that revision instead of reading every task again.
+"""
+
+import threading
+import time
+from collections import deque
+from itertools import islice
+from typing import Callable, Deque, Dict, Iterable, List, NamedTuple, Optional
+
+from src.models.task import Task
+
+CHANGE_OPS = ("add", "update", "delete", "reset")
+# Changes kept for clients to catch up with; clients further behind get a reset
+DEFAULT_CHANGE_LOG_SIZE = 10000
+# Seconds between checks of the store files for other processes' changes
+DEFAULT_WATCH_INTERVAL = 0.5
+
+
+class Change(NamedTuple):
+    """One entry of a change feed."""
+
+    revision: int
+    # One of CHANGE_OPS; "reset" means the client must drop every task it
+    # holds, and is followed by an "add" for every current task
+    op: str
+    task_id: Optional[int]
+    # Copy of the task after the change, or as it was when deleted; None for "reset"
+    task: Optional[Task]
+
+
+class ChangeLog:
+    """
+    Bounded, thread-safe log of the most recent changes to a store.
+
+    The services sharing a log (e.g. the shards of a ShardedTaskService)
+    share one sequence of revisions.
+    """
+
+    def __init__(self, size: int = DEFAULT_CHANGE_LOG_SIZE):
+        """
+        Create an empty log at revision 0.
+
+        Args:
+            size: Most changes kept
+        """
+        self.revision = 0
+        # Revision before the oldest change kept; since() answers from here on
+        self._base = 0
+        self._changes: Deque[Change] = deque(maxlen=size)
+        self._condition = threading.Condition()
+
+    def append(self, op: str, task: Task) -> None:
+        """
+        Record a change under the next revision.
+
+        Args:
+            op: "add", "update" or "delete"
+            task: The task affected by the change
+        """
+        with self._condition:
+            if len(self._changes) == self._changes.maxlen:
+                self._base += 1
+            self.revision += 1
+            self._changes.append(Change(self.revision, op, task.id, task.copy()))
+            self._condition.notify_all()
+
+    def append_diff(self, old: Dict[int, Task], new: Dict[int, Task]) -> None:
+        """
+        Record the changes that turn one set of tasks into another.
+
+        Tasks are compared by version, which goes up with every change, so
+        this finds what another process changed without comparing fields.
+
+        Args:
+            old: Tasks by id before a reload
+            new: Tasks by id after it
+        """
+        for task_id, task in new.items():
+            previous = old.get(task_id)
+            if previous is None:
+                self.append("add", task)
+            elif previous.version != task.version:
+                self.append("update", task)
+        for task_id, task in old.items():
+            if task_id not in new:
+                self.append("delete", task)
+
+    def restart(self) -> None:
+        """Forget every change, so every client resyncs, under a new revision."""
+        with self._condition:
+            self.revision += 1
+            self._base = self.revision
+            self._changes.clear()
+            self._condition.notify_all()
+
+    def since(self, revision: int) -> Optional[List[Change]]:
+        """
+        Get the changes made after a revision.
+
+        Args:
+            revision: Revision the caller is at
+
+        Returns:
+            The changes in revision order, or None if the log no longer
+            holds all of them (or never did)
+        """
+        with self._condition:
+            if not self._base <= revision <= self.revision:
+                return None
+            return list(islice(self._changes, revision - self._base, None))
+
+    def wait(self, revision: int, timeout: Optional[float] = None) -> bool:
+        """
+        Block until the log moves past a revision.
+
+        Args:
+            revision: Revision the caller is at
+            timeout: Most seconds to wait, or None to wait indefinitely
+
+        Returns:
+            True if the revision changed, False on timeout
+        """
+        with self._condition:
+            return self._condition.wait_for(lambda: self.revision != revision, timeout)
+
+
+def reset_changes(revision: int, tasks: Iterable[Task]) -> List[Change]:
+    """
+    Build the changes that replace a client's tasks with the current ones.
+
+    Args:
+        revision: Current revision
+        tasks: Every current task
+
+    Returns:
+        A "reset" followed by an "add" per task, all at the revision
+    """
+    changes = [Change(revision, "reset", None, None)]
+    changes.extend(Change(revision, "add", task.id, task.copy()) for task in tasks)
+    return changes
+
+
+def watch_changes(
+    refresh: Callable[[], object],
+    changes_since: Callable[[int], List[Change]],
+    log: ChangeLog,
+    revision: int,
+    timeout: Optional[float],
+    poll_interval: float
+) -> List[Change]:
+    """
+    Wait for changes after a revision, from this process or another one.
+
+    Changes made in this process wake the caller at once; other processes'
+    changes are noticed by refresh, which stats the store files every
+    poll_interval seconds.
+
+    Args:
+        refresh: Reloads the store if another process changed it
+        changes_since: The service's changes_since
+        log: The service's change log
+        revision: Revision the caller is at
+        timeout: Most seconds to wait, or None to wait until a change
+        poll_interval: Seconds between refreshes
+
+    Returns:
+        The changes after the revision; empty on timeout
+    """
+    deadline = None if timeout is None else time.monotonic() + timeout
+    while True:
+        refresh()
+        changes = changes_since(revision)
+        remaining = None if deadline is None else deadline - time.monotonic()
+        if changes or (remaining is not None and remaining <= 0):
+            return changes
+        log.wait(revision, poll_interval if remaining is None else min(poll_interval, remaining))
@@ -0,0 +1,244 @@
+"""
+Time-ordered indexes over the due dates and reminders of active tasks.
+"""
+
+import math
+from bisect import bisect_left, bisect_right, insort
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from src.models.task import Task
+
+# Target length of a SortedPairs bucket; buckets are split at twice this
+BUCKET_SIZE = 1000
+
+
+class SortedPairs:
+    """
+    Sorted (time, task_id) pairs, kept in buckets of bounded length.
+
+    Inserting into or deleting from one flat sorted list moves every later
+    item; with buckets a change only moves the items of one bucket, so it
+    costs O(log n + BUCKET_SIZE) however many pairs there are.
+    """
+
+    def __init__(self, pairs: Iterable[Tuple[int, int]] = ()):
+        """
+        Initialize the list.
+
+        Args:
+            pairs: Initial pairs, in any order
+        """
+        ordered = sorted(pairs)
+        self._buckets: List[List[Tuple[int, int]]] = [
+            ordered[start:start + BUCKET_SIZE] for start in range(0, len(ordered), BUCKET_SIZE)
+        ]
+        # Last (largest) pair of each bucket, to find a pair's bucket by bisection
+        self._maxes: List[Tuple[int, int]] = [bucket[-1] for bucket in self._buckets]
+        self._len = len(ordered)
+
+    def __len__(self) -> int:
+        return self._len
+
+    def add(self, pair: Tuple[int, int]) -> None:
+        """
+        Insert a pair.
+
+        Args:
+            pair: (time, task_id) pair
+        """
+        self._len += 1
+        if not self._buckets:
+            self._buckets.append([pair])
+            self._maxes.append(pair)
+            return
+        position = min(bisect_left(self._maxes, pair), len(self._maxes) - 1)
+        bucket = self._buckets[position]
+        insort(bucket, pair)
+        self._maxes[position] = bucket[-1]
+        if len(bucket) > 2 * BUCKET_SIZE:
+            self._buckets[position:position + 1] = [bucket[:BUCKET_SIZE], bucket[BUCKET_SIZE:]]
+            self._maxes[position:position + 1] = [bucket[BUCKET_SIZE - 1], bucket[-1]]
+
+    def remove(self, pair: Tuple[int, int]) -> None:
+        """
+        Delete a pair that is in the list.
+
+        Args:
+            pair: (time, task_id) pair
+        """
+        self._len -= 1
+        position = bisect_left(self._maxes, pair)
+        bucket = self._buckets[position]
+        del bucket[bisect_left(bucket, pair)]
+        if bucket:
+            self._maxes[position] = bucket[-1]
+        else:
+            del self._buckets[position]
+            del self._maxes[position]
+
+    def iter_after(self, bound: Tuple, inclusive: bool = True) -> Iterator[Tuple[int, int]]:
+        """
+        Iterate in order over the pairs from a bound on.
+
+        Args:
+            bound: Tuple compared with the pairs
+            inclusive: Whether pairs equal to the bound are included
+
+        Yields:
+            (time, task_id) pairs, smallest first
+        """
+        search = bisect_left if inclusive else bisect_right
+        position = search(self._maxes, bound)
+        if position == len(self._buckets):
+            return
+        bucket = self._buckets[position]
+        yield from bucket[search(bucket, bound):]
+        for bucket in self._buckets[position + 1:]:
+            yield from bucket
+
+
+class DueIndex:
+    """Sorted (time, task_id) indexes on due_at and remind_at of active tasks."""
+
+    def __init__(self):
+        """Initialize empty indexes."""
+        # (due_ts, task_id) and (remind_ts, task_id) pairs; completed tasks
+        # and tasks without the time are left out
+        self._by_due = SortedPairs()
+        self._by_remind = SortedPairs()
+        # task_id -> (due_ts, remind_ts) as currently indexed
+        self._keys: Dict[int, Tuple[Optional[int], Optional[int]]] = {}
+
+    @classmethod
+    def from_tasks(cls, tasks: Iterable[Task]) -> 'DueIndex':
+        """
+        Index many tasks at once, sorting once instead of inserting each in order.
+
+        Args:
+            tasks: Tasks to index
+
+        Returns:
+            The new index
+        """
+        index = cls()
+        for task in tasks:
+            if not task.completed and (task.due_ts is not None or task.remind_ts is not None):
+                index._keys[task.id] = (task.due_ts, task.remind_ts)
+        index._by_due = SortedPairs(
+            (due_ts, task_id) for task_id, (due_ts, _) in index._keys.items() if due_ts is not None
+        )
+        index._by_remind = SortedPairs(
+            (remind_ts, task_id) for task_id, (_, remind_ts) in index._keys.items() if remind_ts is not None
+        )
+        return index
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    @staticmethod
+    def _key(task: Task) -> Tuple[Optional[int], Optional[int]]:
+        """Times a task is indexed under; none once it is completed."""
+        if task.completed:
+            return None, None
+        return task.due_ts, task.remind_ts
+
+    def add(self, task: Task) -> None:
+        """
+        Index a task.
+
+        Args:
+            task: Task to index
+        """
+        # Checked inline: most tasks have no due date
+        if task.completed:
+            return
+        due_ts, remind_ts = task.due_ts, task.remind_ts
+        if due_ts is None and remind_ts is None:
+            return
+        if due_ts is not None:
+            self._by_due.add((due_ts, task.id))
+        if remind_ts is not None:
+            self._by_remind.add((remind_ts, task.id))
+        self._keys[task.id] = (due_ts, remind_ts)
+
+    def remove(self, task_id: int) -> None:
+        """
+        Remove a task from the indexes.
+
+        Args:
+            task_id: ID of the task to remove
+        """
+        key = self._keys.pop(task_id, None)
+        if key is None:
+            return
+        due_ts, remind_ts = key
+        if due_ts is not None:
+            self._by_due.remove((due_ts, task_id))
+        if remind_ts is not None:
+            self._by_remind.remove((remind_ts, task_id))
+
+    def update(self, task: Task) -> None:
+        """
+        Re-index a task whose due date, reminder or status may have changed.
+
+        Args:
+            task: Task to re-index
+        """
+        if self._keys.get(task.id, (None, None)) != self._key(task):
+            self.remove(task.id)
+            self.add(task)
+
+    def due_ids(self, before: Optional[int] = None, limit: Optional[int] = None) -> List[int]:
+        """
+        Get the ids of tasks by due date, earliest first.
+
+        Args:
+            before: Only tasks due strictly before this time (epoch seconds)
+            limit: Most ids to return, or None for all
+
+        Returns:
+            List of task ids
+        """
+        ids: List[int] = []
+        if limit == 0:
+            return ids
+        for due_ts, task_id in self._by_due.iter_after((-math.inf,)):
+            if before is not None and due_ts >= before:
+                break
+            ids.append(task_id)
+            if len(ids) == limit:
+                break
+        return ids
+
+    def reminder_ids(self, after: int, until: int) -> List[int]:
+        """
+        Get the ids of tasks with a reminder in a time range, earliest first.
+
+        Args:
+            after: Exclusive lower bound in epoch seconds
+            until: Inclusive upper bound in epoch seconds
+
+        Returns:
+            List of task ids
+        """
+        ids: List[int] = []
+        # (t, inf) sorts after every (t, task_id) pair
+        for remind_ts, task_id in self._by_remind.iter_after((after, math.inf), inclusive=False):
+            if remind_ts > until:
+                break
+            ids.append(task_id)
+        return ids
+
+    def next_reminder(self, after: int) -> Optional[int]:
+        """
+        Get the time of the first reminder after a time.
+
+        Args:
+            after: Exclusive lower bound in epoch seconds
+
+        Returns:
+            The reminder time in epoch seconds, or None if there is none
+        """
+        for remind_ts, _ in self._by_remind.iter_after((after, math.inf), inclusive=False):
+            return remind_ts
+        return None
@@ -0,0 +1,132 @@
+"""
+Secondary indexes over task status, priority and creation time.
+"""
+
+import math
+from bisect import bisect_left, bisect_right, insort
+from typing import List, Dict, Set, Tuple, Optional, Iterable
+
+from src.models.task import Task
+
+
+class FilterIndex:
+    """Set indexes on completed/priority and a sorted index on created_at."""
+
+    def __init__(self):
+        """Initialize empty indexes."""
+        self._by_completed: Dict[bool, Set[int]] = {True: set(), False: set()}
+        self._by_priority: Dict[str, Set[int]] = {}
+        # Sorted (created_ts, task_id) pairs for range scans
+        self._by_created: List[Tuple[int, int]] = []
+        # task_id -> (completed, priority, created_ts) as currently indexed
+        self._keys: Dict[int, Tuple[bool, str, int]] = {}
+
+    def add(self, task: Task) -> None:
+        """
+        Index a task.
+
+        Args:
+            task: Task to index
+        """
+        completed, priority, created_ts = bool(task.completed), task.priority, task.created_ts
+        self._by_completed[completed].add(task.id)
+        self._by_priority.setdefault(priority, set()).add(task.id)
+        insort(self._by_created, (created_ts, task.id))
+        self._keys[task.id] = (completed, priority, created_ts)
+
+    def remove(self, task_id: int) -> None:
+        """
+        Remove a task from the indexes.
+
+        Args:
+            task_id: ID of the task to remove
+        """
+        keys = self._keys.pop(task_id, None)
+        if keys is None:
+            return
+        completed, priority, created_ts = keys
+        self._by_completed[completed].discard(task_id)
+        self._by_priority[priority].discard(task_id)
+        position = bisect_left(self._by_created, (created_ts, task_id))
+        del self._by_created[position]
+
+    def update(self, task: Task) -> None:
+        """
+        Re-index a task whose indexed fields may have changed.
+
+        Args:
+            task: Task to re-index
+        """
+        old = self._keys.get(task.id)
+        if old is None:
+            self.add(task)
+            return
+        new = (bool(task.completed), task.priority, task.created_ts)
+        if new == old:
+            return
+        # Only move the entries that changed; the sorted index is the costly one
+        if new[0] != old[0]:
+            self._by_completed[old[0]].discard(task.id)
+            self._by_completed[new[0]].add(task.id)
+        if new[1] != old[1]:
+            self._by_priority[old[1]].discard(task.id)
+            self._by_priority.setdefault(new[1], set()).add(task.id)
+        if new[2] != old[2]:
+            del self._by_created[bisect_left(self._by_created, (old[2], task.id))]
+            insort(self._by_created, (new[2], task.id))
+        self._keys[task.id] = new
+
+    def ids_with_completed(self, completed: bool) -> Set[int]:
+        """
+        Get the ids of tasks with the given completion status.
+
+        Args:
+            completed: Completion status to match
+
+        Returns:
+            Set of task ids (owned by the index; do not mutate)
+        """
+        return self._by_completed[bool(completed)]
+
+    def ids_with_priority(self, priorities: Iterable[str]) -> Set[int]:
+        """
+        Get the ids of tasks with any of the given priorities.
+
+        Args:
+            priorities: Priority levels to match
+
+        Returns:
+            Set of task ids (may be owned by the index; do not mutate)
+        """
+        sets = [self._by_priority.get(priority, set()) for priority in priorities]
+        if len(sets) == 1:
+            return sets[0]
+        return set().union(*sets)
+
+    def ids_created_between(self, start: Optional[int], end: Optional[int]) -> List[int]:
+        """
+        Get the ids of tasks created within a time range, oldest first.
+
+        Args:
+            start: Inclusive lower bound in epoch seconds, or None
+            end: Inclusive upper bound in epoch seconds, or None
+
+        Returns:
+            List of task ids ordered by creation time
+        """
+        low = 0 if start is None else bisect_left(self._by_created, (start,))
+        # (end, inf) sorts after every (end, task_id) pair, keeping the bound inclusive
+        high = len(self._by_created) if end is None else bisect_right(self._by_created, (end, math.inf))
+        return [task_id for _, task_id in self._by_created[low:high]]
+
+    def created_key(self, task_id: int) -> int:
+        """
+        Get the indexed creation time of a task.
+
+        Args:
+            task_id: ID of an indexed task
+
+        Returns:
+            The task's creation time in epoch seconds
+        """
+        return self._keys[task_id][2]
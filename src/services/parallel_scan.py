@@ -0,0 +1,179 @@
+"""
+Parallel substring scans over a memory-mapped columnar snapshot.
+
+Worker processes never receive tasks: the parent writes the tasks once as a
+columnar snapshot (in shared memory where available), every worker maps
+that file, and a query only sends each worker a keyword and a range of rows
+and gets back the matching row numbers.
+
+Writing the snapshot costs more than one serial scan, so after the tasks
+change it is only rewritten once they stay unchanged from one search to the
+next; until then searches are left to the caller's serial scan.
+"""
+
+import multiprocessing
+import os
+import shutil
+import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from src.models.task import Task
+from src.storage.columnar_store import ColumnarSnapshot, ColumnarTaskStore, encode_columns
+from src.storage.json_store import file_signature, write_file_atomic
+
+# Ranges per worker; smaller ranges balance uneven matches and let scans
+# with a limit stop early
+CHUNKS_PER_WORKER = 4
+# tmpfs mount used for the snapshot where it exists, so it stays in memory
+SHARED_MEMORY_DIR = "/dev/shm"
+
+# Snapshots mapped by this worker process: path -> snapshot
+_snapshots: Dict[str, ColumnarSnapshot] = {}
+
+
+def scan_range(path: str, signature: Tuple, start: int, end: int, keyword: str) -> Optional[List[int]]:
+    """
+    Find the rows of a snapshot whose title or description contains a keyword.
+
+    Runs in the worker processes. Snapshots stay mapped between calls and
+    are remapped when the file at path is replaced.
+
+    Args:
+        path: Snapshot file
+        signature: file_signature of the snapshot the rows refer to
+        start: First row to scan
+        end: Row after the last one to scan
+        keyword: Lowercase text to look for
+
+    Returns:
+        Ascending matching rows, or None if the file at path is no longer
+        the expected snapshot
+    """
+    snapshot = _snapshots.get(path)
+    if snapshot is None or snapshot.signature != signature:
+        if snapshot is not None:
+            snapshot.close()
+        snapshot = _snapshots[path] = ColumnarSnapshot(path)
+        if snapshot.signature != signature:
+            return None
+    return snapshot.find_substring(keyword, start, end)
+
+
+class ParallelScanner:
+    """Runs substring scans of a task list on a pool of worker processes."""
+
+    def __init__(self, workers: Optional[int] = None):
+        """
+        Initialize the scanner; the pool is started by the first scan.
+
+        Args:
+            workers: Number of worker processes (defaults to one per CPU)
+        """
+        self.workers = workers or os.cpu_count() or 1
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._directory: Optional[str] = None
+        self._path: Optional[str] = None
+        self._signature: Optional[Tuple] = None
+        self._generation: Any = None
+        # Generation of the last prepare() call that left the snapshot stale
+        self._requested: Any = None
+        self._tasks: List[Task] = []
+
+    def prepare(self, tasks: Iterable[Task], generation: Any, store: Any = None) -> bool:
+        """
+        Make the scanned snapshot match the given tasks, if that is worth it.
+
+        Nothing is done if the snapshot is already at this generation. A
+        new snapshot is only written when the previous call was for the same
+        generation, so a store changed between every search never pays for
+        snapshots it would use only once.
+
+        Args:
+            tasks: Every task, in the order results should keep
+            generation: Value that changes whenever the tasks change
+            store: The service's store, if it holds exactly these tasks in
+                this order; a columnar store's file is then scanned in place
+                instead of writing a snapshot
+
+        Returns:
+            Whether the snapshot matches the tasks; if not, the caller
+            should scan serially
+        """
+        if generation == self._generation:
+            return True
+        signature = file_signature(store.path) if isinstance(store, ColumnarTaskStore) else None
+        if signature is None and generation != self._requested:
+            self._requested = generation
+            return False
+        self._tasks = list(tasks)
+        if signature is not None:
+            self._path = store.path
+        else:
+            if self._directory is None:
+                shared = SHARED_MEMORY_DIR if os.path.isdir(SHARED_MEMORY_DIR) else None
+                self._directory = tempfile.mkdtemp(prefix="task-scan-", dir=shared)
+            self._path = os.path.join(self._directory, "snapshot.tcol")
+            write_file_atomic(self._path, encode_columns(self._tasks, 0), fsync=False)
+            signature = file_signature(self._path)
+        self._signature = signature
+        self._generation = generation
+        return True
+
+    def search(self, keyword: str, end: Optional[int] = None) -> Optional[List[Task]]:
+        """
+        Find tasks whose title or description contains a keyword, ignoring case.
+
+        Args:
+            keyword: Text to look for
+            end: Stop once this many matches are found, or None for all
+
+        Returns:
+            Matching tasks in the order given to prepare(), or None if the
+            snapshot changed under the scan (prepare() must be called again)
+        """
+        if self._pool is None:
+            # Not forked: the parent runs other threads (e.g. the flusher),
+            # whose locks a forked child could inherit in a held state.
+            # Python 3.6 has no mp_context and always forks
+            if sys.version_info >= (3, 7):
+                methods = multiprocessing.get_all_start_methods()
+                context = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+                self._pool = ProcessPoolExecutor(self.workers, mp_context=context)
+            else:
+                self._pool = ProcessPoolExecutor(self.workers)
+        keyword = keyword.lower()
+        count = len(self._tasks)
+        chunk = max(1, -(-count // (self.workers * CHUNKS_PER_WORKER)))
+        futures = [
+            self._pool.submit(scan_range, self._path, self._signature, start, min(start + chunk, count), keyword)
+            for start in range(0, count, chunk)
+        ]
+        results = []
+        try:
+            # Collected in submission order, which keeps the tasks' order
+            for future in futures:
+                rows = future.result()
+                if rows is None:
+                    self._generation = None
+                    return None
+                results.extend(self._tasks[row] for row in rows)
+                if end is not None and len(results) >= end:
+                    break
+        finally:
+            for future in futures:
+                future.cancel()
+        return results
+
+    def close(self) -> None:
+        """Stop the worker processes and remove the snapshot."""
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+        if self._directory is not None:
+            shutil.rmtree(self._directory, ignore_errors=True)
+            self._directory = None
+        self._tasks = []
+        self._generation = None
+        self._requested = None
@@ -0,0 +1,146 @@
+"""
+Bounded LRU cache of query results.
+
+Each entry remembers the generation of the data it was computed from; a
+lookup made after that data changed finds the entry stale and drops it.
+Callers pick the generation per kind of query, so a change only invalidates
+the results that could depend on it (e.g. renaming a task leaves cached
+status filters valid).
+"""
+
+import sys
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+DEFAULT_QUERY_CACHE_SIZE = 256
+DEFAULT_QUERY_CACHE_BYTES = 32 * 1024 * 1024
+# Rough bytes taken by an entry besides its key and result: the
+# OrderedDict node and the entry tuple
+ENTRY_OVERHEAD = 200
+
+
+def result_size(value: Any) -> int:
+    """
+    Estimate the memory a cached result adds.
+
+    Results hold references to tasks that live in the store anyway, so only
+    the containers are counted.
+
+    Args:
+        value: A list of tasks, or a tuple of such lists and scalars
+
+    Returns:
+        Size in bytes
+    """
+    size = sys.getsizeof(value)
+    if isinstance(value, tuple):
+        size += sum(sys.getsizeof(item) for item in value)
+    return size
+
+
+class QueryCache:
+    """Thread-safe LRU map from normalized queries to results, capped by count and size."""
+
+    def __init__(self, max_entries: int = DEFAULT_QUERY_CACHE_SIZE, max_bytes: int = DEFAULT_QUERY_CACHE_BYTES):
+        """
+        Create an empty cache.
+
+        Args:
+            max_entries: Most results kept; 0 disables the cache
+            max_bytes: Most memory the kept results may take, as estimated
+                by result_size; larger results are never cached
+
+        Raises:
+            ValueError: If a limit is negative
+        """
+        if max_entries < 0 or max_bytes < 0:
+            raise ValueError("Query cache limits must not be negative")
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        # Entries found stale, or dropped by clear()
+        self.invalidations = 0
+        self.bytes = 0
+        # key -> (generation, result, size), least recently used first
+        self._entries: 'OrderedDict[Hashable, Tuple[Any, Any, int]]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable, generation: Any) -> Optional[Any]:
+        """
+        Look up a result.
+
+        Args:
+            key: Normalized query
+            generation: Current generation of the data the query reads
+
+        Returns:
+            The cached result, or None if there is none for this generation
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            if entry[0] != generation:
+                del self._entries[key]
+                self.bytes -= entry[2]
+                self.invalidations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: Hashable, generation: Any, result: Any) -> None:
+        """
+        Store a result, evicting the least recently used ones to make room.
+
+        Args:
+            key: Normalized query
+            generation: Generation of the data the result was computed from
+            result: Result to keep; must not be modified afterwards
+        """
+        size = result_size(result) + sys.getsizeof(key) + ENTRY_OVERHEAD
+        if not self.max_entries or size > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.bytes -= previous[2]
+            self._entries[key] = (generation, result, size)
+            self.bytes += size
+            while len(self._entries) > self.max_entries or self.bytes > self.max_bytes:
+                _, (_, _, evicted) = self._entries.popitem(last=False)
+                self.bytes -= evicted
+                self.evictions += 1
+
+    def clear(self) -> None:
+        """Drop every result."""
+        with self._lock:
+            self.invalidations += len(self._entries)
+            self._entries.clear()
+            self.bytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Report the cache counters.
+
+        Returns:
+            Dict with "entries", "bytes", "hits", "misses", "evictions"
+            and "invalidations"
+        """
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self.bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
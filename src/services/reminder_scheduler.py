@@ -0,0 +1,115 @@
+"""
+Reminder scheduler: calls back for each task whose reminder time arrives.
+
+The scheduler never scans the tasks. It asks the service's due index for
+the reminders in the time elapsed since its last check, then sleeps until
+the next reminder. Changes made in this process (e.g. a new, earlier
+reminder) wake it at once through the change log. Other processes' changes
+are picked up by refreshing every poll interval.
+"""
+
+import threading
+import time
+from typing import Callable, List, Optional
+
+from src.models.task import Task
+from src.services.change_feed import DEFAULT_WATCH_INTERVAL, ChangeLog
+
+
+class ReminderScheduler:
+    """Background thread firing reminder callbacks, see TaskService.schedule_reminders."""
+
+    def __init__(
+        self,
+        refresh: Callable[[], object],
+        reminders_between: Callable[[int, int], List[Task]],
+        next_reminder_time: Callable[[int], Optional[int]],
+        log: ChangeLog,
+        callback: Callable[[Task], object],
+        since: Optional[int] = None,
+        poll_interval: float = DEFAULT_WATCH_INTERVAL
+    ):
+        """
+        Prepare the scheduler; start() runs it.
+
+        Args:
+            refresh: Reloads the store if another process changed it
+            reminders_between: The service's reminders_between
+            next_reminder_time: The service's next_reminder_time
+            log: The service's change log, which wakes the scheduler on changes
+            callback: Called with each task as its reminder time arrives
+            since: Epoch seconds after which reminders fire; earlier ones
+                are considered handled (defaults to now)
+            poll_interval: Most seconds between refreshes
+
+        Raises:
+            ValueError: If poll_interval is not positive
+        """
+        if poll_interval <= 0:
+            raise ValueError("Poll interval must be positive")
+        self._refresh = refresh
+        self._reminders_between = reminders_between
+        self._next_reminder_time = next_reminder_time
+        self._log = log
+        self.callback = callback
+        self.poll_interval = poll_interval
+        # Reminders up to this time (epoch seconds) have fired
+        self.checked = int(time.time()) if since is None else since
+        self.fired = 0
+        # Callbacks that raised; the scheduler carries on with the next reminder
+        self.failures = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def run_pending(self, now: Optional[int] = None) -> int:
+        """
+        Fire the reminders that came due since the last check.
+
+        Args:
+            now: Current time as epoch seconds (defaults to the clock)
+
+        Returns:
+            Number of reminders fired
+        """
+        now = int(time.time()) if now is None else now
+        if now <= self.checked:
+            return 0
+        tasks = self._reminders_between(self.checked, now)
+        self.checked = now
+        for task in tasks:
+            try:
+                self.callback(task)
+            except Exception:
+                self.failures += 1
+        self.fired += len(tasks)
+        return len(tasks)
+
+    def start(self) -> 'ReminderScheduler':
+        """
+        Start firing reminders from a daemon thread.
+
+        Returns:
+            This scheduler
+        """
+        self._thread = threading.Thread(target=self._loop, name="reminder-scheduler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stop the thread; returns within about one poll interval."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _loop(self) -> None:
+        while not self._stop.is_set():
+            # Read first, so a change made while checking cuts the wait short
+            revision = self._log.revision
+            self._refresh()
+            self.run_pending()
+            next_time = self._next_reminder_time(self.checked)
+            timeout = self.poll_interval
+            if next_time is not None:
+                timeout = min(timeout, max(0.0, next_time - time.time()))
+            self._log.wait(revision, timeout)
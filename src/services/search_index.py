@@ -0,0 +1,179 @@
+"""
+Incremental inverted index for full-text task search.
+
+add, remove and update must not run concurrently with anything else, but
+any number of searches may run at once (e.g. under a readers-writer lock).
+"""
+
+import re
+import heapq
+import threading
+from bisect import bisect_left
+from typing import List, Dict, Set, Tuple
+
+from src.models.task import Task
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+# Title hits are a stronger signal than description hits
+TITLE_WEIGHT = 2
+DESCRIPTION_WEIGHT = 1
+# Whole-word hits rank above hits that only share a prefix with the query term
+EXACT_MATCH_BONUS = 2
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Split text into lowercase word tokens.
+
+    Args:
+        text: Text to tokenize
+
+    Returns:
+        List of tokens in order of appearance
+    """
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+class SearchIndex:
+    """Token index over task titles and descriptions, kept up to date incrementally."""
+
+    def __init__(self):
+        """Initialize an empty index."""
+        # token -> {task_id: weight}
+        self._postings: Dict[str, Dict[int, int]] = {}
+        # Sorted vocabulary so prefix lookups are a bisect plus a short scan
+        self._vocabulary: List[str] = []
+        # Tokens not merged into the vocabulary yet; sorting once per query
+        # instead of inserting one by one keeps bulk indexing linear
+        self._new_tokens: Set[str] = set()
+        # Held while a search merges _new_tokens, the one change searches make
+        self._merge_lock = threading.Lock()
+        # task_id -> tokens it was indexed under, needed to unindex it later
+        self._task_tokens: Dict[int, Set[str]] = {}
+
+    def __len__(self) -> int:
+        """Number of distinct tokens indexed."""
+        return len(self._postings)
+
+    def add(self, task: Task) -> None:
+        """
+        Index a task.
+
+        Args:
+            task: Task to index
+        """
+        weights: Dict[str, int] = {}
+        for token in tokenize(task.title):
+            weights[token] = weights.get(token, 0) + TITLE_WEIGHT
+        for token in tokenize(task.description):
+            weights[token] = weights.get(token, 0) + DESCRIPTION_WEIGHT
+
+        for token, weight in weights.items():
+            posting = self._postings.get(token)
+            if posting is None:
+                posting = self._postings[token] = {}
+                self._new_tokens.add(token)
+            posting[task.id] = weight
+        self._task_tokens[task.id] = set(weights)
+
+    def remove(self, task_id: int) -> None:
+        """
+        Remove a task from the index.
+
+        Args:
+            task_id: ID of the task to remove
+        """
+        for token in self._task_tokens.pop(task_id, ()):
+            posting = self._postings[token]
+            del posting[task_id]
+            if not posting:
+                del self._postings[token]
+                if token in self._new_tokens:
+                    self._new_tokens.discard(token)
+                else:
+                    del self._vocabulary[bisect_left(self._vocabulary, token)]
+
+    def update(self, task: Task) -> None:
+        """
+        Re-index a task after its text changed.
+
+        Args:
+            task: Task to re-index
+        """
+        self.remove(task.id)
+        self.add(task)
+
+    def search(self, query: str, limit: int = None, prefix: bool = True) -> List[Tuple[int, int]]:
+        """
+        Find tasks containing every term of the query.
+
+        Args:
+            query: Free-text query; all terms must match (AND semantics)
+            limit: Maximum number of results, or None for all
+            prefix: Whether a term also matches tokens it is a prefix of
+
+        Returns:
+            List of (task_id, score) pairs, best match first; equal scores
+            are ordered by task id
+        """
+        terms = set(tokenize(query))
+        if not terms:
+            return []
+
+        term_matches = []
+        for term in terms:
+            matches = self._match_term(term, prefix)
+            if not matches:
+                return []
+            term_matches.append(matches)
+
+        # Intersecting from the rarest term keeps the work bounded by the
+        # smallest posting set rather than the most common term.
+        term_matches.sort(key=len)
+        scores = dict(term_matches[0])
+        for matches in term_matches[1:]:
+            scores = {
+                task_id: score + matches[task_id]
+                for task_id, score in scores.items()
+                if task_id in matches
+            }
+            if not scores:
+                return []
+
+        ranked = ((-score, task_id) for task_id, score in scores.items())
+        if limit is None:
+            ordered = sorted(ranked)
+        else:
+            ordered = heapq.nsmallest(limit, ranked)
+        return [(task_id, -neg_score) for neg_score, task_id in ordered]
+
+    def _match_term(self, term: str, prefix: bool) -> Dict[int, int]:
+        """Collect task scores for every indexed token matching a query term."""
+        if not prefix:
+            posting = self._postings.get(term, {})
+            return {task_id: weight * EXACT_MATCH_BONUS for task_id, weight in posting.items()}
+
+        if self._new_tokens:
+            self._merge_new_tokens()
+
+        vocabulary = self._vocabulary
+        matches: Dict[int, int] = {}
+        position = bisect_left(vocabulary, term)
+        while position < len(vocabulary) and vocabulary[position].startswith(term):
+            token = vocabulary[position]
+            bonus = EXACT_MATCH_BONUS if token == term else 1
+            for task_id, weight in self._postings[token].items():
+                matches[task_id] = max(matches.get(task_id, 0), weight * bonus)
+            position += 1
+        return matches
+
+    def _merge_new_tokens(self) -> None:
+        """Sort pending tokens into the vocabulary, safely for concurrent searches."""
+        with self._merge_lock:
+            if not self._new_tokens:
+                return
+            # Swapped in whole, and before _new_tokens is emptied, so other
+            # searches see either the old lists or the complete new ones
+            self._vocabulary = sorted(self._vocabulary + list(self._new_tokens))
+            self._new_tokens = set()
@@ -0,0 +1,760 @@
+"""
+Task service spreading tasks over the stores of a shard map.
+"""
+
+import heapq
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack, contextmanager
+from itertools import islice
+from typing import List, Dict, Any, Optional, Tuple, Union, Iterable, Iterator, Mapping, Callable, Sequence, TypeVar
+
+from src.models.task import Task, parse_timestamp
+from src.services.archive_policy import ArchivePolicy
+from src.services.change_feed import DEFAULT_WATCH_INTERVAL, Change, ChangeLog, reset_changes, watch_changes
+from src.services.query_cache import DEFAULT_QUERY_CACHE_BYTES, DEFAULT_QUERY_CACHE_SIZE
+from src.services.reminder_scheduler import ReminderScheduler
+from src.services.search_index import tokenize
+from src.services.task_service import (
+    TaskService,
+    TaskPage,
+    SEARCH_MODES,
+    DEFAULT_PAGE_SIZE,
+    TimeBound,
+    build_page,
+    page_key,
+    parse_order_by,
+)
+from src.storage.factory import SNAPSHOT_MODES, resolve_storage_mode
+from src.storage.shard_map import Shard, find_shard, load_shard_map, shard_of
+from src.utils.exceptions import TaskNotFoundException
+
+# Most threads used to run a call on every shard at once
+MAX_FANOUT_WORKERS = 32
+# Totals reported by stats(), summed over the shards
+SUMMED_STATS = ("tasks", "search_terms", "storage_bytes", "bytes_read", "bytes_written", "archive_bytes")
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+def creation_key(task: Task) -> Tuple[int, int]:
+    """Order tasks of different shards by creation time."""
+    return task.created_ts, task.id
+
+
+def merge_by_creation(results: Iterable[List[Task]]) -> Iterator[Task]:
+    """
+    Merge the task lists of several shards by creation time.
+
+    Shards list tasks in insertion order, which is not creation order for
+    imported tasks that keep their created_at, or for restored tasks, so
+    each list is sorted first (close to linear, as they are nearly sorted).
+
+    Args:
+        results: One task list per shard
+
+    Returns:
+        Iterator over all the tasks, ordered by creation_key
+    """
+    return heapq.merge(*(sorted(tasks, key=creation_key) for tasks in results), key=creation_key)
+
+
+def due_key(task: Task) -> Tuple[int, int]:
+    """Order tasks of different shards by due date."""
+    return task.due_ts, task.id
+
+
+def reminder_key(task: Task) -> Tuple[int, int]:
+    """Order tasks of different shards by reminder time."""
+    return task.remind_ts, task.id
+
+
+class ShardedTaskService:
+    """
+    Presents the stores of a shard map as a single task service.
+
+    Each shard is a TaskService with its own store file, and its ids encode
+    its shard number, so reading or changing one task touches one store.
+    Listing, querying and searching run on every shard in parallel and
+    merge the per-shard results, which each shard returns already sorted.
+    Like TaskService, an instance must not be used by several threads at
+    once; wrap it in a SharedTaskService for that.
+    """
+
+    def __init__(
+        self,
+        shard_map: str,
+        storage_mode: Optional[str] = None,
+        tenants: Optional[Iterable[str]] = None,
+        lazy_load: bool = False,
+        autosave: bool = True,
+        commit_interval: Optional[float] = None,
+        commit_every: Optional[int] = None,
+        durability: str = "none",
+        max_workers: Optional[int] = None,
+        archive_policy: Optional[ArchivePolicy] = None,
+        query_cache_size: int = DEFAULT_QUERY_CACHE_SIZE,
+        query_cache_bytes: int = DEFAULT_QUERY_CACHE_BYTES
+    ):
+        """
+        Open the shards of a shard map.
+
+        Args:
+            shard_map: Path of the shard map file (see src.storage.shard_map)
+            storage_mode: Storage backend of every shard, see TaskService;
+                auto-detected per shard file when omitted
+            tenants: Names of the tenants to open, or None for all; ids of
+                other tenants' tasks are reported as not found
+            lazy_load: Passed to each shard's TaskService
+            autosave: Passed to each shard's TaskService
+            commit_interval: Passed to each shard's TaskService
+            commit_every: Passed to each shard's TaskService
+            durability: Passed to each shard's TaskService
+            max_workers: Most threads to fan calls out over (defaults to one
+                per shard, up to MAX_FANOUT_WORKERS)
+            archive_policy: Passed to each shard's TaskService, so
+                max_hot_tasks applies to each shard on its own
+            query_cache_size: Passed to each shard's TaskService
+            query_cache_bytes: Passed to each shard's TaskService
+
+        Raises:
+            ValueError: If there are no shards, a tenant is unknown, or a
+                shard is not a snapshot store (see SNAPSHOT_MODES)
+        """
+        shards = load_shard_map(shard_map)
+        if tenants is not None:
+            shards = [find_shard(shards, name) for name in dict.fromkeys(tenants)]
+        if not shards:
+            raise ValueError(f"No shards in {shard_map}")
+        for shard in shards:
+            mode = resolve_storage_mode(shard.path, storage_mode)
+            if mode not in SNAPSHOT_MODES:
+                raise ValueError(f"Shard '{shard.name}' uses {mode} storage, which cannot be sharded")
+
+        self.shard_map = shard_map
+        self.shards: List[Shard] = shards
+        # Shared by every shard, so changes are numbered across shards
+        self.change_log = ChangeLog()
+        workers = min(len(shards), max_workers or MAX_FANOUT_WORKERS)
+        self._executor = ThreadPoolExecutor(workers, thread_name_prefix="shard") if workers > 1 else None
+
+        def open_shard(shard: Shard) -> TaskService:
+            return TaskService(
+                shard.path,
+                storage_mode,
+                lazy_load=lazy_load,
+                autosave=autosave,
+                commit_interval=commit_interval,
+                commit_every=commit_every,
+                durability=durability,
+                shard=shard.number,
+                change_log=self.change_log,
+                archive_policy=archive_policy,
+                query_cache_size=query_cache_size,
+                query_cache_bytes=query_cache_bytes
+            )
+
+        # Loading is most of the cost of opening a shard, so shards load in parallel
+        services = self._map(open_shard, shards, return_exceptions=True)
+        failures = [service for service in services if isinstance(service, BaseException)]
+        if failures:
+            for service in services:
+                if not isinstance(service, BaseException):
+                    service.close()
+            self._shutdown_executor()
+            raise failures[0]
+        self._services: Dict[int, TaskService] = {shard.number: service for shard, service in zip(shards, services)}
+        self._tenants: Dict[str, int] = {shard.name: shard.number for shard in shards}
+        self._names: Dict[int, str] = {shard.number: shard.name for shard in shards}
+
+    def _map(self, func: Callable[[T], R], items: List[T], return_exceptions: bool = False) -> List[Any]:
+        """
+        Call func on every item, in parallel when there is more than one.
+
+        Args:
+            func: Function to call
+            items: Arguments, one call each
+            return_exceptions: Return exceptions in place of results instead
+                of raising the first one
+
+        Returns:
+            The results, in the order of items
+        """
+        def call(item: T) -> Any:
+            try:
+                return func(item)
+            except BaseException as e:
+                if not return_exceptions:
+                    raise
+                return e
+
+        if self._executor is None or len(items) < 2:
+            return [call(item) for item in items]
+        return list(self._executor.map(call, items))
+
+    def _fan_out(self, func: Callable[[TaskService], R]) -> List[R]:
+        """Call func on every shard's service in parallel and collect the results in shard order."""
+        return self._map(func, list(self._services.values()))
+
+    def _shutdown_executor(self) -> None:
+        """Stop the fan-out threads; later fan-outs run on the calling thread."""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def _service_for(self, task_id: int) -> TaskService:
+        """
+        Get the service of the shard holding a task.
+
+        Raises:
+            TaskNotFoundException: If the task's shard is not open
+        """
+        service = self._services.get(shard_of(task_id))
+        if service is None:
+            raise TaskNotFoundException(f"Task with ID {task_id} not found")
+        return service
+
+    def _shard_for_new(self, title: str, tenant: Optional[str]) -> int:
+        """
+        Pick the shard a new task goes to.
+
+        Args:
+            title: Title of the task
+            tenant: Tenant the task belongs to, or None to spread tasks over
+                the open shards by a hash of their title
+
+        Returns:
+            The shard number
+
+        Raises:
+            ValueError: If the tenant is not open
+        """
+        if tenant is not None:
+            number = self._tenants.get(tenant)
+            if number is None:
+                raise ValueError(f"Unknown tenant '{tenant}'")
+            return number
+        numbers = list(self._services)
+        # crc32 rather than hash(), which changes between processes for strings
+        return numbers[zlib.crc32(title.encode("utf-8")) % len(numbers)]
+
+    @contextmanager
+    def _batch(self, numbers: Iterable[int]) -> Iterator[None]:
+        """Run the block inside batch() of the given shards."""
+        with ExitStack() as stack:
+            for number in sorted(set(numbers)):
+                stack.enter_context(self._services[number].batch())
+            yield
+
+    @property
+    def tasks(self) -> List[Task]:
+        """All tasks, ordered by creation time."""
+        return list(merge_by_creation(self._fan_out(lambda service: service.tasks)))
+
+    def tenant_of(self, task_id: int) -> str:
+        """
+        Get the tenant a task belongs to.
+
+        Args:
+            task_id: ID of the task
+
+        Returns:
+            The tenant name
+
+        Raises:
+            TaskNotFoundException: If the task's shard is not open
+        """
+        self._service_for(task_id)
+        return self._names[shard_of(task_id)]
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Report store sizes and I/O totals of every shard.
+
+        Returns:
+            Dict with the keys of TaskService.stats(): the values of
+            SUMMED_STATS summed over the shards (None if any shard reports
+            None; a word indexed by several shards is counted once per
+            shard), "query_cache" with each counter summed, and
+            "metrics", always None. "shards" lists each
+            shard's own stats along with its "name"
+        """
+        per_shard = self._fan_out(lambda service: service.stats())
+        stats: Dict[str, Any] = {}
+        for key in SUMMED_STATS:
+            values = [shard_stats[key] for shard_stats in per_shard]
+            stats[key] = None if None in values else sum(values)
+        stats["query_cache"] = {
+            key: sum(shard_stats["query_cache"][key] for shard_stats in per_shard)
+            for key in per_shard[0]["query_cache"]
+        }
+        stats["metrics"] = None
+        stats["shards"] = [
+            dict(name=shard.name, **{key: shard_stats[key] for key in SUMMED_STATS})
+            for shard, shard_stats in zip(self.shards, per_shard)
+        ]
+        return stats
+
+    def flush(self) -> None:
+        """Persist mutations held back while autosave is off, on every shard."""
+        self._fan_out(lambda service: service.flush())
+
+    def has_external_changes(self) -> bool:
+        """
+        Check whether another process changed any shard since it was loaded.
+
+        Returns:
+            True if the service should be reloaded
+        """
+        return any(service.has_external_changes() for service in self._services.values())
+
+    def reload_if_changed(self) -> bool:
+        """
+        Reload the shards another process changed.
+
+        Returns:
+            True if any shard was reloaded
+        """
+        return any(self._fan_out(lambda service: service.reload_if_changed()))
+
+    @property
+    def revision(self) -> int:
+        """Revision of the latest change to any shard, see changes_since()."""
+        return self.change_log.revision
+
+    def changes_since(self, revision: int) -> List[Change]:
+        """
+        Get the changes made to any shard after a revision.
+
+        See TaskService.changes_since; a reset lists every shard's tasks
+        by creation time.
+        """
+        # Loads lazy shards first, which starts a new revision
+        self._fan_out(lambda service: service._tasks)
+        changes = self.change_log.since(revision)
+        if changes is None:
+            return reset_changes(self.change_log.revision, self.tasks)
+        return changes
+
+    def watch(
+        self,
+        revision: int,
+        timeout: Optional[float] = None,
+        poll_interval: float = DEFAULT_WATCH_INTERVAL
+    ) -> List[Change]:
+        """
+        Wait until any shard has changes after a revision, and return them.
+
+        See TaskService.watch.
+        """
+        return watch_changes(
+            self.reload_if_changed, self.changes_since, self.change_log, revision, timeout, poll_interval
+        )
+
+    def close(self) -> None:
+        """Flush pending changes and close every shard."""
+        try:
+            self._fan_out(lambda service: service.close())
+        finally:
+            self._shutdown_executor()
+
+    @contextmanager
+    def batch(self) -> Iterator['ShardedTaskService']:
+        """
+        Defer persistence of every mutation in the block to one write per shard.
+
+        Yields:
+            This service
+        """
+        with self._batch(self._services):
+            yield self
+
+    def add_task(
+        self,
+        title: str,
+        description: str = "",
+        priority: str = "medium",
+        tenant: Optional[str] = None,
+        due_at: TimeBound = None,
+        remind_at: TimeBound = None
+    ) -> Task:
+        """
+        Add a new task.
+
+        Args:
+            title: Task title
+            description: Task description
+            priority: Task priority (low, medium, high)
+            tenant: Tenant the task belongs to; without one, tasks are
+                spread over the shards by a hash of their title
+            due_at: When the task is due, or None
+            remind_at: When to remind about the task, or None
+
+        Returns:
+            The newly created Task
+
+        Raises:
+            ValueError: If the tenant is not open
+        """
+        return self._services[self._shard_for_new(title, tenant)].add_task(
+            title, description, priority, due_at, remind_at
+        )
+
+    def add_tasks(self, entries: Iterable[Dict[str, Any]], tenant: Optional[str] = None) -> List[Task]:
+        """
+        Add many tasks with a single write per shard, shards in parallel.
+
+        Args:
+            entries: Dicts as accepted by TaskService.add_tasks
+            tenant: Tenant the tasks belong to, see add_task
+
+        Returns:
+            The newly created Tasks, in the order of entries
+
+        Raises:
+            ValueError: If the tenant is not open
+        """
+        entries = list(entries)
+        groups: Dict[int, List[int]] = {}
+        for position, entry in enumerate(entries):
+            groups.setdefault(self._shard_for_new(entry["title"], tenant), []).append(position)
+
+        def add(group: Tuple[int, List[int]]) -> List[Task]:
+            number, positions = group
+            return self._services[number].add_tasks([entries[position] for position in positions])
+
+        tasks: List[Optional[Task]] = [None] * len(entries)
+        for (_, positions), added in zip(groups.items(), self._map(add, list(groups.items()))):
+            for position, task in zip(positions, added):
+                tasks[position] = task
+        return tasks
+
+    def get_all_tasks(self, show_completed: bool = True, include_archived: bool = False) -> List[Task]:
+        """
+        Get all tasks, optionally filtering out completed tasks.
+
+        Args:
+            show_completed: Whether to include completed tasks
+            include_archived: Whether to also read every shard's archive
+                (ignored if show_completed is False)
+
+        Returns:
+            List of Task objects, ordered by creation time
+        """
+        if show_completed:
+            if include_archived:
+                return sorted(self.tasks + self.archived_tasks(), key=creation_key)
+            return self.tasks
+        return list(merge_by_creation(self._fan_out(lambda service: service.get_all_tasks(show_completed=False))))
+
+    def query(
+        self,
+        completed: Optional[bool] = None,
+        priority: Union[str, Iterable[str], None] = None,
+        created_between: Optional[Tuple[TimeBound, TimeBound]] = None,
+        order_by: str = "id",
+        limit: Optional[int] = None,
+        offset: int = 0
+    ) -> List[Task]:
+        """
+        Get tasks matching all of the given filters, see TaskService.query.
+
+        Every shard returns its first offset + limit matches in order, and
+        the merged list is cut to the requested window.
+
+        Returns:
+            List of matching Task objects
+
+        Raises:
+            ValueError: If order_by names an unknown field
+        """
+        field, descending = parse_order_by(order_by)
+        end = None if limit is None else offset + limit
+        results = self._fan_out(
+            lambda service: service.query(completed, priority, created_between, order_by, limit=end)
+        )
+        merged = heapq.merge(*results, key=lambda task: page_key(task, field), reverse=descending)
+        return list(islice(merged, offset, end))
+
+    def page(
+        self,
+        completed: Optional[bool] = None,
+        priority: Union[str, Iterable[str], None] = None,
+        created_between: Optional[Tuple[TimeBound, TimeBound]] = None,
+        order_by: str = "id",
+        page_size: int = DEFAULT_PAGE_SIZE,
+        cursor: Optional[str] = None
+    ) -> TaskPage:
+        """
+        Get one page of tasks matching all of the given filters, see TaskService.page.
+
+        Cursors mark a position in the sort order rather than in a shard,
+        so the same cursor continues every shard where the page ended.
+
+        Returns:
+            TaskPage with the tasks, the cursor of the next page and the
+            total number of matching tasks across shards
+
+        Raises:
+            ValueError: If order_by, page_size or cursor is invalid
+        """
+        field, descending = parse_order_by(order_by)
+        if page_size < 1:
+            raise ValueError("Page size must be positive")
+        # One extra task per shard tells whether another page follows
+        pages = self._fan_out(
+            lambda service: service.page(completed, priority, created_between, order_by, page_size + 1, cursor)
+        )
+        merged = heapq.merge(
+            *(page.tasks for page in pages), key=lambda task: page_key(task, field), reverse=descending
+        )
+        return build_page(list(islice(merged, page_size + 1)), page_size, field, sum(page.total for page in pages))
+
+    def get_task_by_id(self, task_id: int) -> Task:
+        """
+        Get a task by its ID, from the one shard that can hold it.
+
+        Args:
+            task_id: ID of the task to retrieve
+
+        Returns:
+            The requested Task
+
+        Raises:
+            TaskNotFoundException: If no task with the given ID exists
+        """
+        return self._service_for(task_id).get_task_by_id(task_id)
+
+    def update_task(self, task_id: int, expected_version: Optional[int] = None, **kwargs) -> Task:
+        """
+        Update a task with the given ID, see TaskService.update_task.
+
+        Returns:
+            The updated Task
+
+        Raises:
+            TaskNotFoundException: If no task with the given ID exists
+            StaleTaskException: If the task is no longer at expected_version
+        """
+        return self._service_for(task_id).update_task(task_id, expected_version, **kwargs)
+
+    def complete_task(self, task_id: int, expected_version: Optional[int] = None) -> Task:
+        """
+        Mark a task as complete, see TaskService.complete_task.
+
+        Returns:
+            The updated Task
+
+        Raises:
+            TaskNotFoundException: If no task with the given ID exists
+            StaleTaskException: If the task is no longer at expected_version
+        """
+        return self._service_for(task_id).complete_task(task_id, expected_version)
+
+    def delete_task(self, task_id: int) -> Task:
+        """
+        Delete a task.
+
+        Args:
+            task_id: ID of the task to delete
+
+        Returns:
+            The deleted Task
+
+        Raises:
+            TaskNotFoundException: If no task with the given ID exists
+        """
+        return self._service_for(task_id).delete_task(task_id)
+
+    def update_tasks(
+        self,
+        updates: Union[Mapping[int, Dict[str, Any]], Iterable[Tuple[int, Dict[str, Any]]]]
+    ) -> List[Task]:
+        """
+        Update many tasks with a single write per shard, see TaskService.update_tasks.
+
+        Returns:
+            The updated Tasks
+
+        Raises:
+            TaskNotFoundException: If any ID does not exist; nothing is
+                updated in that case
+            InvalidTaskDataException: If any new value is invalid; nothing
+                is updated in that case
+        """
+        updates = list(updates.items() if isinstance(updates, Mapping) else updates)
+        services = [self._service_for(task_id) for task_id, _ in updates]
+        with self._batch(shard_of(task_id) for task_id, _ in updates):
+            # Checked on copies first, so a bad value anywhere updates nothing
+            for service, (task_id, changes) in zip(services, updates):
+                service._require_task(task_id).copy().apply_changes(changes)
+            return [service.update_task(task_id, **changes) for service, (task_id, changes) in zip(services, updates)]
+
+    def delete_tasks(self, task_ids: Iterable[int]) -> List[Task]:
+        """
+        Delete many tasks with a single write per shard.
+
+        Args:
+            task_ids: IDs of the tasks to delete
+
+        Returns:
+            The deleted Tasks
+
+        Raises:
+            TaskNotFoundException: If any ID does not exist; nothing is
+                deleted in that case
+        """
+        task_ids = list(dict.fromkeys(task_ids))
+        services = [self._service_for(task_id) for task_id in task_ids]
+        with self._batch(shard_of(task_id) for task_id in task_ids):
+            for service, task_id in zip(services, task_ids):
+                service._require_task(task_id)
+            return [service.delete_task(task_id) for service, task_id in zip(services, task_ids)]
+
+    def next_due(self, n: int = 10) -> List[Task]:
+        """
+        Get the active tasks of every shard with the earliest due dates, see TaskService.next_due.
+
+        Returns:
+            Tasks by due date, earliest first
+
+        Raises:
+            ValueError: If n is negative
+        """
+        results = self._fan_out(lambda service: service.next_due(n))
+        return list(islice(heapq.merge(*results, key=due_key), n))
+
+    def overdue(self, now: TimeBound = None, limit: Optional[int] = None) -> List[Task]:
+        """
+        Get the active tasks of every shard past their due date, see TaskService.overdue.
+
+        Returns:
+            Tasks by due date, most overdue first
+        """
+        # Resolved once, so every shard compares against the same time
+        now = int(time.time()) if now is None else parse_timestamp(now)
+        results = self._fan_out(lambda service: service.overdue(now, limit))
+        return list(islice(heapq.merge(*results, key=due_key), limit))
+
+    def reminders_between(self, after: TimeBound, until: TimeBound) -> List[Task]:
+        """
+        Get the active tasks of every shard with a reminder in a range, see TaskService.reminders_between.
+
+        Returns:
+            Tasks by reminder time, earliest first
+        """
+        results = self._fan_out(lambda service: service.reminders_between(after, until))
+        return list(heapq.merge(*results, key=reminder_key))
+
+    def next_reminder_time(self, after: TimeBound = None) -> Optional[int]:
+        """
+        Get the time of the next reminder on any shard, see TaskService.next_reminder_time.
+
+        Returns:
+            The reminder time in epoch seconds, or None if there is none
+        """
+        after = int(time.time()) if after is None else parse_timestamp(after)
+        times = self._fan_out(lambda service: service.next_reminder_time(after))
+        return min((value for value in times if value is not None), default=None)
+
+    def schedule_reminders(
+        self,
+        callback: Callable[[Task], object],
+        since: TimeBound = None,
+        poll_interval: float = DEFAULT_WATCH_INTERVAL
+    ) -> ReminderScheduler:
+        """
+        Call back for every active task of any shard as its reminder time arrives.
+
+        See TaskService.schedule_reminders.
+        """
+        return ReminderScheduler(
+            self.reload_if_changed, self.reminders_between, self.next_reminder_time, self.change_log, callback,
+            None if since is None else parse_timestamp(since), poll_interval
+        ).start()
+
+    def archive_completed(self, policy: Optional[Sequence[Optional[float]]] = None) -> int:
+        """
+        Move completed tasks of every shard to its archive, see TaskService.archive_completed.
+
+        Returns:
+            Number of tasks archived
+
+        Raises:
+            ValueError: If there is no policy or it is invalid
+        """
+        return sum(self._fan_out(lambda service: service.archive_completed(policy)))
+
+    def archived_tasks(self) -> List[Task]:
+        """
+        Get the tasks moved to the archives of every shard.
+
+        Returns:
+            Archived tasks, ordered by creation time
+        """
+        return sorted(
+            (task for tasks in self._fan_out(lambda service: service.archived_tasks()) for task in tasks),
+            key=creation_key
+        )
+
+    def search_archive(self, keyword: str, limit: Optional[int] = None) -> List[Task]:
+        """
+        Search the archives of every shard, see TaskService.search_archive.
+
+        Returns:
+            Matching archived tasks, ordered by creation time
+        """
+        results = self._fan_out(lambda service: service.search_archive(keyword))
+        return sorted((task for tasks in results for task in tasks), key=creation_key)[:limit]
+
+    def restore_task(self, task_id: int) -> Task:
+        """
+        Move an archived task back to its shard's store.
+
+        Args:
+            task_id: ID of the archived task
+
+        Returns:
+            The restored Task
+
+        Raises:
+            TaskNotFoundException: If no task with the given ID is archived
+        """
+        return self._service_for(task_id).restore_task(task_id)
+
+    def search_tasks(
+        self,
+        keyword: str,
+        limit: Optional[int] = None,
+        mode: str = "index",
+        prefix: bool = True,
+        offset: int = 0
+    ) -> List[Task]:
+        """
+        Search every shard in parallel, see TaskService.search_tasks.
+
+        Relevance scores do not depend on the other tasks of a shard, so
+        "index" results are ranked exactly as a single store would rank
+        them; "substring" results are ordered by creation time.
+
+        Returns:
+            List of matching Task objects
+
+        Raises:
+            ValueError: If the search mode is unknown
+        """
+        if mode not in SEARCH_MODES:
+            raise ValueError(f"Unknown search mode '{mode}'. Expected one of: {', '.join(SEARCH_MODES)}")
+        end = None if limit is None else offset + limit
+
+        if mode == "index" and tokenize(keyword):
+            hits = self._fan_out(lambda service: service._ranked_search(keyword, end, prefix))
+            ranked = heapq.merge(*hits, key=lambda hit: (-hit[1], hit[0].id))
+            return [task for task, _ in islice(ranked, offset, end)]
+
+        # Shards cut their results in insertion order, not creation order,
+        # so every match is needed to find the first ones by creation time
+        results = self._fan_out(lambda service: service.search_tasks(keyword, mode="substring"))
+        return list(islice(merge_by_creation(results), offset, end))
@@ -0,0 +1,118 @@
+"""
+Thread-safe TaskService wrapper for sharing one loaded store between threads.
+"""
+
+from typing import Any, Callable, List, Optional, TYPE_CHECKING
+
+from src.services.change_feed import DEFAULT_WATCH_INTERVAL, Change, watch_changes
+from src.utils.rwlock import ReadWriteLock
+
+if TYPE_CHECKING:
+    # Only for annotations: the daemon client imports the method sets below
+    # and should not pay for loading the service stack
+    from src.models.task import Task
+    from src.services.reminder_scheduler import ReminderScheduler
+    from src.services.task_service import TaskService
+
+READ_METHODS = frozenset([
+    "get_all_tasks", "get_task_by_id", "query", "page", "search_tasks", "stats", "changes_since",
+    "archived_tasks", "search_archive", "next_due", "overdue", "reminders_between", "next_reminder_time",
+])
+WRITE_METHODS = frozenset([
+    "add_task", "update_task", "complete_task", "delete_task",
+    "add_tasks", "update_tasks", "delete_tasks", "archive_completed", "restore_task",
+])
+
+
+class SharedTaskService:
+    """
+    Exposes the TaskService read and write methods behind a readers-writer lock.
+
+    Used to keep a single loaded store for every Streamlit session instead of
+    re-reading the file on each rerun.
+    """
+
+    def __init__(self, service: 'TaskService'):
+        """
+        Wrap a service.
+
+        Args:
+            service: Service to share; it must not be used directly afterwards
+        """
+        self.service = service
+        self._lock = ReadWriteLock()
+
+    def __getattr__(self, name: str) -> Any:
+        if name in READ_METHODS:
+            lock = self._lock.read
+        elif name in WRITE_METHODS:
+            lock = self._lock.write
+        else:
+            raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
+        method = getattr(self.service, name)
+
+        def call(*args, **kwargs):
+            with lock():
+                return method(*args, **kwargs)
+        return call
+
+    def refresh(self) -> bool:
+        """
+        Reload the store if another process (e.g. the CLI) changed it.
+
+        Returns:
+            True if the store was reloaded
+        """
+        # The unlocked check is a couple of stat calls, so the common case
+        # of nothing having changed never blocks readers.
+        if not self.service.has_external_changes():
+            return False
+        with self._lock.write():
+            return self.service.reload_if_changed()
+
+    @property
+    def revision(self) -> int:
+        """Revision of the latest change, see TaskService.changes_since()."""
+        return self.service.revision
+
+    def watch(
+        self,
+        revision: int,
+        timeout: Optional[float] = None,
+        poll_interval: float = DEFAULT_WATCH_INTERVAL
+    ) -> List[Change]:
+        """
+        Wait until there are changes after a revision, and return them.
+
+        The lock is only held to refresh and to read the changes, so other
+        threads keep reading and writing while this waits. See
+        TaskService.watch.
+        """
+        return watch_changes(
+            self.refresh, self.changes_since, self.service.change_log, revision, timeout, poll_interval
+        )
+
+    def schedule_reminders(
+        self,
+        callback: Callable[['Task'], object],
+        since: Optional[int] = None,
+        poll_interval: float = DEFAULT_WATCH_INTERVAL
+    ) -> 'ReminderScheduler':
+        """
+        Call back for every active task as its reminder time arrives.
+
+        The lock is only held to refresh and to look up reminders. See
+        TaskService.schedule_reminders.
+        """
+        # Imported here, see TYPE_CHECKING above
+        from src.services.reminder_scheduler import ReminderScheduler
+
+        return ReminderScheduler(
+            self.refresh, self.reminders_between, self.next_reminder_time, self.service.change_log, callback, since,
+            poll_interval
+        ).start()
+
+    def close(self) -> None:
+        """Flush pending changes and release storage resources."""
+        with self._lock.write():
+            self.service.close()
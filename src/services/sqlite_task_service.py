@@ -0,0 +1,477 @@
+"""
+Task service backed by the SQLite storage engine.
+"""
+
+import atexit
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional, Set, Tuple, Union, Iterable, Iterator
+
+from src.models.task import Task, parse_timestamp
+from src.services.archive_policy import ArchivePolicy
+from src.services.change_feed import Change, ChangeLog, reset_changes
+from src.services.query_cache import DEFAULT_QUERY_CACHE_BYTES, DEFAULT_QUERY_CACHE_SIZE, QueryCache
+from src.services.search_index import tokenize
+from src.services.task_service import (
+    TaskService,
+    check_version,
+    TaskPage,
+    SEARCH_MODES,
+    DEFAULT_PAGE_SIZE,
+    DURABILITY_MODES,
+    TimeBound,
+    build_page,
+    decode_cursor,
+    normalize_priorities,
+    normalize_time_range,
+    parse_order_by,
+)
+from src.storage.archive_store import ARCHIVE_SUFFIX, TaskArchive
+from src.storage.sqlite_store import SqliteTaskStore
+from src.utils.exceptions import TaskNotFoundException, StaleTaskException
+from src.utils.metrics import Metrics
+
+
+class SqliteTaskService(TaskService):
+    """
+    TaskService that pushes every read and write down to SQLite.
+
+    Nothing is loaded up front; each call materializes only the rows it
+    returns. Constructed automatically by TaskService for SQLite files.
+    """
+
+    def __init__(
+        self,
+        storage_file: str = "tasks.db",
+        storage_mode: Optional[str] = "sqlite",
+        lazy_load: bool = False,
+        autosave: bool = True,
+        commit_interval: Optional[float] = None,
+        commit_every: Optional[int] = None,
+        durability: str = "none",
+        metrics: Optional[Metrics] = None,
+        shard: Optional[int] = None,
+        parallel_scan: Optional[bool] = None,
+        scan_workers: Optional[int] = None,
+        change_log: Optional[ChangeLog] = None,
+        archive_policy: Optional[ArchivePolicy] = None,
+        query_cache_size: int = DEFAULT_QUERY_CACHE_SIZE,
+        query_cache_bytes: int = DEFAULT_QUERY_CACHE_BYTES
+    ):
+        """
+        Open the SQLite task database.
+
+        Args:
+            storage_file: Path to the SQLite database file
+            storage_mode: Accepted for signature compatibility; always "sqlite"
+            lazy_load: Accepted for signature compatibility; nothing is
+                loaded up front either way
+            autosave: Commit every change immediately; when False, changes
+                stay in an open transaction until flush() or close(), which
+                other connections cannot write through
+            commit_interval: Enable group commit: changes are committed
+                together by a background flusher every commit_interval
+                seconds, and on exit
+            commit_every: Enable group commit, committing as soon as this
+                many changes are pending
+            durability: "commit" fsyncs every commit, "interval" checkpoints
+                the write-ahead log in the background; otherwise SQLite
+                syncs it at its own checkpoints
+            metrics: Registry to record method and query latencies and store
+                sizes in; no instrumentation when omitted
+            shard: Must be None; SQLite allocates ids itself, so a database
+                cannot be a shard
+            parallel_scan: Must not be True; substring searches are answered
+                by SQLite
+            scan_workers: Must be None, see parallel_scan
+            change_log: Log to record changes in, see TaskService
+            archive_policy: Completed tasks to move to the archive on
+                writes, see TaskService
+            query_cache_size: Must be left at its default; SQLite answers
+                every query, and its page cache keeps repeated ones fast
+            query_cache_bytes: Must be left at its default, see
+                query_cache_size
+
+        Raises:
+            ValueError: If the durability mode or archive policy is invalid,
+                or an option SQLite stores do not support is given
+        """
+        if durability not in DURABILITY_MODES:
+            raise ValueError(f"Unknown durability '{durability}'. Expected one of: {', '.join(DURABILITY_MODES)}")
+        if shard is not None:
+            raise ValueError("SQLite stores cannot be used as shards")
+        if parallel_scan or scan_workers is not None:
+            raise ValueError("SQLite stores do not support parallel scans")
+        if query_cache_size != DEFAULT_QUERY_CACHE_SIZE or query_cache_bytes != DEFAULT_QUERY_CACHE_BYTES:
+            raise ValueError("SQLite stores do not support the query cache")
+        self.storage_file = storage_file
+        self.durability = durability
+        self.metrics = metrics
+        self.shard = None
+        self.parallel_scan = False
+        self.scan_workers = None
+        self.commit_interval = commit_interval
+        self.commit_every = commit_every
+        group_commit = commit_interval is not None or commit_every is not None
+        self.autosave = autosave and not group_commit
+        self._pending = 0
+        # Serializes commits with the background flusher
+        self._mutex = threading.RLock()
+        self._store = SqliteTaskStore(storage_file, synchronous="FULL" if durability == "commit" else "NORMAL")
+        self._store.defer_commits = not self.autosave
+        self._data_version = self._store.data_version()
+        self._archive = TaskArchive(storage_file + ARCHIVE_SUFFIX, fsync=durability != "none")
+        self.archive_policy = None if archive_policy is None else archive_policy.validate()
+        self._archive_due = 0.0
+        self._archive_signature: Any = None
+        self._archived: Dict[int, Task] = {}
+        # Never filled; reported by stats() like a TaskService's
+        self.query_cache = QueryCache(0)
+        self.change_log = change_log if change_log is not None else ChangeLog()
+        # Clients start with a reset listing the rows already in the database
+        self.change_log.restart()
+        if metrics is not None:
+            self._instrument()
+
+        self._stop_flusher = threading.Event()
+        self._flusher: Optional[threading.Thread] = None
+        if commit_interval is not None or durability == "interval":
+            self._flusher = threading.Thread(target=self._flush_loop, name="task-service-flusher", daemon=True)
+            self._flusher.start()
+        if group_commit:
+            atexit.register(self.flush)
+
+    @property
+    def tasks(self) -> List[Task]:
+        """All tasks in creation order."""
+        return self._store.query()
+
+    def _task_count(self) -> Optional[int]:
+        """Number of task rows."""
+        return self._store.count()
+
+    def _record(self, op: str, task: Task) -> None:
+        """
+        Log a mutation already written to the database, committing once enough are held back.
+
+        Args:
+            op: Mutation type ("add", "update" or "delete")
+            task: The task affected by the mutation
+        """
+        self.change_log.append(op, task)
+        if not self.autosave:
+            with self._mutex:
+                self._pending += 1
+                if self.commit_every is not None and self._pending >= self.commit_every:
+                    self.flush()
+        self._archive_if_due()
+
+    def flush(self) -> None:
+        """Commit the changes held back while autosave is off."""
+        with self._mutex:
+            self._store.commit()
+            self._pending = 0
+
+    def close(self) -> None:
+        """Commit pending changes, stop the background flusher and close the database connection."""
+        if self._flusher is not None:
+            self._stop_flusher.set()
+            self._flusher.join()
+        atexit.unregister(self.flush)
+        if self._store.closed:
+            return
+        self.flush()
+        if self.durability == "interval":
+            self._store.sync()
+        self._store.close()
+
+    def has_external_changes(self) -> bool:
+        """
+        Check whether another connection committed since the last check.
+
+        Returns:
+            True if reload_if_changed() has changes to report
+        """
+        return self._store.data_version() != self._data_version
+
+    def reload_if_changed(self) -> bool:
+        """
+        Report other connections' commits to the change feed.
+
+        Rows are always read from the database, so nothing is reloaded, but
+        which rows changed is not known: the change log is restarted, and
+        changes_since() then answers with a reset.
+
+        Returns:
+            True if another connection committed
+        """
+        data_version = self._store.data_version()
+        if data_version == self._data_version:
+            return False
+        self._data_version = data_version
+        self.change_log.restart()
+        return True
+
+    def changes_since(self, revision: int) -> List[Change]:
+        """
+        Get the changes made after a revision.
+
+        See TaskService.changes_since; a reset reads every row.
+        """
+        changes = self.change_log.since(revision)
+        if changes is None:
+            return reset_changes(self.change_log.revision, self._store.query())
+        return changes
+
+    def add_task(
+        self,
+        title: str,
+        description: str = "",
+        priority: str = "medium",
+        due_at: TimeBound = None,
+        remind_at: TimeBound = None
+    ) -> Task:
+        """
+        Add a new task.
+
+        See TaskService.add_task.
+        """
+        return self._insert_task(title, description, priority, due_at=due_at, remind_at=remind_at)
+
+    def _insert_task(
+        self,
+        title: str,
+        description: str = "",
+        priority: str = "medium",
+        completed: bool = False,
+        created_at: Union[str, int, None] = None,
+        completed_at: Union[str, int, None] = None,
+        due_at: TimeBound = None,
+        remind_at: TimeBound = None
+    ) -> Task:
+        """Insert a task row; used by the bulk methods inherited from TaskService."""
+        task = self._store.insert(
+            title, description, priority, completed, created_at, completed_at if completed else None, due_at,
+            remind_at
+        )
+        self._record("add", task)
+        return task
+
+    def _require_task(self, task_id: int) -> Task:
+        """Fetch a task row, raising TaskNotFoundException if it is missing; archived tasks are not looked at."""
+        task = self._store.get(task_id)
+        if task is None:
+            raise TaskNotFoundException(f"Task with ID {task_id} not found")
+        return task
+
+    @contextmanager
+    def batch(self) -> Iterator[TaskService]:
+        """
+        Run every mutation in the block in a single SQLite transaction.
+
+        Yields:
+            This service
+        """
+        with self._store.transaction():
+            yield self
+
+    def query(
+        self,
+        completed: Optional[bool] = None,
+        priority: Union[str, Iterable[str], None] = None,
+        created_between: Optional[Tuple[TimeBound, TimeBound]] = None,
+        order_by: str = "id",
+        limit: Optional[int] = None,
+        offset: int = 0
+    ) -> List[Task]:
+        """
+        Get tasks matching all of the given filters.
+
+        See TaskService.query; filtering, ordering and pagination run in SQL.
+        """
+        field, descending = parse_order_by(order_by)
+        return self._store.query(
+            completed=completed,
+            priorities=None if priority is None else normalize_priorities(priority),
+            created_between=None if created_between is None else normalize_time_range(created_between),
+            order_by=field,
+            descending=descending,
+            limit=limit,
+            offset=offset
+        )
+
+    def page(
+        self,
+        completed: Optional[bool] = None,
+        priority: Union[str, Iterable[str], None] = None,
+        created_between: Optional[Tuple[TimeBound, TimeBound]] = None,
+        order_by: str = "id",
+        page_size: int = DEFAULT_PAGE_SIZE,
+        cursor: Optional[str] = None
+    ) -> TaskPage:
+        """
+        Get one page of tasks matching all of the given filters.
+
+        See TaskService.page; the cursor becomes a keyset condition in SQL,
+        so deep pages cost no more than the first one.
+        """
+        field, descending = parse_order_by(order_by)
+        if page_size < 1:
+            raise ValueError("Page size must be positive")
+        filters = {
+            "completed": completed,
+            "priorities": None if priority is None else normalize_priorities(priority),
+            "created_between": None if created_between is None else normalize_time_range(created_between),
+        }
+        tasks = self._store.query(
+            order_by=field,
+            descending=descending,
+            limit=page_size + 1,
+            after=None if cursor is None else decode_cursor(cursor),
+            **filters
+        )
+        return build_page(tasks, page_size, field, self._store.count(**filters))
+
+    def get_task_by_id(self, task_id: int) -> Task:
+        """
+        Get a task by its ID.
+
+        Args:
+            task_id: ID of the task to retrieve
+
+        Returns:
+            The requested Task
+
+        Raises:
+            TaskNotFoundException: If no task with the given ID exists
+        """
+        task = self._store.get(task_id)
+        if task is None:
+            return self._require_archived(task_id)
+        return task
+
+    def update_task(self, task_id: int, expected_version: Optional[int] = None, **kwargs) -> Task:
+        """
+        Update a task with the given ID.
+
+        Args:
+            task_id: ID of the task to update
+            expected_version: Version the caller last saw, see
+                TaskService.update_task
+            **kwargs: Task attributes to update
+
+        Returns:
+            The updated Task
+
+        Raises:
+            TaskNotFoundException: If no task with the given ID exists
+            StaleTaskException: If the task is no longer at expected_version,
+                or another connection updated it between read and write
+        """
+        task = self._require_task(task_id)
+        check_version(task, expected_version)
+        task.apply_changes(kwargs)
+        if not self._store.update(task):
+            raise StaleTaskException(f"Task {task_id} was modified concurrently")
+        self._record("update", task)
+        return task
+
+    def delete_task(self, task_id: int) -> Task:
+        """
+        Delete a task.
+
+        Args:
+            task_id: ID of the task to delete
+
+        Returns:
+            The deleted Task
+
+        Raises:
+            TaskNotFoundException: If no task with the given ID exists
+        """
+        task = self._require_task(task_id)
+        self._store.delete(task_id)
+        self._record("delete", task)
+        return task
+
+    def next_due(self, n: int = 10) -> List[Task]:
+        """
+        Get the active tasks with the earliest due dates, overdue ones included.
+
+        See TaskService.next_due; answered from an index on due_at.
+        """
+        if n < 0:
+            raise ValueError("n must not be negative")
+        return self._store.due(limit=n)
+
+    def overdue(self, now: TimeBound = None, limit: Optional[int] = None) -> List[Task]:
+        """
+        Get the active tasks past their due date, most overdue first.
+
+        See TaskService.overdue.
+        """
+        return self._store.due(int(time.time()) if now is None else parse_timestamp(now), limit)
+
+    def reminders_between(self, after: TimeBound, until: TimeBound) -> List[Task]:
+        """
+        Get the active tasks whose reminder time falls in a range.
+
+        See TaskService.reminders_between.
+        """
+        return self._store.reminders(parse_timestamp(after), parse_timestamp(until))
+
+    def next_reminder_time(self, after: TimeBound = None) -> Optional[int]:
+        """
+        Get the time of the next reminder of an active task.
+
+        See TaskService.next_reminder_time.
+        """
+        return self._store.next_reminder(int(time.time()) if after is None else parse_timestamp(after))
+
+    def _stored_ids(self, task_ids: Iterable[int]) -> Set[int]:
+        """Find which of some ids have a row."""
+        return self._store.existing_ids(task_ids)
+
+    def restore_task(self, task_id: int) -> Task:
+        """
+        Move an archived task back to the database.
+
+        See TaskService.restore_task; the task keeps its id, which
+        AUTOINCREMENT never hands out again.
+        """
+        archived = self._archived_tasks().get(task_id)
+        if archived is None:
+            raise TaskNotFoundException(f"No archived task with ID {task_id}")
+        task = self._store.get(task_id)
+        if task is None:
+            task = archived.copy()
+            # Committed before the archive is told, even while commits are
+            # held back: a crash in between leaves both copies, and the
+            # database's copy is the one used
+            self._store.insert_many([task])
+            self._record("add", task)
+            self.flush()
+        self._archive.remove([task_id])
+        return task
+
+    def search_tasks(
+        self,
+        keyword: str,
+        limit: Optional[int] = None,
+        mode: str = "index",
+        prefix: bool = True,
+        offset: int = 0
+    ) -> List[Task]:
+        """
+        Search for tasks matching the keyword.
+
+        See TaskService.search_tasks; "index" mode is answered by FTS5.
+        """
+        if mode not in SEARCH_MODES:
+            raise ValueError(f"Unknown search mode '{mode}'. Expected one of: {', '.join(SEARCH_MODES)}")
+        end = None if limit is None else offset + limit
+        terms = tokenize(keyword)
+        if mode == "index" and terms:
+            return self._store.search(terms, limit=end, prefix=prefix)[offset:]
+        return self._store.search_substring(keyword, limit=end)[offset:]
@@ -2,51 +2,782 @@
 Task service for managing task operations.
 """
 
+import heapq
+import atexit
+import importlib
 import os
-import json
-from typing import List, Dict, Any, Optional
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import datetime
+from itertools import islice
+from typing import (
+    List, Dict, Any, Optional, Tuple, Union, Iterable, Iterator, Mapping, NamedTuple, Sequence, Set, Callable,
+    TypeVar, DefaultDict, Hashable, TYPE_CHECKING
+)
 
-from src.models.task import Task
-from src.utils.exceptions import TaskNotFoundException
+from src.models.task import Task, parse_timestamp
+from src.services.change_feed import DEFAULT_WATCH_INTERVAL, Change, ChangeLog, reset_changes, watch_changes
+from src.services.query_cache import DEFAULT_QUERY_CACHE_BYTES, DEFAULT_QUERY_CACHE_SIZE, QueryCache
+from src.storage.archive_store import ARCHIVE_SUFFIX, TaskArchive
+from src.storage.factory import create_store, resolve_storage_mode
+from src.storage.shard_map import SHARD_ID_BASE, shard_id
+from src.utils.exceptions import TaskNotFoundException, StaleTaskException
+
+if TYPE_CHECKING:
+    # Imported where used: one-shot CLI commands rarely need them, and each
+    # module imported adds to their start-up time
+    from src.services.archive_policy import ArchivePolicy
+    from src.services.reminder_scheduler import ReminderScheduler
+    from src.utils.metrics import Metrics
+
+SEARCH_MODES = ("index", "substring")
+PRIORITY_ORDER = {"low": 0, "medium": 1, "high": 2}
+ORDER_FIELDS = ("id", "created_at", "priority")
+DEFAULT_PAGE_SIZE = 50
+# "none" leaves syncing to the OS, "commit" fsyncs every write, "interval"
+# fsyncs in the background once per commit interval
+DURABILITY_MODES = ("none", "commit", "interval")
+DEFAULT_SYNC_INTERVAL = 1.0
+# Stores smaller than this are scanned serially unless parallel_scan is set:
+# below it, handing the scan to other processes costs more than it saves
+PARALLEL_SCAN_THRESHOLD = 200000
+# Most often, in seconds, writes check the archive policy; each check scans
+# the completed tasks
+ARCHIVE_CHECK_INTERVAL = 60.0
+# Task fields only the search index covers; updating just these leaves
+# cached query() and page() results valid
+TEXT_FIELDS = frozenset(["title", "description"])
+# Public methods timed when metrics are enabled
+INSTRUMENTED_METHODS = (
+    "add_task", "get_all_tasks", "query", "page", "get_task_by_id", "update_task", "complete_task",
+    "delete_task", "add_tasks", "update_tasks", "delete_tasks", "search_tasks", "flush", "reload_if_changed",
+    "changes_since", "archive_completed", "archived_tasks", "search_archive", "restore_task", "next_due", "overdue",
+    "reminders_between", "next_reminder_time",
+)
+
+TimeBound = Union[str, int, datetime, None]
+R = TypeVar("R")
+
+# In-memory state built by _load_tasks, which lazy services defer
+LAZY_STATE = ("_tasks", "_next_id")
+# Indexes lazy services build on first use, so one-shot commands that never
+# search or filter (e.g. "complete") skip the cost
+INDEX_STATE = ("_search_index", "_filter_index", "_due_index")
+# Module and class of each index, imported when the index is first built
+INDEX_TYPES = {
+    "_search_index": ("src.services.search_index", "SearchIndex"),
+    "_filter_index": ("src.services.filter_index", "FilterIndex"),
+    "_due_index": ("src.services.due_index", "DueIndex"),
+}
+
+
+class TaskPage(NamedTuple):
+    """One page of query results."""
+
+    tasks: List[Task]
+    # Cursor for the following page, or None on the last page
+    next_cursor: Optional[str]
+    # Number of tasks matching the filters across all pages
+    total: int
+
+
+def parse_order_by(order_by: str) -> Tuple[str, bool]:
+    """
+    Split an order_by argument into its field and direction.
+
+    Args:
+        order_by: Field name, optionally prefixed with "-" for descending order
+
+    Returns:
+        Tuple of (field, descending)
+
+    Raises:
+        ValueError: If the field is not one of ORDER_FIELDS
+    """
+    field = order_by.lstrip("-")
+    if field not in ORDER_FIELDS:
+        raise ValueError(f"Unknown order field '{field}'. Expected one of: {', '.join(ORDER_FIELDS)}")
+    return field, order_by.startswith("-")
+
+
+def normalize_priorities(priority: Union[str, Iterable[str]]) -> List[str]:
+    """
+    Turn a priority filter argument into a list of lowercase levels.
+
+    Args:
+        priority: A priority level or an iterable of them
+
+    Returns:
+        List of priority levels
+    """
+    priorities = [priority] if isinstance(priority, str) else list(priority)
+    return [p.lower() for p in priorities]
+
+
+def normalize_time_range(bounds: Tuple[TimeBound, TimeBound]) -> Tuple[Optional[int], Optional[int]]:
+    """
+    Convert (start, end) time bounds to epoch seconds.
+
+    Args:
+        bounds: Pair of bounds accepted by parse_timestamp, or None
+
+    Returns:
+        Pair of epoch seconds, or None for open bounds
+    """
+    return tuple(None if bound is None else parse_timestamp(bound) for bound in bounds)
+
+
+def filter_key(
+    completed: Optional[bool],
+    priority: Union[str, Iterable[str], None],
+    created_between: Optional[Tuple[TimeBound, TimeBound]]
+) -> Tuple:
+    """
+    Normalize query filters into a hashable cache key, equal for equivalent filters.
+
+    Args:
+        completed: Completion status filter, see TaskService.query
+        priority: Priority filter
+        created_between: Creation time bounds
+
+    Returns:
+        Tuple of the normalized filters
+    """
+    return (
+        None if completed is None else bool(completed),
+        None if priority is None else tuple(sorted(set(normalize_priorities(priority)))),
+        None if created_between is None else normalize_time_range(created_between),
+    )
+
+
+def page_key(task: Task, field: str) -> Tuple[int, int]:
+    """
+    Get the position of a task in a sort order, for keyset pagination.
+
+    Args:
+        task: Task to locate
+        field: Field of ORDER_FIELDS the tasks are sorted by
+
+    Returns:
+        Pair of (field value, id); ties on the field are broken by id
+    """
+    if field == "created_at":
+        return task.created_ts, task.id
+    if field == "priority":
+        return PRIORITY_ORDER.get(task.priority, -1), task.id
+    return task.id, task.id
+
+
+def decode_cursor(cursor: str) -> Tuple[int, int]:
+    """
+    Parse a cursor returned in a TaskPage.
+
+    Args:
+        cursor: Cursor string
+
+    Returns:
+        The page_key of the last task of the previous page
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        value, task_id = cursor.split(":")
+        return int(value), int(task_id)
+    except ValueError:
+        raise ValueError(f"Invalid cursor '{cursor}'") from None
+
+
+def build_page(tasks: List[Task], page_size: int, field: str, total: int) -> TaskPage:
+    """
+    Assemble a TaskPage from up to page_size + 1 tasks in page order.
+
+    Args:
+        tasks: Tasks of the page, plus one more if another page follows
+        page_size: Number of tasks per page
+        field: Field of ORDER_FIELDS the tasks are sorted by
+        total: Number of tasks matching the filters
+
+    Returns:
+        The page
+    """
+    if len(tasks) <= page_size:
+        return TaskPage(tasks, None, total)
+    tasks = tasks[:page_size]
+    return TaskPage(tasks, "%d:%d" % page_key(tasks[-1], field), total)
+
+
+def check_version(task: Task, expected_version: Optional[int]) -> None:
+    """
+    Reject a write based on an outdated read of a task.
+
+    Args:
+        task: Current state of the task
+        expected_version: Version the writer last saw, or None to skip the check
+
+    Raises:
+        StaleTaskException: If the task is no longer at expected_version
+    """
+    if expected_version is not None and task.version != expected_version:
+        raise StaleTaskException(
+            f"Task {task.id} was modified (version {task.version}, expected {expected_version})"
+        )
 
 
 class TaskService:
     """Service class for managing tasks."""
 
-    def __init__(self, storage_file: str = "tasks.json"):
+    def __new__(cls, storage_file: str = "tasks.json", storage_mode: Optional[str] = None, *args, **kwargs):
+        """Pick the SQLite-backed implementation for SQLite storage files."""
+        if cls is TaskService and resolve_storage_mode(storage_file, storage_mode) == "sqlite":
+            # Imported here because the subclass module imports this one
+            from src.services.sqlite_task_service import SqliteTaskService
+            cls = SqliteTaskService
+        return super().__new__(cls)
+
+    def __init__(
+        self,
+        storage_file: str = "tasks.json",
+        storage_mode: Optional[str] = None,
+        lazy_load: bool = False,
+        autosave: bool = True,
+        commit_interval: Optional[float] = None,
+        commit_every: Optional[int] = None,
+        durability: str = "none",
+        metrics: Optional['Metrics'] = None,
+        shard: Optional[int] = None,
+        parallel_scan: Optional[bool] = None,
+        scan_workers: Optional[int] = None,
+        change_log: Optional[ChangeLog] = None,
+        archive_policy: Optional['ArchivePolicy'] = None,
+        query_cache_size: int = DEFAULT_QUERY_CACHE_SIZE,
+        query_cache_bytes: int = DEFAULT_QUERY_CACHE_BYTES
+    ):
         """
         Initialize the TaskService with a storage file.
 
         Args:
-            storage_file: Path to the JSON file for storing tasks
+            storage_file: Path to the file for storing tasks
+            storage_mode: Storage backend ("json" rewrites the file on every
+                change, "journal" appends changes to a log, "sqlite" keeps
+                tasks in a database); auto-detected from the file name and
+                the files on disk when omitted
+            lazy_load: Defer loading the store until an operation needs all
+                tasks, and building the search and filter indexes until
+                they are used; get_task_by_id is answered by scanning the
+                file until the task is found
+            autosave: Persist every mutation immediately; when False,
+                changes are only written by flush() or close()
+            commit_interval: Enable group commit: mutations are written
+                together by a background flusher every commit_interval
+                seconds, and on exit
+            commit_every: Enable group commit, writing as soon as this many
+                mutations are pending
+            durability: One of DURABILITY_MODES
+            metrics: Registry to record method and storage latencies, I/O
+                totals and store sizes in; no instrumentation when omitted
+            shard: Number of the shard this store holds, below
+                SHARD_ID_BASE; new ids then encode it (see shard_id), so
+                ids stay unique across the stores of a ShardedTaskService
+            parallel_scan: Whether substring searches split the scan over
+                a pool of worker processes; None decides by store size (see
+                PARALLEL_SCAN_THRESHOLD)
+            scan_workers: Number of worker processes for parallel scans
+                (defaults to one per CPU)
+            change_log: Log to record changes in for changes_since(), e.g.
+                one shared by the shards of a ShardedTaskService; a new one
+                by default
+            archive_policy: Move the completed tasks it selects to the
+                archive (see archive_completed) on writes, at most every
+                ARCHIVE_CHECK_INTERVAL seconds; archival only runs when
+                called explicitly when omitted
+            query_cache_size: Most results of query(), page() and
+                search_tasks() kept for repeated calls; 0 disables caching
+            query_cache_bytes: Memory cap of the kept results, see
+                QueryCache
+
+        Raises:
+            ValueError: If the durability mode, shard number, archive
+                policy or a query cache limit is invalid
         """
+        if durability not in DURABILITY_MODES:
+            raise ValueError(f"Unknown durability '{durability}'. Expected one of: {', '.join(DURABILITY_MODES)}")
+        if shard is not None and not 0 <= shard < SHARD_ID_BASE:
+            raise ValueError(f"Shard number must be between 0 and {SHARD_ID_BASE - 1}")
         self.storage_file = storage_file
-        self.tasks = self._load_tasks()
+        self.metrics = metrics
+        self.shard = shard
+        self._id_step = 1 if shard is None else SHARD_ID_BASE
+        self.parallel_scan = parallel_scan
+        self.scan_workers = scan_workers
+        # Bumped on every change to the in-memory tasks
+        self._generation = 0
+        # Bumped on changes that can change search results; cached searches
+        # are checked against it
+        self._search_generation = 0
+        # Bumped on changes to query() and page() results that cannot be
+        # narrowed down, such as a reload; cached results are checked against
+        # it and the counters of the filter values they depend on (see
+        # _filter_generation_of)
+        self._filter_generation = 0
+        # "all", "created", ("completed", flag) and ("priority", level) ->
+        # changes to tasks that had that value
+        self._filter_counters: DefaultDict[Hashable, int] = defaultdict(int)
+        self.query_cache = QueryCache(query_cache_size, query_cache_bytes)
+        self.change_log = change_log if change_log is not None else ChangeLog()
+        self.archive_policy = None if archive_policy is None else archive_policy.validate()
+        # Next time (time.monotonic) a write applies archive_policy
+        self._archive_due = 0.0
+        self._archive_signature: Any = None
+        self._archived: Dict[int, Task] = {}
+        self.commit_interval = commit_interval
+        self.commit_every = commit_every
+        self.durability = durability
+        group_commit = commit_interval is not None or commit_every is not None
+        self.autosave = autosave and not group_commit
+        self._dirty = False
+        self._pending = 0
+        # Serializes mutations with flushes from the background flusher
+        self._mutex = threading.RLock()
+        self._store = create_store(storage_file, storage_mode)
+        self._store.fsync = durability == "commit"
+        self._archive = TaskArchive(storage_file + ARCHIVE_SUFFIX, fsync=durability != "none")
+        self._lazy = lazy_load
+        if metrics is not None:
+            self._instrument()
+        if not lazy_load:
+            self._load_tasks()
 
-    def _load_tasks(self) -> List[Task]:
+        self._stop_flusher = threading.Event()
+        self._flusher: Optional[threading.Thread] = None
+        if commit_interval is not None or durability == "interval":
+            self._flusher = threading.Thread(target=self._flush_loop, name="task-service-flusher", daemon=True)
+            self._flusher.start()
+        if group_commit:
+            atexit.register(self.flush)
+
+    def __getattr__(self, name: str) -> Any:
+        """Load the store on first access to in-memory state in lazy mode."""
+        # Only called for attributes not set yet, so there is no cost once loaded.
+        # Concurrent readers (see SharedTaskService) may get here together, so
+        # only the first one loads or builds
+        if name in LAZY_STATE:
+            with self._mutex:
+                if name not in self.__dict__:
+                    self._load_tasks()
+            return self.__dict__[name]
+        if name in INDEX_STATE:
+            with self._mutex:
+                if name not in self.__dict__:
+                    self._build_index(name)
+            return self.__dict__[name]
+        raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
+
+    @property
+    def tasks(self) -> List[Task]:
+        """All tasks in creation order."""
+        return list(self._tasks.values())
+
+    def _instrument(self) -> None:
+        """Time every public method and storage call into self.metrics and expose store sizes."""
+        metrics = self.metrics
+        # Wrappers are set on the instances, so services without metrics
+        # keep calling the plain class methods
+        for name in INSTRUMENTED_METHODS:
+            setattr(self, name, metrics.timed("taskmanager_operation_seconds", getattr(self, name), method=name))
+        store = self._store
+        for name in store.IO_METHODS:
+            setattr(store, name, metrics.timed("taskmanager_storage_seconds", getattr(store, name), op=name))
+
+        metrics.describe("taskmanager_operation_seconds", "Latency of TaskService methods")
+        metrics.describe("taskmanager_operation_seconds_errors_total", "TaskService calls that raised")
+        metrics.describe("taskmanager_storage_seconds", "Latency of storage backend calls")
+        metrics.describe("taskmanager_storage_seconds_errors_total", "Storage backend calls that raised")
+        metrics.describe("taskmanager_loads_total", "Full loads of the store into memory")
+        metrics.describe("taskmanager_lookups_total", "get_task_by_id calls by where the task was found")
+        metrics.describe("taskmanager_tasks", "Tasks in the store (absent until loaded)")
+        metrics.describe("taskmanager_search_terms", "Distinct words in the search index")
+        metrics.describe("taskmanager_storage_bytes", "Size of the files backing the store")
+        metrics.describe("taskmanager_storage_read_bytes_total", "File bytes read by the store")
+        metrics.describe("taskmanager_storage_written_bytes_total", "File bytes written by the store")
+        metrics.register_callback("taskmanager_tasks", self._task_count)
+        metrics.register_callback("taskmanager_search_terms", self._search_term_count)
+        metrics.register_callback("taskmanager_storage_bytes", self._store.disk_usage)
+        metrics.describe("taskmanager_archive_bytes", "Size of the archive segments")
+        metrics.register_callback("taskmanager_archive_bytes", self._archive.disk_usage)
+        cache = self.query_cache
+        for name, help_text in (
+            ("hits", "Query results served from the query cache"),
+            ("misses", "Query results computed because they were not cached or stale"),
+            ("evictions", "Query results dropped from the query cache to make room"),
+            ("invalidations", "Cached query results dropped because the tasks changed"),
+        ):
+            metric = f"taskmanager_query_cache_{name}_total"
+            metrics.describe(metric, help_text)
+            metrics.register_callback(metric, lambda name=name: getattr(cache, name), "counter")
+        metrics.describe("taskmanager_query_cache_entries", "Results held by the query cache")
+        metrics.describe("taskmanager_query_cache_bytes", "Estimated memory taken by the query cache")
+        metrics.register_callback("taskmanager_query_cache_entries", lambda: len(cache))
+        metrics.register_callback("taskmanager_query_cache_bytes", lambda: cache.bytes)
+        metrics.register_callback(
+            "taskmanager_storage_read_bytes_total", lambda: getattr(self._store, "bytes_read", None), "counter"
+        )
+        metrics.register_callback(
+            "taskmanager_storage_written_bytes_total", lambda: getattr(self._store, "bytes_written", None), "counter"
+        )
+
+    def _task_count(self) -> Optional[int]:
+        """Number of tasks, or None if the store has not been loaded yet."""
+        tasks = self.__dict__.get("_tasks")
+        return None if tasks is None else len(tasks)
+
+    def _search_term_count(self) -> Optional[int]:
+        """Size of the search index vocabulary, or None if it has not been built."""
+        search_index = self.__dict__.get("_search_index")
+        return None if search_index is None else len(search_index)
+
+    def stats(self) -> Dict[str, Any]:
         """
-        Load tasks from the storage file.
+        Report store sizes, I/O totals and the metrics collected so far.
+
+        Nothing is loaded to answer this, so it is cheap to call often.
 
         Returns:
-            List of Task objects
+            Dict with "tasks" (None until the store is loaded),
+            "search_terms" (None until the search index is built),
+            "storage_bytes", "bytes_read" and "bytes_written" (None where
+            the backend does not track them), "archive_bytes",
+            "query_cache", the QueryCache.stats(), and "metrics", the
+            Metrics.snapshot(), or None when metrics are disabled
         """
-        tasks = []
-        if os.path.exists(self.storage_file):
-            try:
-                with open(self.storage_file, "r") as f:
-                    task_dicts = json.load(f)
-                    tasks = [Task.from_dict(task_dict) for task_dict in task_dicts]
-            except json.JSONDecodeError:
-                print(f"Error reading task file. Starting with empty task list.")
-        return tasks
+        return {
+            "tasks": self._task_count(),
+            "search_terms": self._search_term_count(),
+            "storage_bytes": self._store.disk_usage(),
+            "bytes_read": getattr(self._store, "bytes_read", None),
+            "bytes_written": getattr(self._store, "bytes_written", None),
+            "archive_bytes": self._archive.disk_usage(),
+            "query_cache": self.query_cache.stats(),
+            "metrics": None if self.metrics is None else self.metrics.snapshot(),
+        }
+
+    def _load_tasks(self) -> None:
+        """Load tasks and the id counter from the storage backend."""
+        # Taken before reading: a change racing with the load then shows up
+        # as a (harmless) extra reload instead of being missed.
+        self._signature = self._store.signature()
+        tasks, next_id = self._store.load()
+        self._next_id = next_id if self.shard is None else shard_id(self.shard, next_id)
+        if self.metrics is not None:
+            self.metrics.inc("taskmanager_loads_total")
+        previous = self.__dict__.get("_tasks")
+        # Dicts keep insertion order, so this doubles as the ordered task list
+        # while giving O(1) lookup and removal by id.
+        self._tasks: Dict[int, Task] = {task.id: task for task in tasks}
+        self._tasks_changed()
+        if previous is None:
+            # Clients that were waiting for the load have none of these tasks
+            self.change_log.restart()
+        else:
+            self.change_log.append_diff(previous, self._tasks)
+        for name in INDEX_STATE:
+            # Built from the new tasks, now or on first use
+            self.__dict__.pop(name, None)
+            if not self._lazy:
+                self._build_index(name)
+
+    def _tasks_changed(
+        self,
+        search: bool = True,
+        filters: bool = True,
+        states: Optional[Iterable[Tuple[bool, str]]] = None
+    ) -> None:
+        """
+        Bump the generation counters after a change to the in-memory tasks.
+
+        Args:
+            search: Whether the change can change search_tasks() results
+            filters: Whether it can change query() and page() results
+            states: (completed, priority) of the changed tasks before and
+                after the change; every cached query and page result is
+                invalidated when omitted
+        """
+        self._generation += 1
+        if search:
+            self._search_generation += 1
+        if not filters:
+            return
+        if states is None:
+            self._filter_generation += 1
+            return
+        counters = self._filter_counters
+        counters["all"] += 1
+        # Adds and deletes change which tasks fall in a creation time range,
+        # and updates can reorder them
+        counters["created"] += 1
+        for completed, priority in states:
+            counters[("completed", completed)] += 1
+            counters[("priority", priority)] += 1
+
+    def _filter_generation_of(
+        self,
+        completed: Optional[bool],
+        priority: Union[str, Iterable[str], None],
+        created_between: Optional[Tuple[TimeBound, TimeBound]]
+    ) -> Tuple[int, ...]:
+        """
+        Get the generation of the tasks a query with these filters reads.
+
+        Only changes to tasks that had the filtered values move it, so, for
+        example, adding an active task leaves cached results for completed
+        tasks valid: a change to a task that matches no filter in either
+        state cannot change the result.
+
+        Args:
+            completed: Completion status filter, see query
+            priority: Priority filter
+            created_between: Creation time bounds
+
+        Returns:
+            Tuple of counters to compare cached results against
+        """
+        counters = self._filter_counters
+        generation = [self._filter_generation]
+        if completed is not None:
+            generation.append(counters[("completed", bool(completed))])
+        if priority is not None:
+            generation.extend(counters[("priority", level)] for level in normalize_priorities(priority))
+        if created_between is not None:
+            generation.append(counters["created"])
+        if len(generation) == 1:
+            generation.append(counters["all"])
+        return tuple(generation)
+
+    def _built_indexes(self) -> List[Any]:
+        """
+        Get the indexes built so far, for mutations to keep up to date.
+
+        Indexes not built yet need no maintenance: they are built from the
+        current tasks on first use.
+
+        Returns:
+            List of built indexes
+        """
+        return [self.__dict__[name] for name in INDEX_STATE if name in self.__dict__]
+
+    def _build_index(self, name: str) -> None:
+        """
+        Build one of the INDEX_STATE indexes over the loaded tasks.
+
+        Args:
+            name: Attribute name of the index
+        """
+        module, class_name = INDEX_TYPES[name]
+        index_type = getattr(importlib.import_module(module), class_name)
+        if hasattr(index_type, "from_tasks"):
+            # Built with one sort rather than one sorted insertion per task
+            setattr(self, name, index_type.from_tasks(self._tasks.values()))
+            return
+        index = index_type()
+        for task in self._tasks.values():
+            index.add(task)
+        setattr(self, name, index)
 
     def _save_tasks(self) -> None:
-        """Save tasks to the storage file."""
-        task_dicts = [task.to_dict() for task in self.tasks]
-        with open(self.storage_file, "w") as f:
-            json.dump(task_dicts, f, indent=2)
+        """Save all tasks to the storage backend."""
+        self._store.save(self._tasks.values(), self._next_id)
+        self._signature = self._store.signature()
+
+    def _record(self, op: str, task: Task) -> None:
+        """
+        Persist a single mutation through the storage backend.
+
+        Args:
+            op: Mutation type ("add", "update" or "delete")
+            task: The task affected by the mutation
+        """
+        self.change_log.append(op, task)
+        if not self.autosave:
+            # Written out as a whole by the next flush()
+            self._dirty = True
+            self._pending += 1
+            if self.commit_every is not None and self._pending >= self.commit_every:
+                self.flush()
+            return
+        self._store.record(op, task, self._tasks.values(), self._next_id)
+        self._signature = self._store.signature()
+
+    def flush(self) -> None:
+        """Persist mutations held back while autosave is off."""
+        with self._mutex:
+            if self._dirty:
+                self._save_tasks()
+                self._dirty = False
+                self._pending = 0
+                self._store.end_write()
+
+    def _flush_loop(self) -> None:
+        """Background group commit and interval fsync."""
+        interval = self.commit_interval if self.commit_interval is not None else DEFAULT_SYNC_INTERVAL
+        while not self._stop_flusher.wait(interval):
+            self.flush()
+            if self.durability == "interval":
+                self._store.sync()
+
+    @contextmanager
+    def _writing(self) -> Iterator[None]:
+        """
+        Hold the store's inter-process write lock around a mutation.
 
-    def add_task(self, title: str, description: str = "", priority: str = "medium") -> Task:
+        Changes other processes made since the last load are picked up once
+        the lock is taken, so the mutation applies to the latest tasks
+        instead of overwriting them. While autosave is off the lock stays
+        held until the pending changes are flushed.
+        """
+        with self._mutex:
+            if self._store.write_lock.held:
+                yield
+                return
+            self._store.begin_write()
+            try:
+                self.reload_if_changed()
+                yield
+                self._archive_if_due()
+            finally:
+                if not self._dirty:
+                    self._store.end_write()
+
+    def has_external_changes(self) -> bool:
+        """
+        Check whether another process changed the store since it was loaded.
+
+        This only stats the storage files, so it is cheap to call often.
+
+        Returns:
+            True if the store should be reloaded
+        """
+        if "_signature" not in self.__dict__:
+            return False
+        return self._store.signature() != self._signature
+
+    def reload_if_changed(self) -> bool:
+        """
+        Reload the store if another process changed it.
+
+        Pending changes are never discarded: while autosave is off and
+        changes are unflushed, no reload happens.
+
+        Returns:
+            True if the store was reloaded
+        """
+        if not self.has_external_changes():
+            return False
+        with self._mutex:
+            if self._dirty:
+                return False
+            self._load_tasks()
+            return True
+
+    @property
+    def revision(self) -> int:
+        """Revision of the latest change, see changes_since()."""
+        return self.change_log.revision
+
+    def changes_since(self, revision: int) -> List[Change]:
+        """
+        Get the changes made after a revision, to bring a copy of the tasks up to date.
+
+        Start with changes_since(0), which lists every task, then pass the
+        revision of the last change applied. Changes other processes made
+        are only included once the store is reloaded (see watch() and
+        reload_if_changed()).
+
+        Args:
+            revision: Revision the caller's copy is at
+
+        Returns:
+            The changes in revision order; empty if there are none. If the
+            change log no longer reaches back to the revision, a "reset"
+            followed by an "add" for every task
+        """
+        # Loads the store first in lazy mode, which starts a new revision
+        tasks = self._tasks
+        changes = self.change_log.since(revision)
+        if changes is None:
+            return reset_changes(self.change_log.revision, tasks.values())
+        return changes
+
+    def watch(
+        self,
+        revision: int,
+        timeout: Optional[float] = None,
+        poll_interval: float = DEFAULT_WATCH_INTERVAL
+    ) -> List[Change]:
+        """
+        Wait until there are changes after a revision, and return them.
+
+        Changes made through this service return at once; other processes'
+        changes are found by checking the store files for changes every
+        poll_interval seconds and reloading.
+
+        Args:
+            revision: Revision the caller's copy is at
+            timeout: Most seconds to wait, or None to wait for a change
+            poll_interval: Seconds between checks of the store files
+
+        Returns:
+            The changes, as from changes_since(); empty on timeout
+        """
+        return watch_changes(
+            self.reload_if_changed, self.changes_since, self.change_log, revision, timeout, poll_interval
+        )
+
+    def close(self) -> None:
+        """Flush pending changes and background work and release storage resources."""
+        if self._flusher is not None:
+            self._stop_flusher.set()
+            self._flusher.join()
+        atexit.unregister(self.flush)
+        self.flush()
+        if self.durability == "interval":
+            self._store.sync()
+        self._store.close()
+        scanner = self.__dict__.get("_scanner")
+        if scanner is not None:
+            scanner.close()
+
+    @contextmanager
+    def batch(self) -> Iterator['TaskService']:
+        """
+        Defer persistence of every mutation in the block to a single write.
+
+        Batches nest; only the outermost one writes. This is not a
+        transaction: if the block raises, the changes made so far are still
+        persisted.
+
+        Yields:
+            This service
+        """
+        with self._writing():
+            autosave = self.autosave
+            self.autosave = False
+            try:
+                yield self
+            finally:
+                self.autosave = autosave
+                if autosave:
+                    self.flush()
+
+    def add_task(
+        self,
+        title: str,
+        description: str = "",
+        priority: str = "medium",
+        due_at: TimeBound = None,
+        remind_at: TimeBound = None
+    ) -> Task:
         """
         Add a new task.
 
@@ -54,29 +785,261 @@ class TaskService:
             title: Task title
             description: Task description
             priority: Task priority (low, medium, high)
+            due_at: When the task is due, or None
+            remind_at: When to remind about the task (see
+                schedule_reminders), or None
 
         Returns:
             The newly created Task
         """
-        task_id = max([task.id for task in self.tasks], default=0) + 1
-        task = Task(task_id, title, description, priority)
-        self.tasks.append(task)
-        self._save_tasks()
+        return self._insert_task(title, description, priority, due_at=due_at, remind_at=remind_at)
+
+    def _insert_task(
+        self,
+        title: str,
+        description: str = "",
+        priority: str = "medium",
+        completed: bool = False,
+        created_at: Union[str, int, None] = None,
+        completed_at: Union[str, int, None] = None,
+        due_at: TimeBound = None,
+        remind_at: TimeBound = None
+    ) -> Task:
+        """
+        Create, index and persist a new task.
+
+        Args:
+            title: Task title
+            description: Task description
+            priority: Task priority (low, medium, high)
+            completed: Whether the task starts out completed
+            created_at: Creation time, or None for now
+            completed_at: Completion time of a completed task, or None if
+                unknown
+            due_at: Due date, or None
+            remind_at: Reminder time, or None
+
+        Returns:
+            The newly created Task
+        """
+        with self._writing():
+            # Built before taking the id so invalid data does not burn one
+            task = Task(
+                self._next_id, title, description, priority, completed, created_at,
+                completed_at=completed_at if completed else None, due_at=due_at, remind_at=remind_at
+            )
+            task_id = task.id
+            self._next_id += self._id_step
+            self._tasks[task_id] = task
+            self._tasks_changed(states=[(task.completed, task.priority)])
+            for index in self._built_indexes():
+                index.add(task)
+            self._record("add", task)
         return task
 
-    def get_all_tasks(self, show_completed: bool = True) -> List[Task]:
+    def get_all_tasks(self, show_completed: bool = True, include_archived: bool = False) -> List[Task]:
         """
         Get all tasks, optionally filtering out completed tasks.
 
         Args:
             show_completed: Whether to include completed tasks
+            include_archived: Whether to also read the archive for completed
+                tasks moved there (ignored if show_completed is False)
 
         Returns:
-            List of Task objects
+            List of Task objects, ordered by id when archived tasks are included
         """
         if show_completed:
+            if include_archived:
+                return sorted(self.tasks + self.archived_tasks(), key=lambda task: task.id)
             return self.tasks
-        return [task for task in self.tasks if not task.completed]
+        return self.query(completed=False)
+
+    def query(
+        self,
+        completed: Optional[bool] = None,
+        priority: Union[str, Iterable[str], None] = None,
+        created_between: Optional[Tuple[TimeBound, TimeBound]] = None,
+        order_by: str = "id",
+        limit: Optional[int] = None,
+        offset: int = 0
+    ) -> List[Task]:
+        """
+        Get tasks matching all of the given filters.
+
+        Filters are answered from secondary indexes, so only matching tasks
+        are visited.
+
+        Args:
+            completed: Completion status to match, or None for any
+            priority: Priority level or levels to match, or None for any
+            created_between: Inclusive (start, end) bounds on the creation
+                time, each as epoch seconds, a datetime or a
+                "YYYY-MM-DD HH:MM:SS" string; either bound may be None
+            order_by: Field to sort by, one of ORDER_FIELDS, optionally
+                prefixed with "-" for descending order
+            limit: Maximum number of tasks to return, or None for all
+            offset: Number of matching tasks to skip
+
+        Returns:
+            List of matching Task objects
+
+        Raises:
+            ValueError: If order_by names an unknown field
+        """
+        key = ("query",) + filter_key(completed, priority, created_between) + (order_by, limit, offset)
+        tasks = self._cached(
+            key,
+            lambda: self._filter_generation_of(completed, priority, created_between),
+            lambda: self._query(completed, priority, created_between, order_by, limit, offset)
+        )
+        return list(tasks)
+
+    def _query(
+        self,
+        completed: Optional[bool],
+        priority: Union[str, Iterable[str], None],
+        created_between: Optional[Tuple[TimeBound, TimeBound]],
+        order_by: str,
+        limit: Optional[int],
+        offset: int
+    ) -> List[Task]:
+        """Run query() without the cache."""
+        field, descending = parse_order_by(order_by)
+        ids = self._matching_ids(completed, priority, created_between)
+
+        if field == "id":
+            sort_key = None
+        elif field == "created_at":
+            sort_key = lambda task_id: (self._filter_index.created_key(task_id), task_id)
+        else:
+            sort_key = lambda task_id: (PRIORITY_ORDER.get(self._tasks[task_id].priority, -1), task_id)
+
+        end = None if limit is None else offset + limit
+        if end is not None and end < len(ids):
+            # Partial selection is O(n log k) instead of a full sort
+            select = heapq.nlargest if descending else heapq.nsmallest
+            ordered = select(end, ids, key=sort_key)
+        else:
+            ordered = sorted(ids, key=sort_key, reverse=descending)
+        return [self._tasks[task_id] for task_id in ordered[offset:end]]
+
+    def page(
+        self,
+        completed: Optional[bool] = None,
+        priority: Union[str, Iterable[str], None] = None,
+        created_between: Optional[Tuple[TimeBound, TimeBound]] = None,
+        order_by: str = "id",
+        page_size: int = DEFAULT_PAGE_SIZE,
+        cursor: Optional[str] = None
+    ) -> TaskPage:
+        """
+        Get one page of tasks matching all of the given filters.
+
+        Pages are addressed by cursor rather than offset: each page starts
+        right after the last task of the previous one, so adding or deleting
+        earlier tasks never shifts or repeats results.
+
+        Args:
+            completed: Completion status to match, or None for any
+            priority: Priority level or levels to match, or None for any
+            created_between: Inclusive (start, end) creation time bounds,
+                see query
+            order_by: Field to sort by, see query
+            page_size: Maximum number of tasks on the page
+            cursor: next_cursor of the previous page, or None for the first
+
+        Returns:
+            TaskPage with the tasks, the cursor of the next page and the
+            total number of matching tasks
+
+        Raises:
+            ValueError: If order_by, page_size or cursor is invalid
+        """
+        key = ("page",) + filter_key(completed, priority, created_between) + (order_by, page_size, cursor)
+        page = self._cached(
+            key,
+            lambda: self._filter_generation_of(completed, priority, created_between),
+            lambda: self._page(completed, priority, created_between, order_by, page_size, cursor)
+        )
+        return page._replace(tasks=list(page.tasks))
+
+    def _page(
+        self,
+        completed: Optional[bool],
+        priority: Union[str, Iterable[str], None],
+        created_between: Optional[Tuple[TimeBound, TimeBound]],
+        order_by: str,
+        page_size: int,
+        cursor: Optional[str]
+    ) -> TaskPage:
+        """Run page() without the cache."""
+        field, descending = parse_order_by(order_by)
+        if page_size < 1:
+            raise ValueError("Page size must be positive")
+
+        ids = self._matching_ids(completed, priority, created_between)
+        tasks = (self._tasks[task_id] for task_id in ids)
+        sort_key = lambda task: page_key(task, field)
+        if cursor is not None:
+            after = decode_cursor(cursor)
+            if descending:
+                tasks = (task for task in tasks if sort_key(task) < after)
+            else:
+                tasks = (task for task in tasks if sort_key(task) > after)
+
+        # One extra task tells whether another page follows
+        select = heapq.nlargest if descending else heapq.nsmallest
+        return build_page(select(page_size + 1, tasks, key=sort_key), page_size, field, len(ids))
+
+    def _cached(self, key: Tuple, generation: Callable[[], Any], compute: Callable[[], R]) -> R:
+        """
+        Get a result from the query cache, computing and caching it on a miss.
+
+        Args:
+            key: Normalized query
+            generation: Returns the generation of the data the result depends on
+            compute: Computes the result
+
+        Returns:
+            The result, shared with the cache: callers must copy it before
+            handing it out
+        """
+        if "_tasks" not in self.__dict__:
+            # Lazy services load the store on first use, which moves the
+            # generations; loaded first so the snapshot below stays current
+            self.__getattr__("_tasks")
+        # Taken before computing: a change made meanwhile (e.g. by a flush
+        # racing a concurrent reader) then leaves the cached result stale
+        # instead of filing it under the newer generation
+        current = generation()
+        result = self.query_cache.get(key, current)
+        if result is None:
+            result = compute()
+            self.query_cache.put(key, current, result)
+        return result
+
+    def _matching_ids(
+        self,
+        completed: Optional[bool],
+        priority: Union[str, Iterable[str], None],
+        created_between: Optional[Tuple[TimeBound, TimeBound]]
+    ) -> Union[List[int], Iterable[int]]:
+        """Collect the ids of tasks matching the query filters from the secondary indexes."""
+        candidates = []
+        if completed is not None:
+            candidates.append(self._filter_index.ids_with_completed(completed))
+        if priority is not None:
+            candidates.append(self._filter_index.ids_with_priority(normalize_priorities(priority)))
+        if created_between is not None:
+            candidates.append(self._filter_index.ids_created_between(*normalize_time_range(created_between)))
+
+        if not candidates:
+            return self._tasks.keys()
+        # Probe the larger candidate sets with members of the smallest
+        candidates.sort(key=len)
+        others = [c if isinstance(c, set) else set(c) for c in candidates[1:]]
+        return [task_id for task_id in candidates[0] if all(task_id in c for c in others)]
 
     def get_task_by_id(self, task_id: int) -> Task:
         """
@@ -91,53 +1054,120 @@ class TaskService:
         Raises:
             TaskNotFoundException: If no task with the given ID exists
         """
-        for task in self.tasks:
-            if task.id == task_id:
-                return task
-        raise TaskNotFoundException(f"Task with ID {task_id} not found")
+        if "_tasks" in self.__dict__:
+            task = self._tasks.get(task_id)
+            if task is None:
+                return self._require_archived(task_id)
+            if self.metrics is not None:
+                self.metrics.inc("taskmanager_lookups_total", source="memory")
+            return task
+        # Not loaded yet (lazy mode): a point read should not pull in the whole store
+        if self.metrics is not None:
+            self.metrics.inc("taskmanager_lookups_total", source="store")
+        task = self._store.find(task_id)
+        if task is None:
+            return self._require_archived(task_id)
+        return task
+
+    def _require_task(self, task_id: int) -> Task:
+        """
+        Get a task from the loaded store, for callers that will mutate it.
+
+        Args:
+            task_id: ID of the task to retrieve
+
+        Returns:
+            The requested Task
+
+        Raises:
+            TaskNotFoundException: If no task with the given ID exists
+        """
+        task = self._tasks.get(task_id)
+        if task is None:
+            raise TaskNotFoundException(f"Task with ID {task_id} not found")
+        return task
+
+    def _require_archived(self, task_id: int) -> Task:
+        """
+        Get a task missing from the store from the archive.
+
+        Args:
+            task_id: ID of the task to retrieve
+
+        Returns:
+            The archived Task
+
+        Raises:
+            TaskNotFoundException: If the task is not archived either
+        """
+        task = self._archived_tasks().get(task_id)
+        if task is None:
+            raise TaskNotFoundException(f"Task with ID {task_id} not found")
+        if self.metrics is not None:
+            self.metrics.inc("taskmanager_lookups_total", source="archive")
+        return task
 
-    def update_task(self, task_id: int, **kwargs) -> Task:
+    def update_task(self, task_id: int, expected_version: Optional[int] = None, **kwargs) -> Task:
         """
         Update a task with the given ID.
 
         Args:
             task_id: ID of the task to update
-            **kwargs: Task attributes to update
+            expected_version: Version the caller last saw; the update is
+                rejected if the task has changed since (compare-and-swap)
+            **kwargs: Task attributes to update: title, description,
+                priority, completed, due_at or remind_at (None clears
+                the last two)
 
         Returns:
             The updated Task
 
         Raises:
             TaskNotFoundException: If no task with the given ID exists
+            StaleTaskException: If the task is no longer at expected_version
+            InvalidTaskDataException: If a new value is invalid; the task is
+                left unchanged
         """
-        task = self.get_task_by_id(task_id)
-        
-        if "title" in kwargs:
-            task.title = kwargs["title"]
-        if "description" in kwargs:
-            task.description = kwargs["description"]
-        if "priority" in kwargs:
-            task.priority = kwargs["priority"]
-        if "completed" in kwargs:
-            task.completed = kwargs["completed"]
-            
-        self._save_tasks()
+        with self._writing():
+            if self._writes_in_place():
+                return self._write_in_place("update", task_id, expected_version, kwargs)
+            task = self._require_task(task_id)
+            check_version(task, expected_version)
+            before = (task.completed, task.priority)
+            task.apply_changes(kwargs)
+            task.version += 1
+            self._tasks_changed(
+                search=not TEXT_FIELDS.isdisjoint(kwargs),
+                filters=not TEXT_FIELDS.issuperset(kwargs),
+                states=[before, (task.completed, task.priority)]
+            )
+
+            search_index = self.__dict__.get("_search_index")
+            if search_index is not None and ("title" in kwargs or "description" in kwargs):
+                search_index.update(task)
+            for name in ("_filter_index", "_due_index"):
+                index = self.__dict__.get(name)
+                if index is not None:
+                    index.update(task)
+            self._record("update", task)
         return task
 
-    def complete_task(self, task_id: int) -> Task:
+    def complete_task(self, task_id: int, expected_version: Optional[int] = None) -> Task:
         """
         Mark a task as complete.
 
         Args:
             task_id: ID of the task to mark as complete
+            expected_version: Version the caller last saw, see update_task
 
         Returns:
             The updated Task
 
         Raises:
             TaskNotFoundException: If no task with the given ID exists
+            StaleTaskException: If the task is no longer at expected_version
         """
-        return self.update_task(task_id, completed=True)
+        return self.update_task(task_id, expected_version, completed=True)
 
     def delete_task(self, task_id: int) -> Task:
         """
@@ -152,23 +1182,486 @@ class TaskService:
         Raises:
             TaskNotFoundException: If no task with the given ID exists
         """
-        task = self.get_task_by_id(task_id)
-        self.tasks.remove(task)
-        self._save_tasks()
+        with self._writing():
+            if self._writes_in_place():
+                return self._write_in_place("delete", task_id)
+            task = self._require_task(task_id)
+            del self._tasks[task_id]
+            self._tasks_changed(states=[(task.completed, task.priority)])
+            for index in self._built_indexes():
+                index.remove(task_id)
+            self._record("delete", task)
+        return task
+
+    def _writes_in_place(self) -> bool:
+        """
+        Whether a single update or delete can skip loading the store.
+
+        True while a lazy service has not loaded its tasks, if the store
+        can append the change on its own (the journal) and nothing needs
+        the other tasks: every change is saved at once and there is no
+        archive policy.
+        """
+        return (
+            "_tasks" not in self.__dict__
+            and self._store.APPENDS_RECORDS
+            and self.autosave
+            and self.archive_policy is None
+        )
+
+    def _write_in_place(
+        self,
+        op: str,
+        task_id: int,
+        expected_version: Optional[int] = None,
+        changes: Optional[Dict[str, Any]] = None
+    ) -> Task:
+        """
+        Update or delete one task with a point read and a journal append.
+
+        Must be called from _writing(), when _writes_in_place() is true.
+
+        Args:
+            op: "update" or "delete"
+            task_id: ID of the task
+            expected_version: Version the caller last saw, for updates
+            changes: Attributes to update, as given to update_task
+
+        Returns:
+            The updated or deleted Task
+
+        Raises:
+            TaskNotFoundException: If no task with the given ID exists
+            StaleTaskException: If the task is no longer at expected_version
+        """
+        task = self._store.find(task_id)
+        if task is None:
+            raise TaskNotFoundException(f"Task with ID {task_id} not found")
+        if op == "update":
+            check_version(task, expected_version)
+            task.apply_changes(changes)
+            task.version += 1
+        self._store.record(op, task)
+        self.change_log.append(op, task)
+        return task
+
+    def add_tasks(self, entries: Iterable[Dict[str, Any]]) -> List[Task]:
+        """
+        Add many tasks with a single write.
+
+        Args:
+            entries: Dicts with a "title" and optionally "description",
+                "priority", "completed", "created_at", "completed_at",
+                "due_at" and "remind_at"
+
+        Returns:
+            The newly created Tasks
+        """
+        with self.batch():
+            return [
+                self._insert_task(
+                    entry["title"],
+                    entry.get("description") or "",
+                    entry.get("priority") or "medium",
+                    bool(entry.get("completed", False)),
+                    entry.get("created_at") or None,
+                    entry.get("completed_at") or None,
+                    entry.get("due_at") or None,
+                    entry.get("remind_at") or None
+                )
+                for entry in entries
+            ]
+
+    def update_tasks(
+        self,
+        updates: Union[Mapping[int, Dict[str, Any]], Iterable[Tuple[int, Dict[str, Any]]]]
+    ) -> List[Task]:
+        """
+        Update many tasks with a single write.
+
+        Args:
+            updates: Mapping (or pairs) of task ID to the attributes to
+                update, as accepted by update_task
+
+        Returns:
+            The updated Tasks
+
+        Raises:
+            TaskNotFoundException: If any ID does not exist; nothing is
+                updated in that case
+            InvalidTaskDataException: If any new value is invalid; nothing
+                is updated in that case
+        """
+        updates = list(updates.items() if isinstance(updates, Mapping) else updates)
+        with self.batch():
+            # Checked on copies first, so a bad value anywhere updates nothing
+            for task_id, changes in updates:
+                self._require_task(task_id).copy().apply_changes(changes)
+            return [self.update_task(task_id, **changes) for task_id, changes in updates]
+
+    def delete_tasks(self, task_ids: Iterable[int]) -> List[Task]:
+        """
+        Delete many tasks with a single write.
+
+        Args:
+            task_ids: IDs of the tasks to delete
+
+        Returns:
+            The deleted Tasks
+
+        Raises:
+            TaskNotFoundException: If any ID does not exist; nothing is
+                deleted in that case
+        """
+        task_ids = list(dict.fromkeys(task_ids))
+        with self.batch():
+            for task_id in task_ids:
+                self._require_task(task_id)
+            return [self.delete_task(task_id) for task_id in task_ids]
+
+    def next_due(self, n: int = 10) -> List[Task]:
+        """
+        Get the active tasks with the earliest due dates, overdue ones included.
+
+        Answered from a sorted index in O(log n + k), without scanning the tasks.
+
+        Args:
+            n: Most tasks to return
+
+        Returns:
+            Tasks by due date, earliest first
+
+        Raises:
+            ValueError: If n is negative
+        """
+        if n < 0:
+            raise ValueError("n must not be negative")
+        tasks = self._tasks
+        return [tasks[task_id] for task_id in self._due_index.due_ids(limit=n)]
+
+    def overdue(self, now: TimeBound = None, limit: Optional[int] = None) -> List[Task]:
+        """
+        Get the active tasks past their due date.
+
+        Args:
+            now: Current time (defaults to the clock)
+            limit: Most tasks to return, or None for all
+
+        Returns:
+            Tasks by due date, most overdue first
+        """
+        before = int(time.time()) if now is None else parse_timestamp(now)
+        tasks = self._tasks
+        return [tasks[task_id] for task_id in self._due_index.due_ids(before, limit)]
+
+    def reminders_between(self, after: TimeBound, until: TimeBound) -> List[Task]:
+        """
+        Get the active tasks whose reminder time falls in a range.
+
+        Args:
+            after: Exclusive start of the range
+            until: Inclusive end of the range
+
+        Returns:
+            Tasks by reminder time, earliest first
+        """
+        # Locked: the reminder scheduler calls this from its own thread
+        with self._mutex:
+            tasks = self._tasks
+            return [
+                tasks[task_id]
+                for task_id in self._due_index.reminder_ids(parse_timestamp(after), parse_timestamp(until))
+            ]
+
+    def next_reminder_time(self, after: TimeBound = None) -> Optional[int]:
+        """
+        Get the time of the next reminder of an active task.
+
+        Args:
+            after: Only look at reminders after this time (defaults to now)
+
+        Returns:
+            The reminder time in epoch seconds, or None if there is none
+        """
+        # Locked, see reminders_between
+        with self._mutex:
+            return self._due_index.next_reminder(int(time.time()) if after is None else parse_timestamp(after))
+
+    def schedule_reminders(
+        self,
+        callback: Callable[[Task], object],
+        since: TimeBound = None,
+        poll_interval: float = DEFAULT_WATCH_INTERVAL
+    ) -> 'ReminderScheduler':
+        """
+        Call back for every active task as its reminder time arrives.
+
+        Runs on a background thread until the returned scheduler is
+        stopped. Reminders set through this service wake it at once; other
+        processes' changes are picked up every poll_interval seconds.
+
+        Args:
+            callback: Called with each task; exceptions it raises are
+                counted in the scheduler's failures and otherwise ignored
+            since: Fire reminders after this time (defaults to now);
+                earlier ones are considered handled
+            poll_interval: Most seconds between checks for other
+                processes' changes
+
+        Returns:
+            The started ReminderScheduler
+        """
+        # Imported here: see the TYPE_CHECKING imports
+        from src.services.reminder_scheduler import ReminderScheduler
+
+        return ReminderScheduler(
+            self.reload_if_changed, self.reminders_between, self.next_reminder_time, self.change_log, callback,
+            None if since is None else parse_timestamp(since), poll_interval
+        ).start()
+
+    def _archive_if_due(self) -> None:
+        """Apply archive_policy if ARCHIVE_CHECK_INTERVAL has passed since it last ran."""
+        if self.archive_policy is None or time.monotonic() < self._archive_due:
+            return
+        # Set first: archive_completed writes, which comes back here
+        self._archive_due = time.monotonic() + ARCHIVE_CHECK_INTERVAL
+        self.archive_completed()
+
+    def archive_completed(self, policy: Optional[Sequence[Optional[float]]] = None) -> int:
+        """
+        Move completed tasks from the store to its archive.
+
+        Archived tasks leave the in-memory tasks and indexes, so loads,
+        queries and searches only pay for active work; they are read back
+        only by archived_tasks(), search_archive(), restore_task(),
+        get_all_tasks(include_archived=True) and lookups of ids missing
+        from the store. The change feed reports them as deleted.
+
+        Args:
+            policy: Which tasks to move, as an ArchivePolicy or a sequence
+                of its fields (as sent to a daemon); defaults to
+                archive_policy
+
+        Returns:
+            Number of tasks archived
+
+        Raises:
+            ValueError: If there is no policy or it is invalid
+        """
+        # Imported here: see the TYPE_CHECKING imports
+        from src.services.archive_policy import ArchivePolicy, select_archivable
+
+        policy = policy if policy is not None else self.archive_policy
+        if policy is None:
+            raise ValueError("No archive policy given")
+        policy = ArchivePolicy(*policy).validate()
+        with self.batch():
+            tasks = select_archivable(self.query(completed=True), self._task_count(), policy)
+            # Archived before leaving the store: a crash in between leaves
+            # both copies, and the store's copy is the one used
+            self._archive.append(tasks)
+            for task in tasks:
+                self.delete_task(task.id)
+        return len(tasks)
+
+    def _archived_tasks(self) -> Dict[int, Task]:
+        """Archived tasks by id, read again only when the segment files change."""
+        signature = self._archive.signature()
+        if signature != self._archive_signature:
+            self._archived = self._archive.load()
+            self._archive_signature = signature
+        return self._archived
+
+    def archived_tasks(self) -> List[Task]:
+        """
+        Get the tasks moved to the archive, reading it if it changed.
+
+        Returns:
+            Archived tasks, in the order they were archived
+        """
+        archived = self._archived_tasks()
+        # Tasks also in the store were restored, or archived by a run cut
+        # short before removing them; the store's copy is the one used
+        stored = self._stored_ids(archived.keys())
+        return [task for task in archived.values() if task.id not in stored]
+
+    def _stored_ids(self, task_ids: Iterable[int]) -> Set[int]:
+        """
+        Find which of some ids are in the store.
+
+        Args:
+            task_ids: IDs to look for
+
+        Returns:
+            The ids that are in the store
+        """
+        tasks = self._tasks
+        return {task_id for task_id in task_ids if task_id in tasks}
+
+    def search_archive(self, keyword: str, limit: Optional[int] = None) -> List[Task]:
+        """
+        Search archived tasks whose title or description contains a keyword, ignoring case.
+
+        Args:
+            keyword: Text to look for
+            limit: Maximum number of results, or None for all
+
+        Returns:
+            Matching archived tasks, in the order they were archived
+        """
+        keyword = keyword.lower()
+        results = (
+            task for task in self.archived_tasks()
+            if keyword in task.title.lower() or keyword in task.description.lower()
+        )
+        return list(islice(results, limit))
+
+    def restore_task(self, task_id: int) -> Task:
+        """
+        Move an archived task back to the store.
+
+        Args:
+            task_id: ID of the archived task
+
+        Returns:
+            The restored Task
+
+        Raises:
+            TaskNotFoundException: If no task with the given ID is archived
+        """
+        with self._writing():
+            archived = self._archived_tasks().get(task_id)
+            if archived is None:
+                raise TaskNotFoundException(f"No archived task with ID {task_id}")
+            task = self._tasks.get(task_id)
+            if task is None:
+                task = archived.copy()
+                self._tasks[task_id] = task
+                # Restored tasks are older than most: put it back in id
+                # (creation) order, a near-linear sort of nearly sorted ids
+                self._tasks = dict(sorted(self._tasks.items()))
+                self._tasks_changed(states=[(task.completed, task.priority)])
+                for index in self._built_indexes():
+                    index.add(task)
+                self._record("add", task)
+            # Written after the store: a crash in between leaves both
+            # copies, and the store's copy is the one used
+            self._archive.remove([task_id])
         return task
 
-    def search_tasks(self, keyword: str) -> List[Task]:
+    def search_tasks(
+        self,
+        keyword: str,
+        limit: Optional[int] = None,
+        mode: str = "index",
+        prefix: bool = True,
+        offset: int = 0
+    ) -> List[Task]:
         """
-        Search for tasks containing the keyword.
+        Search for tasks matching the keyword.
+
+        In "index" mode every word of the keyword must match a word in the
+        task title or description, and results are ranked by relevance. In
+        "substring" mode the keyword is matched as a plain substring and
+        results keep creation order.
 
         Args:
             keyword: Keyword to search for in task titles and descriptions
+            limit: Maximum number of results, or None for all
+            mode: Search mode, one of SEARCH_MODES
+            prefix: In "index" mode, whether words also match longer words
+                they are a prefix of
+            offset: Number of leading results to skip
 
         Returns:
             List of matching Task objects
+
+        Raises:
+            ValueError: If the search mode is unknown
         """
+        # Imported here, like the index itself (see INDEX_TYPES)
+        from src.services.search_index import tokenize
+
+        if mode not in SEARCH_MODES:
+            raise ValueError(f"Unknown search mode '{mode}'. Expected one of: {', '.join(SEARCH_MODES)}")
+        words = tokenize(keyword)
+        if mode == "index" and words:
+            key = ("search", tuple(words), prefix, limit, offset)
+        else:
+            key = ("substring", keyword.lower(), limit, offset)
+        tasks = self._cached(
+            key, lambda: self._search_generation, lambda: self._search(keyword, limit, mode, prefix, offset)
+        )
+        return list(tasks)
+
+    def _search(self, keyword: str, limit: Optional[int], mode: str, prefix: bool, offset: int) -> List[Task]:
+        """Run search_tasks() without the cache."""
+        from src.services.search_index import tokenize
+
+        end = None if limit is None else offset + limit
+
+        if mode == "index" and tokenize(keyword):
+            return [task for task, _ in self._ranked_search(keyword, end, prefix)[offset:]]
+
+        # Substring scan, also used for keywords with no indexable words
         keyword = keyword.lower()
-        return [
-            task for task in self.tasks
+        if self._scans_in_parallel():
+            results = self._parallel_search(keyword, end)
+            if results is not None:
+                return results[offset:end]
+        results = (
+            task for task in self._tasks.values()
             if keyword in task.title.lower() or keyword in task.description.lower()
-        ]
+        )
+        return list(islice(results, offset, end))
+
+    def _ranked_search(self, keyword: str, limit: Optional[int], prefix: bool) -> List[Tuple[Task, int]]:
+        """
+        Search the index, keeping each task's relevance score.
+
+        Args:
+            keyword: Keyword with at least one indexable word
+            limit: Maximum number of results, or None for all
+            prefix: Whether words also match longer words they are a prefix of
+
+        Returns:
+            List of (task, score) pairs, best match first; equal scores are
+            ordered by task id
+        """
+        hits = self._search_index.search(keyword, limit=limit, prefix=prefix)
+        return [(self._tasks[task_id], score) for task_id, score in hits]
+
+    def _scans_in_parallel(self) -> bool:
+        """Whether substring scans should run on worker processes."""
+        if self.parallel_scan is not None:
+            return self.parallel_scan
+        workers = self.scan_workers or os.cpu_count() or 1
+        return workers > 1 and len(self._tasks) >= PARALLEL_SCAN_THRESHOLD
+
+    def _parallel_search(self, keyword: str, end: Optional[int]) -> Optional[List[Task]]:
+        """
+        Run a substring scan on the worker pool.
+
+        Args:
+            keyword: Lowercase keyword
+            end: Number of leading matches needed, or None for all
+
+        Returns:
+            Matching tasks in creation order, or None if the scan must be
+            done serially after all
+        """
+        # Imported here: serial scans never need the worker pool machinery
+        from src.services.parallel_scan import ParallelScanner
+
+        # ParallelScanner is not thread-safe, and concurrent readers (see
+        # SharedTaskService) may search together; each scan uses every worker
+        # anyway, so they take turns
+        with self._mutex:
+            scanner = self.__dict__.get("_scanner")
+            if scanner is None:
+                scanner = self._scanner = ParallelScanner(self.scan_workers)
+            # An unchanged store file holds exactly the loaded tasks, in order
+            clean = not self._dirty and not self.has_external_changes()
+            if not scanner.prepare(self._tasks.values(), self._generation, self._store if clean else None):
+                return None
+            return scanner.search(keyword, end)
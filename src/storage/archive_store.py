@@ -0,0 +1,159 @@
+"""
+Compressed, append-only archive of tasks moved out of a store.
+
+The archive of ``<storage_file>`` is the directory
+``<storage_file>.archive``. Each archival run adds one gzip-compressed
+segment of JSON lines, written atomically and never modified:
+
+    {"op": "archive", "task": {...}}
+    {"op": "restore", "id": 12}
+
+A task's latest record wins, so restoring a task to the store only appends
+a "restore" record. Once there are more than MAX_SEGMENTS segments they are
+merged into one, which also drops restored tasks. Writers take the lock
+file ``<storage_file>.archive.lock``; readers take no lock.
+"""
+
+import json
+import os
+from typing import Dict, Iterable, List, Tuple
+
+from src.models.task import Task
+from src.storage.json_store import file_signature, file_size, write_file_atomic
+from src.utils.file_lock import FileLock
+
+ARCHIVE_SUFFIX = ".archive"
+SEGMENT_PREFIX = "segment-"
+SEGMENT_SUFFIX = ".jsonl.gz"
+# Segments kept before they are merged; each archival run adds one
+MAX_SEGMENTS = 32
+
+
+class TaskArchive:
+    """Reads and appends to the archive segments of one store."""
+
+    def __init__(self, path: str, fsync: bool = True):
+        """
+        Initialize the archive; nothing is read or created until needed.
+
+        Args:
+            path: Archive directory, usually the store path plus ARCHIVE_SUFFIX
+            fsync: Whether to fsync new segments before they become visible
+        """
+        self.path = path
+        self.fsync = fsync
+        self.bytes_read = 0
+        self.bytes_written = 0
+        self.write_lock = FileLock(path + ".lock")
+
+    def segments(self) -> List[str]:
+        """
+        List the segment files.
+
+        Returns:
+            Paths of the segments, oldest first
+        """
+        try:
+            names = os.listdir(self.path)
+        except FileNotFoundError:
+            return []
+        return [
+            os.path.join(self.path, name) for name in sorted(names)
+            if name.startswith(SEGMENT_PREFIX) and name.endswith(SEGMENT_SUFFIX)
+        ]
+
+    def signature(self) -> Tuple:
+        """
+        Fingerprint the segment files.
+
+        Returns:
+            A value that changes whenever the archive changes
+        """
+        return tuple((path, file_signature(path)) for path in self.segments())
+
+    def load(self) -> Dict[int, Task]:
+        """
+        Read every archived task.
+
+        Returns:
+            Archived tasks by id, in the order they were archived
+        """
+        while True:
+            try:
+                return self._read(self.segments())
+            except FileNotFoundError:
+                # A merge removed a segment after it was listed; list again
+                continue
+
+    def _read(self, segments: List[str]) -> Dict[int, Task]:
+        """Replay segments in order into archived tasks by id."""
+        # Imported here: commands that never read the archive skip it
+        import gzip
+
+        tasks: Dict[int, Task] = {}
+        for path in segments:
+            with open(path, "rb") as f:
+                data = f.read()
+            self.bytes_read += len(data)
+            for line in gzip.decompress(data).splitlines():
+                record = json.loads(line)
+                if record["op"] == "restore":
+                    tasks.pop(record["id"], None)
+                else:
+                    task = Task.from_dict(record["task"])
+                    # Re-archived tasks move to the end, like any later record
+                    tasks.pop(task.id, None)
+                    tasks[task.id] = task
+        return tasks
+
+    def append(self, tasks: Iterable[Task]) -> None:
+        """
+        Add tasks to the archive in a new segment.
+
+        Args:
+            tasks: Tasks to archive
+        """
+        self._write([{"op": "archive", "task": task.to_dict()} for task in tasks])
+
+    def remove(self, task_ids: Iterable[int]) -> None:
+        """
+        Record that tasks went back to the store.
+
+        Args:
+            task_ids: IDs of the restored tasks
+        """
+        self._write([{"op": "restore", "id": task_id} for task_id in task_ids])
+
+    def _write(self, records: List[Dict]) -> None:
+        """Write records as the next segment, merging segments once there are too many."""
+        if not records:
+            return
+        # Imported here, see _read
+        import gzip
+
+        with self.write_lock:
+            segments = self.segments()
+            merge = len(segments) >= MAX_SEGMENTS
+            if merge:
+                # The merged segment replaces the old ones: it takes the next
+                # number, so readers that still see them replay it last
+                merged = self._read(segments).values()
+                records = [{"op": "archive", "task": task.to_dict()} for task in merged] + records
+            os.makedirs(self.path, exist_ok=True)
+            last = os.path.basename(segments[-1]) if segments else SEGMENT_PREFIX + "0" + SEGMENT_SUFFIX
+            number = int(last[len(SEGMENT_PREFIX):-len(SEGMENT_SUFFIX)]) + 1
+            lines = b"".join(json.dumps(record, separators=(",", ":")).encode("utf-8") + b"\n" for record in records)
+            path = os.path.join(self.path, f"{SEGMENT_PREFIX}{number:08d}{SEGMENT_SUFFIX}")
+            self.bytes_written += write_file_atomic(path, [gzip.compress(lines)], fsync=self.fsync)
+            if merge:
+                for old in segments:
+                    os.remove(old)
+
+    def disk_usage(self) -> int:
+        """
+        Get the space taken by the segments.
+
+        Returns:
+            Size in bytes
+        """
+        return sum(file_size(path) for path in self.segments())
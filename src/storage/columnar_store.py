@@ -0,0 +1,455 @@
+"""
+Binary columnar snapshot storage for tasks.
+
+A snapshot holds one column per task field instead of one object per task:
+
+    header      magic, format version, flags, task count, next id
+    sections    offset of each column in SECTIONS order
+    ids         int64 per task, in creation order (ascending, unless flags say otherwise)
+    created     int64 epoch seconds per task
+    versions    int64 per task
+    priorities  uint8 priority code per task
+    completed   uint8 flag per task
+    titles      uint64 offsets (count + 1) followed by the UTF-8 text blob
+    descriptions  same layout as titles
+    completed_at  int64 epoch seconds per task, UNKNOWN_TIME where not known
+    due_at      int64 epoch seconds per task, UNKNOWN_TIME where there is none
+    remind_at   same layout as due_at
+
+Numbers are little-endian and every column starts on an 8-byte boundary, so
+a memory-mapped file can be viewed as typed arrays in place. Reading a
+snapshot therefore parses nothing up front: a point lookup binary-searches
+the id column and decodes the strings of a single task.
+"""
+
+import mmap
+import os
+import struct
+import sys
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from src.models.task import Task, PRIORITY_LEVELS
+from src.storage.json_store import JsonTaskStore, write_file_atomic
+from src.utils.exceptions import InvalidTaskDataException
+
+MAGIC = b"TASKCOL"
+FORMAT_VERSION = 1
+COLUMNAR_EXTENSIONS = (".tcol",)
+SECTIONS = (
+    "ids", "created", "versions", "priorities", "completed",
+    "title_offsets", "title_data", "description_offsets", "description_data", "completed_at", "due_at", "remind_at"
+)
+# Optional timestamp columns, in Task.from_stored argument order
+TIME_SECTIONS = ("completed_at", "due_at", "remind_at")
+# magic, format version, flags, task count, next id, then one offset per section
+HEADER = struct.Struct("<7sBBQQ" + "Q" * len(SECTIONS))
+# Stored in the TIME_SECTIONS columns for tasks without that time
+UNKNOWN_TIME = -2 ** 63
+ALIGNMENT = 8
+# Set when the id column is in ascending order and can be binary-searched
+FLAG_SORTED_IDS = 1
+# Size of one task's fixed-width fields plus its two pairs of string offsets
+ROW_BYTES = 6 * 8 + 2 + 2 * 2 * 8
+# Columns are stored little-endian; big-endian hosts swap them on the way in and out
+NATIVE_LITTLE_ENDIAN = sys.byteorder == "little"
+# Substring scans look rows up in the mapped offsets until a string table
+# has this many matches, then copy the offsets to a list, which is faster to
+# bisect but costs a pass over every row
+DENSE_MATCHES = 1024
+
+
+def _padding(size: int) -> bytes:
+    """Zero bytes that round a section of this size up to ALIGNMENT."""
+    return b"\0" * (-size % ALIGNMENT)
+
+
+def _to_bytes(column: array) -> bytes:
+    """Serialize a numeric column in little-endian order."""
+    if not NATIVE_LITTLE_ENDIAN and column.itemsize > 1:
+        column = array(column.typecode, column)
+        column.byteswap()
+    return column.tobytes()
+
+
+def encode_columns(tasks: Iterable[Task], next_id: int) -> List[bytes]:
+    """
+    Build the contents of a columnar snapshot.
+
+    Args:
+        tasks: Tasks to include, in creation order
+        next_id: Next id the allocator will hand out
+
+    Returns:
+        The file contents as a list of chunks
+
+    Raises:
+        InvalidTaskDataException: If a task has a priority outside
+            PRIORITY_LEVELS (see stored_priority)
+    """
+    ids, created, versions = array("q"), array("q"), array("q")
+    completed_at, due_at, remind_at = array("q"), array("q"), array("q")
+    priorities, completed = bytearray(), bytearray()
+    titles, descriptions = [], []
+    for task in tasks:
+        ids.append(task.id)
+        created.append(task.created_ts)
+        versions.append(task.version)
+        if isinstance(task._priority, str):
+            raise InvalidTaskDataException(
+                f"Task {task.id} has priority '{task._priority}', which columnar snapshots cannot store"
+            )
+        priorities.append(task._priority)
+        completed.append(1 if task.completed else 0)
+        completed_at.append(UNKNOWN_TIME if task.completed_ts is None else task.completed_ts)
+        due_at.append(UNKNOWN_TIME if task.due_ts is None else task.due_ts)
+        remind_at.append(UNKNOWN_TIME if task.remind_ts is None else task.remind_ts)
+        # surrogatepass keeps lone surrogates (legal in JSON \u escapes) lossless
+        titles.append(task.title.encode("utf-8", "surrogatepass"))
+        descriptions.append(task.description.encode("utf-8", "surrogatepass"))
+
+    sections = [_to_bytes(ids), _to_bytes(created), _to_bytes(versions), bytes(priorities), bytes(completed)]
+    for strings in (titles, descriptions):
+        offsets = array("Q", [0])
+        total = 0
+        for encoded in strings:
+            total += len(encoded)
+            offsets.append(total)
+        sections.append(_to_bytes(offsets))
+        sections.append(b"".join(strings))
+    sections.extend(_to_bytes(column) for column in (completed_at, due_at, remind_at))
+
+    flags = FLAG_SORTED_IDS if all(a < b for a, b in zip(ids, ids[1:])) else 0
+    body, offsets = [], []
+    position = HEADER.size + len(_padding(HEADER.size))
+    for section in sections:
+        offsets.append(position)
+        body.append(section)
+        body.append(_padding(len(section)))
+        position += len(section) + len(body[-1])
+    header = HEADER.pack(MAGIC, FORMAT_VERSION, flags, len(ids), next_id, *offsets)
+    return [header, _padding(HEADER.size)] + body
+
+
+class ColumnarSnapshot:
+    """
+    Read-only, memory-mapped view of a columnar snapshot.
+
+    Columns are exposed as typed views over the mapping; a field is only
+    read from disk and decoded when it is accessed. Call close() (or use
+    the snapshot as a context manager) to unmap the file.
+    """
+
+    def __init__(self, path: str):
+        """
+        Map a snapshot file.
+
+        Args:
+            path: Path of the snapshot
+
+        Raises:
+            InvalidTaskDataException: If the file is not a valid snapshot
+        """
+        self.path = path
+        self._views = []
+        with open(path, "rb") as f:
+            stat = os.fstat(f.fileno())
+            self.size = stat.st_size
+            # The file_signature of the mapped file, even if the path is replaced later
+            self.signature = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+            if self.size < HEADER.size:
+                raise InvalidTaskDataException(f"{path} is not a columnar task snapshot")
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            magic, version, flags, self.count, self.next_id, *offsets = HEADER.unpack_from(self._mmap)
+            if magic != MAGIC:
+                raise InvalidTaskDataException(f"{path} is not a columnar task snapshot")
+            if version != FORMAT_VERSION:
+                raise InvalidTaskDataException(f"{path} uses unsupported snapshot format version {version}")
+            self._sorted = bool(flags & FLAG_SORTED_IDS)
+            self._offsets = dict(zip(SECTIONS, offsets))
+            self.ids = self._column("ids", "q", self.count)
+            self.created = self._column("created", "q", self.count)
+            self.versions = self._column("versions", "q", self.count)
+            self.priorities = self._column("priorities", "B", self.count)
+            self.completed = self._column("completed", "B", self.count)
+            self._title_offsets = self._column("title_offsets", "Q", self.count + 1)
+            self._description_offsets = self._column("description_offsets", "Q", self.count + 1)
+            self._title_data = self._blob("title_data", self._title_offsets)
+            self._description_data = self._blob("description_data", self._description_offsets)
+            self.completed_at, self.due_at, self.remind_at = (
+                self._column(name, "q", self.count) for name in TIME_SECTIONS
+            )
+        except BaseException:
+            self.close()
+            raise
+        # Bytes actually decoded so far, for the store's I/O counters
+        self.bytes_read = HEADER.size
+
+    def _view(self, start: int, length: int) -> memoryview:
+        """View a byte range of the mapping, checking it lies within the file."""
+        if start + length > self.size:
+            raise InvalidTaskDataException(f"{self.path} is truncated")
+        view = memoryview(self._mmap)[start:start + length]
+        self._views.append(view)
+        return view
+
+    def _column(self, section: str, typecode: str, length: int):
+        """View a numeric column as a sequence of typecode items."""
+        itemsize = array(typecode).itemsize
+        view = self._view(self._offsets[section], length * itemsize)
+        if NATIVE_LITTLE_ENDIAN or itemsize == 1:
+            view = view.cast(typecode)
+            self._views.append(view)
+            return view
+        column = array(typecode, bytes(view))
+        column.byteswap()
+        return column
+
+    def _blob(self, section: str, offsets) -> memoryview:
+        """View the text blob of a string table."""
+        return self._view(self._offsets[section], offsets[-1])
+
+    def _string(self, data: memoryview, offsets, index: int) -> str:
+        """Decode one string of a string table."""
+        start, end = offsets[index], offsets[index + 1]
+        self.bytes_read += end - start
+        return str(data[start:end], "utf-8", "surrogatepass")
+
+    def __len__(self) -> int:
+        return self.count
+
+    def index_of(self, task_id: int) -> Optional[int]:
+        """
+        Find the position of a task by id.
+
+        Args:
+            task_id: ID of the task
+
+        Returns:
+            The task's index, or None if it is not in the snapshot
+        """
+        if not self._sorted:
+            self.bytes_read += 8 * self.count
+            try:
+                return self.ids.tolist().index(task_id)
+            except ValueError:
+                return None
+        index = bisect_left(self.ids, task_id)
+        self.bytes_read += 8 * self.count.bit_length()
+        if index < self.count and self.ids[index] == task_id:
+            return index
+        return None
+
+    def title(self, index: int) -> str:
+        """Decode the title of the task at an index."""
+        return self._string(self._title_data, self._title_offsets, index)
+
+    def description(self, index: int) -> str:
+        """Decode the description of the task at an index."""
+        return self._string(self._description_data, self._description_offsets, index)
+
+    def task(self, index: int) -> Task:
+        """
+        Decode the task at an index.
+
+        Args:
+            index: Position of the task in the snapshot
+
+        Returns:
+            The Task
+        """
+        priority = self.priorities[index]
+        if priority >= len(PRIORITY_LEVELS):
+            raise InvalidTaskDataException(f"{self.path} has an invalid priority code {priority}")
+        self.bytes_read += ROW_BYTES
+        times = [column[index] for column in self._time_columns()]
+        return Task.from_stored(
+            self.ids[index],
+            self.title(index),
+            self.description(index),
+            priority,
+            self.completed[index] == 1,
+            self.created[index],
+            self.versions[index],
+            *(None if value == UNKNOWN_TIME else value for value in times)
+        )
+
+    def _time_columns(self) -> Tuple:
+        """The TIME_SECTIONS columns."""
+        return self.completed_at, self.due_at, self.remind_at
+
+    def tasks(self) -> Iterator[Task]:
+        """
+        Decode every task, in creation order.
+
+        Each column is converted in one pass rather than element by element,
+        which makes a full load far cheaper than count calls to task().
+
+        Yields:
+            Task objects
+        """
+        priorities = self.priorities.tolist()
+        if priorities and max(priorities) >= len(PRIORITY_LEVELS):
+            raise InvalidTaskDataException(f"{self.path} has an invalid priority code {max(priorities)}")
+        titles = _decode_strings(self._title_data, self._title_offsets)
+        descriptions = _decode_strings(self._description_data, self._description_offsets)
+        completed = [flag == 1 for flag in self.completed.tolist()]
+        times = [
+            [None if value == UNKNOWN_TIME else value for value in column.tolist()]
+            for column in self._time_columns()
+        ]
+        self.bytes_read = self.size
+        # The codes are checked above, so tasks skip the validation of Task()
+        from_stored = Task.from_stored
+        for fields in zip(
+            self.ids.tolist(), titles, descriptions, priorities, completed,
+            self.created.tolist(), self.versions.tolist(), *times
+        ):
+            yield from_stored(*fields)
+
+    def find_substring(self, keyword: str, start: int = 0, end: Optional[int] = None) -> List[int]:
+        """
+        Find tasks whose title or description contains a keyword, ignoring case.
+
+        Each string table is decoded and lowercased in one piece and searched
+        with str.find, skipping tasks that cannot match, instead of testing
+        the tasks one by one.
+
+        Args:
+            keyword: Text to look for
+            start: Index of the first task to scan
+            end: Index after the last task to scan, or None for all
+
+        Returns:
+            Ascending indexes of the matching tasks
+        """
+        end = self.count if end is None else min(end, self.count)
+        if start >= end:
+            return []
+        keyword = keyword.lower()
+        if not keyword:
+            return list(range(start, end))
+        matches = set(_rows_containing(self._title_data, self._title_offsets, start, end, keyword))
+        matches.update(_rows_containing(self._description_data, self._description_offsets, start, end, keyword))
+        self.bytes_read += self._title_offsets[end] - self._title_offsets[start]
+        self.bytes_read += self._description_offsets[end] - self._description_offsets[start]
+        return sorted(matches)
+
+    def close(self) -> None:
+        """Unmap the file."""
+        # The mapping can only be closed once no views of it remain
+        for view in reversed(self._views):
+            view.release()
+        self._views = []
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+
+    def __enter__(self) -> 'ColumnarSnapshot':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def _decode_strings(data: memoryview, offsets) -> List[str]:
+    """Split a string table into its strings, decoding the blob only once."""
+    text = str(data, "utf-8", "surrogatepass")
+    bounds = offsets.tolist()
+    if len(text) != len(data):
+        # Non-ASCII text: byte offsets are not character offsets
+        return [str(data[start:end], "utf-8", "surrogatepass") for start, end in zip(bounds, bounds[1:])]
+    return [text[start:end] for start, end in zip(bounds, bounds[1:])]
+
+
+def _rows_containing(data: memoryview, offsets, start: int, end: int, keyword: str) -> List[int]:
+    """Find the strings in rows [start, end) of a string table that contain a lowercase keyword."""
+    bounds = offsets[start:end + 1]
+    base = bounds[0]
+    raw = data[base:bounds[-1]]
+    text = str(raw, "utf-8", "surrogatepass")
+    lowered = text.lower()
+    if len(text) != len(raw) or len(lowered) != len(text):
+        # Non-ASCII text: byte offsets are not character offsets, so test row by row
+        return [
+            start + row for row in range(end - start)
+            if keyword in str(raw[bounds[row] - base:bounds[row + 1] - base], "utf-8", "surrogatepass").lower()
+        ]
+
+    rows = []
+    position = lowered.find(keyword)
+    while position != -1:
+        # bounds are absolute; position is relative to base
+        row = bisect_right(bounds, position + base) - 1
+        row_end = bounds[row + 1] - base
+        if position + len(keyword) <= row_end:
+            rows.append(start + row)
+            if len(rows) == DENSE_MATCHES:
+                bounds = bounds.tolist()
+            # One match is enough; continue with the next row
+            position = lowered.find(keyword, row_end)
+        else:
+            # The match spans two rows
+            position = lowered.find(keyword, position + 1)
+    return rows
+
+
+class ColumnarTaskStore(JsonTaskStore):
+    """
+    Store that keeps all tasks in a single columnar snapshot file.
+
+    Like the JSON store it rewrites the whole file on every mutation and
+    shares its locking and change detection, but the file is memory-mapped
+    on read, so lazy point lookups decode a single task.
+    """
+
+    def load(self) -> Tuple[List[Task], int]:
+        """
+        Load tasks from the snapshot file.
+
+        Returns:
+            Tuple of (tasks in creation order, next id to allocate)
+
+        Raises:
+            InvalidTaskDataException: If the file is not a valid snapshot
+        """
+        if not os.path.exists(self.path):
+            return [], 1
+        with ColumnarSnapshot(self.path) as snapshot:
+            try:
+                tasks = list(snapshot.tasks())
+            finally:
+                self.bytes_read += snapshot.bytes_read
+            next_id = max(snapshot.next_id, max(snapshot.ids, default=0) + 1)
+        return tasks, next_id
+
+    def find(self, task_id: int) -> Optional[Task]:
+        """
+        Look up a single task without decoding the rest of the store.
+
+        Args:
+            task_id: ID of the task to find
+
+        Returns:
+            The Task, or None if it is not stored
+        """
+        if not os.path.exists(self.path):
+            return None
+        with ColumnarSnapshot(self.path) as snapshot:
+            try:
+                index = snapshot.index_of(task_id)
+                return None if index is None else snapshot.task(index)
+            finally:
+                self.bytes_read += snapshot.bytes_read
+
+    def save(self, tasks: Iterable[Task], next_id: int) -> None:
+        """
+        Save all tasks to the snapshot file.
+
+        Args:
+            tasks: Tasks to persist, in creation order
+            next_id: Next id the allocator will hand out
+        """
+        self.bytes_written += write_file_atomic(self.path, encode_columns(tasks, next_id), fsync=self.fsync)
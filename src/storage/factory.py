@@ -0,0 +1,118 @@
+"""
+Factory for selecting a task storage backend.
+"""
+
+import os
+from typing import Optional, Union, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from src.storage.json_store import JsonTaskStore
+    from src.storage.sqlite_store import SqliteTaskStore
+
+STORAGE_MODES = ("json", "journal", "sqlite", "columnar")
+SQLITE_EXTENSIONS = (".db", ".sqlite", ".sqlite3")
+# Kept in sync with columnar_store.COLUMNAR_EXTENSIONS, which is not imported to keep startup lean
+COLUMNAR_EXTENSIONS = (".tcol",)
+# Backends that hold a whole snapshot and can be converted into one another
+SNAPSHOT_MODES = ("json", "journal", "columnar")
+
+
+def resolve_storage_mode(storage_file: str, storage_mode: Optional[str] = None) -> str:
+    """
+    Work out which storage backend serves a task file.
+
+    Args:
+        storage_file: Path to the task storage file
+        storage_mode: One of STORAGE_MODES, or None to auto-detect
+
+    Returns:
+        The storage mode to use
+
+    Raises:
+        ValueError: If the storage mode is unknown
+    """
+    if storage_mode is None:
+        if storage_file.lower().endswith(SQLITE_EXTENSIONS):
+            return "sqlite"
+        if storage_file.lower().endswith(COLUMNAR_EXTENSIONS):
+            return "columnar"
+        # An existing journal holds mutations the snapshot does not have yet,
+        # so it must be replayed no matter which mode wrote it.
+        return "journal" if os.path.exists(storage_file + ".journal") else "json"
+    if storage_mode not in STORAGE_MODES:
+        raise ValueError(f"Unknown storage mode '{storage_mode}'. Expected one of: {', '.join(STORAGE_MODES)}")
+    return storage_mode
+
+
+def create_store(storage_file: str, storage_mode: Optional[str] = None) -> Union['JsonTaskStore', 'SqliteTaskStore']:
+    """
+    Create the storage backend for a task file.
+
+    Args:
+        storage_file: Path to the task storage file
+        storage_mode: One of STORAGE_MODES, or None to auto-detect
+
+    Returns:
+        A task store instance
+
+    Raises:
+        ValueError: If the storage mode is unknown
+    """
+    storage_mode = resolve_storage_mode(storage_file, storage_mode)
+    # Backends are imported on demand so a process only loads the one it uses
+    if storage_mode == "sqlite":
+        from src.storage.sqlite_store import SqliteTaskStore
+        return SqliteTaskStore(storage_file)
+    if storage_mode == "journal":
+        from src.storage.journal_store import JournalTaskStore
+        return JournalTaskStore(storage_file)
+    if storage_mode == "columnar":
+        from src.storage.columnar_store import ColumnarTaskStore
+        return ColumnarTaskStore(storage_file)
+    from src.storage.json_store import JsonTaskStore
+    return JsonTaskStore(storage_file)
+
+
+def convert_store(
+    source_file: str,
+    target_file: str,
+    source_mode: Optional[str] = None,
+    target_mode: Optional[str] = None
+) -> int:
+    """
+    Copy every task from one snapshot store into another, e.g. tasks.json to a columnar snapshot.
+
+    Ids, versions, timestamps and the id counter are preserved, so converting
+    there and back yields the same tasks.
+
+    Args:
+        source_file: Path of the existing task store
+        target_file: Path of the store to write; any existing contents are replaced
+        source_mode: Storage mode of the source, or None to auto-detect
+        target_mode: Storage mode of the target, or None to auto-detect
+
+    Returns:
+        Number of converted tasks
+
+    Raises:
+        ValueError: If either store is not a snapshot store (see SNAPSHOT_MODES)
+    """
+    modes = (resolve_storage_mode(source_file, source_mode), resolve_storage_mode(target_file, target_mode))
+    for mode in modes:
+        if mode not in SNAPSHOT_MODES:
+            raise ValueError(f"Cannot convert {mode} stores. Expected one of: {', '.join(SNAPSHOT_MODES)}")
+
+    source = create_store(source_file, modes[0])
+    try:
+        tasks, next_id = source.load()
+    finally:
+        source.close()
+
+    target = create_store(target_file, modes[1])
+    target.begin_write()
+    try:
+        target.save(tasks, next_id)
+    finally:
+        target.end_write()
+        target.close()
+    return len(tasks)
@@ -0,0 +1,407 @@
+"""
+Append-only journal storage for tasks.
+
+Mutations are appended to ``<storage_file>.journal`` as one compact,
+checksummed record per line instead of rewriting the whole snapshot. The
+snapshot itself keeps the same JSON list format as ``JsonTaskStore`` and is
+rebuilt in a background thread once the journal grows past a threshold.
+
+Several processes may share the files. Appends happen under the store's
+write lock; a compaction additionally holds ``<storage_file>.compact.lock``
+until its snapshot has landed, which tells a live compaction segment apart
+from one left behind by a crash. Readers take no lock and simply retry if
+the journal is rotated or the snapshot replaced while they read.
+"""
+
+import os
+import json
+import zlib
+import threading
+from typing import List, Dict, Any, Iterable, Optional, Tuple
+
+from src.models.task import Task
+from src.storage.json_store import JsonTaskStore, encode_snapshot, file_signature, file_size, write_json_atomic
+from src.utils.file_lock import FileLock
+
+DEFAULT_COMPACT_THRESHOLD = 4 * 1024 * 1024
+
+
+def encode_record(record: Dict[str, Any]) -> bytes:
+    """
+    Encode a journal record as a single checksummed line.
+
+    Args:
+        record: Record to encode
+
+    Returns:
+        The encoded line, including the trailing newline
+    """
+    payload = json.dumps(record, separators=(",", ":")).encode("utf-8")
+    return b"%08x\t%s\n" % (zlib.crc32(payload), payload)
+
+
+def read_records(path: str) -> Tuple[List[Dict[str, Any]], int]:
+    """
+    Read all intact records from a journal file.
+
+    Reading stops at the first torn or corrupt line: it can only be the tail
+    of a write interrupted by a crash, and nothing after it can be trusted.
+
+    Args:
+        path: Journal file path
+
+    Returns:
+        Tuple of (records, byte offset just past the last intact record)
+    """
+    records = []
+    valid_end = 0
+    if not os.path.exists(path):
+        return records, valid_end
+    with open(path, "rb") as f:
+        for line in f:
+            if not line.endswith(b"\n"):
+                break
+            checksum, _, payload = line[:-1].partition(b"\t")
+            try:
+                if int(checksum, 16) != zlib.crc32(payload):
+                    break
+                records.append(json.loads(payload.decode("utf-8")))
+            except ValueError:
+                break
+            valid_end += len(line)
+    return records, valid_end
+
+
+def record_task_id(record: Dict[str, Any]) -> int:
+    """
+    Get the id of the task a journal record refers to.
+
+    Args:
+        record: Journal record
+
+    Returns:
+        The task id
+    """
+    return record["id"] if record["op"] == "delete" else record["task"]["id"]
+
+
+def apply_record(tasks_by_id: Dict[int, Task], record: Dict[str, Any]) -> None:
+    """
+    Apply a journal record to an id-keyed task mapping.
+
+    Records carry the full task state, so applying one twice is harmless.
+    Replay relies on this when a compaction was interrupted.
+
+    Args:
+        tasks_by_id: Mapping to update in place (insertion order is preserved)
+        record: Record to apply
+    """
+    op = record["op"]
+    if op == "delete":
+        tasks_by_id.pop(record["id"], None)
+    else:
+        task = Task.from_dict(record["task"])
+        tasks_by_id[task.id] = task
+
+
+class JournalTaskStore(JsonTaskStore):
+    """Store that appends each mutation to a journal and periodically compacts it."""
+
+    APPENDS_RECORDS = True
+
+    def __init__(
+        self,
+        path: str,
+        compact_threshold: int = DEFAULT_COMPACT_THRESHOLD,
+        fsync: bool = False
+    ):
+        """
+        Initialize the store.
+
+        Args:
+            path: Path to the JSON snapshot file
+            compact_threshold: Journal size in bytes that triggers a compaction
+            fsync: Whether to fsync the journal after every appended record
+        """
+        super().__init__(path)
+        self.journal_path = path + ".journal"
+        self.compacting_path = path + ".journal.compacting"
+        self.compact_threshold = compact_threshold
+        self.fsync = fsync
+        self._journal = None
+        self._journal_size = 0
+        self._lock = threading.Lock()
+        self._compactor: Optional[threading.Thread] = None
+        self.compact_lock = FileLock(path + ".compact.lock")
+
+    def load(self) -> Tuple[List[Task], int]:
+        """
+        Load the snapshot and replay the journal on top of it.
+
+        Returns:
+            Tuple of (tasks in creation order, next id to allocate)
+        """
+        self.wait_for_compaction()
+        while True:
+            layout = self._layout()
+            snapshot_tasks, next_id = super().load()
+            interrupted, interrupted_size = read_records(self.compacting_path)
+            records, records_size = read_records(self.journal_path)
+            self.bytes_read += interrupted_size + records_size
+            # Otherwise another process rotated the journal or replaced the
+            # snapshot mid-read, and the pieces may not fit together
+            if self._layout() == layout:
+                break
+
+        tasks_by_id = {task.id: task for task in snapshot_tasks}
+        for record in interrupted + records:
+            apply_record(tasks_by_id, record)
+            if record["op"] == "add":
+                next_id = max(next_id, record["task"]["id"] + 1)
+
+        tasks = list(tasks_by_id.values())
+        if (
+            self.write_lock.held
+            and os.path.exists(self.compacting_path)
+            and self.compact_lock.acquire(blocking=False)
+        ):
+            # A previous compaction died before its snapshot landed. Fold
+            # everything into a fresh snapshot now so the leftover segment
+            # cannot be clobbered by the next rotation.
+            try:
+                self._fold_compacting_segment(tasks, next_id)
+            finally:
+                self.compact_lock.release()
+        return tasks, next_id
+
+    def find(self, task_id: int) -> Optional[Task]:
+        """
+        Look up a single task without loading the whole store.
+
+        Args:
+            task_id: ID of the task to find
+
+        Returns:
+            The Task, or None if it is not stored
+        """
+        while True:
+            layout = self._layout()
+            task = super().find(task_id)
+            interrupted, interrupted_size = read_records(self.compacting_path)
+            records, records_size = read_records(self.journal_path)
+            self.bytes_read += interrupted_size + records_size
+            if self._layout() == layout:
+                break
+
+        tasks_by_id = {}
+        if task is not None:
+            tasks_by_id[task_id] = task
+        for record in interrupted + records:
+            if record_task_id(record) == task_id:
+                apply_record(tasks_by_id, record)
+        return tasks_by_id.get(task_id)
+
+    def save(self, tasks: Iterable[Task], next_id: int) -> None:
+        """
+        Write a full snapshot and reset the journal.
+
+        Args:
+            tasks: Tasks to persist, in creation order
+            next_id: Next id the allocator will hand out
+        """
+        self.wait_for_compaction()
+        # A compaction still running in another process would later replace
+        # this snapshot with its older one, so wait for it to finish
+        with self.compact_lock, self._lock:
+            self._fold_compacting_segment(tasks, next_id)
+
+    def record(
+        self,
+        op: str,
+        task: Task,
+        tasks: Optional[Iterable[Task]] = None,
+        next_id: Optional[int] = None
+    ) -> None:
+        """
+        Append a single mutation to the journal.
+
+        The id counter needs no record of its own: replay advances it past
+        every added id, and ids are never handed out without an add.
+
+        Args:
+            op: Mutation type ("add", "update" or "delete")
+            task: The task affected by the mutation
+            tasks: All tasks, already reflecting the mutation, or None if
+                they are not loaded; compaction then waits for a later
+                record that has them
+            next_id: Next id the allocator will hand out, given with tasks
+        """
+        if op == "delete":
+            record = {"op": op, "id": task.id}
+        else:
+            record = {"op": op, "task": task.to_dict()}
+        line = encode_record(record)
+
+        with self._lock:
+            if self._journal is None:
+                self._open_journal()
+            self._journal.write(line)
+            self._journal.flush()
+            if self.fsync:
+                os.fsync(self._journal.fileno())
+            self._journal_size += len(line)
+            self.bytes_written += len(line)
+            if (
+                tasks is not None
+                and self._journal_size >= self.compact_threshold
+                and not self._compaction_running()
+            ):
+                self._start_compaction(tasks, next_id)
+
+    def signature(self) -> Tuple:
+        """
+        Fingerprint the snapshot and journal files.
+
+        Returns:
+            A value that changes whenever the stored tasks change
+        """
+        return file_signature(self.path), file_signature(self.journal_path)
+
+    def disk_usage(self) -> int:
+        """
+        Get the space taken by the snapshot and journal files.
+
+        Returns:
+            Size in bytes
+        """
+        return file_size(self.path) + file_size(self.compacting_path) + file_size(self.journal_path)
+
+    def sync(self) -> None:
+        """Force the snapshot and every appended record to disk."""
+        super().sync()
+        with self._lock:
+            if self._journal is not None:
+                os.fsync(self._journal.fileno())
+
+    def begin_write(self) -> None:
+        """Take the inter-process write lock and catch up with the journal file."""
+        super().begin_write()
+        with self._lock:
+            # Other processes may have appended to or rotated the journal, or
+            # died mid-append, since this one last wrote to it
+            if self._journal is None or self._journal_changed():
+                self._open_journal(truncate_to=self._torn_tail_end())
+
+    def wait_for_compaction(self) -> None:
+        """Block until any background compaction has finished."""
+        compactor = self._compactor
+        if compactor is not None:
+            compactor.join()
+
+    def close(self) -> None:
+        """Wait for pending compaction, close the journal and release the write lock."""
+        self.wait_for_compaction()
+        with self._lock:
+            if self._journal is not None:
+                self._journal.close()
+                self._journal = None
+        super().close()
+
+    def _layout(self) -> Tuple:
+        """Identify the current snapshot, compaction segment and journal files."""
+        journal = file_signature(self.journal_path)
+        # Journal appends are excluded: reading a shorter prefix is consistent
+        return file_signature(self.path), file_signature(self.compacting_path), journal and journal[0]
+
+    def _journal_changed(self) -> bool:
+        """Whether the journal file differs from what this store last appended to."""
+        try:
+            current = os.stat(self.journal_path)
+        except FileNotFoundError:
+            return True
+        opened = os.fstat(self._journal.fileno())
+        return current.st_ino != opened.st_ino or current.st_size != self._journal_size
+
+    def _torn_tail_end(self) -> Optional[int]:
+        """Get the offset to cut the journal at if its last record is torn, else None."""
+        try:
+            with open(self.journal_path, "rb") as f:
+                if f.seek(0, os.SEEK_END) == 0:
+                    return None
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) == b"\n":
+                    return None
+        except FileNotFoundError:
+            return None
+        return read_records(self.journal_path)[1]
+
+    def _fold_compacting_segment(self, tasks: Iterable[Task], next_id: int) -> None:
+        """
+        Write a full snapshot and drop both journal segments it supersedes.
+
+        Must be called with the write lock and the compaction lock held.
+        """
+        self._write_snapshot(tasks, next_id)
+        self._open_journal(truncate_to=0)
+        if os.path.exists(self.compacting_path):
+            os.remove(self.compacting_path)
+
+    def _open_journal(self, truncate_to: Optional[int] = None) -> None:
+        """Open the journal for appending, optionally truncating it first."""
+        if self._journal is not None:
+            self._journal.close()
+        self._journal = open(self.journal_path, "ab")
+        self._journal_size = self._journal.seek(0, os.SEEK_END)
+        if truncate_to is not None and truncate_to < self._journal_size:
+            # Drops a torn tail left by a crash so new records are not
+            # appended after unreadable bytes. Skipped when there is nothing
+            # to drop: truncating touches the file, so every SharedTaskService
+            # watching it would reload.
+            self._journal.truncate(truncate_to)
+            self._journal_size = truncate_to
+
+    def _write_snapshot(self, tasks: Iterable[Task], next_id: int) -> None:
+        """Atomically replace the snapshot file with the given tasks."""
+        self.bytes_written += write_json_atomic(self.path, encode_snapshot(tasks, next_id))
+
+    def _compaction_running(self) -> bool:
+        return self._compactor is not None and self._compactor.is_alive()
+
+    def _start_compaction(self, tasks: Iterable[Task], next_id: int) -> None:
+        """
+        Rotate the journal and rebuild the snapshot in a background thread.
+
+        Must be called with the store lock held. New mutations keep appending
+        to a fresh journal while the snapshot is written; replaying that
+        journal over the new snapshot is safe because records are idempotent.
+        """
+        if not self.compact_lock.acquire(blocking=False):
+            # Another process is still compacting; try again on a later record
+            return
+        if os.path.exists(self.compacting_path):
+            # Left behind by a compactor that died; these tasks include it
+            try:
+                self._fold_compacting_segment(tasks, next_id)
+            finally:
+                self.compact_lock.release()
+            return
+
+        self._journal.close()
+        os.replace(self.journal_path, self.compacting_path)
+        self._journal = None
+        self._open_journal()
+
+        tasks_copy = list(tasks)
+        self._compactor = threading.Thread(
+            target=self._compact,
+            args=(tasks_copy, next_id),
+            name="task-journal-compactor"
+        )
+        self._compactor.start()
+
+    def _compact(self, tasks: List[Task], next_id: int) -> None:
+        try:
+            self._write_snapshot(tasks, next_id)
+            os.remove(self.compacting_path)
+        finally:
+            self.compact_lock.release()
@@ -0,0 +1,290 @@
+"""
+JSON snapshot storage for tasks.
+"""
+
+import os
+import json
+from typing import List, Dict, Any, Iterable, Optional, Tuple
+
+from src.models.task import Task
+from src.storage.json_stream import SnapshotStream
+from src.utils.file_lock import FileLock
+
+# Permissions open() gives new files under the process umask, which can only
+# be read by setting it, so it is read once at import
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+NEW_FILE_MODE = 0o666 & ~_UMASK
+
+
+def write_file_atomic(path: str, chunks: Iterable[bytes], fsync: bool = True) -> int:
+    """
+    Write a file atomically.
+
+    The data is written to a temporary file in the same directory and then
+    renamed over the target, so readers (and a crash mid-write) only ever see
+    the old or the new file, never a partial one. The new file keeps the
+    permissions of the one it replaces.
+
+    Args:
+        path: Destination file path
+        chunks: File contents, written in order
+        fsync: Whether to fsync the temporary file before renaming it
+
+    Returns:
+        Number of bytes written
+    """
+    # Imported on first write; read-only CLI commands never need it
+    import tempfile
+
+    directory = os.path.dirname(os.path.abspath(path))
+    try:
+        mode = os.stat(path).st_mode & 0o7777
+    except FileNotFoundError:
+        mode = NEW_FILE_MODE
+    fd, tmp_path = tempfile.mkstemp(prefix=os.path.basename(path) + ".", suffix=".tmp", dir=directory)
+    try:
+        # mkstemp creates the file readable by its owner only
+        os.chmod(tmp_path, mode)
+        with os.fdopen(fd, "wb") as f:
+            for chunk in chunks:
+                f.write(chunk)
+            f.flush()
+            if fsync:
+                os.fsync(f.fileno())
+            size = os.fstat(f.fileno()).st_size
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return size
+
+
+def write_json_atomic(path: str, data: Any, indent: int = None, fsync: bool = True) -> int:
+    """
+    Write JSON data to a file atomically (see write_file_atomic).
+
+    Args:
+        path: Destination file path
+        data: JSON-serializable data
+        indent: Indentation passed to json.dumps (None for compact output)
+        fsync: Whether to fsync the temporary file before renaming it
+
+    Returns:
+        Number of bytes written
+    """
+    # json.dumps can use the C encoder where json.dump never does
+    if indent is None:
+        text = json.dumps(data, separators=(",", ":"))
+    else:
+        text = json.dumps(data, indent=indent)
+    return write_file_atomic(path, [text.encode("utf-8")], fsync)
+
+
+def file_signature(path: str) -> Optional[Tuple[int, int, int]]:
+    """
+    Get a cheap fingerprint of a file's current version.
+
+    Args:
+        path: File path
+
+    Returns:
+        Tuple of (inode, mtime in ns, size), or None if the file is missing
+    """
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    # The inode changes on every atomic rename, even within one mtime tick
+    return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+
+def file_size(path: str) -> int:
+    """
+    Get the size of a file.
+
+    Args:
+        path: File path
+
+    Returns:
+        Size in bytes, or 0 if the file is missing
+    """
+    signature = file_signature(path)
+    return signature[2] if signature else 0
+
+
+def fsync_path(path: str) -> None:
+    """
+    Force a file's written data to disk.
+
+    Args:
+        path: File path; a missing file is ignored
+    """
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except FileNotFoundError:
+        return
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def encode_snapshot(tasks: Iterable[Task], next_id: int) -> Dict[str, Any]:
+    """
+    Build the JSON document for a task snapshot.
+
+    Args:
+        tasks: Tasks to include, in creation order
+        next_id: Next id the allocator will hand out
+
+    Returns:
+        JSON-serializable snapshot document
+    """
+    return {"next_id": next_id, "tasks": [task.to_dict() for task in tasks]}
+
+
+class JsonTaskStore:
+    """
+    Store that keeps all tasks in a single JSON file, rewritten on every mutation.
+
+    Writers from any number of processes are serialized by an advisory lock
+    on ``<path>.lock``; readers take no lock, since snapshots are replaced
+    atomically and a reader always sees a complete old or new file.
+    """
+
+    # Methods that touch the disk, timed when metrics are enabled
+    IO_METHODS = ("load", "find", "save", "record", "sync")
+    # Whether record() can persist a change without the other tasks
+    APPENDS_RECORDS = False
+
+    def __init__(self, path: str):
+        """
+        Initialize the store.
+
+        Args:
+            path: Path to the JSON file for storing tasks
+        """
+        self.path = path
+        self.write_lock = FileLock(path + ".lock")
+        # Whether every write is fsynced before it returns
+        self.fsync = False
+        # Running totals of file bytes read and written by this store
+        self.bytes_read = 0
+        self.bytes_written = 0
+
+    def load(self) -> Tuple[List[Task], int]:
+        """
+        Load tasks from the storage file.
+
+        Returns:
+            Tuple of (tasks in creation order, next id to allocate)
+        """
+        tasks, next_id = [], 1
+        if os.path.exists(self.path):
+            # Streaming builds each Task as soon as its object is parsed, so
+            # the raw text and the full dict tree never coexist in memory.
+            stream = SnapshotStream(self.path)
+            try:
+                tasks = [Task.from_dict(task_dict) for task_dict in stream]
+            except json.JSONDecodeError:
+                print(f"Error reading task file. Starting with empty task list.")
+                return [], 1
+            finally:
+                self.bytes_read += stream.bytes_read
+            next_id = max(stream.next_id or 1, max((task.id for task in tasks), default=0) + 1)
+        return tasks, next_id
+
+    def find(self, task_id: int) -> Optional[Task]:
+        """
+        Look up a single task without loading the whole store.
+
+        Parsing stops as soon as the task is found, and only that task is
+        turned into a Task object.
+
+        Args:
+            task_id: ID of the task to find
+
+        Returns:
+            The Task, or None if it is not stored
+        """
+        if not os.path.exists(self.path):
+            return None
+        stream = SnapshotStream(self.path)
+        try:
+            for task_dict in stream:
+                if task_dict["id"] == task_id:
+                    return Task.from_dict(task_dict)
+        except json.JSONDecodeError:
+            pass
+        finally:
+            self.bytes_read += stream.bytes_read
+        return None
+
+    def save(self, tasks: Iterable[Task], next_id: int) -> None:
+        """
+        Save all tasks to the storage file.
+
+        Args:
+            tasks: Tasks to persist, in creation order
+            next_id: Next id the allocator will hand out
+        """
+        self.bytes_written += write_json_atomic(
+            self.path, encode_snapshot(tasks, next_id), indent=2, fsync=self.fsync
+        )
+
+    def record(self, op: str, task: Task, tasks: Iterable[Task], next_id: int) -> None:
+        """
+        Persist a single mutation.
+
+        A snapshot store has no cheaper way to persist a change than
+        rewriting the whole file, so this simply saves every task.
+
+        Args:
+            op: Mutation type ("add", "update" or "delete")
+            task: The task affected by the mutation
+            tasks: All tasks, already reflecting the mutation
+            next_id: Next id the allocator will hand out
+        """
+        self.save(tasks, next_id)
+
+    def signature(self) -> Tuple:
+        """
+        Fingerprint the files backing the store.
+
+        Returns:
+            A value that changes whenever the stored tasks change
+        """
+        return (file_signature(self.path),)
+
+    def disk_usage(self) -> int:
+        """
+        Get the space taken by the files backing the store.
+
+        Returns:
+            Size in bytes
+        """
+        return file_size(self.path)
+
+    def sync(self) -> None:
+        """Force everything written so far to disk."""
+        fsync_path(self.path)
+
+    def begin_write(self) -> None:
+        """
+        Take the inter-process write lock.
+
+        save() and record() must only be called between begin_write() and
+        end_write(), after reloading if signature() changed, so that no
+        other process's writes are overwritten.
+        """
+        self.write_lock.acquire()
+
+    def end_write(self) -> None:
+        """Release the inter-process write lock."""
+        self.write_lock.release()
+
+    def close(self) -> None:
+        """Release any resources held by the store."""
+        self.write_lock.release()
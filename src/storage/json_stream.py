@@ -0,0 +1,149 @@
+"""
+Streaming reader for JSON task snapshots.
+
+The snapshot is memory-mapped and decoded a chunk at a time, and tasks are
+yielded one by one, so neither the whole file text nor the whole parsed
+document has to be held in memory at once.
+"""
+
+import os
+import json
+import mmap
+import codecs
+from typing import Iterator, Dict, Any, Optional
+
+CHUNK_SIZE = 1024 * 1024
+WHITESPACE = " \t\n\r"
+
+
+class SnapshotStream:
+    """
+    Iterate over the task dicts of a snapshot file without loading it whole.
+
+    Accepts both the current {"next_id": ..., "tasks": [...]} document and the
+    legacy bare list. ``next_id`` is available once iteration has finished
+    (it stays None for legacy files); ``bytes_read`` counts the file bytes
+    decoded so far.
+    """
+
+    def __init__(self, path: str, chunk_size: int = CHUNK_SIZE):
+        """
+        Initialize the stream.
+
+        Args:
+            path: Snapshot file path
+            chunk_size: Number of bytes decoded per refill
+        """
+        self.path = path
+        self.chunk_size = chunk_size
+        self.next_id: Optional[int] = None
+        self.bytes_read = 0
+        self._decoder = json.JSONDecoder()
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        """
+        Yield task dicts in file order.
+
+        Raises:
+            json.JSONDecodeError: If the file is not a valid snapshot
+        """
+        if os.path.getsize(self.path) == 0:
+            raise json.JSONDecodeError("Expecting value", "", 0)
+
+        with open(self.path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            self._data = data
+            self._offset = 0
+            self._text_decoder = codecs.getincrementaldecoder("utf-8")()
+            self._buffer = ""
+            self._pos = 0
+            try:
+                first = self._peek()
+                if first == "[":
+                    yield from self._iter_array()
+                elif first == "{":
+                    yield from self._iter_document()
+                else:
+                    raise json.JSONDecodeError("Expecting '[' or '{'", self._buffer, self._pos)
+            finally:
+                self._data = None
+
+    def _iter_document(self) -> Iterator[Dict[str, Any]]:
+        """Walk the top-level object, streaming its "tasks" array."""
+        self._expect("{")
+        if self._peek() == "}":
+            self._expect("}")
+            return
+        while True:
+            key = self._decode_value()
+            self._expect(":")
+            if key == "tasks":
+                yield from self._iter_array()
+            else:
+                value = self._decode_value()
+                if key == "next_id":
+                    self.next_id = value
+            if self._peek() == ",":
+                self._expect(",")
+            else:
+                self._expect("}")
+                return
+
+    def _iter_array(self) -> Iterator[Dict[str, Any]]:
+        """Decode and yield the elements of an array one at a time."""
+        self._expect("[")
+        if self._peek() == "]":
+            self._expect("]")
+            return
+        while True:
+            yield self._decode_value()
+            if self._peek() == ",":
+                self._expect(",")
+            else:
+                self._expect("]")
+                return
+
+    def _refill(self) -> bool:
+        """Decode the next chunk into the buffer; False once the file is exhausted."""
+        if self._offset >= len(self._data):
+            return False
+        chunk = self._data[self._offset:self._offset + self.chunk_size]
+        self._offset += len(chunk)
+        self.bytes_read += len(chunk)
+        final = self._offset >= len(self._data)
+        # Drop the consumed prefix so the buffer stays around one chunk long
+        self._buffer = self._buffer[self._pos:] + self._text_decoder.decode(chunk, final)
+        self._pos = 0
+        return True
+
+    def _peek(self) -> str:
+        """Skip whitespace and return the next character without consuming it."""
+        while True:
+            while self._pos < len(self._buffer) and self._buffer[self._pos] in WHITESPACE:
+                self._pos += 1
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            if not self._refill():
+                raise json.JSONDecodeError("Unexpected end of file", self._buffer, self._pos)
+
+    def _expect(self, char: str) -> None:
+        """Consume the given structural character."""
+        if self._peek() != char:
+            raise json.JSONDecodeError(f"Expecting '{char}'", self._buffer, self._pos)
+        self._pos += 1
+
+    def _decode_value(self) -> Any:
+        """Decode one JSON value, pulling in more chunks until it is complete."""
+        self._peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError:
+                if not self._refill():
+                    raise
+                continue
+            # A value ending exactly at the buffer edge may be a number cut
+            # in half by the chunk boundary, so confirm with more input.
+            if end == len(self._buffer) and self._refill():
+                continue
+            self._pos = end
+            return value
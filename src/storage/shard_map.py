@@ -0,0 +1,139 @@
+"""
+Shard map: which store file holds each tenant's tasks.
+
+The map is a small JSON file listing shards in the order they were added;
+a shard's number is its position, and every id of a shard encodes that
+number (see shard_id), so shards can be added but never reordered.
+"""
+
+import json
+import os
+from typing import List, NamedTuple
+
+from src.utils.file_lock import FileLock
+
+# Ids of shard n are the numbers ending in n in this base (n, n + 1000,
+# n + 2000, ...), so the shard of any task can be read off its id
+SHARD_ID_BASE = 1000
+DEFAULT_SHARD_MAP = "shards.json"
+# Where new shards' store files go, relative to the map
+SHARD_DIRECTORY = "shards"
+
+
+class Shard(NamedTuple):
+    """One entry of a shard map."""
+
+    number: int
+    # Tenant name
+    name: str
+    # Path of the shard's store file
+    path: str
+
+
+def shard_id(shard: int, at_least: int = 1) -> int:
+    """
+    Get the lowest id of a shard that is not below a bound.
+
+    Args:
+        shard: Shard number, below SHARD_ID_BASE
+        at_least: Lower bound, at least 1
+
+    Returns:
+        The id; ids of a shard are congruent to its number modulo SHARD_ID_BASE
+    """
+    return at_least + (shard - at_least) % SHARD_ID_BASE
+
+
+def shard_of(task_id: int) -> int:
+    """
+    Get the number of the shard a task id belongs to.
+
+    Args:
+        task_id: Task ID allocated by a sharded store
+
+    Returns:
+        The shard number
+    """
+    return task_id % SHARD_ID_BASE
+
+
+def load_shard_map(path: str) -> List[Shard]:
+    """
+    Read a shard map.
+
+    Args:
+        path: Path of the shard map file
+
+    Returns:
+        The shards in number order; empty if the file does not exist
+    """
+    if not os.path.exists(path):
+        return []
+    with open(path, "r", encoding="utf-8") as f:
+        entries = json.load(f)["shards"]
+    directory = os.path.dirname(os.path.abspath(path))
+    return [
+        Shard(number, entry["name"], os.path.join(directory, entry["file"]))
+        for number, entry in enumerate(entries)
+    ]
+
+
+def find_shard(shards: List[Shard], name: str) -> Shard:
+    """
+    Look up a tenant's shard.
+
+    Args:
+        shards: Result of load_shard_map
+        name: Tenant name
+
+    Returns:
+        The shard
+
+    Raises:
+        ValueError: If there is no shard for the tenant
+    """
+    for shard in shards:
+        if shard.name == name:
+            return shard
+    raise ValueError(f"Unknown tenant '{name}'")
+
+
+def add_shard(path: str, name: str, extension: str = ".json") -> Shard:
+    """
+    Add a shard for a new tenant to a shard map, creating the map if needed.
+
+    The shard's store is not created until its first task is written.
+
+    Args:
+        path: Path of the shard map file
+        name: Tenant name; letters, digits, "-", "_" and "." only
+        extension: Extension of the store file, which selects its storage
+            mode (e.g. ".tcol" for a columnar store)
+
+    Returns:
+        The new shard
+
+    Raises:
+        ValueError: If the name is invalid or taken, or the map is full
+    """
+    if not name or name.startswith(".") or not all(c.isalnum() or c in "-_." for c in name):
+        raise ValueError(f"Invalid tenant name '{name}'")
+    # Imported here: only adding shards writes the map
+    from src.storage.json_store import write_json_atomic
+
+    lock = FileLock(path + ".lock")
+    lock.acquire()
+    try:
+        shards = load_shard_map(path)
+        if any(shard.name == name for shard in shards):
+            raise ValueError(f"Tenant '{name}' already exists")
+        if len(shards) >= SHARD_ID_BASE:
+            raise ValueError(f"A shard map holds at most {SHARD_ID_BASE} shards")
+        directory = os.path.dirname(os.path.abspath(path))
+        entries = [{"name": shard.name, "file": os.path.relpath(shard.path, directory)} for shard in shards]
+        entries.append({"name": name, "file": os.path.join(SHARD_DIRECTORY, name + extension)})
+        os.makedirs(os.path.join(directory, SHARD_DIRECTORY), exist_ok=True)
+        write_json_atomic(path, {"shards": entries}, indent=2)
+    finally:
+        lock.release()
+    return Shard(len(shards), name, os.path.join(directory, entries[-1]["file"]))
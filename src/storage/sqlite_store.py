@@ -0,0 +1,588 @@
+"""
+SQLite storage engine for tasks.
+
+Unlike the file stores, which load everything into memory, this store keeps
+tasks in a SQLite database and answers lookups, filters, pagination and
+full-text search with SQL, so only the rows a caller needs become Task
+objects.
+"""
+
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import List, Optional, Set, Tuple, Iterable, Iterator, Union
+
+from src.models.task import Task, stored_priority
+from src.storage.json_store import file_size
+
+SCHEMA_VERSION = 1
+# Ids bound per statement by existing_ids, below SQLite's parameter limit
+IDS_PER_QUERY = 500
+
+# Every time is stored as epoch seconds, which sort and compare correctly
+# across DST changes, unlike local-time text
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    title TEXT NOT NULL,
+    description TEXT NOT NULL DEFAULT '',
+    priority TEXT NOT NULL DEFAULT 'medium',
+    completed INTEGER NOT NULL DEFAULT 0,
+    created_at INTEGER NOT NULL,
+    version INTEGER NOT NULL DEFAULT 1,
+    completed_at INTEGER,
+    due_at INTEGER,
+    remind_at INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_tasks_completed ON tasks (completed, id);
+CREATE INDEX IF NOT EXISTS idx_tasks_priority ON tasks (priority, id);
+CREATE INDEX IF NOT EXISTS idx_tasks_created_at ON tasks (created_at, id);
+CREATE INDEX IF NOT EXISTS idx_tasks_due_at ON tasks (completed, due_at, id);
+CREATE INDEX IF NOT EXISTS idx_tasks_remind_at ON tasks (completed, remind_at, id);
+"""
+
+FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS tasks_fts USING fts5(
+    title, description, content='tasks', content_rowid='id'
+);
+CREATE TRIGGER IF NOT EXISTS tasks_fts_insert AFTER INSERT ON tasks BEGIN
+    INSERT INTO tasks_fts (rowid, title, description) VALUES (new.id, new.title, new.description);
+END;
+CREATE TRIGGER IF NOT EXISTS tasks_fts_delete AFTER DELETE ON tasks BEGIN
+    INSERT INTO tasks_fts (tasks_fts, rowid, title, description)
+    VALUES ('delete', old.id, old.title, old.description);
+END;
+CREATE TRIGGER IF NOT EXISTS tasks_fts_update AFTER UPDATE OF title, description ON tasks BEGIN
+    INSERT INTO tasks_fts (tasks_fts, rowid, title, description)
+    VALUES ('delete', old.id, old.title, old.description);
+    INSERT INTO tasks_fts (rowid, title, description) VALUES (new.id, new.title, new.description);
+END;
+"""
+
+COLUMNS = "id, title, description, priority, completed, created_at, version, completed_at, due_at, remind_at"
+JOINED_COLUMNS = ", ".join("t." + column for column in COLUMNS.split(", "))
+
+SORT_KEYS = {
+    "id": "id",
+    "created_at": "created_at",
+    "priority": "CASE priority WHEN 'low' THEN 0 WHEN 'medium' THEN 1 WHEN 'high' THEN 2 ELSE -1 END",
+}
+ORDER_CLAUSES = {
+    field: key if field == "id" else f"{key}, id"
+    for field, key in SORT_KEYS.items()
+}
+
+
+def row_to_task(row: Tuple) -> Task:
+    """
+    Build a Task from a row selected with COLUMNS.
+
+    Args:
+        row: Database row
+
+    Returns:
+        The corresponding Task
+    """
+    # Rows hold epoch seconds already, so only the priority is converted
+    return Task.from_stored(row[0], row[1], row[2], stored_priority(row[3]), bool(row[4]), *row[5:])
+
+
+class SqliteTaskStore:
+    """Store that keeps tasks in a SQLite database running in WAL mode."""
+
+    # Methods that touch the database, timed when metrics are enabled
+    IO_METHODS = (
+        "get", "insert", "insert_many", "update", "delete", "count", "query", "search", "search_substring", "due",
+        "reminders", "next_reminder"
+    )
+
+    def __init__(self, path: str, synchronous: str = "NORMAL"):
+        """
+        Open (and if needed create) the database.
+
+        Args:
+            path: Path to the SQLite database file
+            synchronous: SQLite synchronous level; in WAL mode NORMAL syncs
+                at checkpoints and FULL on every commit
+        """
+        self.path = path
+        # The connection is shared between threads (e.g. Streamlit sessions);
+        # the lock serializes access to it.
+        self._conn = sqlite3.connect(path, check_same_thread=False, cached_statements=256)
+        self._lock = threading.RLock()
+        self._transaction_depth = 0
+        # Set while commits are held back (see SqliteTaskService): writes
+        # then stay in the open transaction until commit()
+        self.defer_commits = False
+        self.closed = False
+        with self._lock:
+            # WAL lets readers proceed while a writer commits
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(f"PRAGMA synchronous={synchronous}")
+            self._conn.executescript(SCHEMA)
+            self.has_fts = self._create_fts()
+            # Only written on creation: opening must not wait for another
+            # connection's open transaction (see defer_commits)
+            if self._conn.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+                self._conn.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+            self._conn.commit()
+
+    def _create_fts(self) -> bool:
+        """Create the FTS5 index, returning False if SQLite lacks FTS5."""
+        try:
+            self._conn.executescript(FTS_SCHEMA)
+        except sqlite3.OperationalError:
+            return False
+        return True
+
+    @contextmanager
+    def transaction(self) -> Iterator[None]:
+        """
+        Group writes into one commit.
+
+        Transactions nest; the outermost one commits, even if the block
+        raises, matching the file stores where a failed batch keeps the
+        changes made before the error.
+        """
+        with self._lock:
+            self._transaction_depth += 1
+            try:
+                yield
+            finally:
+                self._transaction_depth -= 1
+                if not self._transaction_depth and not self.defer_commits:
+                    self._conn.commit()
+
+    def commit(self) -> None:
+        """Commit the writes held back while defer_commits is set."""
+        with self._lock:
+            if self._conn.in_transaction:
+                self._conn.commit()
+
+    def sync(self) -> None:
+        """Write the write-ahead log through to the database file, syncing both to disk."""
+        with self._lock:
+            self._conn.execute("PRAGMA wal_checkpoint(FULL)")
+
+    def get(self, task_id: int) -> Optional[Task]:
+        """
+        Fetch a single task.
+
+        Args:
+            task_id: ID of the task
+
+        Returns:
+            The Task, or None if it does not exist
+        """
+        with self._lock:
+            row = self._conn.execute(f"SELECT {COLUMNS} FROM tasks WHERE id = ?", (task_id,)).fetchone()
+        return None if row is None else row_to_task(row)
+
+    def existing_ids(self, task_ids: Iterable[int]) -> Set[int]:
+        """
+        Find which of some ids have a row.
+
+        Args:
+            task_ids: IDs to look for
+
+        Returns:
+            The ids that exist
+        """
+        task_ids = list(task_ids)
+        found: Set[int] = set()
+        with self._lock:
+            for start in range(0, len(task_ids), IDS_PER_QUERY):
+                chunk = task_ids[start:start + IDS_PER_QUERY]
+                placeholders = ", ".join("?" * len(chunk))
+                rows = self._conn.execute(f"SELECT id FROM tasks WHERE id IN ({placeholders})", chunk)
+                found.update(row[0] for row in rows)
+        return found
+
+    def insert(
+        self,
+        title: str,
+        description: str,
+        priority: str,
+        completed: bool = False,
+        created_at: Union[str, int, None] = None,
+        completed_at: Union[str, int, None] = None,
+        due_at: Union[str, int, None] = None,
+        remind_at: Union[str, int, None] = None
+    ) -> Task:
+        """
+        Insert a new task, letting SQLite allocate its id.
+
+        AUTOINCREMENT guarantees ids of deleted tasks are never reused.
+
+        Args:
+            title: Task title
+            description: Task description
+            priority: Task priority
+            completed: Whether the task starts out completed
+            created_at: Creation time, or None for now
+            completed_at: Completion time, or None if unknown
+            due_at: Due date, or None
+            remind_at: Reminder time, or None
+
+        Returns:
+            The newly created Task
+        """
+        task = Task(
+            0, title, description, priority, completed, created_at, completed_at=completed_at, due_at=due_at,
+            remind_at=remind_at
+        )
+        with self.transaction():
+            cursor = self._conn.execute(
+                "INSERT INTO tasks (title, description, priority, completed, created_at, completed_at, due_at,"
+                " remind_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    task.title, task.description, task.priority, int(task.completed), task.created_ts,
+                    task.completed_ts, task.due_ts, task.remind_ts
+                )
+            )
+        task.id = cursor.lastrowid
+        return task
+
+    def insert_many(self, tasks: Iterable[Task]) -> None:
+        """
+        Insert tasks with their existing ids in a single transaction.
+
+        Args:
+            tasks: Tasks to insert
+        """
+        rows = (
+            (
+                task.id, task.title, task.description, task.priority, int(task.completed), task.created_ts,
+                task.version, task.completed_ts, task.due_ts, task.remind_ts
+            )
+            for task in tasks
+        )
+        with self.transaction():
+            self._conn.executemany(f"INSERT INTO tasks ({COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+
+    def update(self, task: Task) -> bool:
+        """
+        Write back all fields of an existing task and bump its version.
+
+        The row is only written if it is still at task.version, so a
+        concurrent update from another connection is never overwritten.
+
+        Args:
+            task: Task to write, as last read
+
+        Returns:
+            True if the row was updated, False if it changed or disappeared
+        """
+        with self.transaction():
+            cursor = self._conn.execute(
+                "UPDATE tasks SET title = ?, description = ?, priority = ?, completed = ?, completed_at = ?,"
+                " due_at = ?, remind_at = ?, version = version + 1 WHERE id = ? AND version = ?",
+                (
+                    task.title, task.description, task.priority, int(task.completed), task.completed_ts,
+                    task.due_ts, task.remind_ts, task.id, task.version
+                )
+            )
+        if cursor.rowcount != 1:
+            return False
+        task.version += 1
+        return True
+
+    def delete(self, task_id: int) -> None:
+        """
+        Delete a task.
+
+        Args:
+            task_id: ID of the task to delete
+        """
+        with self.transaction():
+            self._conn.execute("DELETE FROM tasks WHERE id = ?", (task_id,))
+
+    def reserve_ids(self, next_id: int) -> None:
+        """
+        Make sure newly allocated ids start at or after next_id.
+
+        The counter only ever moves forward, so ids already handed out are
+        never reused.
+
+        Args:
+            next_id: Lowest id new tasks may receive
+        """
+        with self.transaction():
+            cursor = self._conn.execute(
+                "UPDATE sqlite_sequence SET seq = MAX(seq, ?) WHERE name = 'tasks'", (next_id - 1,)
+            )
+            if not cursor.rowcount:
+                self._conn.execute("INSERT INTO sqlite_sequence (name, seq) VALUES ('tasks', ?)", (next_id - 1,))
+
+    def count(
+        self,
+        completed: Optional[bool] = None,
+        priorities: Optional[List[str]] = None,
+        created_between: Optional[Tuple[Optional[int], Optional[int]]] = None
+    ) -> int:
+        """
+        Count tasks matching all of the given filters.
+
+        Args:
+            completed: Completion status to match, or None for any
+            priorities: Priority levels to match, or None for any
+            created_between: Inclusive (start, end) bounds in epoch seconds
+
+        Returns:
+            Number of matching tasks
+        """
+        where, params = self._filters(completed, priorities, created_between)
+        sql = "SELECT COUNT(*) FROM tasks"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        with self._lock:
+            return self._conn.execute(sql, params).fetchone()[0]
+
+    def query(
+        self,
+        completed: Optional[bool] = None,
+        priorities: Optional[List[str]] = None,
+        created_between: Optional[Tuple[Optional[int], Optional[int]]] = None,
+        order_by: str = "id",
+        descending: bool = False,
+        limit: Optional[int] = None,
+        offset: int = 0,
+        after: Optional[Tuple[int, int]] = None
+    ) -> List[Task]:
+        """
+        Select tasks matching all of the given filters.
+
+        Args:
+            completed: Completion status to match, or None for any
+            priorities: Priority levels to match, or None for any
+            created_between: Inclusive (start, end) bounds in epoch seconds
+            order_by: Key of ORDER_CLAUSES to sort by
+            descending: Whether to sort in descending order
+            limit: Maximum number of tasks to return, or None for all
+            offset: Number of matching tasks to skip
+            after: Only return tasks past this (sort value, id) position in
+                the requested order, as given by page_key
+
+        Returns:
+            List of matching Task objects
+        """
+        where, params = self._filters(completed, priorities, created_between)
+        if after is not None:
+            value, task_id = after
+            op = "<" if descending else ">"
+            if order_by == "id":
+                where.append(f"id {op} ?")
+                params.append(task_id)
+            else:
+                key = SORT_KEYS[order_by]
+                where.append(f"({key} {op} ? OR ({key} = ? AND id {op} ?))")
+                params.extend([value, value, task_id])
+
+        order = ORDER_CLAUSES[order_by]
+        if descending:
+            order = ", ".join(f"{term} DESC" for term in order.split(", "))
+        sql = f"SELECT {COLUMNS} FROM tasks"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += f" ORDER BY {order} LIMIT ? OFFSET ?"
+        params.extend([-1 if limit is None else limit, offset])
+
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [row_to_task(row) for row in rows]
+
+    def due(self, before: Optional[int] = None, limit: Optional[int] = None) -> List[Task]:
+        """
+        Select active tasks by due date, earliest first.
+
+        Args:
+            before: Only tasks due strictly before this time (epoch seconds)
+            limit: Maximum number of tasks to return, or None for all
+
+        Returns:
+            List of matching Task objects
+        """
+        sql = f"SELECT {COLUMNS} FROM tasks WHERE completed = 0 AND due_at IS NOT NULL"
+        params: List = []
+        if before is not None:
+            sql += " AND due_at < ?"
+            params.append(before)
+        sql += " ORDER BY due_at, id LIMIT ?"
+        params.append(-1 if limit is None else limit)
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [row_to_task(row) for row in rows]
+
+    def reminders(self, after: int, until: int) -> List[Task]:
+        """
+        Select active tasks with a reminder in a time range, earliest first.
+
+        Args:
+            after: Exclusive lower bound in epoch seconds
+            until: Inclusive upper bound in epoch seconds
+
+        Returns:
+            List of matching Task objects
+        """
+        sql = (
+            f"SELECT {COLUMNS} FROM tasks WHERE completed = 0 AND remind_at > ? AND remind_at <= ?"
+            " ORDER BY remind_at, id"
+        )
+        with self._lock:
+            rows = self._conn.execute(sql, (after, until)).fetchall()
+        return [row_to_task(row) for row in rows]
+
+    def next_reminder(self, after: int) -> Optional[int]:
+        """
+        Find the first reminder time of an active task after a time.
+
+        Args:
+            after: Exclusive lower bound in epoch seconds
+
+        Returns:
+            The reminder time in epoch seconds, or None if there is none
+        """
+        with self._lock:
+            return self._conn.execute(
+                "SELECT MIN(remind_at) FROM tasks WHERE completed = 0 AND remind_at > ?", (after,)
+            ).fetchone()[0]
+
+    @staticmethod
+    def _filters(
+        completed: Optional[bool],
+        priorities: Optional[List[str]],
+        created_between: Optional[Tuple[Optional[int], Optional[int]]]
+    ) -> Tuple[List[str], List]:
+        """Build the WHERE terms and parameters shared by query and count."""
+        where, params = [], []
+        if completed is not None:
+            where.append("completed = ?")
+            params.append(int(completed))
+        if priorities is not None:
+            where.append(f"priority IN ({', '.join('?' * len(priorities))})")
+            params.extend(priorities)
+        if created_between is not None:
+            start, end = created_between
+            if start is not None:
+                where.append("created_at >= ?")
+                params.append(start)
+            if end is not None:
+                where.append("created_at <= ?")
+                params.append(end)
+        return where, params
+
+    def search(self, terms: List[str], limit: Optional[int] = None, prefix: bool = True) -> List[Task]:
+        """
+        Full-text search requiring every term to match, best match first.
+
+        Args:
+            terms: Lowercase word tokens to match
+            limit: Maximum number of results, or None for all
+            prefix: Whether terms also match longer words they start
+
+        Returns:
+            List of matching Task objects
+        """
+        if not self.has_fts:
+            return self._search_like(terms, limit)
+        suffix = "*" if prefix else ""
+        match = " ".join(f'"{term}"{suffix}' for term in terms)
+        # Weights mirror the in-memory index: title hits count double
+        sql = (
+            f"SELECT {JOINED_COLUMNS} FROM tasks_fts"
+            " JOIN tasks t ON t.id = tasks_fts.rowid"
+            " WHERE tasks_fts MATCH ? ORDER BY bm25(tasks_fts, 2.0, 1.0), t.id LIMIT ?"
+        )
+        with self._lock:
+            rows = self._conn.execute(sql, (match, -1 if limit is None else limit)).fetchall()
+        return [row_to_task(row) for row in rows]
+
+    def search_substring(self, keyword: str, limit: Optional[int] = None) -> List[Task]:
+        """
+        Case-insensitive substring search, in id order.
+
+        Args:
+            keyword: Substring to look for in titles and descriptions
+            limit: Maximum number of results, or None for all
+
+        Returns:
+            List of matching Task objects
+        """
+        keyword = keyword.lower()
+        sql = (
+            f"SELECT {COLUMNS} FROM tasks"
+            " WHERE instr(lower(title), ?) > 0 OR instr(lower(description), ?) > 0"
+            " ORDER BY id LIMIT ?"
+        )
+        with self._lock:
+            rows = self._conn.execute(sql, (keyword, keyword, -1 if limit is None else limit)).fetchall()
+        return [row_to_task(row) for row in rows]
+
+    def _search_like(self, terms: List[str], limit: Optional[int]) -> List[Task]:
+        """Unranked AND search for SQLite builds without FTS5."""
+        clause = " AND ".join("(instr(lower(title), ?) > 0 OR instr(lower(description), ?) > 0)" for _ in terms)
+        params = [term for term in terms for _ in range(2)]
+        sql = f"SELECT {COLUMNS} FROM tasks WHERE {clause} ORDER BY id LIMIT ?"
+        with self._lock:
+            rows = self._conn.execute(sql, params + [-1 if limit is None else limit]).fetchall()
+        return [row_to_task(row) for row in rows]
+
+    def data_version(self) -> int:
+        """
+        Get a counter that changes whenever another connection commits.
+
+        Commits made through this store leave it unchanged.
+
+        Returns:
+            SQLite's data_version for this connection
+        """
+        with self._lock:
+            return self._conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def disk_usage(self) -> int:
+        """
+        Get the space taken by the database and its write-ahead log.
+
+        Returns:
+            Size in bytes
+        """
+        return file_size(self.path) + file_size(self.path + "-wal")
+
+    def close(self) -> None:
+        """Commit the writes held back, if any, and close the database connection; closing again does nothing."""
+        with self._lock:
+            if self.closed:
+                return
+            self._conn.commit()
+            self._conn.close()
+            self.closed = True
+
+
+def migrate_json_to_sqlite(json_path: str, db_path: str) -> int:
+    """
+    Copy every task from a JSON (or journal) task store into a SQLite database.
+
+    Ids and the id counter are preserved, so references to existing task ids
+    stay valid after switching backends.
+
+    Args:
+        json_path: Path of the existing JSON task file
+        db_path: Path of the SQLite database to create or fill
+
+    Returns:
+        Number of migrated tasks
+    """
+    # Imported here to keep the storage modules free of import cycles
+    from src.storage.factory import create_store
+
+    source = create_store(json_path)
+    tasks, next_id = source.load()
+    source.close()
+
+    target = SqliteTaskStore(db_path)
+    try:
+        target.insert_many(tasks)
+        target.reserve_ids(next_id)
+    finally:
+        target.close()
+    return len(tasks)
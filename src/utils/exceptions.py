@@ -16,3 +16,8 @@ class TaskNotFoundException(TaskManagerException):
 class InvalidTaskDataException(TaskManagerException):
     """Exception raised when task data is invalid."""
     pass
+
+
+class StaleTaskException(TaskManagerException):
+    """Exception raised when a task was changed since the version a write expected."""
+    pass
@@ -0,0 +1,70 @@
+"""
+Advisory inter-process file lock.
+"""
+
+import os
+
+try:
+    import fcntl
+except ImportError:  # Windows: no advisory locks, single-process use only
+    fcntl = None
+
+
+class FileLock:
+    """
+    Exclusive advisory lock on a lock file, shared by every process using it.
+
+    The lock is not reentrant and belongs to the process rather than to a
+    thread, so it may be released by a different thread than the one that
+    acquired it. Where fcntl is unavailable, acquiring always succeeds.
+    """
+
+    def __init__(self, path: str):
+        """
+        Initialize the lock.
+
+        Args:
+            path: Path of the lock file; created on first use
+        """
+        self.path = path
+        self._fd = None
+
+    @property
+    def held(self) -> bool:
+        """Whether this object currently holds the lock."""
+        return self._fd is not None
+
+    def acquire(self, blocking: bool = True) -> bool:
+        """
+        Take the lock.
+
+        Args:
+            blocking: Wait for other holders to release it; when False,
+                give up immediately if it is taken
+
+        Returns:
+            True if the lock was acquired
+        """
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        if fcntl is not None:
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                os.close(fd)
+                return False
+        self._fd = fd
+        return True
+
+    def release(self) -> None:
+        """Release the lock if it is held."""
+        if self._fd is not None:
+            # Closing the descriptor drops the flock
+            os.close(self._fd)
+            self._fd = None
+
+    def __enter__(self) -> 'FileLock':
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.release()
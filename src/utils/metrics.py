@@ -0,0 +1,308 @@
+"""
+Opt-in metrics: counters, latency histograms and callback gauges.
+
+Nothing here is used unless a Metrics registry is passed to a TaskService,
+which then wraps its own methods; services without one run the plain,
+unwrapped methods.
+"""
+
+import functools
+import math
+import threading
+import time
+from bisect import bisect_left
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Upper bounds in seconds, spanning in-memory lookups to full rewrites of huge stores
+LATENCY_BUCKETS = (
+    0.00001, 0.00005, 0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0, math.inf
+)
+DEFAULT_METRICS_HOST = "127.0.0.1"
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus style."""
+
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        """
+        Initialize an empty histogram.
+
+        Args:
+            buckets: Sorted bucket upper bounds, ending with math.inf
+        """
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        """
+        Record a value.
+
+        Args:
+            value: Observed value
+        """
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def cumulative(self) -> List[Tuple[float, int]]:
+        """
+        Get the cumulative count for each bucket.
+
+        Returns:
+            List of (upper bound, observations at or below it)
+        """
+        total = 0
+        result = []
+        for bound, count in zip(self.buckets, self.counts):
+            total += count
+            result.append((bound, total))
+        return result
+
+    def quantile(self, q: float) -> Optional[float]:
+        """
+        Estimate a quantile as the upper bound of the bucket containing it.
+
+        Args:
+            q: Quantile between 0 and 1
+
+        Returns:
+            The estimate, or None if nothing was observed
+        """
+        if not self.count:
+            return None
+        rank = q * self.count
+        for bound, total in self.cumulative():
+            if total >= rank:
+                return bound
+        return self.buckets[-1]
+
+
+def _label_key(labels: Dict[str, str]) -> LabelKey:
+    return tuple(sorted(labels.items()))
+
+
+def _format_labels(key: LabelKey, extra: Optional[Tuple[str, str]] = None) -> str:
+    items = list(key) + ([extra] if extra else [])
+    if not items:
+        return ""
+    return "{" + ",".join(f'{name}="{value}"' for name, value in items) + "}"
+
+
+def _format_bound(bound: float) -> str:
+    return "+Inf" if bound == math.inf else repr(bound)
+
+
+class Metrics:
+    """Thread-safe registry of counters, histograms and callback gauges."""
+
+    def __init__(self):
+        """Initialize an empty registry."""
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Dict[LabelKey, float]] = {}
+        self._histograms: Dict[str, Dict[LabelKey, Histogram]] = {}
+        # name -> (kind, callback); evaluated whenever metrics are read
+        self._callbacks: Dict[str, Tuple[str, Callable[[], Optional[float]]]] = {}
+        self._help: Dict[str, str] = {}
+
+    def describe(self, name: str, help_text: str) -> None:
+        """Set the help text shown for a metric in the Prometheus export."""
+        self._help[name] = help_text
+
+    def inc(self, name: str, amount: float = 1, **labels: str) -> None:
+        """
+        Increase a counter.
+
+        Args:
+            name: Metric name
+            amount: Amount to add
+            **labels: Label values
+        """
+        key = _label_key(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + amount
+
+    def observe(self, name: str, value: float, **labels: str) -> None:
+        """
+        Record a value in a histogram.
+
+        Args:
+            name: Metric name
+            value: Observed value
+            **labels: Label values
+        """
+        key = _label_key(labels)
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = Histogram()
+            histogram.observe(value)
+
+    def register_callback(self, name: str, callback: Callable[[], Optional[float]], kind: str = "gauge") -> None:
+        """
+        Expose a value computed on demand, such as a size or a running total.
+
+        Args:
+            name: Metric name
+            callback: Returns the current value, or None if unavailable
+            kind: Prometheus type, "gauge" or "counter"
+        """
+        self._callbacks[name] = (kind, callback)
+
+    def timed(self, name: str, func: Callable, **labels: str) -> Callable:
+        """
+        Wrap a callable so each call's duration is recorded in a histogram.
+
+        Calls that raise are also counted in ``<name>_errors_total``.
+
+        Args:
+            name: Histogram name
+            func: Callable to wrap
+            **labels: Label values
+
+        Returns:
+            The wrapped callable
+        """
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            except Exception:
+                self.inc(name + "_errors_total", **labels)
+                raise
+            finally:
+                self.observe(name, time.perf_counter() - start, **labels)
+        return wrapper
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Read every metric as JSON-serializable data.
+
+        Returns:
+            Dict with "counters", "histograms" and "gauges" lists, plus the
+            "help" texts by metric name. Each entry has a "name" and
+            "labels"; counters and gauges a "value" (gauges also a "kind"),
+            histograms a "count", "sum", estimated "p50" and "p99", and
+            cumulative "buckets" as [upper bound, count] pairs
+        """
+        with self._lock:
+            counters = [
+                {"name": name, "labels": dict(key), "value": value}
+                for name, series in sorted(self._counters.items())
+                for key, value in series.items()
+            ]
+            histograms = [
+                {
+                    "name": name,
+                    "labels": dict(key),
+                    "count": histogram.count,
+                    "sum": histogram.sum,
+                    "p50": histogram.quantile(0.5),
+                    "p99": histogram.quantile(0.99),
+                    "buckets": [[_format_bound(bound), total] for bound, total in histogram.cumulative()],
+                }
+                for name, series in sorted(self._histograms.items())
+                for key, histogram in series.items()
+            ]
+        # Callbacks run outside the lock; they may take locks of their own
+        gauges = [
+            {"name": name, "labels": {}, "kind": kind, "value": callback()}
+            for name, (kind, callback) in sorted(self._callbacks.items())
+        ]
+        return {"counters": counters, "histograms": histograms, "gauges": gauges, "help": dict(self._help)}
+
+    def to_prometheus(self) -> str:
+        """
+        Render every metric in the Prometheus text exposition format.
+
+        Returns:
+            The exposition text
+        """
+        return format_prometheus(self.snapshot())
+
+
+def format_prometheus(snapshot: Dict[str, Any]) -> str:
+    """
+    Render a Metrics.snapshot() in the Prometheus text exposition format.
+
+    Taking the snapshot rather than the registry lets metrics collected in
+    another process (e.g. the task daemon) be rendered locally.
+
+    Args:
+        snapshot: Result of Metrics.snapshot()
+
+    Returns:
+        The exposition text
+    """
+    lines = []
+    described = set()
+
+    def header(name: str, kind: str) -> None:
+        if name in described:
+            return
+        described.add(name)
+        if name in snapshot["help"]:
+            lines.append(f"# HELP {name} {snapshot['help'][name]}")
+        lines.append(f"# TYPE {name} {kind}")
+
+    for entry in snapshot["counters"]:
+        name, key = entry["name"], _label_key(entry["labels"])
+        header(name, "counter")
+        lines.append(f"{name}{_format_labels(key)} {entry['value']}")
+    for entry in snapshot["histograms"]:
+        name, key = entry["name"], _label_key(entry["labels"])
+        header(name, "histogram")
+        for bound, total in entry["buckets"]:
+            lines.append(f"{name}_bucket{_format_labels(key, ('le', bound))} {total}")
+        lines.append(f"{name}_sum{_format_labels(key)} {entry['sum']}")
+        lines.append(f"{name}_count{_format_labels(key)} {entry['count']}")
+    for entry in snapshot["gauges"]:
+        if entry["value"] is not None:
+            header(entry["name"], entry["kind"])
+            lines.append(f"{entry['name']} {entry['value']}")
+    return "\n".join(lines) + "\n"
+
+
+def serve_metrics(metrics: Metrics, port: int, host: str = DEFAULT_METRICS_HOST) -> Any:
+    """
+    Serve metrics in Prometheus format at /metrics from a background thread.
+
+    Args:
+        metrics: Registry to expose
+        port: TCP port (0 picks a free one)
+        host: Interface to bind; local only by default
+
+    Returns:
+        The running server; call shutdown() to stop it
+    """
+    # Imported here: http.server costs more to import than the rest of the CLI
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+    from socketserver import ThreadingMixIn
+
+    class Server(ThreadingMixIn, HTTPServer):
+        daemon_threads = True
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = metrics.to_prometheus().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = Server((host, port), Handler)
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    return server
@@ -0,0 +1,113 @@
+"""
+Streaming CSV/JSONL import and export of tasks.
+"""
+
+import os
+import sys
+import csv
+import json
+from contextlib import contextmanager
+from typing import Dict, Any, Iterable, Iterator, Optional, TextIO
+
+from src.models.task import Task
+from src.utils.exceptions import InvalidTaskDataException
+
+FORMATS = ("csv", "jsonl")
+CSV_FIELDS = (
+    "id", "title", "description", "priority", "completed", "created_at", "completed_at", "due_at", "remind_at"
+)
+TRUE_VALUES = ("1", "true", "yes", "y")
+
+
+def detect_format(path: str, file_format: Optional[str] = None) -> str:
+    """
+    Work out the file format from an explicit choice or the file extension.
+
+    Args:
+        path: File path ("-" for stdin/stdout)
+        file_format: One of FORMATS, or None to use the extension
+
+    Returns:
+        The file format
+
+    Raises:
+        InvalidTaskDataException: If the format cannot be determined
+    """
+    if file_format is None:
+        file_format = os.path.splitext(path)[1].lstrip(".").lower()
+    if file_format not in FORMATS:
+        raise InvalidTaskDataException(
+            f"Cannot determine file format of '{path}'. Use one of: {', '.join(FORMATS)}"
+        )
+    return file_format
+
+
+@contextmanager
+def open_text(path: str, mode: str) -> Iterator[TextIO]:
+    """Open a text file, treating "-" as stdin or stdout."""
+    if path == "-":
+        yield sys.stdin if "r" in mode else sys.stdout
+    else:
+        with open(path, mode, newline="", encoding="utf-8") as f:
+            yield f
+
+
+def read_task_entries(f: TextIO, file_format: str) -> Iterator[Dict[str, Any]]:
+    """
+    Yield task entries, as accepted by TaskService.add_tasks, one row at a time.
+
+    Args:
+        f: Open text file
+        file_format: One of FORMATS
+
+    Raises:
+        InvalidTaskDataException: If a row has no title
+    """
+    if file_format == "csv":
+        rows = csv.DictReader(f)
+    else:
+        rows = (json.loads(line) for line in f if line.strip())
+
+    for line_number, row in enumerate(rows, start=1):
+        if not row.get("title"):
+            raise InvalidTaskDataException(f"Row {line_number} has no title")
+        completed = row.get("completed", False)
+        if isinstance(completed, str):
+            completed = completed.strip().lower() in TRUE_VALUES
+        yield {
+            "title": row["title"],
+            "description": row.get("description") or "",
+            "priority": row.get("priority") or "medium",
+            "completed": completed,
+            "created_at": row.get("created_at") or None,
+            "completed_at": row.get("completed_at") or None,
+            "due_at": row.get("due_at") or None,
+            "remind_at": row.get("remind_at") or None,
+        }
+
+
+def write_tasks(f: TextIO, tasks: Iterable[Task], file_format: str) -> int:
+    """
+    Write tasks one row at a time.
+
+    Args:
+        f: Open text file
+        tasks: Tasks to write
+        file_format: One of FORMATS
+
+    Returns:
+        Number of tasks written
+    """
+    count = 0
+    if file_format == "csv":
+        # The version is store bookkeeping; imported rows start a new history
+        writer = csv.DictWriter(f, fieldnames=CSV_FIELDS, extrasaction="ignore")
+        writer.writeheader()
+        for task in tasks:
+            writer.writerow(task.to_dict())
+            count += 1
+    else:
+        for task in tasks:
+            f.write(json.dumps(task.to_dict()) + "\n")
+            count += 1
+    return count
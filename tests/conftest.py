@@ -0,0 +1,41 @@
+"""
+Shared fixtures for the test suite.
+"""
+
+import pytest
+
+from src.services.task_service import TaskService
+
+# File name and storage mode of a store of each backend, see src.storage.factory
+STORAGE_BACKENDS = {
+    "json": ("tasks.json", "json"),
+    "journal": ("tasks.json", "journal"),
+    "columnar": ("tasks.tcol", None),
+    "sqlite": ("tasks.db", None),
+}
+
+
+@pytest.fixture(params=sorted(STORAGE_BACKENDS))
+def open_service(request, tmp_path):
+    """
+    Open TaskServices over one store file, once per storage backend.
+
+    Calling the fixture again opens another service on the same file, as a
+    later run (or another process) would; its path and storage_mode
+    attributes give the file and mode to open it elsewhere. Every service is
+    closed after the test.
+    """
+    name, mode = STORAGE_BACKENDS[request.param]
+    path = str(tmp_path / name)
+    services = []
+
+    def open_store(**kwargs) -> TaskService:
+        service = TaskService(path, mode, **kwargs)
+        services.append(service)
+        return service
+
+    open_store.path = path
+    open_store.storage_mode = mode
+    yield open_store
+    for service in services:
+        service.close()
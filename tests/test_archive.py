@@ -0,0 +1,62 @@
+"""
+Tests for moving completed tasks to the archive and back.
+"""
+
+import pytest
+
+from src.services.archive_policy import ArchivePolicy
+from src.utils.exceptions import TaskNotFoundException
+
+
+def test_archive_and_restore_round_trip(open_service):
+    service = open_service()
+    tasks = service.add_tasks([
+        {"title": "Old report", "completed": True, "completed_at": "2024-01-01 09:00:00"},
+        {"title": "Recent report", "completed": True},
+        {"title": "Active report"},
+    ])
+    old = service.get_task_by_id(tasks[0].id).to_dict()
+
+    assert service.archive_completed(ArchivePolicy(completed_days=30)) == 1
+    assert [task.id for task in service.get_all_tasks()] == [tasks[1].id, tasks[2].id]
+    assert [task.title for task in service.search_tasks("report")] == ["Recent report", "Active report"]
+    assert [task.to_dict() for task in service.archived_tasks()] == [old]
+    assert [task.id for task in service.search_archive("OLD")] == [tasks[0].id]
+    assert [task.id for task in service.get_all_tasks(include_archived=True)] == [task.id for task in tasks]
+    service.close()
+
+    service = open_service()
+    assert [task.id for task in service.archived_tasks()] == [tasks[0].id]
+    restored = service.restore_task(tasks[0].id)
+    assert restored.to_dict() == old
+    assert service.archived_tasks() == []
+    assert [task.id for task in service.get_all_tasks()] == [task.id for task in tasks]
+    assert [task.id for task in service.query(completed=True)] == [tasks[0].id, tasks[1].id]
+    with pytest.raises(TaskNotFoundException):
+        service.restore_task(tasks[0].id)
+    service.close()
+
+    reopened = open_service()
+    assert reopened.get_task_by_id(tasks[0].id).to_dict() == old
+    assert reopened.archived_tasks() == []
+
+
+def test_max_hot_tasks_archives_the_longest_completed(open_service):
+    service = open_service()
+    service.add_tasks([
+        {"title": "Newer", "completed": True, "completed_at": "2024-02-01 09:00:00"},
+        {"title": "Older", "completed": True, "completed_at": "2024-01-01 09:00:00"},
+        {"title": "Active"},
+    ])
+    assert service.archive_completed(ArchivePolicy(max_hot_tasks=2)) == 1
+    assert [task.title for task in service.archived_tasks()] == ["Older"]
+    assert service.archive_completed((None, 0)) == 1
+    assert [task.title for task in service.get_all_tasks()] == ["Active"]
+
+
+def test_invalid_policy_is_rejected(open_service):
+    service = open_service()
+    with pytest.raises(ValueError):
+        service.archive_completed()
+    with pytest.raises(ValueError):
+        service.archive_completed(ArchivePolicy(completed_days=-1))
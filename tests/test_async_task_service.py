@@ -0,0 +1,104 @@
+"""
+Tests for the asyncio front end and its background writer.
+"""
+
+import asyncio
+
+import pytest
+
+from src.services.async_task_service import AsyncTaskService
+from src.services.task_service import TaskService
+
+
+def run(coroutine):
+    """Run a coroutine on a fresh event loop; asyncio.run is Python 3.7+."""
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
+
+
+def count_writes(service: AsyncTaskService, fail: int = 0) -> list:
+    """Record each write of the wrapped TaskService, failing the first fail of them."""
+    writes = []
+    save_tasks = service.service._save_tasks
+
+    def save():
+        writes.append(1)
+        if len(writes) <= fail:
+            raise OSError("disk full")
+        save_tasks()
+
+    service.service._save_tasks = save
+    return writes
+
+
+def stored_titles(path):
+    service = TaskService(path)
+    try:
+        return [task.title for task in service.get_all_tasks()]
+    finally:
+        service.close()
+
+
+def test_a_burst_of_mutations_is_written_once(tmp_path):
+    path = str(tmp_path / "tasks.json")
+
+    async def main():
+        async with AsyncTaskService(path, flush_delay=0.2) as service:
+            writes = count_writes(service)
+            tasks = await asyncio.gather(*(service.add_task(f"Task {index}") for index in range(10)))
+            await service.complete_task(tasks[0].id)
+            assert [task.id for task in await service.get_all_tasks()] == [task.id for task in tasks]
+            assert writes == []
+            await asyncio.sleep(0.5)
+            assert writes == [1]
+            assert len(stored_titles(path)) == 10
+
+            # Nothing left to write
+            await service.flush()
+            assert writes == [1]
+
+    run(main())
+
+
+def test_pending_mutations_are_flushed_on_close(tmp_path):
+    path = str(tmp_path / "tasks.json")
+
+    async def main():
+        # Long enough that only close writes the changes
+        service = AsyncTaskService(path, flush_delay=60)
+        await service.add_tasks([{"title": "First"}, {"title": "Second"}])
+        await service.close()
+
+    run(main())
+    assert stored_titles(path) == ["First", "Second"]
+
+
+def test_background_write_errors_reach_the_next_mutation(tmp_path):
+    path = str(tmp_path / "tasks.json")
+
+    async def main():
+        async with AsyncTaskService(path, flush_delay=0.01) as service:
+            writes = count_writes(service, fail=1)
+            await service.add_task("First")
+            await asyncio.sleep(0.2)
+            assert writes == [1]
+
+            with pytest.raises(OSError):
+                await service.add_task("Second")
+            # The error is reported once, and the change is still pending
+            await service.add_task("Third")
+            await service.flush()
+            assert stored_titles(path) == ["First", "Third"]
+
+            # A flush that succeeds clears an earlier failure
+            writes = count_writes(service, fail=1)
+            await service.add_task("Fourth")
+            await asyncio.sleep(0.2)
+            await service.flush()
+            await service.add_task("Fifth")
+
+    run(main())
+    assert stored_titles(path) == ["First", "Third", "Fourth", "Fifth"]
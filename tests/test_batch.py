@@ -0,0 +1,65 @@
+"""
+Tests for batched writes.
+"""
+
+import pytest
+
+from src.utils.exceptions import InvalidTaskDataException, TaskNotFoundException
+
+
+def snapshot(service):
+    return [task.to_dict() for task in service.get_all_tasks()]
+
+
+def test_batch_updates_are_applied_and_persisted(open_service):
+    service = open_service()
+    tasks = service.add_tasks([{"title": f"Task {number}"} for number in range(4)])
+    updated = service.update_tasks({
+        tasks[0].id: {"priority": "high"},
+        tasks[1].id: {"completed": True, "title": "Done"},
+    })
+    assert [task.version for task in updated] == [2, 2]
+    deleted = service.delete_tasks([tasks[2].id, tasks[2].id, tasks[3].id])
+    assert [task.id for task in deleted] == [tasks[2].id, tasks[3].id]
+    expected = snapshot(service)
+    service.close()
+
+    reopened = open_service()
+    assert snapshot(reopened) == expected
+    assert [task.title for task in reopened.query(completed=True)] == ["Done"]
+    assert [task.id for task in reopened.query(priority="high")] == [tasks[0].id]
+
+
+def test_batch_with_an_unknown_id_changes_nothing(open_service):
+    service = open_service()
+    tasks = service.add_tasks([{"title": "One"}, {"title": "Two"}])
+    before = snapshot(service)
+
+    with pytest.raises(TaskNotFoundException):
+        service.update_tasks([(tasks[0].id, {"title": "Changed"}), (99, {"title": "Missing"})])
+    with pytest.raises(TaskNotFoundException):
+        service.delete_tasks([tasks[0].id, 99])
+    assert snapshot(service) == before
+
+
+def test_batch_with_an_invalid_value_changes_nothing(open_service):
+    service = open_service()
+    tasks = service.add_tasks([{"title": "One"}, {"title": "Two"}])
+    before = snapshot(service)
+
+    with pytest.raises(InvalidTaskDataException):
+        service.update_tasks({tasks[0].id: {"title": "Changed"}, tasks[1].id: {"priority": "urgent"}})
+    assert snapshot(service) == before
+    assert service.search_tasks("changed") == []
+    service.close()
+    assert snapshot(open_service()) == before
+
+
+def test_batch_context_persists_every_change(open_service):
+    service = open_service()
+    with service.batch():
+        first = service.add_task("First")
+        service.update_task(first.id, title="First, renamed")
+        service.add_task("Second")
+    service.close()
+    assert [task.title for task in open_service().tasks] == ["First, renamed", "Second"]
@@ -0,0 +1,93 @@
+"""
+Tests for the change feed.
+"""
+
+from src.models.task import Task
+from src.services.change_feed import ChangeLog
+from src.services.task_service import TaskService
+
+
+def apply(replica, changes):
+    """Bring a client's copy of the tasks up to date, as a feed client would."""
+    for change in changes:
+        if change.op == "reset":
+            replica.clear()
+        elif change.op == "delete":
+            replica.pop(change.task_id, None)
+        else:
+            replica[change.task_id] = change.task.to_dict()
+    return changes[-1].revision if changes else None
+
+
+def current(service):
+    return {task.id: task.to_dict() for task in service.get_all_tasks()}
+
+
+def test_replica_follows_the_service(open_service):
+    service = open_service()
+    service.add_task("Existing")
+    service.close()
+
+    service = open_service()
+    replica = {}
+    changes = service.changes_since(0)
+    assert [change.op for change in changes] == ["reset", "add"]
+    revision = apply(replica, changes)
+
+    task = service.add_task("New")
+    service.update_task(task.id, title="New, renamed")
+    service.delete_task(1)
+    changes = service.changes_since(revision)
+    assert [change.op for change in changes] == ["add", "update", "delete"]
+    revision = apply(replica, changes)
+    assert replica == current(service)
+    assert service.changes_since(revision) == []
+
+
+def test_lazy_load_restarts_the_feed(tmp_path):
+    path = str(tmp_path / "tasks.json")
+    writer = TaskService(path)
+    writer.add_task("Existing")
+    writer.close()
+    service = TaskService(path, lazy_load=True)
+    revision = service.revision
+    # The first read loads the store; changes from before it cannot be replayed
+    changes = service.changes_since(revision)
+    assert [change.op for change in changes] == ["reset", "add"]
+    assert changes[0].revision > revision
+    service.close()
+
+
+def test_clients_behind_the_log_get_a_reset():
+    log = ChangeLog(size=2)
+    for task_id in (1, 2, 3):
+        log.append("add", Task(task_id, f"Task {task_id}"))
+    assert log.since(0) is None
+    assert [change.task_id for change in log.since(1)] == [2, 3]
+    log.restart()
+    assert log.since(3) is None
+    assert log.since(log.revision) == []
+
+
+def test_reload_records_other_processes_changes_as_a_diff(tmp_path):
+    path = str(tmp_path / "tasks.json")
+    reader = TaskService(path)
+    writer = TaskService(path)
+    kept = writer.add_task("Kept")
+    removed = writer.add_task("Removed")
+    revision = apply({}, reader.changes_since(0))
+
+    assert [change.op for change in reader.watch(revision, timeout=5, poll_interval=0.01)] == ["add", "add"]
+    revision = reader.revision
+    writer.update_task(kept.id, title="Kept, renamed")
+    writer.delete_task(removed.id)
+    changes = reader.watch(revision, timeout=5, poll_interval=0.01)
+    assert [(change.op, change.task_id) for change in changes] == [("update", kept.id), ("delete", removed.id)]
+    assert changes[0].task.title == "Kept, renamed"
+    reader.close()
+    writer.close()
+
+
+def test_watch_times_out_without_changes(open_service):
+    service = open_service()
+    assert service.watch(service.revision, timeout=0.05, poll_interval=0.01) == []
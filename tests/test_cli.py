@@ -0,0 +1,77 @@
+"""
+Tests for the command-line interface and its lean start-up path.
+"""
+
+import argparse
+import subprocess
+import sys
+import time
+
+import pytest
+
+from src import cli
+from src.daemon import DEFAULT_FLUSH_INTERVAL
+from src.services.change_feed import DEFAULT_WATCH_INTERVAL
+from src.storage.factory import STORAGE_MODES
+from src.storage.shard_map import DEFAULT_SHARD_MAP
+from src.utils.task_io import FORMATS
+
+
+def run_cli(*arguments):
+    return subprocess.run(
+        [sys.executable, "-m", "src.cli"] + list(arguments),
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        universal_newlines=True
+    )
+
+
+def test_inlined_constants_match_their_modules():
+    assert cli.STORAGE_MODES == STORAGE_MODES
+    assert cli.FORMATS == FORMATS
+    assert cli.DEFAULT_FLUSH_INTERVAL == DEFAULT_FLUSH_INTERVAL
+    assert cli.DEFAULT_WATCH_INTERVAL == DEFAULT_WATCH_INTERVAL
+    assert cli.DEFAULT_SHARD_MAP == DEFAULT_SHARD_MAP
+
+
+def test_importing_the_cli_skips_the_service_stack():
+    modules = subprocess.run(
+        [sys.executable, "-c", "import sys, src.cli; print(' '.join(sys.modules))"],
+        stdout=subprocess.PIPE,
+        universal_newlines=True,
+        check=True
+    ).stdout.split()
+    assert "src.services.task_service" not in modules
+    assert "src.daemon" not in modules
+
+
+def test_subcommands_are_configured_on_first_use():
+    parser = cli.build_parser()
+    args = parser.parse_args(["add", "Write report", "-p", "high"])
+    assert (args.command, args.title, args.priority) == ("add", "Write report", "high")
+    assert "view" in parser.format_help()
+
+    with pytest.raises(SystemExit):
+        parser.parse_args(["add", "Write report", "-p", "urgent"])
+
+
+def test_help_of_a_subcommand_lists_its_options():
+    result = run_cli("search", "-h")
+    assert result.returncode == 0
+    assert "--substring" in result.stdout
+
+
+def test_add_then_view(tmp_path):
+    path = str(tmp_path / "tasks.json")
+    assert run_cli("--storage-file", path, "add", "Write report").returncode == 0
+    result = run_cli("--storage-file", path, "view", "1")
+    assert result.returncode == 0
+    assert "Write report" in result.stdout
+    assert "not found" in run_cli("--storage-file", path, "view", "99").stdout
+
+
+def test_times_are_parsed_in_every_documented_form():
+    assert cli.parse_when("2030-05-01") == cli.parse_when("2030-05-01 00:00") == cli.parse_when("2030-05-01 00:00:00")
+    assert abs(cli.parse_when("+2h") - (time.time() + 7200)) < 5
+    with pytest.raises(argparse.ArgumentTypeError):
+        cli.parse_when("next tuesday")
@@ -0,0 +1,87 @@
+"""
+Tests for the columnar snapshot format and conversion to and from it.
+"""
+
+import pytest
+
+from src.models.task import Task
+from src.services.task_service import TaskService
+from src.storage.columnar_store import HEADER, ColumnarSnapshot, ColumnarTaskStore, encode_columns
+from src.storage.factory import convert_store
+from src.utils.exceptions import InvalidTaskDataException
+
+
+def write_snapshot(path, tasks, next_id):
+    with open(path, "wb") as f:
+        f.write(b"".join(encode_columns(tasks, next_id)))
+
+
+def test_json_to_columnar_and_back_keeps_every_field(tmp_path):
+    json_path = str(tmp_path / "tasks.json")
+    service = TaskService(json_path)
+    tasks = service.add_tasks([
+        {"title": "Report", "priority": "high", "created_at": "2024-01-01 09:00:00"},
+        {"title": "Review", "description": "Second pass", "due_at": "2030-05-01 12:00:00"},
+        {"title": "Call", "remind_at": "2030-04-30 09:00:00"},
+        {"title": "Gone"},
+    ])
+    service.complete_task(tasks[0].id)
+    service.update_task(tasks[1].id, description="Third pass")
+    service.delete_task(tasks[3].id)
+    expected = [task.to_dict() for task in service.get_all_tasks()]
+    service.close()
+
+    columnar_path = str(tmp_path / "tasks.tcol")
+    assert convert_store(json_path, columnar_path) == 3
+    back_path = str(tmp_path / "back.json")
+    assert convert_store(columnar_path, back_path) == 3
+
+    for path in (columnar_path, back_path):
+        converted = TaskService(path)
+        assert [task.to_dict() for task in converted.get_all_tasks()] == expected
+        # The id counter is kept, so the deleted task's id stays retired
+        assert converted.add_task("New").id == tasks[3].id + 1
+        converted.close()
+
+
+def test_non_ascii_and_surrogate_text_round_trips(tmp_path):
+    path = str(tmp_path / "tasks.tcol")
+    titles = ["Café menu", "日本語のタスク", "lone \ud800 surrogate", "plain"]
+    tasks = [Task(index + 1, title, title.upper(), "low", False, 1700000000) for index, title in enumerate(titles)]
+    store = ColumnarTaskStore(path)
+    store.save(tasks, len(tasks) + 1)
+
+    loaded, next_id = store.load()
+    assert [task.title for task in loaded] == titles
+    assert [task.description for task in loaded] == [title.upper() for title in titles]
+    assert next_id == len(tasks) + 1
+    assert store.find(2).title == "日本語のタスク"
+    with ColumnarSnapshot(path) as snapshot:
+        assert snapshot.find_substring("CAFÉ") == [0]
+        assert snapshot.find_substring("のタ") == [1]
+
+
+def test_truncated_and_foreign_files_are_rejected(tmp_path):
+    path = str(tmp_path / "tasks.tcol")
+    write_snapshot(path, [Task(1, "Report", "Quarterly numbers", "medium", False, 1700000000)], 2)
+    with open(path, "rb") as f:
+        data = f.read()
+
+    for contents in (data[:HEADER.size - 1], data[:HEADER.size + 16], b"NOTACOL" + data[7:]):
+        with open(path, "wb") as f:
+            f.write(contents)
+        with pytest.raises(InvalidTaskDataException):
+            ColumnarTaskStore(path).load()
+
+
+def test_substring_matches_do_not_span_rows(tmp_path):
+    path = str(tmp_path / "tasks.tcol")
+    titles = ["abc", "def", "cde", "xabcdefx", "ab", "cd"]
+    tasks = [Task(index + 1, title, "", "low", False, 1700000000) for index, title in enumerate(titles)]
+    write_snapshot(path, tasks, len(tasks) + 1)
+    with ColumnarSnapshot(path) as snapshot:
+        # "abc" + "def" are adjacent in the title blob, but no single row holds "cde" there
+        assert snapshot.find_substring("cde") == [2, 3]
+        assert snapshot.find_substring("bcd") == [3]
+        assert snapshot.find_substring("abcd") == [3]
+        assert snapshot.find_substring("bc", start=1, end=4) == [3]
@@ -0,0 +1,121 @@
+"""
+Tests for the task daemon and its client, over a socket in a temporary directory.
+"""
+
+import os
+import socket
+import threading
+import time
+
+import pytest
+
+from src.daemon import TaskDaemon
+from src.daemon_client import connect
+from src.models.task import Task
+from src.services.task_service import TaskService
+from src.utils.exceptions import (
+    InvalidTaskDataException, StaleTaskException, TaskManagerException, TaskNotFoundException
+)
+
+pytestmark = pytest.mark.skipif(not hasattr(socket, "AF_UNIX"), reason="needs Unix domain sockets")
+
+
+@pytest.fixture
+def serve(tmp_path):
+    """Start daemons on a store in a background thread; each is shut down after the test."""
+    path = str(tmp_path / "tasks.json")
+    running = []
+
+    def start(**kwargs) -> TaskDaemon:
+        daemon = TaskDaemon(path, **kwargs)
+        thread = threading.Thread(target=daemon.serve_forever, daemon=True)
+        thread.start()
+        deadline = time.monotonic() + 5
+        while not os.path.exists(daemon.socket_path):
+            assert time.monotonic() < deadline, "daemon did not start"
+            time.sleep(0.01)
+        running.append((daemon, thread))
+        return daemon
+
+    yield start
+    for daemon, thread in running:
+        daemon.shutdown()
+        thread.join()
+
+
+def test_dispatch_runs_service_methods(tmp_path):
+    daemon = TaskDaemon(str(tmp_path / "tasks.json"), flush_interval=0)
+    response = daemon.dispatch({"method": "add_task", "args": ["Write report"], "kwargs": {"priority": "high"}})
+    assert response["ok"]
+    assert response["result"]["__task__"]["title"] == "Write report"
+
+    assert daemon.dispatch({"method": "get_all_tasks"})["result"][0]["__task__"]["priority"] == "high"
+    assert daemon.dispatch({"method": "get_task_by_id", "args": [99]})["error"] == "TaskNotFoundException"
+    assert daemon.dispatch({"method": "close"})["error"] == "ValueError"
+    daemon.service.close()
+
+
+def test_client_calls_and_remote_errors(serve):
+    daemon = serve()
+    client = connect(daemon.socket_path)
+    try:
+        task = client.add_task("Write report", "Quarterly numbers")
+        assert isinstance(task, Task)
+        assert client.get_task_by_id(task.id).to_dict() == task.to_dict()
+        assert [found.id for found in client.search_tasks("quarterly")] == [task.id]
+        page = client.page(page_size=1)
+        assert ([found.id for found in page.tasks], page.total) == ([task.id], 1)
+        assert [change.op for change in client.changes_since(0)] == ["reset", "add"]
+
+        with pytest.raises(TaskNotFoundException):
+            client.get_task_by_id(99)
+        with pytest.raises(InvalidTaskDataException):
+            client.update_task(task.id, priority="urgent")
+        with pytest.raises(StaleTaskException):
+            client.update_task(task.id, expected_version=task.version + 1, title="Late")
+        with pytest.raises(AttributeError):
+            client.close_store
+    finally:
+        client.close()
+
+
+def test_a_second_daemon_is_refused(serve):
+    daemon = serve()
+    with pytest.raises(TaskManagerException):
+        TaskDaemon(daemon.service.storage_file)
+
+
+def test_stale_sockets_are_replaced(tmp_path):
+    path = str(tmp_path / "tasks.json")
+    with open(path + ".sock", "w"):
+        pass
+    assert connect(path + ".sock") is None
+    daemon = TaskDaemon(path)
+    assert not os.path.exists(daemon.socket_path)
+    daemon.service.close()
+
+
+def test_pending_changes_are_flushed_on_shutdown(tmp_path):
+    path = str(tmp_path / "tasks.json")
+    # Long enough that only shutdown writes the changes
+    daemon = TaskDaemon(path, flush_interval=60)
+    thread = threading.Thread(target=daemon.serve_forever)
+    thread.start()
+    try:
+        client = None
+        deadline = time.monotonic() + 5
+        while client is None:
+            assert time.monotonic() < deadline, "daemon did not start"
+            time.sleep(0.01)
+            client = connect(daemon.socket_path)
+        client.add_tasks([{"title": "First"}, {"title": "Second"}])
+        client.close()
+        assert not os.path.exists(path)
+    finally:
+        daemon.shutdown()
+        thread.join()
+
+    assert not os.path.exists(daemon.socket_path)
+    reopened = TaskService(path)
+    assert [task.title for task in reopened.get_all_tasks()] == ["First", "Second"]
+    reopened.close()
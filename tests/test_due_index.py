@@ -0,0 +1,124 @@
+"""
+Tests for due dates, reminders and their indexes.
+"""
+
+import random
+import threading
+import time
+
+import pytest
+
+from src.services import due_index
+from src.services.due_index import SortedPairs
+from src.services.reminder_scheduler import ReminderScheduler
+
+# Fixed times (epoch seconds) so the tests do not depend on the clock
+DAY = 86400
+NOW = 1700000000
+
+
+def ids(tasks):
+    return [task.id for task in tasks]
+
+
+def test_sorted_pairs_match_a_sorted_list(monkeypatch):
+    # Small buckets, so splits and emptied buckets are exercised
+    monkeypatch.setattr(due_index, "BUCKET_SIZE", 4)
+    rng = random.Random(7)
+    pairs = SortedPairs((rng.randrange(50), task_id) for task_id in range(20))
+    expected = sorted(pairs.iter_after((-1,)))
+    for step in range(500):
+        if expected and rng.random() < 0.45:
+            pair = expected.pop(rng.randrange(len(expected)))
+            pairs.remove(pair)
+        else:
+            pair = (rng.randrange(50), 100 + step)
+            pairs.add(pair)
+            expected.append(pair)
+            expected.sort()
+        assert len(pairs) == len(expected)
+    assert list(pairs.iter_after((-1,))) == expected
+    bound = (25, float("inf"))
+    assert list(pairs.iter_after(bound, inclusive=False)) == [pair for pair in expected if pair > bound]
+
+
+def test_due_index_follows_updates_completions_and_deletes(open_service):
+    service = open_service()
+    late = service.add_task("Late", due_at=NOW + 3 * DAY)
+    soon = service.add_task("Soon", due_at=NOW + DAY)
+    past = service.add_task("Past", due_at=NOW - DAY)
+    service.add_task("No due date")
+    assert ids(service.next_due(10)) == [past.id, soon.id, late.id]
+    assert ids(service.overdue(now=NOW)) == [past.id]
+
+    service.update_task(late.id, due_at=NOW - 2 * DAY)
+    assert ids(service.overdue(now=NOW)) == [late.id, past.id]
+    service.complete_task(past.id)
+    service.delete_task(soon.id)
+    assert ids(service.next_due(10)) == [late.id]
+    service.update_task(late.id, due_at=None)
+    assert service.next_due(10) == []
+
+    service.update_task(past.id, completed=False)
+    service.close()
+    assert ids(open_service().next_due(1)) == [past.id]
+
+
+def test_reminders_in_a_range(open_service):
+    service = open_service()
+    first = service.add_task("First", remind_at=NOW + 10)
+    second = service.add_task("Second", remind_at=NOW + 20)
+    service.add_task("Done", remind_at=NOW + 15)
+    service.complete_task(3)
+
+    assert ids(service.reminders_between(NOW, NOW + 20)) == [first.id, second.id]
+    assert ids(service.reminders_between(NOW + 10, NOW + 30)) == [second.id]
+    assert service.next_reminder_time(NOW + 10) == NOW + 20
+    service.update_task(second.id, remind_at=None)
+    assert service.next_reminder_time(NOW + 10) is None
+
+
+def test_run_pending_fires_each_reminder_once(open_service):
+    service = open_service()
+    first = service.add_task("First", remind_at=NOW + 10)
+    second = service.add_task("Second", remind_at=NOW + 20)
+    fired = []
+
+    def callback(task):
+        fired.append(task.id)
+        if task.id == first.id:
+            raise RuntimeError("callback failure")
+
+    scheduler = ReminderScheduler(
+        service.reload_if_changed, service.reminders_between, service.next_reminder_time, service.change_log,
+        callback, since=NOW
+    )
+    assert scheduler.run_pending(NOW + 5) == 0
+    assert scheduler.run_pending(NOW + 20) == 2
+    assert scheduler.run_pending(NOW + 30) == 0
+    assert fired == [first.id, second.id]
+    assert (scheduler.fired, scheduler.failures) == (2, 1)
+
+
+def test_scheduler_thread_fires_due_reminders(open_service):
+    service = open_service()
+    fired = threading.Event()
+    reminded = []
+
+    def callback(task):
+        reminded.append(task.title)
+        fired.set()
+
+    scheduler = service.schedule_reminders(callback, poll_interval=0.05)
+    try:
+        service.add_task("Past reminder", remind_at=int(time.time()) - 60)
+        service.add_task("Reminder", remind_at=int(time.time()) + 1)
+        assert fired.wait(5)
+    finally:
+        scheduler.stop()
+    assert reminded == ["Reminder"]
+
+
+def test_next_due_rejects_negative_counts(open_service):
+    with pytest.raises(ValueError):
+        open_service().next_due(-1)
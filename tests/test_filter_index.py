@@ -0,0 +1,63 @@
+"""
+Tests for filtered queries and their secondary indexes.
+"""
+
+import pytest
+
+
+def ids(tasks):
+    return [task.id for task in tasks]
+
+
+def test_filters_follow_updates_and_deletes(open_service):
+    service = open_service()
+    low = service.add_task("Low", priority="low")
+    high = service.add_task("High", priority="high")
+    other = service.add_task("Other high", priority="high")
+    assert ids(service.query(priority="high")) == [high.id, other.id]
+    assert ids(service.query(completed=False)) == [low.id, high.id, other.id]
+
+    service.update_task(low.id, priority="high")
+    service.complete_task(high.id)
+    assert ids(service.query(priority="low")) == []
+    assert ids(service.query(priority="high", completed=False)) == [low.id, other.id]
+    assert ids(service.query(completed=True)) == [high.id]
+
+    service.delete_task(other.id)
+    assert ids(service.query(priority="high")) == [low.id, high.id]
+    assert ids(service.query(priority=["high", "medium"], completed=False)) == [low.id]
+
+
+def test_created_between_and_ordering(open_service):
+    service = open_service()
+    service.add_tasks([
+        {"title": "Old", "created_at": "2024-01-01 09:00:00"},
+        {"title": "New", "created_at": "2024-03-01 09:00:00"},
+        {"title": "Middle", "created_at": "2024-02-01 09:00:00"},
+    ])
+    found = service.query(created_between=("2024-01-15 00:00:00", None), order_by="created_at")
+    assert [task.title for task in found] == ["Middle", "New"]
+    newest = service.query(order_by="-created_at", limit=2)
+    assert [task.title for task in newest] == ["New", "Middle"]
+    assert [task.title for task in service.query(offset=1, limit=1)] == ["New"]
+
+
+def test_pages_are_not_shifted_by_deletes(open_service):
+    service = open_service()
+    tasks = service.add_tasks([{"title": f"Task {number}"} for number in range(5)])
+    first = service.page(page_size=2)
+    assert ids(first.tasks) == [tasks[0].id, tasks[1].id]
+    assert first.total == 5
+
+    service.delete_task(tasks[0].id)
+    second = service.page(page_size=2, cursor=first.next_cursor)
+    assert ids(second.tasks) == [tasks[2].id, tasks[3].id]
+    last = service.page(page_size=2, cursor=second.next_cursor)
+    assert ids(last.tasks) == [tasks[4].id]
+    assert last.next_cursor is None
+
+
+def test_unknown_order_field_is_rejected(open_service):
+    service = open_service()
+    with pytest.raises(ValueError):
+        service.query(order_by="title")
@@ -0,0 +1,90 @@
+"""
+Tests for group commit: mutations written together by count, by interval and on exit.
+"""
+
+import os
+import subprocess
+import sys
+import time
+
+import pytest
+
+from src.services.task_service import TaskService
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Adds tasks under group commit and exits without closing the service
+EXIT_SCRIPT = """
+import sys
+from src.services.task_service import TaskService
+
+service = TaskService(sys.argv[1], sys.argv[2] or None, commit_interval=60)
+service.add_tasks([{"title": "First"}, {"title": "Second"}])
+service.complete_task(1)
+"""
+
+
+def stored_titles(open_service):
+    """Titles of the tasks on disk, as another run would load them."""
+    reader = open_service()
+    titles = [task.title for task in reader.get_all_tasks()]
+    reader.close()
+    return titles
+
+
+def test_commit_every_writes_in_groups(open_service):
+    service = open_service(commit_every=3)
+    service.add_task("First")
+    service.add_task("Second")
+    assert stored_titles(open_service) == []
+    service.add_task("Third")
+    assert stored_titles(open_service) == ["First", "Second", "Third"]
+
+    service.complete_task(1)
+    service.flush()
+    reader = open_service()
+    assert reader.get_task_by_id(1).completed
+    reader.close()
+
+
+def test_commit_interval_writes_in_the_background(open_service):
+    service = open_service(commit_interval=0.05)
+    service.add_tasks([{"title": f"Task {index}"} for index in range(5)])
+    deadline = time.monotonic() + 5
+    while len(stored_titles(open_service)) < 5:
+        assert time.monotonic() < deadline, "changes were not written"
+        time.sleep(0.02)
+
+
+def test_a_burst_of_mutations_shares_writes(tmp_path):
+    service = TaskService(str(tmp_path / "tasks.json"), commit_interval=0.2)
+    writes = []
+    save_tasks = service._save_tasks
+    service._save_tasks = lambda: (writes.append(1), save_tasks())
+    try:
+        tasks = service.add_tasks([{"title": f"Task {index}"} for index in range(50)])
+        for task in tasks:
+            service.complete_task(task.id)
+        assert len(writes) <= 1
+        service.flush()
+        assert 1 <= len(writes) <= 2
+        # Nothing left to write
+        service.flush()
+        assert len(writes) <= 2
+    finally:
+        service.close()
+
+
+def test_pending_changes_are_written_on_exit(open_service):
+    result = subprocess.run(
+        [sys.executable, "-c", EXIT_SCRIPT, open_service.path, open_service.storage_mode or ""],
+        cwd=REPO_ROOT, stdout=subprocess.PIPE, stderr=subprocess.PIPE
+    )
+    assert result.returncode == 0, result.stderr.decode()
+    reader = open_service()
+    assert [(task.title, task.completed) for task in reader.get_all_tasks()] == [("First", True), ("Second", False)]
+
+
+def test_unknown_durability_is_refused(tmp_path):
+    with pytest.raises(ValueError):
+        TaskService(str(tmp_path / "tasks.json"), durability="sometimes")
@@ -0,0 +1,132 @@
+"""
+Tests for the append-only journal backend.
+"""
+
+import os
+
+from src.services.task_service import TaskService
+from src.storage.journal_store import JournalTaskStore, encode_record, read_records
+
+
+def open_journal(path, **kwargs):
+    return TaskService(str(path), "journal", **kwargs)
+
+
+def test_mutations_are_appended_and_replayed(tmp_path):
+    path = tmp_path / "tasks.json"
+    service = open_journal(path)
+    first = service.add_task("First", "one", "high")
+    second = service.add_task("Second")
+    third = service.add_task("Third")
+    service.update_task(first.id, title="First, renamed")
+    service.complete_task(second.id)
+    service.delete_task(third.id)
+    service.close()
+
+    records, _ = read_records(str(path) + ".journal")
+    assert [record["op"] for record in records] == ["add", "add", "add", "update", "update", "delete"]
+    # Nothing was compacted, so the snapshot was never written
+    assert not path.exists()
+
+    reopened = open_journal(path)
+    tasks = {task.id: task for task in reopened.tasks}
+    assert sorted(tasks) == [first.id, second.id]
+    assert tasks[first.id].title == "First, renamed"
+    assert tasks[first.id].priority == "high"
+    assert tasks[second.id].completed
+    reopened.close()
+
+
+def test_torn_tail_is_ignored_and_cut_before_the_next_append(tmp_path):
+    path = tmp_path / "tasks.json"
+    service = open_journal(path)
+    service.add_task("Kept")
+    service.close()
+
+    journal = str(path) + ".journal"
+    with open(journal, "ab") as f:
+        # A write cut short by a crash: no trailing newline
+        f.write(encode_record({"op": "add", "task": {"id": 2, "title": "Torn"}})[:-10])
+
+    reopened = open_journal(path)
+    assert [task.title for task in reopened.tasks] == ["Kept"]
+    added = reopened.add_task("After crash")
+    reopened.close()
+
+    records, valid_end = read_records(journal)
+    assert valid_end == os.path.getsize(journal)
+    assert [record["task"]["title"] for record in records] == ["Kept", "After crash"]
+    assert added.id == 2
+
+
+def test_record_with_bad_checksum_ends_the_replay(tmp_path):
+    path = tmp_path / "tasks.json"
+    service = open_journal(path)
+    for title in ("One", "Two", "Three"):
+        service.add_task(title)
+    service.close()
+
+    journal = str(path) + ".journal"
+    with open(journal, "rb") as f:
+        lines = f.readlines()
+    # Flip a byte of the second record's payload, keeping its checksum
+    lines[1] = lines[1].replace(b"Two", b"Twx")
+    with open(journal, "wb") as f:
+        f.writelines(lines)
+
+    records, valid_end = read_records(journal)
+    assert [record["task"]["title"] for record in records] == ["One"]
+    assert valid_end == len(lines[0])
+    reopened = open_journal(path)
+    assert [task.title for task in reopened.tasks] == ["One"]
+    reopened.close()
+
+
+def test_compaction_folds_the_journal_into_the_snapshot(tmp_path):
+    path = tmp_path / "tasks.json"
+    service = open_journal(path)
+    service._store.compact_threshold = 1000
+    for number in range(50):
+        service.add_task(f"Task {number}", "x" * 20)
+        # Compaction runs in the background; let each one finish
+        service._store.wait_for_compaction()
+    service.delete_task(1)
+    service.close()
+
+    assert path.exists()
+    records, _ = read_records(str(path) + ".journal")
+    assert len(records) < 51
+    reopened = open_journal(path)
+    assert [task.title for task in reopened.tasks] == [f"Task {number}" for number in range(1, 50)]
+    reopened.close()
+
+
+def test_point_lookup_applies_journal_records(tmp_path):
+    path = tmp_path / "tasks.json"
+    service = open_journal(path)
+    task = service.add_task("Original")
+    service.update_task(task.id, title="Changed")
+    service.close()
+
+    store = JournalTaskStore(str(path))
+    assert store.find(task.id).title == "Changed"
+    assert store.find(task.id + 1) is None
+    store.close()
+
+
+def test_lazy_update_appends_without_loading(tmp_path):
+    path = tmp_path / "tasks.json"
+    service = open_journal(path)
+    task = service.add_task("Task")
+    service.add_task("Other")
+    service.close()
+
+    lazy = open_journal(path, lazy_load=True)
+    completed = lazy.complete_task(task.id)
+    assert completed.completed and completed.version == 2
+    assert "_tasks" not in lazy.__dict__
+    lazy.close()
+
+    reopened = open_journal(path)
+    assert reopened.get_task_by_id(task.id).completed
+    reopened.close()
@@ -0,0 +1,73 @@
+"""
+Tests for the streaming snapshot reader.
+"""
+
+import json
+import os
+
+import pytest
+
+from src.storage.json_stream import SnapshotStream
+
+TASKS = [
+    {"id": 1, "title": 'Say "hi" \\ wave', "description": "Line one\nLine two\ttabbed", "priority": "high"},
+    {"id": 2, "title": "Café ☕ déjà vu \U0001f600", "description": "\u0000 and \u001f", "priority": "low"},
+    {"id": 1234567, "title": "", "description": "]}, {\"tasks\": [", "priority": "medium", "completed": True},
+]
+
+# Chunks small enough to split keys, escapes, numbers and multi-byte characters
+CHUNK_SIZES = [1, 2, 3, 7, 64, 1024 * 1024]
+
+
+def write(tmp_path, text, name="tasks.json"):
+    path = tmp_path / name
+    path.write_bytes(text.encode("utf-8"))
+    return str(path)
+
+
+def read(path, chunk_size):
+    stream = SnapshotStream(path, chunk_size)
+    return list(stream), stream
+
+
+@pytest.mark.parametrize("chunk_size", CHUNK_SIZES)
+@pytest.mark.parametrize("ensure_ascii", [True, False])
+def test_tasks_and_next_id_are_read_in_either_order(tmp_path, chunk_size, ensure_ascii):
+    for document in ({"next_id": 1234568, "tasks": TASKS}, {"tasks": TASKS, "next_id": 1234568}):
+        path = write(tmp_path, json.dumps(document, indent=2, ensure_ascii=ensure_ascii))
+        tasks, stream = read(path, chunk_size)
+        assert tasks == TASKS
+        assert stream.next_id == 1234568
+        assert stream.bytes_read == os.path.getsize(path)
+
+
+@pytest.mark.parametrize("chunk_size", CHUNK_SIZES)
+def test_other_document_shapes(tmp_path, chunk_size):
+    # The legacy bare list has no next_id
+    tasks, stream = read(write(tmp_path, json.dumps(TASKS)), chunk_size)
+    assert (tasks, stream.next_id) == (TASKS, None)
+
+    for text in ("[]", " {} ", '{"tasks": []}', '{"version": [1, {"a": 2}], "tasks": [], "next_id": 5}'):
+        tasks, stream = read(write(tmp_path, text), chunk_size)
+        assert tasks == []
+    assert stream.next_id == 5
+
+
+def test_tasks_are_yielded_before_the_file_is_read(tmp_path):
+    path = write(tmp_path, json.dumps({"next_id": 1001, "tasks": [{"id": index} for index in range(1000)]}))
+    stream = SnapshotStream(path, 64)
+    tasks = iter(stream)
+    assert next(tasks) == {"id": 0}
+    assert 0 < stream.bytes_read <= 128
+    assert len(list(tasks)) == 999
+
+
+@pytest.mark.parametrize("chunk_size", [1, 5, 1024 * 1024])
+def test_truncated_and_invalid_files_are_refused(tmp_path, chunk_size):
+    text = json.dumps({"tasks": TASKS, "next_id": 1234568})
+    for cut in (1, len(text) // 2, len(text) - 12, len(text) - 1):
+        with pytest.raises(json.JSONDecodeError):
+            read(write(tmp_path, text[:cut]), chunk_size)
+    for bad in ("", "   ", '"tasks"', '{"tasks": [1 2]}', '{"tasks" []}'):
+        with pytest.raises(json.JSONDecodeError):
+            read(write(tmp_path, bad), chunk_size)
@@ -0,0 +1,134 @@
+"""
+Tests for the metrics registry, its Prometheus export and TaskService instrumentation.
+"""
+
+import math
+from urllib.error import HTTPError
+from urllib.request import urlopen
+
+import pytest
+
+from src.services.task_service import TaskService
+from src.utils.exceptions import TaskNotFoundException
+from src.utils.metrics import Histogram, Metrics, format_prometheus, serve_metrics
+
+
+def test_histograms_count_into_cumulative_buckets():
+    histogram = Histogram((0.1, 1.0, math.inf))
+    assert histogram.quantile(0.5) is None
+    for value in (0.05, 0.1, 0.5, 2.0):
+        histogram.observe(value)
+    # Bounds are inclusive
+    assert histogram.cumulative() == [(0.1, 2), (1.0, 3), (math.inf, 4)]
+    assert histogram.count == 4
+    assert histogram.sum == pytest.approx(2.65)
+    assert histogram.quantile(0.5) == 0.1
+    assert histogram.quantile(0.75) == 1.0
+    assert histogram.quantile(0.99) == math.inf
+
+
+def test_counters_and_timers_record_by_label():
+    metrics = Metrics()
+    metrics.inc("requests_total", method="get")
+    metrics.inc("requests_total", 2, method="get")
+    metrics.inc("requests_total", method="put")
+
+    def fail():
+        raise KeyError("missing")
+
+    timed = metrics.timed("call_seconds", lambda value: value * 2, method="double")
+    assert timed(21) == 42
+    with pytest.raises(KeyError):
+        metrics.timed("call_seconds", fail, method="fail")()
+
+    snapshot = metrics.snapshot()
+    assert [(entry["labels"], entry["value"]) for entry in snapshot["counters"]] == [
+        ({"method": "fail"}, 1), ({"method": "get"}, 3), ({"method": "put"}, 1)
+    ]
+    assert [entry["name"] for entry in snapshot["counters"]] == ["call_seconds_errors_total"] + ["requests_total"] * 2
+    assert [(entry["labels"], entry["count"]) for entry in snapshot["histograms"]] == [
+        ({"method": "double"}, 1), ({"method": "fail"}, 1)
+    ]
+
+
+def test_prometheus_text_format():
+    metrics = Metrics()
+    metrics.describe("requests_total", "Requests served")
+    metrics.inc("requests_total", method="get")
+    histogram = Histogram()
+    metrics.observe("latency_seconds", 0.003, op="load")
+    metrics.register_callback("tasks", lambda: 7)
+    metrics.register_callback("archive_bytes", lambda: None)
+
+    lines = metrics.to_prometheus().splitlines()
+    assert lines[:3] == [
+        "# HELP requests_total Requests served",
+        "# TYPE requests_total counter",
+        'requests_total{method="get"} 1',
+    ]
+    assert lines[3] == "# TYPE latency_seconds histogram"
+    buckets = lines[4:4 + len(histogram.buckets)]
+    assert buckets[0] == 'latency_seconds_bucket{op="load",le="1e-05"} 0'
+    assert 'latency_seconds_bucket{op="load",le="0.005"} 1' in buckets
+    assert buckets[-1] == 'latency_seconds_bucket{op="load",le="+Inf"} 1'
+    assert lines[4 + len(buckets):] == [
+        'latency_seconds_sum{op="load"} 0.003',
+        'latency_seconds_count{op="load"} 1',
+        "# TYPE tasks gauge",
+        "tasks 7",
+    ]
+    # Snapshots taken elsewhere, e.g. by the daemon, render the same
+    assert format_prometheus(metrics.snapshot()) == metrics.to_prometheus()
+
+
+def test_metrics_are_served_over_http():
+    metrics = Metrics()
+    metrics.inc("requests_total")
+    server = serve_metrics(metrics, 0)
+    try:
+        url = "http://%s:%d" % server.server_address[:2]
+        with urlopen(url + "/metrics?format=text", timeout=5) as response:
+            assert response.headers["Content-Type"].startswith("text/plain; version=0.0.4")
+            assert response.read().decode() == metrics.to_prometheus()
+        with pytest.raises(HTTPError) as error:
+            urlopen(url + "/other", timeout=5)
+        assert error.value.code == 404
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_services_record_operations_and_storage_calls(open_service):
+    metrics = Metrics()
+    service = open_service(metrics=metrics)
+    task = service.add_task("Write report")
+    service.get_task_by_id(task.id)
+    with pytest.raises(TaskNotFoundException):
+        service.get_task_by_id(99)
+
+    snapshot = metrics.snapshot()
+    operations = {
+        entry["labels"]["method"]: entry["count"]
+        for entry in snapshot["histograms"] if entry["name"] == "taskmanager_operation_seconds"
+    }
+    assert operations["add_task"] == 1
+    assert operations["get_task_by_id"] == 2
+    assert any(entry["name"] == "taskmanager_storage_seconds" for entry in snapshot["histograms"])
+    errors = [
+        (entry["labels"], entry["value"])
+        for entry in snapshot["counters"] if entry["name"] == "taskmanager_operation_seconds_errors_total"
+    ]
+    assert errors == [({"method": "get_task_by_id"}, 1)]
+    gauges = {entry["name"]: entry["value"] for entry in snapshot["gauges"]}
+    assert gauges["taskmanager_tasks"] == 1
+
+    text = metrics.to_prometheus()
+    assert "# TYPE taskmanager_operation_seconds histogram" in text
+    assert 'taskmanager_operation_seconds_count{method="add_task"} 1' in text
+    assert "\ntaskmanager_tasks 1\n" in text
+
+
+def test_services_without_metrics_are_not_wrapped(tmp_path):
+    service = TaskService(str(tmp_path / "tasks.json"))
+    assert service.add_task.__func__ is TaskService.add_task
+    service.close()
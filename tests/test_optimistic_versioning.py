@@ -0,0 +1,42 @@
+"""
+Tests for version checks on writes (compare-and-swap).
+"""
+
+import pytest
+
+from src.utils.exceptions import StaleTaskException
+
+
+def test_every_write_bumps_the_version(open_service):
+    service = open_service()
+    task = service.add_task("Task")
+    assert task.version == 1
+    assert service.update_task(task.id, expected_version=1, title="Renamed").version == 2
+    assert service.complete_task(task.id, expected_version=2).version == 3
+
+
+def test_stale_version_is_rejected(open_service):
+    service = open_service()
+    task = service.add_task("Task")
+    service.update_task(task.id, title="Renamed")
+
+    with pytest.raises(StaleTaskException):
+        service.update_task(task.id, expected_version=1, title="Lost update")
+    with pytest.raises(StaleTaskException):
+        service.complete_task(task.id, expected_version=1)
+
+    current = service.get_task_by_id(task.id)
+    assert (current.title, current.completed, current.version) == ("Renamed", False, 2)
+
+
+def test_write_from_another_service_makes_a_read_stale(open_service):
+    first = open_service()
+    task = first.add_task("Task")
+    first.flush()
+    second = open_service()
+    seen = second.get_task_by_id(task.id).version
+
+    first.update_task(task.id, expected_version=seen, title="First wins")
+    with pytest.raises(StaleTaskException):
+        second.update_task(task.id, expected_version=seen, title="Second loses")
+    assert second.get_task_by_id(task.id).title == "First wins"
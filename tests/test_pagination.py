@@ -0,0 +1,108 @@
+"""
+Tests for cursor pagination on every backend and across shards.
+"""
+
+import pytest
+
+from src.services.sharded_task_service import ShardedTaskService
+from src.storage.shard_map import add_shard
+
+ORDERS = ("id", "-id", "created_at", "-created_at", "priority", "-priority")
+PRIORITIES = ("low", "medium", "high")
+
+
+def walk(service, page_size, **filters):
+    """Collect the ids of every page in turn."""
+    ids, cursor = [], None
+    while True:
+        page = service.page(page_size=page_size, cursor=cursor, **filters)
+        assert len(page.tasks) <= page_size
+        ids.extend(task.id for task in page.tasks)
+        if page.next_cursor is None:
+            return ids
+        cursor = page.next_cursor
+
+
+def add_tasks(service, count, **kwargs):
+    return service.add_tasks([
+        {"title": f"Task {index}", "priority": PRIORITIES[index % 3], "created_at": 1700000000 + index // 4}
+        for index in range(count)
+    ], **kwargs)
+
+
+@pytest.mark.parametrize("order_by", ORDERS)
+def test_pages_follow_the_query_order(open_service, order_by):
+    service = open_service()
+    add_tasks(service, 23)
+    expected = [task.id for task in service.query(order_by=order_by)]
+    assert walk(service, 5, order_by=order_by) == expected
+
+    active = [task.id for task in service.query(completed=False, priority=["low", "high"], order_by=order_by)]
+    service.complete_task(expected[0])
+    active = [task_id for task_id in active if task_id != expected[0]]
+    assert walk(service, 4, completed=False, priority=["low", "high"], order_by=order_by) == active
+    assert service.page(completed=False, priority=["low", "high"], page_size=4).total == len(active)
+
+
+@pytest.mark.parametrize("order_by", ["id", "-created_at", "priority"])
+def test_cursors_survive_adds_and_deletes(open_service, order_by):
+    service = open_service()
+    add_tasks(service, 20)
+    order = [task.id for task in service.query(order_by=order_by)]
+    unseen = list(order)
+    deleted = []
+    shown = []
+
+    def change(number):
+        # Delete a task already shown and the last one not shown yet, and add one
+        service.delete_task(shown[-1])
+        deleted.append(unseen.pop())
+        service.delete_task(deleted[-1])
+        service.add_tasks([{"title": f"Added {number}", "priority": "low", "created_at": 1700000000}])
+
+    cursor = None
+    while True:
+        if shown and unseen:
+            change(len(shown))
+        page = service.page(page_size=6, cursor=cursor, order_by=order_by)
+        page_ids = [task.id for task in page.tasks]
+        shown.extend(page_ids)
+        unseen = [task_id for task_id in unseen if task_id not in page_ids]
+        if page.next_cursor is None:
+            break
+        cursor = page.next_cursor
+
+    assert len(shown) == len(set(shown))
+    # Every original task that was not deleted before its turn is shown once, in order
+    assert [task_id for task_id in shown if task_id in order] == [
+        task_id for task_id in order if task_id not in deleted
+    ]
+    assert not unseen
+
+
+def test_sharded_pages_merge_in_sort_order(tmp_path):
+    shard_map = str(tmp_path / "shards.json")
+    add_shard(shard_map, "acme")
+    add_shard(shard_map, "globex", ".tcol")
+    service = ShardedTaskService(shard_map)
+    try:
+        add_tasks(service, 11, tenant="acme")
+        add_tasks(service, 9, tenant="globex")
+        for order_by in ORDERS:
+            expected = [task.id for task in service.query(order_by=order_by)]
+            assert len(expected) == 20
+            assert walk(service, 6, order_by=order_by) == expected
+            assert walk(service, 3, priority="high", order_by=order_by) == [
+                task.id for task in service.query(priority="high", order_by=order_by)
+            ]
+        assert service.page(page_size=6).total == 20
+    finally:
+        service.close()
+
+
+def test_invalid_pages_are_refused(open_service):
+    service = open_service()
+    add_tasks(service, 3)
+    for kwargs in ({"page_size": 0}, {"order_by": "title"}, {"cursor": "not a cursor"}):
+        with pytest.raises(ValueError):
+            service.page(**kwargs)
@@ -0,0 +1,45 @@
+"""
+Tests for substring scans on the worker pool.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from src.services.task_service import TaskService
+
+KEYWORDS = ("report", "REV", "q3", "missing", "é")
+
+
+@pytest.mark.parametrize("name", ["tasks.json", "tasks.tcol"])
+def test_parallel_scans_match_the_serial_scan(tmp_path, name):
+    path = str(tmp_path / name)
+    serial = TaskService(path, parallel_scan=False, query_cache_size=0)
+    serial.add_tasks([
+        {"title": f"Task {index}", "description": ("Q3 report", "Review notes", "Café", "")[index % 4]}
+        for index in range(200)
+    ])
+    serial.flush()
+    parallel = TaskService(path, parallel_scan=True, scan_workers=2, query_cache_size=0)
+    try:
+        for keyword in KEYWORDS:
+            expected = [task.id for task in serial.search_tasks(keyword, mode="substring")]
+            # The first scan of a generation may run serially, see ParallelScanner.prepare
+            for _ in range(2):
+                assert [task.id for task in parallel.search_tasks(keyword, mode="substring")] == expected
+            page = parallel.search_tasks(keyword, mode="substring", limit=5, offset=3)
+            assert [task.id for task in page] == expected[3:8]
+        # The scans above ran on the worker pool
+        assert parallel._scanner._generation is not None
+
+        # Concurrent readers share the scanner
+        with ThreadPoolExecutor(4) as pool:
+            results = list(pool.map(
+                lambda keyword: [task.id for task in parallel.search_tasks(keyword, mode="substring")],
+                KEYWORDS * 4
+            ))
+        expected = [[task.id for task in serial.search_tasks(keyword, mode="substring")] for keyword in KEYWORDS]
+        assert results == expected * 4
+    finally:
+        parallel.close()
+        serial.close()
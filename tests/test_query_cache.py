@@ -0,0 +1,129 @@
+"""
+Tests for the query result cache and its invalidation by TaskService.
+"""
+
+import pytest
+
+from src.services.query_cache import ENTRY_OVERHEAD, QueryCache, result_size
+from src.services.task_service import TaskService
+
+
+@pytest.fixture
+def service(tmp_path):
+    service = TaskService(str(tmp_path / "tasks.json"))
+    service.add_tasks([
+        {"title": "Write report", "priority": "high"},
+        {"title": "Review report", "priority": "low", "completed": True},
+        {"title": "Plan sprint"},
+    ])
+    yield service
+    service.close()
+
+
+def test_repeated_queries_are_served_from_the_cache(service):
+    first = service.query(completed=False, order_by="-priority")
+    again = service.query(completed=False, order_by="-priority")
+    assert [task.id for task in again] == [task.id for task in first]
+    # Callers get their own list
+    assert again is not first
+    assert service.query_cache.hits == 1
+
+    service.search_tasks("report")
+    service.search_tasks("REPORT")
+    service.page(priority="high")
+    service.page(priority=["high"])
+    assert service.query_cache.hits == 3
+
+
+def test_changes_invalidate_only_the_results_they_can_affect(service):
+    service.query(completed=True)
+    service.query(priority="high")
+    service.query()
+    service.search_tasks("report")
+    cache = service.query_cache
+
+    # An active, medium priority task cannot show up in either filtered result
+    service.add_task("Plan retro")
+    hits = cache.hits
+    assert [task.id for task in service.query(completed=True)] == [2]
+    assert [task.id for task in service.query(priority="high")] == [1]
+    assert cache.hits == hits + 2
+    assert len(service.query()) == 4
+    assert [task.title for task in service.search_tasks("report")] == ["Write report", "Review report"]
+
+    # Completing a high priority task changes both results
+    service.complete_task(1)
+    assert [task.id for task in service.query(completed=True)] == [1, 2]
+    assert [task.id for task in service.query(priority="high")] == [1]
+    assert service.query(priority="high")[0].completed
+
+    # Renames leave filter results alone but not searches
+    hits = cache.hits
+    service.update_task(3, title="Plan report")
+    assert [task.id for task in service.query(completed=True)] == [1, 2]
+    assert cache.hits == hits + 1
+    assert [task.title for task in service.search_tasks("report")] == ["Write report", "Review report", "Plan report"]
+
+
+def test_results_computed_during_a_change_are_not_kept(service):
+    generation = [0]
+    calls = []
+
+    def compute():
+        calls.append(1)
+        # A writer moves the data on while the result is computed
+        generation[0] += 1
+        return ["result"]
+
+    service._cached(("test",), lambda: generation[0], compute)
+    service._cached(("test",), lambda: generation[0], compute)
+    assert len(calls) == 2
+
+
+def test_least_recently_used_results_are_evicted():
+    cache = QueryCache(max_entries=2)
+    cache.put("a", 0, [1])
+    cache.put("b", 0, [2])
+    assert cache.get("a", 0) == [1]
+    cache.put("c", 0, [3])
+    assert cache.get("b", 0) is None
+    assert cache.get("a", 0) == [1]
+    assert cache.get("c", 0) == [3]
+    assert cache.evictions == 1
+    assert len(cache) == 2
+
+    # A newer generation finds the entry stale
+    assert cache.get("a", 1) is None
+    assert cache.invalidations == 1
+    assert len(cache) == 1
+
+
+def test_memory_cap_bounds_the_cached_results():
+    small = list(range(10))
+    entry = result_size(small) + ENTRY_OVERHEAD + 100
+    cache = QueryCache(max_entries=100, max_bytes=2 * entry)
+    for key in ("a", "b", "c"):
+        cache.put(key, 0, list(small))
+    assert len(cache) == 2
+    assert cache.bytes <= cache.max_bytes
+    assert cache.get("a", 0) is None
+
+    # Results larger than the cap are never cached
+    cache.put("huge", 0, list(range(10000)))
+    assert cache.get("huge", 0) is None
+    assert len(cache) == 2
+
+    cache.clear()
+    assert (len(cache), cache.bytes) == (0, 0)
+
+
+def test_a_zero_size_cache_keeps_nothing(tmp_path):
+    service = TaskService(str(tmp_path / "tasks.json"), query_cache_size=0)
+    service.add_task("Task")
+    service.query()
+    service.query()
+    assert service.query_cache.hits == 0
+    assert len(service.query_cache) == 0
+    service.close()
+    with pytest.raises(ValueError):
+        QueryCache(max_entries=-1)
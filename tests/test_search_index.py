@@ -0,0 +1,77 @@
+"""
+Tests for keyword search and its index.
+"""
+
+import threading
+
+from src.models.task import Task
+from src.services.search_index import SearchIndex
+
+
+def titles(tasks):
+    return [task.title for task in tasks]
+
+
+def test_index_follows_updates_and_deletes(open_service):
+    service = open_service()
+    groceries = service.add_task("Buy groceries", "milk and bread")
+    service.add_task("Call the bank")
+    report = service.add_task("Write report", "quarterly numbers")
+    assert titles(service.search_tasks("milk")) == ["Buy groceries"]
+
+    service.update_task(groceries.id, description="eggs")
+    assert service.search_tasks("milk") == []
+    assert titles(service.search_tasks("egg")) == ["Buy groceries"]
+
+    service.delete_task(report.id)
+    assert service.search_tasks("quarterly") == []
+    assert service.search_tasks("report") == []
+    assert titles(service.search_tasks("ban")) == ["Call the bank"]
+
+
+def test_index_is_rebuilt_on_reopen(open_service):
+    service = open_service()
+    task = service.add_task("Plan trip", "book hotel")
+    service.update_task(task.id, title="Plan holiday")
+    service.close()
+
+    reopened = open_service()
+    assert titles(reopened.search_tasks("holiday")) == ["Plan holiday"]
+    assert reopened.search_tasks("trip") == []
+
+
+def test_title_matches_rank_first(open_service):
+    service = open_service()
+    service.add_task("Notes", "review the budget")
+    service.add_task("Budget review")
+    assert titles(service.search_tasks("budget")) == ["Budget review", "Notes"]
+    assert titles(service.search_tasks("budget", limit=1, offset=1)) == ["Notes"]
+
+
+def test_substring_mode_keeps_creation_order(open_service):
+    service = open_service()
+    service.add_task("Second-hand shop")
+    service.add_task("Handover notes")
+    assert titles(service.search_tasks("hand", mode="substring")) == ["Second-hand shop", "Handover notes"]
+
+
+def test_concurrent_searches_see_every_indexed_token():
+    index = SearchIndex()
+    for number in range(2000):
+        index.add(Task(number + 1, f"word{number}"))
+    errors = []
+
+    def search():
+        try:
+            for _ in range(20):
+                if len(index.search("word1999")) != 1:
+                    errors.append("missing result")
+        except Exception as error:
+            errors.append(error)
+
+    threads = [threading.Thread(target=search) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
@@ -0,0 +1,71 @@
+"""
+Tests for ShardedTaskService.
+"""
+
+import pytest
+
+from src.models.task import Task
+from src.services.sharded_task_service import ShardedTaskService, merge_by_creation
+from src.storage.shard_map import SHARD_ID_BASE, add_shard, shard_of
+from src.utils.exceptions import TaskNotFoundException
+
+
+@pytest.fixture
+def shard_map(tmp_path):
+    path = str(tmp_path / "shards.json")
+    add_shard(path, "acme")
+    add_shard(path, "globex", ".tcol")
+    return path
+
+
+@pytest.fixture
+def sharded(shard_map):
+    service = ShardedTaskService(shard_map)
+    yield service
+    service.close()
+
+
+def test_ids_route_to_the_tenant_shard(shard_map, sharded):
+    acme = sharded.add_task("Acme task", tenant="acme")
+    globex = sharded.add_tasks([{"title": "Globex one"}, {"title": "Globex two"}], tenant="globex")
+    assert shard_of(acme.id) == 0
+    assert [shard_of(task.id) for task in globex] == [1, 1]
+    assert globex[1].id == globex[0].id + SHARD_ID_BASE
+    assert sharded.tenant_of(globex[0].id) == "globex"
+
+    sharded.update_task(globex[0].id, title="Globex renamed")
+    sharded.delete_task(acme.id)
+    sharded.close()
+
+    only_globex = ShardedTaskService(shard_map, tenants=["globex"])
+    assert only_globex.get_task_by_id(globex[0].id).title == "Globex renamed"
+    with pytest.raises(TaskNotFoundException):
+        only_globex.get_task_by_id(acme.id)
+    with pytest.raises(ValueError):
+        only_globex.add_task("Elsewhere", tenant="acme")
+    only_globex.close()
+
+
+def test_results_merge_by_creation_time(sharded):
+    sharded.add_tasks([
+        {"title": "Acme new", "created_at": "2024-03-01 09:00:00"},
+        {"title": "Acme old", "created_at": "2024-01-01 09:00:00"},
+    ], tenant="acme")
+    sharded.add_tasks([
+        {"title": "Globex middle", "created_at": "2024-02-01 09:00:00"},
+        {"title": "Globex oldest", "created_at": "2023-12-01 09:00:00"},
+    ], tenant="globex")
+
+    expected = ["Globex oldest", "Acme old", "Globex middle", "Acme new"]
+    assert [task.title for task in sharded.tasks] == expected
+    assert [task.title for task in sharded.get_all_tasks()] == expected
+    found = sharded.search_tasks("e", mode="substring", limit=2, offset=1)
+    assert [task.title for task in found] == expected[1:3]
+
+
+def test_merge_by_creation_sorts_each_shard_first():
+    def task(task_id, created_ts):
+        return Task(task_id, f"Task {task_id}", created_at=created_ts)
+
+    merged = merge_by_creation([[task(1, 30), task(1001, 10)], [task(2, 20)]])
+    assert [item.id for item in merged] == [1001, 2, 1]
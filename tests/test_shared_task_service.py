@@ -0,0 +1,112 @@
+"""
+Tests for sharing one loaded store between threads, and picking up other processes' writes.
+"""
+
+import os
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+
+from src.services.shared_task_service import SharedTaskService
+from src.utils.rwlock import ReadWriteLock
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Adds a task from another process, as the CLI would
+ADD_SCRIPT = """
+import sys
+from src.services.task_service import TaskService
+
+service = TaskService(sys.argv[1], sys.argv[2] or None)
+service.add_task(sys.argv[3])
+service.close()
+"""
+
+
+def add_from_another_process(open_service, title):
+    result = subprocess.run(
+        [sys.executable, "-c", ADD_SCRIPT, open_service.path, open_service.storage_mode or "", title],
+        cwd=REPO_ROOT, stdout=subprocess.PIPE, stderr=subprocess.PIPE
+    )
+    assert result.returncode == 0, result.stderr.decode()
+
+
+def finishes(thread, timeout=0.2):
+    thread.join(timeout)
+    return not thread.is_alive()
+
+
+def test_writes_of_other_processes_are_picked_up(open_service):
+    shared = SharedTaskService(open_service())
+    shared.add_task("Local")
+    assert not shared.refresh()
+
+    revision = shared.revision
+    add_from_another_process(open_service, "Remote")
+    assert shared.refresh()
+    assert [task.title for task in shared.get_all_tasks()] == ["Local", "Remote"]
+    assert [task.title for task in shared.search_tasks("remote")] == ["Remote"]
+    changes = shared.changes_since(revision)
+    # SQLite cannot tell which rows another connection changed, and resets
+    if changes[0].op == "reset":
+        changes = changes[1:]
+        assert [change.task.title for change in changes] == ["Local", "Remote"]
+    else:
+        assert [(change.op, change.task.title) for change in changes] == [("add", "Remote")]
+    assert not shared.refresh()
+
+    # Watchers find the change by refreshing between checks
+    revision = shared.revision
+    add_from_another_process(open_service, "Watched")
+    changes = shared.watch(revision, timeout=5, poll_interval=0.01)
+    assert "Watched" in [change.task.title for change in changes if change.task is not None]
+
+
+def test_writers_wait_for_readers(open_service):
+    shared = SharedTaskService(open_service())
+    shared.add_task("First")
+
+    with shared._lock.read():
+        # Readers share the lock
+        reader = threading.Thread(target=shared.get_all_tasks)
+        reader.start()
+        assert finishes(reader)
+
+        writer = threading.Thread(target=shared.add_task, args=("Second",))
+        writer.start()
+        assert not finishes(writer)
+        assert len(shared.service.get_all_tasks()) == 1
+    assert finishes(writer, 5)
+    assert [task.title for task in shared.get_all_tasks()] == ["First", "Second"]
+
+    with pytest.raises(AttributeError):
+        shared.flush
+
+
+def test_waiting_writers_block_new_readers():
+    lock = ReadWriteLock()
+    order = []
+
+    def write():
+        with lock.write():
+            order.append("write")
+
+    def read():
+        with lock.read():
+            order.append("read")
+
+    with lock.read():
+        writer = threading.Thread(target=write)
+        writer.start()
+        deadline = time.monotonic() + 5
+        while not lock._waiting_writers:
+            assert time.monotonic() < deadline, "writer did not start waiting"
+            time.sleep(0.001)
+        reader = threading.Thread(target=read)
+        reader.start()
+        assert not finishes(reader)
+    assert finishes(writer, 5) and finishes(reader, 5)
+    assert order == ["write", "read"]
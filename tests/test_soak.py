@@ -0,0 +1,45 @@
+"""
+Smoke run of the soak test, so the load generator keeps working as the services change.
+"""
+
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SOAK_TEST = os.path.join(REPO_ROOT, "benchmarks", "soak_test.py")
+
+
+def soak(tmp_path, *args):
+    output = str(tmp_path / "soak.json")
+    result = subprocess.run(
+        [sys.executable, SOAK_TEST, "--workers", "2", "--duration", "1", "--interval", "0.5", "--size", "200",
+         "--output", output] + list(args),
+        cwd=str(tmp_path), stdout=subprocess.PIPE, stderr=subprocess.PIPE, timeout=120
+    )
+    assert result.returncode == 0, result.stdout.decode() + result.stderr.decode()
+    with open(output) as f:
+        return output, json.load(f)
+
+
+@pytest.mark.parametrize("args", [
+    ("--kind", "shared"),
+    ("--kind", "process", "--storage-mode", "journal"),
+    ("--kind", "shared", "--storage-mode", "sqlite", "--mix", "add=1,complete=1,delete=1"),
+])
+def test_short_soak_runs_without_lost_updates(tmp_path, args):
+    _, results = soak(tmp_path, *args)
+    totals = results["totals"]
+    assert totals["ops"] > 0
+    assert (totals["errors"], totals["lost_updates"]) == (0, 0)
+    assert results["timeline"]
+
+
+def test_baselines_are_compared(tmp_path):
+    baseline, _ = soak(tmp_path)
+    os.rename(baseline, str(tmp_path / "baseline.json"))
+    # A generous threshold: short runs vary too much to flag small changes
+    soak(tmp_path, "--baseline", "baseline.json", "--threshold", "100")
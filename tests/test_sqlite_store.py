@@ -0,0 +1,97 @@
+"""
+Tests for the SQLite backend and the migration to it.
+"""
+
+import sqlite3
+
+import pytest
+
+from src.services.task_service import TaskService
+from src.storage.sqlite_store import SqliteTaskStore, migrate_json_to_sqlite
+
+
+def test_migration_keeps_ids_timestamps_and_the_id_counter(tmp_path):
+    json_path = str(tmp_path / "tasks.json")
+    db_path = str(tmp_path / "tasks.db")
+    source = TaskService(json_path)
+    tasks = source.add_tasks([
+        {"title": "First", "priority": "high", "created_at": "2024-01-01 09:00:00"},
+        {"title": "Second", "description": "gone"},
+        {"title": "Third", "due_at": "2030-05-01 12:00:00"},
+    ])
+    source.complete_task(tasks[0].id)
+    source.delete_task(tasks[1].id)
+    source.delete_task(tasks[2].id)
+    kept = source.get_task_by_id(tasks[0].id)
+    source.close()
+
+    assert migrate_json_to_sqlite(json_path, db_path) == 1
+
+    migrated = TaskService(db_path)
+    task = migrated.get_task_by_id(tasks[0].id)
+    assert task.to_dict() == kept.to_dict()
+    assert task.created_at == "2024-01-01 09:00:00"
+    # The deleted tasks' ids stay retired
+    assert migrated.add_task("New").id == tasks[2].id + 1
+    migrated.close()
+
+
+def test_timestamps_are_stored_as_integers(tmp_path):
+    db_path = str(tmp_path / "tasks.db")
+    service = TaskService(db_path)
+    task = service.add_task("Task", due_at="2030-05-01 12:00:00")
+    service.complete_task(task.id)
+    service.close()
+
+    conn = sqlite3.connect(db_path)
+    row = conn.execute(
+        "SELECT typeof(created_at), typeof(completed_at), typeof(due_at) FROM tasks WHERE id = ?", (task.id,)
+    ).fetchone()
+    conn.close()
+    assert row == ("integer", "integer", "integer")
+
+
+def test_reserve_ids_never_moves_the_counter_back(tmp_path):
+    store = SqliteTaskStore(str(tmp_path / "tasks.db"))
+    store.reserve_ids(10)
+    assert store.insert("First", "", "medium").id == 10
+    store.reserve_ids(5)
+    assert store.insert("Second", "", "medium").id == 11
+    store.close()
+
+
+def test_held_back_commits_are_invisible_until_flushed(tmp_path):
+    db_path = str(tmp_path / "tasks.db")
+    service = TaskService(db_path, autosave=False)
+    reader = TaskService(db_path)
+    service.add_task("Pending")
+    assert service.get_all_tasks()[0].title == "Pending"
+    assert reader.get_all_tasks() == []
+    service.flush()
+    assert [task.title for task in reader.get_all_tasks()] == ["Pending"]
+
+    service.add_task("Committed on close")
+    service.close()
+    assert len(reader.get_all_tasks()) == 2
+    reader.close()
+
+
+def test_commit_every_commits_in_groups(tmp_path):
+    db_path = str(tmp_path / "tasks.db")
+    service = TaskService(db_path, commit_every=3)
+    reader = TaskService(db_path)
+    service.add_task("One")
+    service.add_task("Two")
+    assert reader.get_all_tasks() == []
+    service.add_task("Three")
+    assert len(reader.get_all_tasks()) == 3
+    service.close()
+    reader.close()
+
+
+@pytest.mark.parametrize("option", [
+    {"parallel_scan": True}, {"scan_workers": 2}, {"query_cache_size": 0}, {"shard": 1}
+])
+def test_unsupported_options_are_rejected(tmp_path, option):
+    with pytest.raises(ValueError):
+        TaskService(str(tmp_path / "tasks.db"), **option)
@@ -0,0 +1,65 @@
+"""
+Tests for the Task model and loading tasks written by older versions.
+"""
+
+import json
+from datetime import datetime
+
+import pytest
+
+from src.models.task import Task, format_timestamp, parse_timestamp
+from src.services.task_service import TaskService
+from src.storage.columnar_store import encode_columns
+from src.storage.sqlite_store import migrate_json_to_sqlite
+from src.utils.exceptions import InvalidTaskDataException
+
+
+def test_new_priorities_are_validated():
+    assert Task(1, "Task", priority="HIGH").priority == "high"
+    with pytest.raises(InvalidTaskDataException):
+        Task(1, "Task", priority="urgent")
+    task = Task(1, "Task")
+    with pytest.raises(InvalidTaskDataException):
+        task.priority = "urgent"
+    assert task.priority == "medium"
+
+
+def test_stored_priorities_outside_the_levels_are_kept(tmp_path):
+    path = str(tmp_path / "tasks.json")
+    # A bare list of tasks, as the first version of the JSON store wrote it
+    with open(path, "w") as f:
+        json.dump([
+            {"id": 1, "title": "Legacy", "priority": "urgent", "completed": False,
+             "created_at": "2024-01-01 09:00:00"},
+            {"id": 2, "title": "Shouting", "priority": "High", "completed": False,
+             "created_at": "2024-01-02 09:00:00"},
+        ], f)
+
+    service = TaskService(path)
+    assert [task.priority for task in service.get_all_tasks()] == ["urgent", "high"]
+    assert [task.id for task in service.query(priority="high")] == [2]
+    # Unknown priorities sort below every level
+    assert [task.id for task in service.query(order_by="priority")] == [1, 2]
+    service.update_task(1, title="Legacy task")
+    service.close()
+
+    reopened = TaskService(path)
+    assert reopened.get_task_by_id(1).to_dict()["priority"] == "urgent"
+    reopened.close()
+
+    db_path = str(tmp_path / "tasks.db")
+    assert migrate_json_to_sqlite(path, db_path) == 2
+    database = TaskService(db_path)
+    assert database.get_task_by_id(1).priority == "urgent"
+    database.close()
+
+    with pytest.raises(InvalidTaskDataException):
+        encode_columns([Task.from_dict({"id": 1, "title": "Legacy", "priority": "urgent"})], 2)
+
+
+def test_timestamps_round_trip_through_text():
+    assert format_timestamp(parse_timestamp("2024-01-15 12:34:56")) == "2024-01-15 12:34:56"
+    assert parse_timestamp(datetime(2024, 1, 1, 9, 0)) == parse_timestamp("2024-01-01 09:00:00")
+    assert parse_timestamp(1700000000.7) == 1700000000
+    with pytest.raises(ValueError):
+        parse_timestamp("yesterday")
@@ -0,0 +1,55 @@
+"""
+Tests for TaskService on every storage backend.
+"""
+
+import pytest
+
+from src.utils.exceptions import InvalidTaskDataException, TaskNotFoundException
+
+
+def test_ids_are_never_reused(open_service):
+    service = open_service()
+    first = service.add_task("First")
+    second = service.add_task("Second")
+    service.delete_task(second.id)
+    third = service.add_task("Third")
+    assert third.id == second.id + 1
+
+    # Deleting the highest id must not hand it out again after a reopen
+    service.delete_task(third.id)
+    service.close()
+    reopened = open_service()
+    fourth = reopened.add_task("Fourth")
+    assert fourth.id == third.id + 1
+    assert [task.id for task in reopened.tasks] == [first.id, fourth.id]
+
+
+def test_lookup_by_id_after_reopen(open_service):
+    service = open_service()
+    tasks = service.add_tasks([{"title": f"Task {number}"} for number in range(5)])
+    service.delete_task(tasks[2].id)
+    service.close()
+
+    reopened = open_service(lazy_load=True)
+    assert reopened.get_task_by_id(tasks[3].id).title == "Task 3"
+    with pytest.raises(TaskNotFoundException):
+        reopened.get_task_by_id(tasks[2].id)
+    assert reopened.add_task("Next").id == tasks[-1].id + 1
+
+
+def test_invalid_update_leaves_the_task_unchanged(open_service):
+    service = open_service()
+    task = service.add_task("Original", "text", "low")
+    before = task.to_dict()
+
+    with pytest.raises(InvalidTaskDataException):
+        service.update_task(task.id, title="Changed", priority="urgent")
+    with pytest.raises(ValueError):
+        service.update_task(task.id, description="Changed", due_at="not a date")
+
+    assert service.get_task_by_id(task.id).to_dict() == before
+    assert [found.id for found in service.search_tasks("original")] == [task.id]
+    assert service.search_tasks("changed") == []
+    assert [found.id for found in service.query(priority="low")] == [task.id]
+    service.close()
+    assert open_service().get_task_by_id(task.id).to_dict() == before